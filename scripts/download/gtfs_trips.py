@@ -45,6 +45,7 @@ from math import radians, cos, sin, sqrt, atan2
 from pathlib import Path
 from typing import NamedTuple, Callable
 
+import numpy as np
 import requests
 
 # Add parent directory to path for terrain elevation sampling
@@ -170,140 +171,265 @@ def find_nearest_shape_point(
     return min_idx, min_dist
 
 
-def interpolate_waypoints(
-    shape_points: list[ShapePoint],
-    stop_times: list[StopTime],
+# Default elevation for flat mode (2m above Zurich base for visual clearance)
+ZURICH_BASE_ELEVATION = 408.0
+FLAT_MODE_ELEVATION = ZURICH_BASE_ELEVATION + 2.0
+
+# Timestamps beyond this are dropped (a day plus a buffer for overnight trips)
+MAX_TIMESTAMP = 30 * 3600
+
+
+def nearest_shape_indices(
+    stop_lats: np.ndarray,
+    stop_lons: np.ndarray,
+    shape: "ShapeArrays",
+) -> np.ndarray:
+    """Vectorized find_nearest_shape_point for many stops at once.
+
+    Distances are computed with NumPy; near-ties are re-checked with
+    haversine_distance so the chosen index matches the scalar version.
+
+    Returns:
+        Shape point index per stop
+    """
+    shape_lats = np.radians(shape.lats)
+    shape_lons = np.radians(shape.lons)
+    lat1 = np.radians(stop_lats)[:, None]
+    lon1 = np.radians(stop_lons)[:, None]
+
+    a = (np.sin((shape_lats - lat1) / 2) ** 2
+         + np.cos(lat1) * np.cos(shape_lats) * np.sin((shape_lons - lon1) / 2) ** 2)
+    dist = 2 * 6371000 * np.arctan2(np.sqrt(a), np.sqrt(1 - a))
+
+    indices = np.argmin(dist, axis=1)
+    for k in range(len(indices)):
+        near = np.flatnonzero(dist[k] <= dist[k, indices[k]] * (1 + 1e-9) + 1e-9)
+        if len(near) > 1:
+            exact = [
+                haversine_distance(stop_lats[k], stop_lons[k], shape.lats[i], shape.lons[i])
+                for i in near
+            ]
+            indices[k] = near[int(np.argmin(exact))]
+    return indices
+
+
+class ShapeArrays:
+    """Per-shape arrays shared by all trips and patterns on that shape."""
+
+    def __init__(self, shape_points: list[ShapePoint]):
+        self.points = shape_points
+        self.lats = np.array([sp.lat for sp in shape_points])
+        self.lons = np.array([sp.lon for sp in shape_points])
+        self.dist_traveled = np.array([sp.dist_traveled for sp in shape_points])
+
+        # Distance from point i to i+1, and distance from the first point
+        self.step_dist = np.array([
+            haversine_distance(a.lat, a.lon, b.lat, b.lon)
+            for a, b in zip(shape_points, shape_points[1:])
+        ])
+        self.prefix_dist = np.concatenate([[0.0], np.cumsum(self.step_dist)])
+
+        # Output coordinates, rounded to 4 decimals (~11m accuracy)
+        self.rounded = np.array([[round(sp.lon, 4), round(sp.lat, 4)] for sp in shape_points])
+        self._elevations: dict[int, float] = {}
+
+    def elevations(self, indices: np.ndarray) -> np.ndarray:
+        """Rounded terrain elevation per shape point (sampled once per point)."""
+        result = np.empty(len(indices))
+        for k, i in enumerate(indices.tolist()):
+            elevation = self._elevations.get(i)
+            if elevation is None:
+                sp = self.points[i]
+                elevation = round(get_elevation_lazy(sp.lon, sp.lat), 1)
+                self._elevations[i] = elevation
+            result[k] = elevation
+        return result
+
+
+class TripPattern(NamedTuple):
+    """Trip geometry shared by all trips with the same shape and stops.
+
+    Rows are the shape points visited segment by segment between matched
+    stops (segment end points appear twice, as in a per-trip walk).
+    """
+    stop_order: np.ndarray     # Index into sequence-sorted stop times per matched stop
+    row_start: np.ndarray      # Matched-stop position where each row's segment starts
+    row_end: np.ndarray        # Matched-stop position where each row's segment ends
+    progress: np.ndarray       # 0-1 distance fraction along the segment per row
+    coords: np.ndarray         # (rows, 3) [lng, lat, elevation] per row
+
+
+def build_trip_pattern(
+    shape: ShapeArrays,
+    stop_ids: tuple[str, ...],
     stops: dict[str, Stop],
-    use_elevation: bool = True
-) -> dict:
-    """Interpolate timestamps for all shape points between stops.
+    use_elevation: bool = True,
+) -> TripPattern | None:
+    """Match stops to the shape and precompute per-row interpolation.
 
     Algorithm:
     1. Match each stop to its nearest shape point
-    2. For shape points between stops, linearly interpolate time based on distance
-    3. Return parallel arrays for efficient JSON serialization
+    2. For shape points between consecutive stops, compute the distance
+       fraction used to interpolate times
+    3. Gather output coordinates (and elevations) for every row
+
+    Args:
+        shape: Shape arrays
+        stop_ids: Stop ids in stop_sequence order
+        stops: Stop lookup
+        use_elevation: Whether to sample terrain elevation
 
     Returns:
-        dict with 'path' (list of [lng, lat, elevation]) and 'timestamps' (list of int)
+        TripPattern, or None if fewer than two stops match
     """
-    # Default elevation for flat mode (2m above Zurich base for visual clearance)
-    ZURICH_BASE_ELEVATION = 408.0
-    FLAT_MODE_ELEVATION = ZURICH_BASE_ELEVATION + 2.0
+    stop_order = np.array([i for i, stop_id in enumerate(stop_ids) if stop_id in stops], dtype=np.int64)
+    if len(stop_order) < 2:
+        return None
 
-    if not shape_points or not stop_times:
-        return {'path': [], 'timestamps': []}
+    matched = [stops[stop_ids[i]] for i in stop_order]
+    shape_idx = nearest_shape_indices(
+        np.array([stop.lat for stop in matched]),
+        np.array([stop.lon for stop in matched]),
+        shape,
+    )
+    stop_dist = np.where(
+        shape.dist_traveled[shape_idx] > 0,
+        shape.dist_traveled[shape_idx],
+        shape.prefix_dist[shape_idx],
+    )
 
-    # Sort stop times by sequence
-    sorted_stops = sorted(stop_times, key=lambda x: x.stop_sequence)
+    # Order by shape index (stable, so equal indices keep stop order)
+    by_shape = np.argsort(shape_idx, kind="stable")
+    stop_order, shape_idx, stop_dist = stop_order[by_shape], shape_idx[by_shape], stop_dist[by_shape]
+
+    point_rows, start_rows, end_rows, progress_rows = [], [], [], []
+    for i in range(len(shape_idx) - 1):
+        start_idx, end_idx = int(shape_idx[i]), int(shape_idx[i + 1])
 
-    # Match stops to shape point indices
-    stop_matches = []
-    for st in sorted_stops:
-        stop = stops.get(st.stop_id)
-        if not stop:
+        # Handle case where indices are same or inverted
+        if start_idx >= end_idx:
             continue
 
-        idx, dist = find_nearest_shape_point(stop.lat, stop.lon, shape_points)
-        stop_matches.append({
-            'shape_idx': idx,
-            'arrival_time': st.arrival_time,
-            'departure_time': st.departure_time,
-            'stop_id': st.stop_id,
-            'dist_traveled': shape_points[idx].dist_traveled if shape_points[idx].dist_traveled > 0 else sum(
-                haversine_distance(
-                    shape_points[i].lat, shape_points[i].lon,
-                    shape_points[i+1].lat, shape_points[i+1].lon
-                ) for i in range(idx)
-            )
-        })
+        steps = shape.step_dist[start_idx:end_idx]
+        total_segment_dist = stop_dist[i + 1] - stop_dist[i]
+        if total_segment_dist <= 0:
+            # Fallback: calculate from coordinates
+            total_segment_dist = np.cumsum(steps)[-1]
+
+        n = end_idx - start_idx + 1
+        if total_segment_dist > 0:
+            progress = np.concatenate([[0.0], np.cumsum(steps)]) / total_segment_dist
+        else:
+            progress = np.arange(n) / (end_idx - start_idx)
+        progress[0], progress[-1] = 0.0, 1.0
+
+        point_rows.append(np.arange(start_idx, end_idx + 1))
+        start_rows.append(np.full(n, i))
+        end_rows.append(np.full(n, i + 1))
+        progress_rows.append(progress)
+
+    if not point_rows:
+        empty = np.zeros(0, dtype=np.int64)
+        return TripPattern(stop_order, empty, empty, np.zeros(0), np.zeros((0, 3)))
+
+    points = np.concatenate(point_rows)
+    coords = np.empty((len(points), 3))
+    coords[:, :2] = shape.rounded[points]
+    coords[:, 2] = shape.elevations(points) if use_elevation else FLAT_MODE_ELEVATION
+
+    return TripPattern(
+        stop_order=stop_order,
+        row_start=np.concatenate(start_rows),
+        row_end=np.concatenate(end_rows),
+        progress=np.concatenate(progress_rows),
+        coords=coords,
+    )
 
-    if len(stop_matches) < 2:
-        return {'path': [], 'timestamps': []}
 
-    # Sort by shape index to ensure proper ordering
-    stop_matches.sort(key=lambda x: x['shape_idx'])
+class TripPatternCache:
+    """Caches shape arrays and trip patterns across the trips of a feed.
 
-    # Use parallel arrays for efficient JSON output
-    path = []
-    timestamps = []
+    Thousands of trips share a (shape_id, stop sequence) pattern; stop
+    matching, distances and elevations are computed once per pattern.
+    """
 
-    # Process segments between consecutive stops
-    for i in range(len(stop_matches) - 1):
-        start_match = stop_matches[i]
-        end_match = stop_matches[i + 1]
+    def __init__(self, use_elevation: bool = True):
+        self.use_elevation = use_elevation
+        self._shapes: dict[str, ShapeArrays] = {}
+        self._patterns: dict[tuple, TripPattern | None] = {}
+
+    def pattern(
+        self,
+        shape_points: list[ShapePoint],
+        stop_ids: tuple[str, ...],
+        stops: dict[str, Stop],
+    ) -> TripPattern | None:
+        """Get (or build) the pattern for a shape and stop sequence."""
+        shape_id = shape_points[0].shape_id
+        key = (shape_id, len(shape_points), stop_ids)
+        if key not in self._patterns:
+            shape = self._shapes.get(shape_id)
+            if shape is None or len(shape.points) != len(shape_points):
+                shape = ShapeArrays(shape_points)
+                self._shapes[shape_id] = shape
+            self._patterns[key] = build_trip_pattern(shape, stop_ids, stops, self.use_elevation)
+        return self._patterns[key]
+
+    def __len__(self) -> int:
+        return len(self._patterns)
 
-        start_idx = start_match['shape_idx']
-        end_idx = end_match['shape_idx']
 
-        # Use departure time from start stop, arrival time at end stop
-        start_time = start_match['departure_time']
-        end_time = end_match['arrival_time']
+def interpolate_waypoints(
+    shape_points: list[ShapePoint],
+    stop_times: list[StopTime],
+    stops: dict[str, Stop],
+    use_elevation: bool = True,
+    cache: TripPatternCache | None = None,
+) -> dict:
+    """Interpolate timestamps for all shape points between stops.
 
-        # Handle case where indices are same or inverted
-        if start_idx >= end_idx:
-            continue
+    Algorithm:
+    1. Look up (or build) the trip's pattern: stop matches, distance
+       fractions and coordinates shared with other trips
+    2. Linearly interpolate times for every row from the trip's stop times
+    3. Drop out-of-range and consecutive duplicate points
+
+    Args:
+        shape_points: Shape points sorted by sequence
+        stop_times: Stop times of the trip
+        stops: Stop lookup
+        use_elevation: Whether to sample terrain elevation
+        cache: Pattern cache shared across trips (a throwaway one if None)
 
-        # Calculate total distance for this segment
-        segment_start_dist = start_match['dist_traveled']
-        segment_end_dist = end_match['dist_traveled']
-        total_segment_dist = segment_end_dist - segment_start_dist
+    Returns:
+        dict with 'path' (list of [lng, lat, elevation]) and 'timestamps' (list of int)
+    """
+    if not shape_points or not stop_times:
+        return {'path': [], 'timestamps': []}
 
-        if total_segment_dist <= 0:
-            # Fallback: calculate from coordinates
-            total_segment_dist = 0
-            for j in range(start_idx, end_idx):
-                total_segment_dist += haversine_distance(
-                    shape_points[j].lat, shape_points[j].lon,
-                    shape_points[j+1].lat, shape_points[j+1].lon
-                )
-
-        # Interpolate timestamps for each shape point in this segment
-        cumulative_dist = 0
-        for j in range(start_idx, end_idx + 1):
-            sp = shape_points[j]
-
-            if j == start_idx:
-                timestamp = start_time
-            elif j == end_idx:
-                timestamp = end_time
-            else:
-                # Linear interpolation based on distance
-                if total_segment_dist > 0:
-                    progress = cumulative_dist / total_segment_dist
-                else:
-                    progress = (j - start_idx) / (end_idx - start_idx)
-                timestamp = int(start_time + progress * (end_time - start_time))
-
-            # Only add if timestamp is reasonable (within a day + some buffer for overnight trips)
-            if 0 <= timestamp < 30 * 3600:  # Up to 30 hours for overnight trips
-                # Use 4 decimal precision (~11m accuracy, sufficient for transit visualization)
-                # Coordinate format: [lng, lat, elevation] for deck.gl TripsLayer
-                if use_elevation:
-                    elevation = get_elevation_lazy(sp.lon, sp.lat)
-                else:
-                    elevation = FLAT_MODE_ELEVATION
-
-                coord = [round(sp.lon, 4), round(sp.lat, 4), round(elevation, 1)]
-                path.append(coord)
-                timestamps.append(timestamp)
-
-            # Update cumulative distance for next iteration
-            if j < end_idx:
-                next_sp = shape_points[j + 1]
-                cumulative_dist += haversine_distance(sp.lat, sp.lon, next_sp.lat, next_sp.lon)
-
-    # Deduplicate consecutive points with same timestamp or coordinates
-    if path:
-        deduped_path = [path[0]]
-        deduped_timestamps = [timestamps[0]]
-        for i in range(1, len(path)):
-            # Compare coordinates (first 2 elements) and timestamp
-            if timestamps[i] != deduped_timestamps[-1] or path[i][:2] != deduped_path[-1][:2]:
-                deduped_path.append(path[i])
-                deduped_timestamps.append(timestamps[i])
-        path, timestamps = deduped_path, deduped_timestamps
-
-    return {'path': path, 'timestamps': timestamps}
+    if cache is None:
+        cache = TripPatternCache(use_elevation)
+
+    # Sort stop times by sequence
+    sorted_stops = sorted(stop_times, key=lambda x: x.stop_sequence)
+    pattern = cache.pattern(shape_points, tuple(st.stop_id for st in sorted_stops), stops)
+    if pattern is None:
+        return {'path': [], 'timestamps': []}
+
+    # Use departure time from start stop, arrival time at end stop
+    departures = np.array([st.departure_time for st in sorted_stops])[pattern.stop_order]
+    arrivals = np.array([st.arrival_time for st in sorted_stops])[pattern.stop_order]
+    start_time = departures[pattern.row_start]
+    end_time = arrivals[pattern.row_end]
+    timestamps = np.trunc(start_time + pattern.progress * (end_time - start_time)).astype(np.int64)
+
+    # Only keep reasonable timestamps, then drop consecutive duplicates
+    valid = (timestamps >= 0) & (timestamps < MAX_TIMESTAMP)
+    timestamps, coords = timestamps[valid], pattern.coords[valid]
+    keep = np.ones(len(timestamps), dtype=bool)
+    keep[1:] = (timestamps[1:] != timestamps[:-1]) | np.any(coords[1:, :2] != coords[:-1, :2], axis=1)
+
+    return {'path': coords[keep].tolist(), 'timestamps': timestamps[keep].tolist()}
 
 
 def download_and_process_gtfs(output_path: Path, limit_trips: int = 0, use_elevation: bool = True) -> dict:
@@ -436,6 +562,7 @@ def download_and_process_gtfs(output_path: Path, limit_trips: int = 0, use_eleva
 
     # Process trips into TripsLayer format
     print("Interpolating waypoints for each trip...")
+    pattern_cache = TripPatternCache(use_elevation)
     output_trips = []
     skipped_no_shape = 0
     skipped_no_waypoints = 0
@@ -449,7 +576,9 @@ def download_and_process_gtfs(output_path: Path, limit_trips: int = 0, use_eleva
         shape_points = shapes[shape_id]
         stop_times = trip_stop_times.get(trip_id, [])
 
-        waypoint_data = interpolate_waypoints(shape_points, stop_times, stops, use_elevation)
+        waypoint_data = interpolate_waypoints(
+            shape_points, stop_times, stops, use_elevation, cache=pattern_cache
+        )
 
         if not waypoint_data['path']:
             skipped_no_waypoints += 1
@@ -466,7 +595,7 @@ def download_and_process_gtfs(output_path: Path, limit_trips: int = 0, use_eleva
             'timestamps': waypoint_data['timestamps']
         })
 
-    print(f"  → Generated {len(output_trips)} trips")
+    print(f"  → Generated {len(output_trips)} trips from {len(pattern_cache)} stop patterns")
     if skipped_no_shape:
         print(f"  → Skipped {skipped_no_shape} trips (no shape)")
     if skipped_no_waypoints:
@@ -1,9 +1,51 @@
 #!/usr/bin/env python3
 """Pytest configuration and shared fixtures."""
+import sys
 import pytest
 import tempfile
 from pathlib import Path
 
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.sources.vector import Feature
+
+
+def square(lon: float, lat: float, size: float, clockwise: bool = False) -> list:
+    """Closed GeoJSON ring of a square footprint."""
+    ring = [(lon, lat), (lon + size, lat), (lon + size, lat + size), (lon, lat + size), (lon, lat)]
+    return ring[::-1] if clockwise else ring
+
+
+def random_buildings(
+    count: int,
+    area: tuple[float, float, float, float],
+    size: tuple[float, float] = (0.0002, 0.0002),
+    height: tuple[float, float] = (5.0, 45.0),
+    seed: int = 0,
+) -> list[Feature]:
+    """Square buildings scattered over an area.
+
+    Args:
+        count: Number of buildings
+        area: (west, south, east, north) range of the south-west corners
+        size: (min, max) edge length in degrees
+        height: (min, max) height in meters
+        seed: Random seed
+    """
+    rng = np.random.default_rng(seed)
+    west, south, east, north = area
+    features = []
+    for i in range(count):
+        lon = west + rng.random() * (east - west)
+        lat = south + rng.random() * (north - south)
+        edge = size[0] + rng.random() * (size[1] - size[0])
+        top = height[0] + rng.random() * (height[1] - height[0])
+        features.append(Feature(i, "Polygon", [square(lon, lat, edge)], top, {}))
+    return features
+
 
 @pytest.fixture
 def temp_dir():
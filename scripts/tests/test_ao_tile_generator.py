@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Tests for batch AO tile generation, using in-process Blender servers."""
+import json
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+pytest.importorskip("cv2")
+
+from tile_pipeline import ao_tile_generator
+from tile_pipeline.ao_tile_generator import AOTileConfig, AOTileGenerator, get_tiles_in_bounds
+from tile_pipeline.blender_scene import load_scene
+from tile_pipeline.blender_server import BlenderServer, BlenderServerPool
+
+
+BOUNDS = (8.535, 47.375, 8.545, 47.380)
+
+
+def write_buildings(path: Path) -> None:
+    """Write a few square buildings spread over BOUNDS."""
+    features = []
+    for i, (lon, lat) in enumerate([(8.536, 47.376), (8.540, 47.378), (8.544, 47.379)]):
+        ring = [[lon, lat], [lon + 2e-4, lat], [lon + 2e-4, lat + 2e-4], [lon, lat + 2e-4], [lon, lat]]
+        features.append({
+            "type": "Feature",
+            "id": i,
+            "geometry": {"type": "Polygon", "coordinates": [ring]},
+            "properties": {"height": 15.0},
+        })
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+
+
+class TestAOTileGenerator:
+    """Tests for the AO batch engine."""
+
+    def test_generates_and_resumes(self, temp_dir, monkeypatch):
+        """Test sources load once, workers render every tile and reruns skip."""
+        buildings_path = temp_dir / "buildings.geojson"
+        write_buildings(buildings_path)
+
+        loads = []
+        original_source = ao_tile_generator.VectorSource
+        monkeypatch.setattr(
+            ao_tile_generator, "VectorSource",
+            lambda *args, **kwargs: loads.append(args) or original_source(*args, **kwargs),
+        )
+
+        rendered = []
+        lock = threading.Lock()
+
+        def render(data_dir, output_path):
+            scene = load_scene(data_dir)
+            with lock:
+                rendered.append(len(scene["buildings"]))
+            size = scene["config"]["image_size"]
+            Image.fromarray(np.zeros((size, size), dtype=np.uint8), "L").save(output_path)
+
+        config = AOTileConfig(tile_size=32, output_format="png")
+        output_dir = temp_dir / "ao"
+        tiles = list(get_tiles_in_bounds(*BOUNDS, config.zoom))
+
+        with BlenderServerPool(size=2, factory=lambda: BlenderServer.in_process(render)) as pool:
+            generator = AOTileGenerator(config, server_pool=pool)
+            paths = generator.generate_tiles(
+                BOUNDS, str(output_dir), buildings_path=str(buildings_path),
+                workers=2, progress=False,
+            )
+
+            assert len(loads) == 1
+            assert len(paths) == len(tiles) == len(rendered)
+            assert sum(rendered) >= 3  # Every building lands in some tile
+            for tile in tiles:
+                image = Image.open(output_dir / str(tile.z) / str(tile.x) / f"{tile.y}.png")
+                assert image.size == (32, 32)
+
+            # Second run: everything up to date, nothing parsed or rendered
+            assert generator.generate_tiles(
+                BOUNDS, str(output_dir), buildings_path=str(buildings_path), progress=False
+            ) == []
+            assert len(loads) == 1 and len(rendered) == len(tiles)
+
+            # Changed data invalidates every tile
+            write_buildings(buildings_path)
+            buildings_path.write_text(buildings_path.read_text() + "\n")
+            paths = generator.generate_tiles(
+                BOUNDS, str(output_dir), buildings_path=str(buildings_path), progress=False
+            )
+            assert len(paths) == len(tiles)
@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""Tests for the binary Blender scene format and batched mesh buffers."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.blender_scene import (
+    SceneLayerBuilder,
+    extrusion_buffers,
+    flat_polygon_buffers,
+    load_scene,
+    read_scene_binary,
+    tree_buffers,
+    write_scene,
+    write_scene_binary,
+)
+from tile_pipeline.blender_shadows import BlenderConfig, BlenderShadowRenderer, SceneBounds, SunPosition
+from tile_pipeline.sources.vector import Feature
+
+
+BOUNDS = (8.53, 47.37, 8.54, 47.38)
+
+
+def closed_volume(buffers):
+    """Signed volume of a closed mesh via the divergence theorem."""
+    vertices, loops, starts, totals = buffers
+    vertices = vertices.astype(np.float64)
+    volume = 0.0
+    for start, total in zip(starts, totals):
+        face = vertices[loops[start:start + total]]
+        for i in range(1, total - 1):
+            volume += np.dot(face[0], np.cross(face[i], face[i + 1])) / 6
+    return volume
+
+
+def face_normals(buffers):
+    """Unnormalized Newell normals of every face."""
+    vertices, loops, starts, totals = buffers
+    normals = []
+    for start, total in zip(starts, totals):
+        face = vertices[loops[start:start + total]].astype(np.float64)
+        normals.append(np.cross(face, np.roll(face, -1, axis=0)).sum(axis=0))
+    return np.array(normals)
+
+
+class TestSceneBinary:
+    """Tests for writing and reading scene.bin."""
+
+    def test_round_trip(self, temp_dir):
+        """Test arrays come back identical and memory-mapped."""
+        arrays = {
+            "a": np.arange(7, dtype=np.float32).reshape(7, 1),
+            "b": np.array([1, 5, 9], dtype=np.int32),
+            "empty": np.zeros((0, 2), dtype=np.float32),
+        }
+        write_scene_binary(temp_dir / "scene.bin", {"mode": "depth"}, arrays)
+        header, loaded = read_scene_binary(temp_dir / "scene.bin")
+
+        assert header == {"mode": "depth"}
+        for name, array in arrays.items():
+            np.testing.assert_array_equal(loaded[name], array)
+            assert loaded[name].dtype == array.dtype
+        assert isinstance(loaded["a"].base, np.memmap)
+
+    def test_rejects_other_files(self, temp_dir):
+        """Test a file without the magic bytes is refused."""
+        (temp_dir / "scene.bin").write_bytes(b"{}" * 8)
+        with pytest.raises(ValueError, match="Not a scene file"):
+            read_scene_binary(temp_dir / "scene.bin")
+
+    def test_layers_match_json_features(self, temp_dir):
+        """Test packed layers iterate as the per-feature dicts of scene.json."""
+        bounds = SceneBounds(*BOUNDS)
+        ring = [(8.531, 47.371), (8.532, 47.371), (8.532, 47.372), (8.531, 47.371)]
+
+        buildings = SceneLayerBuilder("rings", "footprint", numeric=("height", "elevation"))
+        buildings.add(ring, height=12.0, elevation=3.0, type="Gebaeude_Wohngebaeude", id="b1")
+        buildings.add(ring[:3], height=5.0, elevation=0.0, id=7)
+        trees = SceneLayerBuilder("points", "position", numeric=("height", "crown_radius"))
+        trees.add((8.535, 47.375, 2.0), height=9.0, crown_radius=3.0)
+
+        to_local = bounds.wgs84_to_local_array
+        write_scene(temp_dir, {"mode": "shadow", "config": {"image_size": 64}}, {
+            "buildings": buildings.pack("buildings", to_local),
+            "trees": trees.pack("trees", to_local),
+        })
+        scene = load_scene(temp_dir)
+
+        assert scene["mode"] == "shadow"
+        assert scene["config"] == {"image_size": 64}
+        assert len(scene["buildings"]) == 2
+
+        first, second = scene["buildings"]
+        expected = [bounds.wgs84_to_local(lon, lat) for lon, lat in ring]
+        np.testing.assert_allclose(first["footprint"], expected, atol=1e-3)
+        assert first["height"] == 12.0 and first["elevation"] == 3.0
+        assert first["type"] == "Gebaeude_Wohngebaeude" and first["id"] == "b1"
+        assert second["id"] == 7 and "type" not in second
+        assert len(second["footprint"]) == 3
+
+        tree = scene["trees"][0]
+        x, y = bounds.wgs84_to_local(8.535, 47.375)
+        np.testing.assert_allclose(tree["position"], [x, y, 2.0], atol=1e-3)
+        assert tree["crown_radius"] == 3.0
+
+    def test_shadow_renderer_export(self, temp_dir):
+        """Test BlenderShadowRenderer exports a loadable scene.bin."""
+        building = Feature(
+            id="b",
+            geometry_type="Polygon",
+            coordinates=[[[8.531, 47.371], [8.532, 47.371], [8.532, 47.372], [8.531, 47.371]]],
+            properties={},
+            height=20.0,
+        )
+        tree = Feature(id="t", geometry_type="Point", coordinates=[8.535, 47.375],
+                       properties={"crown_diameter": 8.0}, height=0.0)
+
+        renderer = BlenderShadowRenderer(blender_path="blender", config=BlenderConfig(image_size=64))
+        renderer._export_scene_data(temp_dir, [building], [tree], None, BOUNDS, SunPosition(225, 35))
+        scene = load_scene(temp_dir)
+
+        assert not (temp_dir / "scene.json").exists()
+        assert scene["sun"]["azimuth"] == 225
+        assert scene["buildings"][0]["height"] == 20.0
+        assert scene["trees"][0]["height"] == 8.0  # Default for missing height
+        assert scene["trees"][0]["crown_radius"] == 4.0
+
+
+class TestMeshBuffers:
+    """Tests for batched mesh construction."""
+
+    def test_extrusion_is_closed_and_outward(self):
+        """Test prisms enclose area * height regardless of ring winding."""
+        square_ccw = [[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]
+        triangle_cw = [[20, 0], [20, 6], [26, 0]]
+        coords = np.array(square_ccw + triangle_cw, dtype=np.float64)
+        offsets = np.array([0, 5, 8])
+
+        buffers = extrusion_buffers(coords, offsets, np.array([5.0, 2.0]), np.array([1.0, 0.0]))
+        vertices, loops, starts, totals = buffers
+
+        assert len(vertices) == 2 * (4 + 3)  # Closing vertex dropped
+        assert list(totals) == [4, 3, 4, 3] + [4] * 7
+        assert closed_volume(buffers) == pytest.approx(100 * 5 + 18 * 2)
+
+        normals = face_normals(buffers)
+        assert (normals[:2, 2] < 0).all() and (normals[2:4, 2] > 0).all()
+
+    def test_degenerate_rings_skipped(self):
+        """Test rings with fewer than three distinct vertices produce no faces."""
+        coords = np.array([[0, 0], [1, 0], [0, 0], [0, 0], [0, 1], [1, 1]], dtype=np.float64)
+        offsets = np.array([0, 3, 3, 6])
+        _, _, starts, totals = flat_polygon_buffers(coords, offsets, np.zeros(3))
+        assert list(totals) == [3]
+
+    def test_trees_are_closed(self):
+        """Test tree crowns and trunks match the create_tree dimensions."""
+        trees = [{"position": [5.0, 5.0, 2.0], "height": 10.0, "crown_radius": 3.0}]
+        crowns, trunks = tree_buffers(trees)
+
+        assert len(crowns[0]) == 16 and len(trunks[0]) == 12
+        assert crowns[0][:, 2].min() == pytest.approx(5.0)  # z + 0.3 * height
+        assert crowns[0][:, 2].max() == pytest.approx(12.0)
+        assert trunks[0][:, 2].max() == pytest.approx(5.5)
+        assert closed_volume(crowns) > 0 and closed_volume(trunks) > 0
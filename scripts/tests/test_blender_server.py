@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""Tests for the persistent Blender server protocol, using in-process workers."""
+import io
+import json
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.blender_scene import SERVER_REPLY_PREFIX, load_scene, serve
+from tile_pipeline.blender_server import BlenderServer, BlenderServerPool
+from tile_pipeline.blender_shadows import BlenderConfig, BlenderShadowRenderer, SunPosition
+from tile_pipeline.config import PipelineConfig
+from tile_pipeline.tile_renderer import RenderedTileRenderer, _init_render_worker
+
+
+def fake_render(data_dir: Path, output_path: Path) -> None:
+    """Stand-in for Blender: write a half-shadowed grayscale image."""
+    scene = load_scene(data_dir)
+    size = scene["config"]["image_size"]
+    image = np.zeros((size, size), dtype=np.uint8)
+    image[:, : size // 2] = 255
+    Image.fromarray(image, "L").save(output_path)
+
+
+def touch_render(data_dir: Path, output_path: Path) -> None:
+    """Stand-in for Blender that only creates the output file."""
+    output_path.write_bytes(b"")
+
+
+class ClosingRenderer(RenderedTileRenderer):
+    """Records each close() by creating a file named after the process."""
+
+    def __init__(self, marker_dir: Path, **kwargs):
+        super().__init__(**kwargs)
+        self.marker_dir = marker_dir
+
+    def close(self) -> None:
+        super().close()
+        (self.marker_dir / str(os.getpid())).touch()
+
+
+def worker_pid(_) -> int:
+    return os.getpid()
+
+
+def parse_replies(text: str) -> list:
+    """Decode reply lines written by serve()."""
+    return [
+        json.loads(line[len(SERVER_REPLY_PREFIX):])
+        for line in text.splitlines()
+        if line.startswith(SERVER_REPLY_PREFIX)
+    ]
+
+
+class TestServeLoop:
+    """Tests for the server loop that runs inside Blender."""
+
+    def test_replies_per_job(self, temp_dir):
+        """Test the loop greets, reports each job and stops on shutdown."""
+        def render(data_dir, output_path):
+            if data_dir.name == "bad":
+                raise ValueError("broken scene")
+
+        requests = io.StringIO("\n".join([
+            json.dumps({"id": 1, "data_dir": str(temp_dir), "output": "a.png"}),
+            "not json",
+            json.dumps({"id": 2, "data_dir": str(temp_dir / "bad"), "output": "b.png"}),
+            json.dumps({"command": "shutdown"}),
+            json.dumps({"id": 3, "data_dir": str(temp_dir), "output": "c.png"}),
+        ]))
+        replies = io.StringIO()
+
+        assert serve(requests, replies, render=render) == 1
+
+        ready, first, invalid, failed = parse_replies(replies.getvalue())
+        assert ready == {"ready": True}
+        assert first["id"] == 1 and first["ok"] and first["output"] == "a.png"
+        assert not invalid["ok"]
+        assert failed["id"] == 2 and "broken scene" in failed["error"]
+
+
+class TestBlenderServer:
+    """Tests for the client of a single server."""
+
+    def test_renders_jobs_in_sequence(self, temp_dir):
+        """Test one server handles several jobs and returns output paths."""
+        server = BlenderServer.in_process(touch_render, timeout=10)
+        try:
+            for i in range(3):
+                output = temp_dir / f"{i}.png"
+                assert server.render(temp_dir, output) == output
+                assert output.exists()
+        finally:
+            server.close()
+        assert not server.alive
+
+    def test_render_error_raises(self, temp_dir):
+        """Test a failed job raises but leaves the server usable."""
+        def render(data_dir, output_path):
+            if output_path.name == "fail.png":
+                raise RuntimeError("out of memory")
+            output_path.write_bytes(b"")
+
+        server = BlenderServer.in_process(render, timeout=10)
+        try:
+            with pytest.raises(RuntimeError, match="out of memory"):
+                server.render(temp_dir, temp_dir / "fail.png")
+            assert server.alive
+            server.render(temp_dir, temp_dir / "ok.png")
+        finally:
+            server.close()
+
+
+class TestBlenderServerPool:
+    """Tests for sharing servers between threads."""
+
+    def test_bounded_concurrency_and_reuse(self, temp_dir):
+        """Test jobs never exceed the pool size and servers are reused."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+        started = []
+
+        def render(data_dir, output_path):
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            output_path.write_bytes(b"")
+            with lock:
+                active -= 1
+
+        def factory():
+            started.append(1)
+            return BlenderServer.in_process(render, timeout=10)
+
+        with BlenderServerPool(size=2, factory=factory) as pool:
+            threads = [
+                threading.Thread(target=pool.render, args=(temp_dir, temp_dir / f"{i}.png"))
+                for i in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            assert pool.running == 2
+        assert len(started) == 2
+        assert peak <= 2
+        assert len(list(temp_dir.glob("*.png"))) == 8
+
+    @pytest.mark.filterwarnings("ignore::pytest.PytestUnhandledThreadExceptionWarning")
+    def test_dead_server_is_replaced(self, temp_dir):
+        """Test a crashed server is dropped and a fresh one serves the next job."""
+        def crash(data_dir, output_path):
+            raise SystemExit(1)  # Escapes the serve loop, like Blender dying
+
+        factories = [lambda: BlenderServer.in_process(crash, timeout=10),
+                     lambda: BlenderServer.in_process(touch_render, timeout=10)]
+
+        with BlenderServerPool(size=1, factory=lambda: factories.pop(0)()) as pool:
+            with pytest.raises(RuntimeError, match="exited"):
+                pool.render(temp_dir, temp_dir / "a.png")
+            assert pool.running == 0
+            pool.render(temp_dir, temp_dir / "b.png")
+            assert pool.running == 1
+
+
+class TestRendererIntegration:
+    """Tests for renderers routing jobs through a pool."""
+
+    def test_shadow_renderer_uses_pool(self):
+        """Test BlenderShadowRenderer renders through the server pool."""
+        config = BlenderConfig(image_size=32)
+        with BlenderServerPool(size=1, factory=lambda: BlenderServer.in_process(fake_render)) as pool:
+            renderer = BlenderShadowRenderer(config=config, server_pool=pool)
+            shadow = renderer.render(
+                buildings=[],
+                trees=[],
+                elevation=None,
+                bounds=(8.53, 47.37, 8.54, 47.38),
+                sun=SunPosition(azimuth=225, altitude=35),
+            )
+
+        assert shadow.shape == (32, 32)
+        np.testing.assert_allclose(shadow[:, :16], config.shadow_darkness)
+        np.testing.assert_allclose(shadow[:, 16:], 1.0)
+
+    def test_renderer_close_shuts_down_pool(self, temp_dir):
+        """Test closing a rendered-tile renderer stops its Blender servers."""
+        pool = BlenderServerPool(size=1, factory=lambda: BlenderServer.in_process(touch_render, timeout=10))
+        with RenderedTileRenderer(PipelineConfig(cache_dir=temp_dir), blender_servers=1) as renderer:
+            renderer._server_pool = pool
+            pool.render(temp_dir, temp_dir / "a.png")
+            assert pool.running == 1
+
+        assert pool.running == 0
+        assert renderer._server_pool is None
+        with pytest.raises(RuntimeError):
+            pool.render(temp_dir, temp_dir / "b.png")
+
+    def test_worker_renderers_closed_on_exit(self, temp_dir):
+        """Test process pool workers close their renderer when they exit."""
+        kwargs = {"marker_dir": temp_dir, "config": PipelineConfig(cache_dir=temp_dir / "cache")}
+        with ProcessPoolExecutor(
+            max_workers=2, initializer=_init_render_worker, initargs=(ClosingRenderer, kwargs)
+        ) as pool:
+            pids = set(pool.map(worker_pid, range(4)))
+
+        closed = {int(path.name) for path in temp_dir.iterdir() if path.name.isdigit()}
+        assert len(closed) == 2
+        assert pids <= closed
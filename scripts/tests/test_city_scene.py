@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""Tests for the city-wide shadow scene and its BVH."""
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pytest
+import trimesh
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.city_scene import CityScene, build_city_scene, open_city_scene
+from tile_pipeline.config import PipelineConfig, SourceConfig
+from tile_pipeline.query import ShadowQueryEngine, sample_times
+from tile_pipeline.raytracer import RayTracerConfig, SunPosition, TileRaytracer
+from tile_pipeline.scene_builder import SceneBuilder
+from tile_pipeline.tile_compositor import composite_tile_v2
+from tile_pipeline.tile_renderer import TileRenderer
+from tile_pipeline.sources.vector import Feature
+from tests.conftest import random_buildings
+
+CITY = (8.530, 47.370, 8.540, 47.377)
+TILE = (8.534, 47.372, 8.536, 47.3735)
+# South-west corners of the random buildings
+CITY_AREA = (8.530, 47.370, 8.5395, 47.3765)
+
+
+def write_geojson(path: Path, features: list[Feature]) -> Path:
+    """Save features as a GeoJSON FeatureCollection."""
+    path.write_text(json.dumps({
+        "type": "FeatureCollection",
+        "features": [
+            {
+                "type": "Feature",
+                "properties": {"height": f.height},
+                "geometry": {"type": f.geometry_type, "coordinates": f.coordinates},
+            }
+            for f in features
+        ],
+    }))
+    return path
+
+
+@pytest.fixture
+def city():
+    """City scene built from random buildings, with its source mesh."""
+    mesh = SceneBuilder(CITY).add_buildings(random_buildings(150, CITY_AREA)).build()
+    return CityScene.from_mesh(mesh, CITY), mesh
+
+
+class TestCityScene:
+    """Tests for BVH ray casting."""
+
+    def test_matches_trimesh(self, city):
+        """Test BVH hits agree with trimesh's ray-triangle intersector."""
+        scene, mesh = city
+        rng = np.random.default_rng(1)
+        origins = np.column_stack([
+            rng.random(3000) * scene.bounds.width_meters,
+            rng.random(3000) * scene.bounds.height_meters,
+            rng.random(3000) * 3,
+        ])
+        reference = trimesh.ray.ray_triangle.RayMeshIntersector(mesh)
+
+        for direction in ([0.3, -0.5, 0.6], [-0.2, 0.1, 0.9], [0.0, 0.0, 1.0]):
+            direction = np.asarray(direction) / np.linalg.norm(direction)
+            expected = reference.intersects_any(origins, np.broadcast_to(direction, origins.shape))
+            np.testing.assert_array_equal(scene.intersects_any(origins, direction), expected)
+
+    def test_box_query_matches_brute_force(self, city):
+        """Test BVH box queries return exactly the triangles overlapping the box."""
+        scene, _ = city
+        low = scene.triangles.min(axis=1)
+        high = scene.triangles.max(axis=1)
+
+        for box in ((100, 100, 300, 250), (0, 0, 5, 5), (-50, -50, -10, -10)):
+            expected = np.flatnonzero(
+                (high[:, 0] >= box[0]) & (low[:, 0] <= box[2]) &
+                (high[:, 1] >= box[1]) & (low[:, 1] <= box[3])
+            )
+            np.testing.assert_array_equal(scene.bvh.query(box), expected)
+
+    def test_saved_scene_is_memory_mapped(self, city, temp_dir):
+        """Test a saved scene loads with mmap and casts the same rays."""
+        scene, _ = city
+        scene.save(temp_dir / "scene")
+        loaded = CityScene.load(temp_dir / "scene")
+
+        assert isinstance(loaded.triangles, np.memmap)
+        assert len(loaded) == len(scene)
+        origins = np.column_stack([np.linspace(0, 700, 200), np.full(200, 400.0), np.zeros(200)])
+        np.testing.assert_array_equal(
+            loaded.intersects_any(origins, [0.2, 0.3, 0.5]),
+            scene.intersects_any(origins, [0.2, 0.3, 0.5]),
+        )
+        assert CityScene.load(temp_dir / "missing") is None
+
+    def test_tile_render_matches_tile_scene(self, city):
+        """Test rendering a tile against the city scene matches a per-tile scene."""
+        scene, _ = city
+        builder = SceneBuilder(TILE, image_size=64)
+        builder.add_ground_plane(z=0)
+        builder.add_buildings(random_buildings(150, CITY_AREA))
+        config = RayTracerConfig(image_size=64, use_embree=False)
+        sun = SunPosition(azimuth=200, altitude=35)
+
+        expected = TileRaytracer(builder.build(), TILE, config).render(sun)
+        actual = TileRaytracer(scene, TILE, config).render(sun)
+
+        np.testing.assert_array_equal(actual, expected)
+        assert (actual < 1).any()
+
+
+class TestPersistedCityScene:
+    """Tests for building, opening and using a saved city scene."""
+
+    def test_stale_scene_not_opened(self, temp_dir):
+        """Test a scene built from other data is ignored."""
+        buildings = write_geojson(temp_dir / "b.geojson", random_buildings(20, CITY_AREA))
+        scene_dir = build_city_scene(buildings, None, temp_dir / "scene", bounds=CITY, store_dir=temp_dir)
+
+        assert open_city_scene(scene_dir, buildings, None) is not None
+        assert open_city_scene(scene_dir, buildings, temp_dir / "b.geojson") is None
+
+        write_geojson(buildings, random_buildings(21, CITY_AREA))
+        assert open_city_scene(scene_dir, buildings, None) is None
+
+    def test_query_engine_uses_city_scene(self, temp_dir):
+        """Test shadow queries give the same answers from the city scene."""
+        buildings = write_geojson(temp_dir / "b.geojson", random_buildings(60, CITY_AREA))
+        trees = temp_dir / "missing_trees.geojson"
+        scene_dir = build_city_scene(buildings, trees, temp_dir / "scene", store_dir=temp_dir)
+
+        local = ShadowQueryEngine(buildings, trees, city_scene_dir=None, store_dir=temp_dir)
+        shared = ShadowQueryEngine(buildings, trees, city_scene_dir=scene_dir, store_dir=temp_dir)
+        lats = [47.3720, 47.3735, 47.3750]
+        lngs = [8.5330, 8.5350, 8.5370]
+        times = sample_times(
+            datetime(2026, 3, 1, 7, tzinfo=timezone.utc),
+            datetime(2026, 3, 1, 16, tzinfo=timezone.utc),
+            60,
+        )
+
+        np.testing.assert_array_equal(
+            shared.shadow_matrix(lats, lngs, times), local.shadow_matrix(lats, lngs, times)
+        )
+        assert shared.city_scene is not None
+        assert all(scene.mesh is None for scene in shared._scenes.values())
+
+    def test_tile_composite_skips_mesh_assembly(self, city, temp_dir, monkeypatch):
+        """Test composite_tile_v2 casts against a covering city scene without a tile mesh."""
+        scene, _ = city
+        builds = []
+        build = SceneBuilder.build
+        monkeypatch.setattr(SceneBuilder, "build", lambda self: builds.append(1) or build(self))
+
+        satellite = np.full((64, 64, 3), 128, dtype=np.uint8)
+        elevation = np.zeros((64, 64), dtype=np.float32)
+        buildings = random_buildings(150, CITY_AREA)
+
+        def composite(bounds, city_scene):
+            return composite_tile_v2(
+                satellite, elevation, buildings, [], bounds,
+                PipelineConfig(cache_dir=temp_dir), remove_shadows=False, city_scene=city_scene,
+            )
+
+        shared = composite(TILE, scene)
+        assert builds == []
+
+        per_tile = composite(TILE, None)
+        assert builds == [1]
+        assert np.mean(np.all(shared == per_tile, axis=-1)) > 0.98
+
+        # Outside the scene: falls back to a tile mesh
+        composite((8.60, 47.40, 8.602, 47.4015), scene)
+        assert builds == [1, 1]
+
+    def test_renderer_opens_scene_once(self, temp_dir):
+        """Test a tile renderer opens the scene built from its sources, once."""
+        buildings = write_geojson(temp_dir / "b.geojson", random_buildings(20, CITY_AREA))
+        trees = temp_dir / "missing_trees.geojson"
+        config = PipelineConfig(
+            sources=SourceConfig(buildings_path=buildings, trees_path=trees),
+            cache_dir=temp_dir / "cache" / "tiles",
+        )
+        renderer = TileRenderer(config)
+        assert renderer.city_scene is None
+
+        build_city_scene(buildings, trees, config.city_scene_dir, store_dir=temp_dir)
+        assert TileRenderer(config).city_scene is not None
+        assert renderer.city_scene is None  # Checked once per renderer
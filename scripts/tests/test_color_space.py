@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Tests for the fast sRGB ↔ LAB conversions against the float64 reference."""
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.color_space import (
+    LAB_LUT_MAX_DELTA_E,
+    RGB_TO_LAB_MAX_DELTA_E,
+    lab_to_rgb,
+    lab_to_xyz,
+    rgb_to_lab,
+    rgb_to_xyz,
+    xyz_to_lab,
+    xyz_to_rgb,
+)
+
+
+def color_grid(step: int = 3) -> np.ndarray:
+    """sRGB colors on a regular grid as a (N, 1, 3) uint8 image."""
+    levels = np.arange(0, 256, step, dtype=np.uint8)
+    grid = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1)
+    return grid.reshape(-1, 1, 3)
+
+
+def delta_e(lab1: np.ndarray, lab2: np.ndarray) -> np.ndarray:
+    """CIE76 color difference."""
+    return np.sqrt(((lab1.astype(np.float64) - lab2) ** 2).sum(axis=-1))
+
+
+class TestFastConversions:
+    """Tests for rgb_to_lab / lab_to_rgb accuracy."""
+
+    def test_rgb_to_lab_matches_reference(self):
+        """Test forward conversion stays within the documented ΔE."""
+        rgb = color_grid()
+        lab = rgb_to_lab(rgb)
+
+        assert lab.dtype == np.float32 and lab.shape == rgb.shape
+        assert delta_e(lab, xyz_to_lab(rgb_to_xyz(rgb))).max() < RGB_TO_LAB_MAX_DELTA_E
+
+    def test_lab_to_rgb_matches_reference(self):
+        """Test back conversion of edited colors is within one code value."""
+        lab = xyz_to_lab(rgb_to_xyz(color_grid()))
+        lab[..., 0] *= 0.8  # Darken, like the shadow tools do
+        lab[..., 1:] += 10.0  # Push some colors out of gamut
+
+        fast = lab_to_rgb(lab).astype(int)
+        reference = xyz_to_rgb(lab_to_xyz(lab)).astype(int)
+
+        assert np.abs(fast - reference).max() <= 1
+        assert (fast == reference).mean() > 0.999
+
+    def test_round_trip(self):
+        """Test a uint8 image survives rgb → lab → rgb within one code value."""
+        rng = np.random.default_rng(0)
+        rgb = rng.integers(0, 256, (64, 48, 3), dtype=np.uint8)
+        assert np.abs(lab_to_rgb(rgb_to_lab(rgb)).astype(int) - rgb).max() <= 1
+
+    def test_lut_within_bound(self):
+        """Test the 3D LUT return path stays within its documented ΔE."""
+        lab = rgb_to_lab(color_grid(step=5))
+        exact = lab_to_rgb(lab)
+        approximate = lab_to_rgb(lab, lut=True)
+
+        error = delta_e(rgb_to_lab(approximate), rgb_to_lab(exact))
+        assert error.max() < LAB_LUT_MAX_DELTA_E
+        assert error.mean() < 1.0
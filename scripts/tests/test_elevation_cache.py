@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Tests for the decoded elevation cache."""
+import io
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.sources import elevation as elevation_module
+from tile_pipeline.sources.elevation import ElevationSource, decode_terrarium, encode_terrarium
+
+
+def terrarium_png(elevation: np.ndarray) -> bytes:
+    """Encode an elevation grid as a lossless Terrarium tile."""
+    buffer = io.BytesIO()
+    Image.fromarray(encode_terrarium(elevation)).save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def ramp(size: int = 64, base: float = 400.0) -> np.ndarray:
+    """Elevation rising by 1 m per column."""
+    return np.tile(np.arange(size, dtype=np.float32) + base, (size, 1))
+
+
+@pytest.fixture
+def source(temp_dir):
+    """Elevation source with a pre-filled raw cache and no network."""
+    source = ElevationSource(url_template="http://127.0.0.1:9/{z}/{x}/{y}.webp", cache_dir=temp_dir)
+    source.store.put(14, 8, 4, terrarium_png(ramp()))
+    return source
+
+
+@pytest.fixture
+def count_decodes(monkeypatch):
+    """Count Terrarium decodes performed by ElevationSource."""
+    calls = []
+
+    def counting(rgb):
+        calls.append(1)
+        return decode_terrarium(rgb)
+
+    monkeypatch.setattr(elevation_module, "decode_terrarium", counting)
+    return calls
+
+
+class TestDecodedCache:
+    """Tests for the in-memory and .npy levels."""
+
+    def test_decodes_once(self, source, count_decodes):
+        """Test repeated fetches reuse one decoded, read-only grid."""
+        first = source.fetch(14, 8, 4)
+        second = source.fetch(14, 8, 4)
+
+        assert second is first
+        assert len(count_decodes) == 1
+        assert not first.flags.writeable
+        np.testing.assert_allclose(first, ramp())
+
+    def test_npy_survives_restart(self, source, temp_dir, count_decodes):
+        """Test a new source memory-maps the .npy instead of decoding."""
+        source.fetch(14, 8, 4)
+        fresh = ElevationSource(cache_dir=temp_dir)
+
+        elevation = fresh.fetch(14, 8, 4)
+
+        assert isinstance(elevation, np.memmap)
+        assert len(count_decodes) == 1
+        assert (temp_dir / "elevation_decoded" / "14" / "8" / "4.npy").exists()
+
+    def test_stale_npy_rebuilt(self, source, temp_dir, count_decodes):
+        """Test a raw tile newer than its .npy is decoded again."""
+        source.fetch(14, 8, 4)
+        npy = temp_dir / "elevation_decoded" / "14" / "8" / "4.npy"
+        os.utime(npy, (0, 0))
+        source.store.put(14, 8, 4, terrarium_png(ramp(base=1000.0)))
+
+        elevation = ElevationSource(cache_dir=temp_dir).fetch(14, 8, 4)
+
+        assert len(count_decodes) == 2
+        assert elevation[0, 0] == pytest.approx(1000.0)
+
+    def test_memory_lru_bounded(self, temp_dir):
+        """Test the in-memory level holds at most memory_tiles grids."""
+        source = ElevationSource(cache_dir=temp_dir, memory_tiles=2)
+        for x in range(4):
+            source.store.put(14, x, 0, terrarium_png(ramp()))
+            source.fetch(14, x, 0)
+
+        assert list(source._decoded) == [(14, 2, 0), (14, 3, 0)]
+
+    def test_without_cache_dir(self, monkeypatch):
+        """Test decoding still works (read-only) with no cache directory."""
+        source = ElevationSource()
+        monkeypatch.setattr(source, "fetch_raw", lambda z, x, y: encode_terrarium(ramp()))
+
+        elevation = source.fetch(14, 0, 0)
+
+        assert not elevation.flags.writeable
+        assert source.fetch(14, 0, 0) is elevation
+
+
+class TestWindows:
+    """Tests for serving child tiles from an ancestor grid."""
+
+    def test_same_size_is_zero_copy(self, source):
+        """Test an unresampled tile is the cached grid itself."""
+        assert source.fetch_and_resize(14, 8, 4, 64) is source.fetch(14, 8, 4)
+
+    def test_child_window_is_view(self, source):
+        """Test a child at native resolution is a view into its parent."""
+        parent = source.fetch(14, 8, 4)
+        child = source.fetch_window(15, 17, 9, source_zoom=14, target_size=32)
+
+        assert np.shares_memory(child, parent)
+        np.testing.assert_array_equal(child, parent[32:64, 32:64])
+
+    def test_max_zoom_serves_resampled_window(self, temp_dir):
+        """Test zooms beyond max_zoom are cut from the ancestor tile."""
+        source = ElevationSource(cache_dir=temp_dir, max_zoom=14)
+        source.store.put(14, 8, 4, terrarium_png(ramp()))
+
+        child = source.fetch_and_resize(16, 33, 17, 64)
+
+        assert child.shape == (64, 64)
+        # Columns 16-31 of the parent, upsampled 4×
+        assert 415.0 < child[0, 0] < 417.0
+        assert 430.0 < child[0, -1] < 432.0
+        assert source.fetch_and_resize(16, 33, 17, 64) is child
+        assert source.cache_mtime(16, 33, 17) == source.store.mtime(14, 8, 4)
+        assert [(r.z, r.x, r.y) for r in source.prefetch_requests(16, 33, 17)] == [(14, 8, 4)]
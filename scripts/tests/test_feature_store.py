@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""Tests for the columnar feature store behind VectorSource."""
+import pytest
+import json
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.sources.feature_store import (
+    FeatureStore,
+    build_feature_store,
+    is_store_current,
+    open_feature_store,
+    store_path_for,
+)
+from tile_pipeline.sources.vector import VectorSource
+
+
+@pytest.fixture
+def mixed_geojson(temp_dir, sample_geojson):
+    """GeoJSON file mixing polygon, point, line and multipolygon features."""
+    features = sample_geojson["features"] + [
+        {
+            "type": "Feature",
+            "properties": {"estimated_height": 12, "crown_diameter": 8},
+            "geometry": {"type": "Point", "coordinates": [8.5415, 47.3765]},
+        },
+        {
+            "type": "Feature",
+            "properties": {"width": "7.5"},
+            "geometry": {
+                "type": "LineString",
+                "coordinates": [[8.540, 47.370], [8.545, 47.372]],
+            },
+        },
+        {
+            "type": "Feature",
+            "properties": {"height": 30, "art": "Wohnhaus"},
+            "geometry": {
+                "type": "MultiPolygon",
+                "coordinates": [
+                    [[[8.55, 47.38], [8.551, 47.38], [8.551, 47.381], [8.55, 47.38]]],
+                    [
+                        [[8.56, 47.39], [8.562, 47.39], [8.562, 47.392], [8.56, 47.39]],
+                        [[8.5605, 47.3905], [8.561, 47.3905], [8.561, 47.391], [8.5605, 47.3905]],
+                    ],
+                ],
+            },
+        },
+    ]
+    path = temp_dir / "mixed.geojson"
+    path.write_text(json.dumps({"type": "FeatureCollection", "features": features}))
+    return path
+
+
+class TestFeatureStore:
+    """Tests for building and reading the store."""
+
+    def test_round_trip_matches_geojson(self, temp_dir, mixed_geojson):
+        """Test stored features match features parsed from GeoJSON."""
+        stored = VectorSource(mixed_geojson, store_dir=temp_dir / "store")
+        parsed = VectorSource(mixed_geojson, store_dir=None)
+
+        assert len(stored) == len(parsed) == 4
+        for a, b in zip(stored.features, parsed.features):
+            assert a.geometry_type == b.geometry_type
+            assert a.coordinates == b.coordinates
+            assert a.height == b.height
+            assert a.properties == b.properties
+            assert a.bounds == pytest.approx(b.bounds)
+
+    def test_query_matches_geojson(self, temp_dir, mixed_geojson):
+        """Test bbox queries return the same features either way."""
+        stored = VectorSource(mixed_geojson, store_dir=temp_dir / "store")
+        parsed = VectorSource(mixed_geojson, store_dir=None)
+        bounds = (8.540, 47.370, 8.5412, 47.3762)
+
+        assert sorted(f.id for f in stored.query(bounds)) == sorted(
+            f.id for f in parsed.query(bounds)
+        )
+
+    def test_rings_are_array_views(self, temp_dir, mixed_geojson):
+        """Test rings() exposes coordinates without list conversion."""
+        store = open_feature_store(mixed_geojson, "height", temp_dir / "store")
+        rings = store[3].rings()
+
+        assert len(rings) == 3
+        assert rings[2].shape == (4, 2)
+
+    def test_store_rebuilt_when_source_changes(self, temp_dir, mixed_geojson):
+        """Test a stale store is detected after the GeoJSON changes."""
+        assert len(open_feature_store(mixed_geojson, "height", temp_dir)) == 4
+        store_path = store_path_for(mixed_geojson, "height", temp_dir)
+        assert is_store_current(store_path, mixed_geojson, "height")
+        assert not is_store_current(store_path, mixed_geojson, "estimated_height")
+
+        mixed_geojson.write_text(json.dumps({"type": "FeatureCollection", "features": []}))
+        assert not is_store_current(store_path, mixed_geojson, "height")
+        assert len(open_feature_store(mixed_geojson, "height", temp_dir)) == 0
+
+    def test_empty_store(self, temp_dir):
+        """Test a GeoJSON without features produces an empty store."""
+        path = temp_dir / "empty.geojson"
+        path.write_text(json.dumps({"type": "FeatureCollection", "features": []}))
+        store = FeatureStore(build_feature_store(path, "height", temp_dir / "store"))
+
+        assert len(store) == 0
+        assert list(store) == []
+
+    def test_same_name_in_different_folders(self, temp_dir, sample_geojson):
+        """Test equally named GeoJSON files get separate stores."""
+        paths = []
+        for folder, count in (("a", 1), ("b", 2)):
+            (temp_dir / folder).mkdir()
+            path = temp_dir / folder / "buildings.geojson"
+            path.write_text(json.dumps({**sample_geojson, "features": sample_geojson["features"] * count}))
+            paths.append(path)
+
+        stores = [store_path_for(path, "height", temp_dir / "store") for path in paths]
+        assert stores[0] != stores[1]
+        assert [len(open_feature_store(p, "height", temp_dir / "store")) for p in paths] == [1, 2]
+        assert all(is_store_current(s, p, "height") for s, p in zip(stores, paths))
+
+    def test_rebuild_replaces_store(self, temp_dir, mixed_geojson):
+        """Test rebuilding over an existing store leaves only the new one."""
+        store_path = build_feature_store(mixed_geojson, "height", temp_dir / "store")
+        mixed_geojson.write_text(json.dumps({"type": "FeatureCollection", "features": []}))
+        build_feature_store(mixed_geojson, "height", store_path)
+
+        assert len(FeatureStore(store_path)) == 0
+        assert [p.name for p in temp_dir.iterdir() if p.is_dir()] == ["store"]
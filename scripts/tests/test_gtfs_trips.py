@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Tests for GTFS trip waypoint interpolation."""
+import pytest
+import sys
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from download.gtfs_trips import (
+    ShapeArrays,
+    ShapePoint,
+    Stop,
+    StopTime,
+    TripPatternCache,
+    find_nearest_shape_point,
+    interpolate_waypoints,
+    nearest_shape_indices,
+)
+
+
+@pytest.fixture
+def shape_points():
+    """Straight east-west shape with 11 points, ~75m apart."""
+    return [ShapePoint("s1", 47.37, 8.53 + i * 0.001, i, 0.0) for i in range(11)]
+
+
+@pytest.fixture
+def stops():
+    """Stops at the start, middle and end of the shape."""
+    return {
+        "a": Stop("a", "A", 47.3701, 8.530),
+        "b": Stop("b", "B", 47.3699, 8.535),
+        "c": Stop("c", "C", 47.3701, 8.540),
+    }
+
+
+def stop_times(trip_id, start):
+    """Stop times for a trip departing at start seconds."""
+    return [
+        StopTime(trip_id, start + 200, start + 200, "c", 3),
+        StopTime(trip_id, start, start, "a", 1),
+        StopTime(trip_id, start + 90, start + 100, "b", 2),
+    ]
+
+
+class TestInterpolateWaypoints:
+    """Tests for pattern-based interpolation."""
+
+    def test_nearest_matches_scalar_search(self, shape_points):
+        """Test vectorized stop matching agrees with the scalar search."""
+        rng = np.random.default_rng(0)
+        lats = 47.37 + rng.uniform(-0.001, 0.001, 20)
+        lons = rng.uniform(8.529, 8.541, 20)
+        indices = nearest_shape_indices(lats, lons, ShapeArrays(shape_points))
+        expected = [find_nearest_shape_point(lat, lon, shape_points)[0] for lat, lon in zip(lats, lons)]
+        assert indices.tolist() == expected
+
+    def test_timestamps_interpolate_between_stops(self, shape_points, stops):
+        """Test times are linear in distance and stops keep their exact times."""
+        result = interpolate_waypoints(shape_points, stop_times("t1", 1000), stops, use_elevation=False)
+
+        assert result["timestamps"][0] == 1000
+        assert result["timestamps"][5] == 1090  # Arrival at B
+        assert result["timestamps"][6] == 1100  # Departure from B
+        assert result["timestamps"][-1] == 1200
+        assert result["timestamps"][2] == 1036
+        assert result["path"][0] == [8.53, 47.37, 410.0]
+        assert len(result["path"]) == len(result["timestamps"]) == 12
+
+    def test_trips_share_patterns(self, shape_points, stops):
+        """Test trips with the same shape and stops reuse one pattern."""
+        cache = TripPatternCache(use_elevation=False)
+        first = interpolate_waypoints(shape_points, stop_times("t1", 1000), stops, False, cache)
+        second = interpolate_waypoints(shape_points, stop_times("t2", 4000), stops, False, cache)
+
+        assert len(cache) == 1
+        assert first["path"] == second["path"]
+        assert [t + 3000 for t in first["timestamps"]] == second["timestamps"]
+
+    def test_unmatched_trip(self, shape_points, stops):
+        """Test trips with fewer than two known stops produce no waypoints."""
+        times = [StopTime("t1", 0, 0, "a", 1), StopTime("t1", 60, 60, "missing", 2)]
+        assert interpolate_waypoints(shape_points, times, stops, False) == {"path": [], "timestamps": []}
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Tests for the heightfield shadow backend."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+import trimesh
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.city_scene import CityScene
+from tile_pipeline.heightfield import HeightField, rasterize_max_heights
+from tile_pipeline.raytracer import RayTracerConfig, SunPosition, TileRaytracer
+from tile_pipeline.scene_builder import SceneBounds, SceneBuilder
+from tests.conftest import random_buildings
+
+CITY = (8.530, 47.370, 8.540, 47.377)
+TILE = (8.534, 47.372, 8.536, 47.3735)
+# South-west corners of the random buildings
+AREA = (8.5335, 47.3715, 8.5365, 47.374)
+
+
+@pytest.fixture
+def scene():
+    """Tile mesh with a ground plane and random buildings."""
+    builder = SceneBuilder(TILE, image_size=128)
+    builder.add_ground_plane(z=0)
+    builder.add_buildings(random_buildings(40, AREA, size=(0.0001, 0.0003), height=(5, 35)))
+    return builder.build()
+
+
+class TestRasterize:
+    """Tests for max-height rasterization."""
+
+    def test_box_roof(self):
+        """Test a box fills its footprint with the roof height."""
+        box = trimesh.creation.box(extents=[4, 6, 10])
+        box.apply_translation([5, 5, 5])
+        heights = rasterize_max_heights(box.vertices[box.faces], (0.0, 10.0), 1.0, (10, 10))
+
+        # Footprint x 3..7, y 2..8 -> columns 3..6, rows 2..7
+        expected = np.full((10, 10), -np.inf, dtype=np.float32)
+        expected[2:8, 3:7] = 10.0
+        np.testing.assert_array_equal(heights, expected)
+
+    def test_thin_geometry_keeps_vertices(self):
+        """Test a sliver between cell centers still marks its vertices."""
+        sliver = np.array([[[2.1, 2.1, 7.0], [2.3, 2.1, 7.0], [2.2, 2.3, 7.0]]])
+        heights = rasterize_max_heights(sliver, (0.0, 5.0), 1.0, (5, 5))
+        assert heights[2, 2] == 7.0
+        assert np.isinf(heights).sum() == 24
+
+
+class TestHeightFieldBackend:
+    """Tests for heightfield ray marching in TileRaytracer."""
+
+    def test_matches_mesh_backend(self, scene):
+        """Test heightfield shadows agree with triangle ray tracing."""
+        mesh_rt = TileRaytracer(scene, TILE, RayTracerConfig(image_size=128, use_embree=False))
+        field_rt = TileRaytracer(scene, TILE, RayTracerConfig(image_size=128, backend="heightfield"))
+        assert isinstance(field_rt._intersector, HeightField)
+
+        for sun in (SunPosition(90, 30), SunPosition(200, 50), SunPosition(300, 12)):
+            expected = mesh_rt.render(sun)
+            actual = field_rt.render(sun)
+            assert (expected < 1).any()
+            assert np.mean(actual == expected) > 0.98
+
+    def test_flat_ground_is_lit(self):
+        """Test a bare ground plane casts no shadows at a low sun."""
+        mesh = SceneBuilder(TILE).add_ground_plane(z=0).build()
+        raytracer = TileRaytracer(mesh, TILE, RayTracerConfig(image_size=32, backend="heightfield"))
+        np.testing.assert_array_equal(raytracer.render(SunPosition(250, 3)), 1.0)
+
+    def test_points_under_roofs_are_shadowed(self):
+        """Test rays starting below a roof are blocked even with the sun overhead."""
+        field = HeightField(np.full((4, 4), 10.0, dtype=np.float32), (0.0, 4.0), 1.0)
+        origins = np.array([[1.5, 1.5, 0.1], [2.5, 2.5, 10.5]])
+        np.testing.assert_array_equal(field.intersects_any(origins, [0.0, 0.0, 1.0]), [True, False])
+
+    def test_city_scene_input(self, scene):
+        """Test rasterizing a city scene matches rasterizing the tile mesh."""
+        city = CityScene.from_mesh(scene, TILE)
+        np.testing.assert_array_equal(
+            HeightField.from_scene(city, city.bounds).heights,
+            HeightField.from_scene(scene, city.bounds).heights,
+        )
+
+    def test_city_scene_around_tile(self):
+        """Test rasterizing part of a larger city scene matches a mesh in the tile frame."""
+        buildings = random_buildings(150, (8.530, 47.370, 8.5395, 47.3765), seed=1)
+        city = CityScene.from_mesh(SceneBuilder(CITY).add_buildings(buildings).build(), CITY)
+        tile_mesh = SceneBuilder(TILE).add_buildings(buildings).build()
+
+        actual = HeightField.from_scene(city, SceneBounds(*TILE), padding=50.0)
+        expected = HeightField.from_scene(tile_mesh, SceneBounds(*TILE), padding=50.0)
+        np.testing.assert_array_equal(actual.heights, expected.heights)
+        assert np.isfinite(actual.heights).any()
+
+    def test_unknown_backend(self, scene):
+        """Test an unknown backend name is rejected."""
+        with pytest.raises(ValueError):
+            TileRaytracer(scene, TILE, RayTracerConfig(backend="voxels"))
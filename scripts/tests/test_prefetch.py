@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Tests for concurrent source tile prefetching."""
+import io
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.config import OutputConfig, PipelineConfig, SourceConfig
+from tile_pipeline.sources.elevation import ElevationSource
+from tile_pipeline.sources.prefetch import TilePrefetcher, TileRequest
+from tile_pipeline.sources.satellite import SatelliteSource
+from tile_pipeline.tile_renderer import RenderedTileRenderer, TileCoord, TileRenderer
+
+
+def fixture_tile(z: int, x: int, y: int, fmt: str) -> bytes:
+    """A distinct solid-color tile per coordinate."""
+    buffer = io.BytesIO()
+    Image.new("RGB", (256, 256), (x % 256, y % 256, z * 10)).save(buffer, fmt)
+    return buffer.getvalue()
+
+
+class TileServer:
+    """Local tile server for /<kind>/<z>/<x>/<y>.<ext> fixture tiles."""
+
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.requests: list[str] = []
+        self.fail_first: dict[str, int] = {}  # path -> 503 responses before success
+        self.missing: set[str] = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                server.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+
+    def template(self, kind: str, ext: str) -> str:
+        return f"{self.url}/{kind}/{{z}}/{{x}}/{{y}}.{ext}"
+
+    def handle(self, request):
+        with self.lock:
+            self.requests.append(request.path)
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            failures = self.fail_first.get(request.path, 0)
+            if failures:
+                self.fail_first[request.path] = failures - 1
+
+        time.sleep(self.delay)
+        with self.lock:
+            self.in_flight -= 1
+
+        if request.path in self.missing:
+            status, body = 404, b"not found"
+        elif failures:
+            status, body = 503, b"busy"
+        else:
+            _, kind, z, x, stem = request.path.split("/")
+            y, ext = stem.split(".")
+            status = 200
+            body = fixture_tile(int(z), int(x), int(y), "JPEG" if ext == "jpeg" else "WEBP")
+
+        request.send_response(status)
+        request.send_header("Content-Length", str(len(body)))
+        if status == 503:
+            request.send_header("Retry-After", "0")
+        request.end_headers()
+        request.wfile.write(body)
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+@pytest.fixture
+def tile_server():
+    server = TileServer()
+    yield server
+    server.close()
+
+
+def satellite_requests(source: SatelliteSource, tiles) -> list[TileRequest]:
+    return [r for (z, x, y) in tiles for r in source.prefetch_requests(z, x, y)]
+
+
+class TestTilePrefetcher:
+    """Tests for TilePrefetcher against a local tile server."""
+
+    def test_fills_cache_concurrently(self, temp_dir, tile_server):
+        """Test uncached tiles are fetched in parallel, then served from cache."""
+        source = SatelliteSource(tile_server.template("sat", "jpeg"), cache_dir=temp_dir)
+        tiles = [(16, 100 + i, 200) for i in range(4)]
+
+        result = TilePrefetcher(concurrency=4, backoff=0).prefetch(satellite_requests(source, tiles))
+
+        assert result.fetched == 16
+        assert not result.failed
+        assert 1 < tile_server.max_in_flight <= 4
+
+        count = len(tile_server.requests)
+        image = source.fetch_and_resize(16, 100, 200)
+        assert image.shape == (512, 512, 3)
+        assert len(tile_server.requests) == count
+
+    def test_skips_cached_and_duplicate_tiles(self, temp_dir, tile_server):
+        """Test only tiles missing from the cache are requested, once each."""
+        source = SatelliteSource(tile_server.template("sat", "jpeg"), cache_dir=temp_dir)
+        source.fetch(17, 200, 400)
+        requests = satellite_requests(source, [(16, 100, 200), (16, 100, 200)])
+
+        result = TilePrefetcher(backoff=0).prefetch(requests)
+
+        assert (result.fetched, result.cached) == (3, 1)
+        assert len(tile_server.requests) == 4
+
+    def test_retries_transient_errors(self, temp_dir, tile_server):
+        """Test 503 responses are retried until the tile arrives."""
+        source = ElevationSource(tile_server.template("dem", "webp"), cache_dir=temp_dir)
+        tile_server.fail_first["/dem/14/10/20.webp"] = 2
+
+        result = TilePrefetcher(retries=3, backoff=0).prefetch(source.prefetch_requests(14, 10, 20))
+
+        assert result.fetched == 1
+        assert tile_server.requests.count("/dem/14/10/20.webp") == 3
+        assert source.fetch_raw(14, 10, 20).shape == (256, 256, 3)
+
+    def test_reports_missing_and_failed(self, temp_dir, tile_server):
+        """Test 404s count as missing and exhausted retries as failures."""
+        source = ElevationSource(tile_server.template("dem", "webp"), cache_dir=temp_dir)
+        tile_server.missing.add("/dem/14/1/1.webp")
+        tile_server.fail_first["/dem/14/2/2.webp"] = 10
+        requests = [*source.prefetch_requests(14, 1, 1), *source.prefetch_requests(14, 2, 2)]
+
+        result = TilePrefetcher(retries=1, backoff=0).prefetch(requests)
+
+        assert result.missing == 1
+        assert list(result.failed) == [requests[1].url]
+        assert source.cache_mtime(14, 1, 1) is None
+        assert not list(temp_dir.rglob("*.tmp"))
+
+    def test_no_cache_dir(self, tile_server):
+        """Test sources without a cache have nothing to prefetch."""
+        assert SatelliteSource(tile_server.template("sat", "jpeg")).prefetch_requests(16, 1, 1) == []
+
+
+class TestRendererPrefetch:
+    """Tests for prefetching a render job's source tiles."""
+
+    def make_config(self, temp_dir: Path, tile_server: TileServer) -> PipelineConfig:
+        return PipelineConfig(
+            sources=SourceConfig(
+                swissimage_url=tile_server.template("sat", "jpeg"),
+                elevation_url=tile_server.template("dem", "webp"),
+            ),
+            output=OutputConfig(output_dir=temp_dir / "out"),
+            cache_dir=temp_dir / "cache",
+            fetch_concurrency=8,
+        )
+
+    def test_prefetches_satellite_and_elevation(self, temp_dir, tile_server):
+        """Test every source tile a render reads is cached up front."""
+        renderer = TileRenderer(self.make_config(temp_dir, tile_server))
+        tiles = [TileCoord(16, 100, 200), TileCoord(16, 101, 200)]
+
+        renderer.prefetch_sources(tiles, progress=False)
+
+        assert len(tile_server.requests) == 10  # 2 × (4 satellite + 1 elevation)
+        assert all(None not in renderer.satellite.cache_mtimes(c.z, c.x, c.y) for c in tiles)
+        assert all(renderer.elevation.cache_mtime(c.z, c.x, c.y) for c in tiles)
+
+    def test_rendered_mode_skips_satellite(self, temp_dir, tile_server):
+        """Test rendered mode only prefetches elevation."""
+        renderer = RenderedTileRenderer(self.make_config(temp_dir, tile_server))
+
+        renderer.prefetch_sources([TileCoord(16, 100, 200)], progress=False)
+
+        assert tile_server.requests == ["/dem/16/100/200.webp"]
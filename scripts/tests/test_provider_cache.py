@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""Tests for the content-addressed provider response cache."""
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.provider_cache import ProviderCache, default_provider_cache, request_key
+
+
+class TestRequestKey:
+    """Tests for request hashing."""
+
+    def test_stable(self):
+        """Test identical requests hash identically."""
+        a = request_key("gemini", "m", "prompt", 0.3, images=[b"tile"], params={"a": 1, "b": 2})
+        b = request_key("gemini", "m", "prompt", 0.3, images=[b"tile"], params={"b": 2, "a": 1})
+        assert a == b
+
+    @pytest.mark.parametrize("change", [
+        {"provider": "openai"},
+        {"model": "other"},
+        {"prompt": "prompt!"},
+        {"temperature": 0.4},
+        {"images": [b"tile2"]},
+        {"references": [b"mood"]},
+        {"params": {"size": 1024}},
+    ])
+    def test_sensitive_to_every_input(self, change):
+        """Test any change to the request changes the key."""
+        base = dict(provider="gemini", model="m", prompt="prompt", temperature=0.3, images=[b"tile"])
+        assert request_key(**base) != request_key(**{**base, **change})
+
+    def test_image_roles_distinct(self):
+        """Test an input image is not confused with a reference image."""
+        assert request_key("p", "m", "", images=[b"x"]) != request_key("p", "m", "", references=[b"x"])
+
+
+class TestProviderCache:
+    """Tests for ProviderCache lookups, eviction and coalescing."""
+
+    def test_miss_then_hit(self, temp_dir):
+        """Test the provider is only called on the first fetch."""
+        cache = ProviderCache(temp_dir)
+        calls = []
+
+        def call():
+            calls.append(1)
+            return b"response"
+
+        assert cache.fetch("k1", call) == (b"response", False)
+        assert cache.fetch("k1", call) == (b"response", True)
+        assert len(calls) == 1
+        assert (cache.hits, cache.misses) == (1, 1)
+
+    def test_persists_across_instances(self, temp_dir):
+        """Test entries written by one process are found by the next."""
+        ProviderCache(temp_dir).put("k1", b"data")
+        reopened = ProviderCache(temp_dir)
+        assert len(reopened) == 1
+        assert reopened.get("k1") == b"data"
+
+    def test_refresh_overwrites(self, temp_dir):
+        """Test refresh bypasses the lookup and stores the new response."""
+        cache = ProviderCache(temp_dir)
+        cache.put("k1", b"old")
+        assert cache.fetch("k1", lambda: b"new", refresh=True) == (b"new", False)
+        assert cache.get("k1") == b"new"
+
+    def test_errors_not_cached(self, temp_dir):
+        """Test a failed call leaves no entry and is retried next time."""
+        cache = ProviderCache(temp_dir)
+
+        def fail():
+            raise ValueError("API error")
+
+        with pytest.raises(ValueError):
+            cache.fetch("k1", fail)
+        assert cache.get("k1") is None
+        assert cache.fetch("k1", lambda: b"ok") == (b"ok", False)
+
+    def test_evicts_least_recently_used(self, temp_dir):
+        """Test going over budget removes the oldest-used entries first."""
+        cache = ProviderCache(temp_dir, max_bytes=250)
+        cache.put("a", b"x" * 100)
+        time.sleep(0.01)
+        cache.put("b", b"x" * 100)
+        time.sleep(0.01)
+        cache.get("a")  # a is now more recent than b
+        time.sleep(0.01)
+        cache.put("c", b"x" * 100)
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.total_bytes == 200
+
+    def test_coalesces_concurrent_requests(self, temp_dir):
+        """Test identical in-flight requests share one provider call."""
+        cache = ProviderCache(temp_dir)
+        calls = []
+        started = threading.Event()
+
+        def call():
+            calls.append(1)
+            started.set()
+            time.sleep(0.1)
+            return b"response"
+
+        results = []
+        owner = threading.Thread(target=lambda: results.append(cache.fetch("k1", call)))
+        owner.start()
+        started.wait()
+        waiters = [
+            threading.Thread(target=lambda: results.append(cache.fetch("k1", call, refresh=True)))
+            for _ in range(3)
+        ]
+        for thread in waiters:
+            thread.start()
+        for thread in [owner, *waiters]:
+            thread.join()
+
+        assert len(calls) == 1
+        assert sorted(cached for _, cached in results) == [False, True, True, True]
+        assert cache.coalesced == 3
+
+    def test_rechecks_after_registering(self, temp_dir, monkeypatch):
+        """Test a response stored just after the lookup missed is not fetched again."""
+        cache = ProviderCache(temp_dir)
+        lookup = cache.get
+
+        def racing_get(key):
+            # Another request finishes between the first lookup and registering
+            monkeypatch.setattr(cache, "get", lookup)
+            cache.put(key, b"stored")
+            return None
+
+        monkeypatch.setattr(cache, "get", racing_get)
+
+        def call():
+            raise AssertionError("provider called for a stored response")
+
+        assert cache.fetch("k1", call) == (b"stored", True)
+        assert cache.misses == 0
+
+    def test_shared_per_directory(self, temp_dir, monkeypatch):
+        """Test stylers pointing at one directory share an instance."""
+        assert ProviderCache.shared(temp_dir / "a") is ProviderCache.shared(temp_dir / "a")
+        assert ProviderCache.shared(temp_dir / "a") is not ProviderCache.shared(temp_dir / "b")
+
+        monkeypatch.setenv("PROVIDER_CACHE_DIR", str(temp_dir / "env"))
+        monkeypatch.setenv("PROVIDER_CACHE_MAX_MB", "1")
+        cache = default_provider_cache()
+        assert cache.cache_dir == (temp_dir / "env").resolve()
+        assert cache.max_bytes == 1024 ** 2
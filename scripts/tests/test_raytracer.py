@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""Tests for batched and adaptive multi-sample shadow rendering."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.raytracer import RayTracerConfig, SunPosition, TileRaytracer
+from tile_pipeline.scene_builder import SceneBuilder
+from tests.conftest import random_buildings
+
+TILE = (8.534, 47.372, 8.536, 47.3735)
+SUN = SunPosition(azimuth=220, altitude=30)
+# South-west corners of the random buildings
+AREA = (8.5338, 47.3718, 8.536, 47.3734)
+
+
+class CountingIntersector:
+    """Wraps an intersector and counts the rays cast through it."""
+
+    def __init__(self, intersector):
+        self.intersector = intersector
+        self.rays = 0
+
+    def intersects_any(self, origins, directions):
+        self.rays += len(origins)
+        return self.intersector.intersects_any(origins, directions)
+
+
+@pytest.fixture
+def scene():
+    """Tile mesh with a ground plane and a few buildings."""
+    builder = SceneBuilder(TILE, image_size=48)
+    builder.add_ground_plane(z=0)
+    builder.add_buildings(random_buildings(12, AREA, height=(10, 30)), default_height=15)
+    return builder.build()
+
+
+def elevation() -> np.ndarray:
+    """Flat terrain at the ground plane, at another resolution than the image."""
+    return np.zeros((32, 32), dtype=np.float32)
+
+
+def per_sample_render(raytracer: TileRaytracer, sun: SunPosition) -> np.ndarray:
+    """The original loop: one ray cast per sample offset."""
+    config = raytracer.config
+    size = config.image_size
+    offsets = raytracer._generate_sample_offsets(config.samples_per_pixel)
+    acc = np.zeros((size, size), dtype=np.float32)
+    for offset in offsets:
+        origins = raytracer._generate_ray_origins(
+            size, elevation(), offset[0] * config.jitter_amount, offset[1] * config.jitter_amount
+        )
+        acc += raytracer._cast_shadow_rays_batched(origins, sun.ray_direction, None).reshape(size, size)
+    return 1.0 - acc / len(offsets) * (1.0 - config.shadow_darkness)
+
+
+class TestBatchedSampling:
+    """Tests for casting all samples in one stream."""
+
+    def test_matches_per_sample_loop(self, scene):
+        """Test the batched render equals casting each sample separately."""
+        config = RayTracerConfig(image_size=48, samples_per_pixel=6, use_embree=False, batch_size=1000)
+        raytracer = TileRaytracer(scene, TILE, config)
+
+        np.random.seed(3)
+        actual = raytracer.render(SUN, elevation())
+        np.random.seed(3)
+        expected = per_sample_render(raytracer, SUN)
+
+        np.testing.assert_allclose(actual, expected, atol=1e-6)
+        assert ((actual > config.shadow_darkness) & (actual < 1)).any()
+
+    def test_ambient_occlusion_matches_per_direction(self, scene):
+        """Test batched hemisphere rays equal casting one direction at a time."""
+        raytracer = TileRaytracer(scene, TILE, RayTracerConfig(image_size=24, use_embree=False))
+
+        np.random.seed(5)
+        actual = raytracer._render_ambient_occlusion(elevation(), 5)
+        np.random.seed(5)
+        directions = raytracer._generate_hemisphere_directions(5)
+        origins = raytracer._generate_ray_origins(24, elevation())
+        expected = np.mean(
+            [~raytracer._cast_shadow_rays_batched(origins, d, None) for d in directions], axis=0
+        ).reshape(24, 24)
+
+        np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+    def test_rays_generated_per_batch(self, scene, monkeypatch):
+        """Test origins are built batch by batch, never for all samples at once."""
+        config = RayTracerConfig(image_size=24, samples_per_pixel=16, use_embree=False, batch_size=100)
+        raytracer = TileRaytracer(scene, TILE, config)
+        sizes = []
+        pixel_origins = raytracer._pixel_origins
+
+        def recording(ground, pixels, offsets=None):
+            sizes.append(len(pixels))
+            return pixel_origins(ground, pixels, offsets)
+
+        monkeypatch.setattr(raytracer, "_pixel_origins", recording)
+        raytracer.render(SUN, elevation())
+        raytracer._render_ambient_occlusion(elevation(), 8)
+
+        assert max(sizes) == 100
+        assert sum(sizes) == (16 + 8) * 24 * 24
+
+    def test_batch_size_tuned_per_intersector(self, scene):
+        """Test the default batch size depends on the intersector."""
+        small = TileRaytracer(scene, TILE, RayTracerConfig(use_embree=False))
+        field = TileRaytracer(scene, TILE, RayTracerConfig(backend="heightfield"))
+        fixed = TileRaytracer(scene, TILE, RayTracerConfig(backend="heightfield", batch_size=123))
+
+        assert small._batch_size() < field._batch_size()
+        assert fixed._batch_size() == 123
+
+
+class TestAdaptiveSampling:
+    """Tests for refining only near shadow edges."""
+
+    def test_refines_edges_only(self, scene):
+        """Test adaptive sampling matches full sampling with fewer rays."""
+        full_config = RayTracerConfig(image_size=48, samples_per_pixel=9, use_embree=False)
+        adaptive_config = RayTracerConfig(
+            image_size=48, samples_per_pixel=9, use_embree=False, adaptive_sampling=True
+        )
+        full = TileRaytracer(scene, TILE, full_config)
+        adaptive = TileRaytracer(scene, TILE, adaptive_config)
+        adaptive._intersector = CountingIntersector(adaptive._intersector)
+
+        np.random.seed(7)
+        expected = full.render(SUN, elevation())
+        np.random.seed(7)
+        actual = adaptive.render(SUN, elevation())
+
+        # Refined pixels get every sample; the rest are uniform neighbourhoods
+        edges = (expected > full_config.shadow_darkness) & (expected < 1)
+        np.testing.assert_allclose(actual[edges], expected[edges], atol=1e-6)
+        assert np.mean(np.abs(actual - expected) < 1e-6) > 0.99
+        assert 48 * 48 < adaptive._intersector.rays < 9 * 48 * 48 / 2
+
+    def test_no_edges_single_pass(self):
+        """Test a scene without shadows is only sampled once per pixel."""
+        mesh = SceneBuilder(TILE).add_ground_plane(z=0).build()
+        config = RayTracerConfig(image_size=16, samples_per_pixel=16, adaptive_sampling=True, use_embree=False)
+        raytracer = TileRaytracer(mesh, TILE, config)
+        raytracer._intersector = CountingIntersector(raytracer._intersector)
+
+        progress = []
+        np.testing.assert_array_equal(raytracer.render(SUN, progress_callback=progress.append), 1.0)
+        assert raytracer._intersector.rays == 16 * 16
+        assert progress[-1] == 1.0
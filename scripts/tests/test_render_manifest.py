@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Tests for the incremental render manifest."""
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.render_manifest import (
+    MANIFEST_FILENAME,
+    RenderManifest,
+    file_digest,
+    fingerprint,
+)
+
+
+class TestFingerprint:
+    """Tests for input fingerprinting."""
+
+    def test_stable_across_key_order(self):
+        """Test dict key order does not change the fingerprint."""
+        assert fingerprint({"a": 1, "b": [1, 2]}) == fingerprint({"b": [1, 2], "a": 1})
+
+    def test_changes_with_inputs(self):
+        """Test any changed value changes the fingerprint."""
+        assert fingerprint({"preset": "noon"}) != fingerprint({"preset": "afternoon"})
+
+    def test_file_digest_missing_file(self, temp_dir):
+        """Test missing files hash to None."""
+        assert file_digest(temp_dir / "missing.geojson") is None
+
+    def test_file_digest_tracks_content(self, temp_dir):
+        """Test file digest follows file content."""
+        path = temp_dir / "data.geojson"
+        path.write_text("one")
+        first = file_digest(path)
+        path.write_text("two")
+        assert file_digest(path) != first
+
+
+class TestRenderManifest:
+    """Tests for manifest persistence and freshness checks."""
+
+    def test_fresh_requires_matching_fingerprint_and_file(self, temp_dir):
+        """Test a tile is fresh only with same inputs and an existing output."""
+        manifest = RenderManifest(temp_dir)
+        tile_path = temp_dir / "16" / "1" / "2.webp"
+        manifest.record("16/1/2", "abc")
+
+        assert not manifest.is_fresh("16/1/2", "abc", tile_path)
+
+        tile_path.parent.mkdir(parents=True)
+        tile_path.write_bytes(b"tile")
+        assert manifest.is_fresh("16/1/2", "abc", tile_path)
+        assert not manifest.is_fresh("16/1/2", "def", tile_path)
+
+    def test_round_trip(self, temp_dir):
+        """Test saved manifests are reloaded."""
+        manifest = RenderManifest(temp_dir)
+        manifest.record("16/1/2", "abc")
+        manifest.save()
+
+        assert (temp_dir / MANIFEST_FILENAME).exists()
+        assert RenderManifest(temp_dir).tiles == {"16/1/2": "abc"}
+
+    def test_corrupt_manifest_is_ignored(self, temp_dir):
+        """Test an unreadable manifest starts empty instead of failing."""
+        (temp_dir / MANIFEST_FILENAME).write_text("{not json")
+        assert len(RenderManifest(temp_dir)) == 0
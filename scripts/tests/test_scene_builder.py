@@ -0,0 +1,201 @@
+#!/usr/bin/env python3
+"""Tests for terrain, building and tree meshing in the scene builder."""
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+import trimesh
+from shapely.geometry import Polygon
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.scene_builder import (
+    SceneBuilder,
+    extrusion_arrays,
+    grid_faces,
+    grid_sample_indices,
+    terrain_grid_stride,
+    terrain_mesh_error,
+)
+from tile_pipeline.sources.vector import Feature
+from tests.conftest import square
+
+BOUNDS = (8.53, 47.37, 8.535, 47.373)
+
+
+def reference_faces(h: int, w: int) -> np.ndarray:
+    """The original per-quad loop."""
+    faces = []
+    for i in range(h - 1):
+        for j in range(w - 1):
+            v0, v1 = i * w + j, i * w + j + 1
+            v2, v3 = (i + 1) * w + j, (i + 1) * w + j + 1
+            faces.append([v0, v2, v1])
+            faces.append([v1, v2, v3])
+    return np.array(faces)
+
+
+def hills(size: int = 512, amplitude: float = 30.0) -> np.ndarray:
+    """Smooth synthetic terrain."""
+    y, x = np.mgrid[0:size, 0:size] / size
+    return (400 + amplitude * np.sin(3 * x) * np.cos(2 * y)).astype(np.float32)
+
+
+class TestGridFaces:
+    """Tests for vectorized grid triangulation."""
+
+    @pytest.mark.parametrize("shape", [(2, 2), (3, 5), (7, 4)])
+    def test_matches_loop(self, shape):
+        """Test faces and winding match the original loop exactly."""
+        np.testing.assert_array_equal(grid_faces(*shape), reference_faces(*shape))
+
+    def test_sample_indices_keep_edges(self):
+        """Test decimated indices always include the last row/column."""
+        np.testing.assert_array_equal(grid_sample_indices(10, 4), [0, 4, 8, 9])
+        np.testing.assert_array_equal(grid_sample_indices(9, 4), [0, 4, 8])
+
+
+class TestTerrainSimplification:
+    """Tests for error-bounded grid decimation."""
+
+    def test_plane_has_no_error(self):
+        """Test a tilted plane is represented exactly at any stride."""
+        y, x = np.mgrid[0:65, 0:65]
+        plane = (2.0 * x + 0.5 * y).astype(np.float32)
+        rows = cols = grid_sample_indices(65, 16)
+        assert terrain_mesh_error(plane, rows, cols) == pytest.approx(0.0, abs=1e-9)
+
+    def test_error_measures_detail(self):
+        """Test a bump lost by decimation shows up as error."""
+        elevation = np.zeros((33, 33), dtype=np.float32)
+        elevation[5, 5] = 3.0
+        rows = cols = grid_sample_indices(33, 8)
+        assert terrain_mesh_error(elevation, rows, cols) == pytest.approx(3.0)
+
+    def test_flat_tile_collapses(self):
+        """Test flat terrain becomes a handful of triangles."""
+        builder = SceneBuilder(BOUNDS).add_terrain(np.full((512, 512), 410.0, dtype=np.float32))
+        assert len(builder.build().faces) <= 8
+
+    def test_stride_respects_error_and_budget(self):
+        """Test the chosen grid is within tolerance and the face budget."""
+        elevation = hills()
+        stride = terrain_grid_stride(elevation, max_error=0.5, max_faces=10000)
+        rows = grid_sample_indices(512, stride)
+        cols = grid_sample_indices(512, stride)
+
+        assert 2 * (len(rows) - 1) * (len(cols) - 1) <= 10000
+        assert terrain_mesh_error(elevation, rows, cols) <= 0.5
+
+        # Rough terrain hits the budget before the tolerance
+        noisy = elevation + np.random.default_rng(0).normal(0, 2, elevation.shape).astype(np.float32)
+        assert terrain_grid_stride(noisy, max_error=0.5, max_faces=10000) == 8
+
+
+class TestAddTerrain:
+    """Tests for SceneBuilder.add_terrain."""
+
+    def test_full_resolution(self):
+        """Test simplify=False keeps every heightmap sample."""
+        elevation = hills(64)
+        builder = SceneBuilder(BOUNDS).add_terrain(elevation, simplify=False)
+        mesh = builder.build()
+
+        assert len(mesh.vertices) == 64 * 64
+        assert len(mesh.faces) == 2 * 63 * 63
+        assert builder.stats.num_terrain_vertices == 64 * 64
+        np.testing.assert_allclose(mesh.vertices[:, 2].reshape(64, 64), elevation, rtol=1e-6)
+
+    def test_simplified_spans_tile(self):
+        """Test the decimated mesh still covers the whole tile extent."""
+        builder = SceneBuilder(BOUNDS)
+        mesh = builder.add_terrain(hills(), z_scale=2.0).build()
+
+        assert mesh.vertices[:, 0].max() == pytest.approx(builder.bounds.width_meters)
+        assert mesh.vertices[:, 1].max() == pytest.approx(builder.bounds.height_meters)
+        assert mesh.vertices[:, 2].max() == pytest.approx(hills().max() * 2.0, rel=1e-3)
+
+    def test_tile_terrain_is_fast(self):
+        """Test a 512×512 full-resolution mesh builds well under a second."""
+        start = time.perf_counter()
+        SceneBuilder(BOUNDS).add_terrain(hills(), simplify=False)
+        assert time.perf_counter() - start < 1.0
+
+
+class TestAddBuildings:
+    """Tests for batched footprint extrusion."""
+
+    def test_matches_trimesh_extrusion(self):
+        """Test a footprint with a hole matches trimesh's extrusion."""
+        outer = square(8.531, 47.371, 0.0005, clockwise=True)
+        hole = square(8.5312, 47.3712, 0.0001)
+        builder = SceneBuilder(BOUNDS)
+        mesh = builder.add_buildings([Feature(1, "Polygon", [outer, hole], 12.0, {"elevation": 400.0})]).build()
+
+        local = [builder.bounds.wgs84_to_local(*c) for c in outer]
+        local_hole = [builder.bounds.wgs84_to_local(*c) for c in hole]
+        reference = trimesh.creation.extrude_polygon(Polygon(local, [local_hole]), height=12.0)
+
+        assert mesh.is_watertight
+        assert mesh.volume == pytest.approx(reference.volume)
+        np.testing.assert_allclose(mesh.bounds[:, :2], reference.bounds[:, :2])
+        np.testing.assert_allclose(mesh.bounds[:, 2], [400.0, 412.0])
+
+    def test_single_mesh_for_all_buildings(self):
+        """Test every footprint lands in one mesh, skipping unusable ones."""
+        features = [
+            Feature(1, "Polygon", [square(8.531, 47.371, 0.0001)], 10.0, {}),
+            Feature(2, "MultiPolygon", [[square(8.532, 47.371, 0.0001)], [square(8.533, 47.371, 0.0001)]], 0.0, {}),
+            Feature(3, "Polygon", [[(8.531, 47.372), (8.5311, 47.372), (8.531, 47.372)]], 10.0, {}),
+            Feature(4, "Polygon", [[(8.531, 47.372), (8.5311, 47.372), (8.5312, 47.372), (8.531, 47.372)]], 10.0, {}),
+            Feature(5, "Point", [8.534, 47.372], 10.0, {}),
+        ]
+        builder = SceneBuilder(BOUNDS).add_buildings(features, default_height=20.0)
+
+        assert len(builder._meshes) == 1
+        assert builder.stats.num_buildings == 3
+        mesh = builder._meshes[0]
+        # 4 walls × 2 + 2 caps × 2 triangles per box
+        assert len(mesh.faces) == 3 * 12
+        assert mesh.bounds[1, 2] == pytest.approx(20.0)
+
+    def test_empty_input(self):
+        """Test no faces and no kept polygons for empty buffers."""
+        vertices, faces, kept = extrusion_arrays(
+            np.empty((0, 2)), np.zeros(1, dtype=np.int64), np.empty(0, dtype=np.int64), np.empty(0), np.empty(0)
+        )
+        assert len(vertices) == len(faces) == len(kept) == 0
+
+
+class TestAddTrees:
+    """Tests for template-stamped tree volumes."""
+
+    def test_matches_per_tree_cone(self):
+        """Test stamped cones sit where a per-tree cone would."""
+        features = [
+            Feature(i, "Point", [8.531 + i * 0.001, 47.371], 8.0, {"crown_diameter": 4.0, "elevation": 400.0})
+            for i in range(3)
+        ]
+        builder = SceneBuilder(BOUNDS).add_trees(features)
+        mesh = builder._meshes[0]
+
+        reference = trimesh.creation.cone(radius=2.0, height=8.0, sections=8)
+        x, y = builder.bounds.wgs84_to_local(8.531, 47.371)
+        first = mesh.vertices[: len(reference.vertices)]
+        np.testing.assert_allclose(first, reference.vertices + [x, y, 404.0])
+
+        assert builder.stats.num_trees == 3
+        assert len(builder._meshes) == 1
+        assert len(mesh.faces) == 3 * len(reference.faces)
+
+    def test_cylinders_use_defaults(self):
+        """Test cylinders fall back to default height and crown radius."""
+        builder = SceneBuilder(BOUNDS).add_trees(
+            [Feature(1, "Point", [8.532, 47.372], 0.0, {})], default_height=6.0, use_cones=False
+        )
+        bounds = builder._meshes[0].bounds
+        np.testing.assert_allclose(bounds[:, 2], [0.0, 6.0])
+        assert bounds[1, 0] - bounds[0, 0] == pytest.approx(6.0)
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Tests for batched shadow queries."""
+import pytest
+import json
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.query import ShadowQueryEngine, sample_times
+
+
+@pytest.fixture
+def engine(temp_dir):
+    """Engine over one tall building just south of the query area."""
+    building = {
+        "type": "Feature",
+        "properties": {"height": 120.0},
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [[
+                [8.5395, 47.3750], [8.5405, 47.3750], [8.5405, 47.3755],
+                [8.5395, 47.3755], [8.5395, 47.3750],
+            ]],
+        },
+    }
+    buildings = temp_dir / "buildings.geojson"
+    buildings.write_text(json.dumps({"type": "FeatureCollection", "features": [building]}))
+    return ShadowQueryEngine(buildings, temp_dir / "missing_trees.geojson", store_dir=temp_dir)
+
+
+class TestShadowMatrix:
+    """Tests for the N points × M times shadow matrix."""
+
+    def test_sample_times_inclusive(self):
+        """Test sampled times include both ends of the range."""
+        start = datetime(2026, 3, 1, 8, tzinfo=timezone.utc)
+        times = sample_times(start, datetime(2026, 3, 1, 10, tzinfo=timezone.utc), 30)
+        assert len(times) == 5
+        assert times[-1].hour == 10
+
+    def test_matches_single_queries(self, engine):
+        """Test the batched matrix agrees with one-ray-per-call queries."""
+        lats = [47.3758, 47.3760, 47.3780]
+        lngs = [8.5400, 8.5402, 8.5400]
+        times = sample_times(
+            datetime(2026, 3, 1, 5, tzinfo=timezone.utc),
+            datetime(2026, 3, 1, 15, tzinfo=timezone.utc),
+            60,
+        )
+        matrix = engine.shadow_matrix(lats, lngs, times)
+
+        assert matrix.shape == (3, len(times))
+        assert matrix[:, 0].tolist() == [1.0, 1.0, 1.0]  # Before sunrise
+        assert matrix[0].any() and not matrix[2, 1:].all()
+        for i, (lat, lng) in enumerate(zip(lats, lngs)):
+            for j, time in enumerate(times):
+                result = engine.shadow_at(lat, lng, time)
+                assert matrix[i, j] == float(result.shadow)
+
+    def test_empty_inputs(self, engine):
+        """Test empty point or time lists give an empty matrix."""
+        assert engine.shadow_matrix([], [], []).shape == (0, 0)
+        assert engine.shadow_matrix([47.376], [8.54], []).shape == (1, 0)
+
+    def test_timeline_is_batched(self, engine, monkeypatch):
+        """Test a day timeline comes from one matrix and matches single queries."""
+        date = datetime(2026, 3, 1, tzinfo=timezone.utc)
+        expected = [
+            engine.shadow_at(47.3758, 8.5400, date.replace(hour=hour), height=4.5)
+            for hour in range(4, 17)
+        ]
+
+        def single(*args, **kwargs):
+            raise AssertionError("timeline cast one ray per time")
+
+        monkeypatch.setattr(engine, "shadow_at", single)
+        timeline = engine.shadow_timeline(47.3758, 8.5400, date, height=4.5, start_hour=4, end_hour=16)
+
+        assert [r.to_dict() for r in timeline] == [r.to_dict() for r in expected]
+        assert {r.source for r in timeline} == {"night", "building", None}
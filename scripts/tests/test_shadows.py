@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Tests for 2D building shadow masks."""
+import pytest
+import math
+import sys
+from pathlib import Path
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.shadows import building_shadows, compute_shadow_offset
+from tile_pipeline.sources.vector import Feature
+
+BOUNDS = (8.540, 47.370, 8.545, 47.375)
+
+
+def box(west, south, size, height, feature_id=0):
+    """Square building feature."""
+    ring = [
+        [west, south], [west + size, south], [west + size, south + size],
+        [west, south + size], [west, south],
+    ]
+    return Feature(
+        id=feature_id,
+        geometry_type="Polygon",
+        coordinates=[ring],
+        properties={"height": height},
+        height=height,
+    )
+
+
+def reference_shadows(features, bounds, size, azimuth, altitude, darkness):
+    """Straightforward one-image-per-building rendering."""
+    west, south, east, north = bounds
+    mask = np.ones((size, size), dtype=np.float32)
+    lat_center = (south + north) / 2
+    meters_per_deg_x = 111000 * math.cos(math.radians(lat_center))
+
+    def to_pixel(x, y):
+        return (int((x - west) / (east - west) * size), int((north - y) / (north - south) * size))
+
+    for feature in features:
+        dx_m, dy_m = compute_shadow_offset(feature.height, azimuth, altitude)
+        ring = feature.coordinates[0]
+        shadow = [(x + dx_m / meters_per_deg_x, y + dy_m / 111000) for x, y in ring]
+
+        img = Image.new("L", (size, size), 0)
+        draw = ImageDraw.Draw(img)
+        for i in range(len(ring)):
+            j = (i + 1) % len(ring)
+            draw.polygon(
+                [to_pixel(*ring[i]), to_pixel(*ring[j]), to_pixel(*shadow[j]), to_pixel(*shadow[i])],
+                fill=255,
+            )
+        draw.polygon([to_pixel(*p) for p in shadow], fill=255)
+        mask *= 1 - np.array(img) / 255.0 * (1.0 - darkness)
+    return mask
+
+
+class TestBuildingShadows:
+    """Tests for the building shadow rasterizer."""
+
+    @pytest.mark.parametrize("azimuth,altitude", [(240, 35), (120, 10), (180, 65)])
+    def test_matches_reference(self, azimuth, altitude):
+        """Test masks are identical to per-building rendering."""
+        rng = np.random.default_rng(3)
+        features = [
+            box(8.5395 + rng.uniform(0, 0.006), 47.3695 + rng.uniform(0, 0.006),
+                rng.uniform(0.0001, 0.0004), rng.uniform(3, 50), i)
+            for i in range(40)
+        ]
+        expected = reference_shadows(features, BOUNDS, 256, azimuth, altitude, 0.8)
+        actual = building_shadows(features, BOUNDS, 256, azimuth, altitude, 0.8)
+
+        assert actual.dtype == np.float32
+        np.testing.assert_array_equal(actual, expected)
+
+    def test_overlapping_shadows_multiply(self):
+        """Test pixels covered by two shadows are darker than by one."""
+        features = [box(8.542, 47.372, 0.0004, 20, 0), box(8.542, 47.372, 0.0004, 20, 1)]
+        mask = building_shadows(features, BOUNDS, 128, 180, 45, darkness=0.5)
+        assert mask.min() == pytest.approx(0.25)
+
+    def test_no_features(self):
+        """Test an empty feature list leaves the tile fully lit."""
+        assert np.all(building_shadows([], BOUNDS, 64, 180, 45) == 1.0)
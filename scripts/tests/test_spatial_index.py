@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for the packed spatial index."""
+import pytest
+import numpy as np
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.sources.spatial_index import PackedIndex
+
+
+def brute_force(bounds, query):
+    """Reference bbox intersection by linear scan."""
+    return np.flatnonzero(
+        (bounds[:, 2] >= query[0]) & (bounds[:, 0] <= query[2]) &
+        (bounds[:, 3] >= query[1]) & (bounds[:, 1] <= query[3])
+    )
+
+
+@pytest.fixture
+def random_bounds():
+    """Small building-sized boxes scattered over Zurich."""
+    rng = np.random.default_rng(42)
+    centers = rng.uniform([8.44, 47.32], [8.63, 47.44], (5000, 2))
+    half_sizes = rng.uniform(0, 0.0005, (5000, 2))
+    bounds = np.hstack([centers - half_sizes, centers + half_sizes])
+    bounds[7] = np.nan  # Empty geometry
+    return bounds
+
+
+class TestPackedIndex:
+    """Tests for building and querying the index."""
+
+    def test_matches_brute_force(self, random_bounds):
+        """Test single queries return exactly the intersecting boxes."""
+        index = PackedIndex.build(random_bounds)
+        for query in [(8.50, 47.36, 8.52, 47.38), (8.44, 47.32, 8.63, 47.44), (0, 0, 1, 1)]:
+            np.testing.assert_array_equal(index.query(query), brute_force(random_bounds, query))
+
+    def test_query_many_matches_single_queries(self, random_bounds):
+        """Test batched queries agree with one-at-a-time queries."""
+        index = PackedIndex.build(random_bounds)
+        rng = np.random.default_rng(0)
+        mins = rng.uniform([8.44, 47.32], [8.63, 47.44], (50, 2))
+        queries = np.hstack([mins, mins + 0.005])
+
+        for query, ids in zip(queries, index.query_many(queries)):
+            np.testing.assert_array_equal(ids, index.query(tuple(query)))
+
+    def test_nan_boxes_never_match(self, random_bounds):
+        """Test empty geometries are excluded from results."""
+        index = PackedIndex.build(random_bounds)
+        assert 7 not in index.query((-180, -90, 180, 90))
+
+    def test_empty_index(self):
+        """Test an index without features returns no results."""
+        index = PackedIndex.build(np.zeros((0, 4)))
+        assert len(index.query((0, 0, 1, 1))) == 0
+
+    def test_save_and_load(self, temp_dir, random_bounds):
+        """Test a saved index is memory-mapped back with identical results."""
+        PackedIndex.build(random_bounds).save(temp_dir)
+        loaded = PackedIndex.load(temp_dir)
+        query = (8.50, 47.36, 8.52, 47.38)
+
+        assert isinstance(loaded.order, np.memmap)
+        np.testing.assert_array_equal(loaded.query(query), brute_force(random_bounds, query))
+
+    def test_save_records_node_size(self, temp_dir, random_bounds):
+        """Test a loaded index uses the node size it was built with."""
+        PackedIndex.build(random_bounds, node_size=4).save(temp_dir)
+        loaded = PackedIndex.load(temp_dir)
+        query = (8.50, 47.36, 8.52, 47.38)
+
+        assert loaded.node_size == 4
+        np.testing.assert_array_equal(loaded.query(query), brute_force(random_bounds, query))
+
+        # Asking for another node size rebuilds
+        assert PackedIndex.load_or_build(temp_dir, random_bounds).node_size == 16
+        assert PackedIndex.load(temp_dir).node_size == 16
+
+    def test_load_or_build_rebuilds_on_changed_bounds(self, temp_dir, random_bounds):
+        """Test an index saved for other bounds of the same length is rebuilt."""
+        PackedIndex.load_or_build(temp_dir, random_bounds)
+        shifted = random_bounds + 1.0
+        query = (9.50, 48.36, 9.52, 48.38)
+
+        index = PackedIndex.load_or_build(temp_dir, shifted)
+        np.testing.assert_array_equal(index.query(query), brute_force(shifted, query))
+        assert isinstance(PackedIndex.load_or_build(temp_dir, shifted).order, np.memmap)
+
+    def test_truncated_files_rebuild(self, temp_dir, random_bounds):
+        """Test a truncated array file is rebuilt instead of raising."""
+        PackedIndex.load_or_build(temp_dir, random_bounds)
+        path = temp_dir / "index_bounds.npy"
+        path.write_bytes(path.read_bytes()[:100])
+
+        assert PackedIndex.load(temp_dir) is None
+        index = PackedIndex.load_or_build(temp_dir, random_bounds)
+        assert len(index.query((8.50, 47.36, 8.52, 47.38))) > 0
+        assert not list(temp_dir.glob("*.tmp-*"))
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""Tests for the precomputed sun-exposure product."""
+import pytest
+import json
+import math
+import sys
+from datetime import date
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.sun_exposure import (
+    INDEX_FILENAME,
+    SunExposureProduct,
+    representative_days,
+)
+
+ZOOM = 16
+TILE = (34322, 22949)  # A z16 tile in central Zurich
+
+
+def tile_point(fx, fy):
+    """WGS84 (lat, lng) at a fractional position inside TILE."""
+    n = 2 ** ZOOM
+    lng = (TILE[0] + fx) / n * 360.0 - 180.0
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (TILE[1] + fy) / n))))
+    return lat, lng
+
+
+@pytest.fixture
+def product_dir(temp_dir):
+    """Product with a 4x4 raster: 2 height bands, 12 monthly days."""
+    raster = np.zeros((2, 12, 4, 4), dtype=np.uint8)
+    raster[0, :, :, :2] = 20   # West half: 2 h at the lower band
+    raster[0, :, :, 2:] = 60   # East half: 6 h
+    raster[1] = 100            # 10 h everywhere at the upper band
+    raster[0, 5] += 10         # June gets an extra hour at the lower band
+
+    tile_path = temp_dir / str(ZOOM) / str(TILE[0]) / f"{TILE[1]}.npy"
+    tile_path.parent.mkdir(parents=True)
+    np.save(tile_path, raster)
+    index = {
+        "version": 1,
+        "zoom": ZOOM,
+        "raster_size": 4,
+        "heights": [1.5, 10.5],
+        "days": [d.isoformat() for d in representative_days("month", 2025)],
+        "interval_minutes": 30,
+        "hours_per_unit": 0.1,
+        "tiles": [f"{ZOOM}/{TILE[0]}/{TILE[1]}"],
+    }
+    (temp_dir / INDEX_FILENAME).write_text(json.dumps(index))
+    return temp_dir
+
+
+class TestSunExposureProduct:
+    """Tests for point lookups in a built product."""
+
+    def test_cell_values(self, product_dir):
+        """Test lookups at cell centers return the stored hours."""
+        product = SunExposureProduct(product_dir)
+        lat, lng = tile_point(0.125, 0.5)
+        assert product.sun_hours(lat, lng, date(2025, 3, 15), 1.5) == pytest.approx(2.0)
+        lat, lng = tile_point(0.875, 0.5)
+        assert product.sun_hours(lat, lng, date(2025, 3, 15), 1.5) == pytest.approx(6.0)
+
+    def test_bilinear_between_cells(self, product_dir):
+        """Test a point between the halves interpolates horizontally."""
+        product = SunExposureProduct(product_dir)
+        lat, lng = tile_point(0.5, 0.5)
+        assert product.sun_hours(lat, lng, date(2025, 3, 15), 1.5) == pytest.approx(4.0)
+
+    def test_height_bands_interpolate_and_clamp(self, product_dir):
+        """Test heights interpolate between bands and clamp outside them."""
+        product = SunExposureProduct(product_dir)
+        lat, lng = tile_point(0.125, 0.5)
+        day = date(2025, 3, 15)
+        assert product.sun_hours(lat, lng, day, 6.0) == pytest.approx(6.0)
+        assert product.sun_hours(lat, lng, day, 0.0) == pytest.approx(2.0)
+        assert product.sun_hours(lat, lng, day, 50.0) == pytest.approx(10.0)
+
+    def test_days_interpolate(self, product_dir):
+        """Test dates between representative days interpolate linearly."""
+        product = SunExposureProduct(product_dir)
+        lat, lng = tile_point(0.125, 0.5)
+        assert product.sun_hours(lat, lng, date(2025, 6, 15), 1.5) == pytest.approx(3.0)
+        halfway = product.sun_hours(lat, lng, date(2025, 5, 31), 1.5)
+        assert 2.0 < halfway < 3.0
+
+    def test_outside_product(self, product_dir):
+        """Test points in tiles that were not built return None."""
+        assert SunExposureProduct(product_dir).sun_hours(47.0, 8.0, date(2025, 1, 1)) is None
+
+    def test_missing_product(self, temp_dir):
+        """Test opening a directory without an index fails clearly."""
+        with pytest.raises(FileNotFoundError):
+            SunExposureProduct(temp_dir)
+
+    def test_representative_days(self):
+        """Test monthly and weekly cadences."""
+        assert len(representative_days("month", 2025)) == 12
+        assert len(representative_days("week", 2025)) == 52
+        with pytest.raises(ValueError):
+            representative_days("daily", 2025)
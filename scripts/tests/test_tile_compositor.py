@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""Tests for the fused single-pass layer compositor."""
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.blend_modes import blend_lab_color_shift, blend_lab_lightness
+from tile_pipeline.color_space import lab_to_rgb, rgb_to_lab
+from tile_pipeline.config import BlendConfig, PipelineConfig
+from tile_pipeline.tile_compositor import TileCompositor, TileLayers, composite_layers
+from tile_pipeline.time_presets import get_preset
+
+
+def random_layers(size: int = 96, seed: int = 0) -> TileLayers:
+    """Random satellite and layer masks, including out-of-range colors."""
+    rng = np.random.default_rng(seed)
+    mask = lambda: rng.random((size, size)).astype(np.float32)  # noqa: E731
+    return TileLayers(
+        satellite=rng.integers(0, 256, (size, size, 3), dtype=np.uint8),
+        hillshade=mask(),
+        imhof_shift_a=(mask() - 0.5) * 20,
+        imhof_shift_b=(mask() - 0.5) * 20,
+        building_shadows=mask(),
+        tree_shadows=mask(),
+        ambient_occlusion=mask(),
+    )
+
+
+def layered_reference(layers: TileLayers, blend: BlendConfig) -> np.ndarray:
+    """The per-layer compositing sequence the fused engine replaces."""
+    lab = rgb_to_lab(layers.satellite).astype(np.float64)
+    lab = blend_lab_lightness(lab, layers.hillshade, blend.hillshade_mode, blend.hillshade_opacity)
+    lab = blend_lab_color_shift(
+        lab, layers.imhof_shift_a, layers.imhof_shift_b, np.ones_like(layers.hillshade)
+    )
+    for mask, mode, opacity in [
+        (layers.building_shadows, blend.building_shadow_mode, blend.building_shadow_opacity),
+        (layers.tree_shadows, blend.tree_shadow_mode, blend.tree_shadow_opacity),
+        (layers.ambient_occlusion, blend.ambient_occlusion_mode, blend.ambient_occlusion_opacity),
+    ]:
+        lab = blend_lab_lightness(lab, mask, mode, opacity)
+    return lab_to_rgb(lab)
+
+
+class TestCompositeLayers:
+    """Tests for composite_layers against the layer-by-layer path."""
+
+    @pytest.mark.parametrize("mode", ["multiply", "soft_light", "screen", "overlay", "normal"])
+    def test_matches_layered_blending(self, mode):
+        """Test every blend mode matches blend_lab_lightness within one code value."""
+        layers = random_layers()
+        blend = BlendConfig(
+            hillshade_mode=mode,
+            building_shadow_mode=mode,
+            tree_shadow_mode=mode,
+            ambient_occlusion_mode=mode,
+        )
+        compositor = TileCompositor(PipelineConfig(blend=blend), get_preset("afternoon"))
+
+        fused = compositor.composite(layers).astype(int)
+        reference = layered_reference(layers, blend).astype(int)
+
+        assert np.abs(fused - reference).max() <= 1
+        assert (fused == reference).mean() > 0.99
+
+    def test_chunking_and_output_buffer(self):
+        """Test results do not depend on chunk size and land in the given buffer."""
+        layers = random_layers(size=50)
+        lightness = [(layers.hillshade, "soft_light", 0.6), (layers.building_shadows, "multiply", 0.8)]
+        out = np.zeros_like(layers.satellite)
+
+        whole = composite_layers(layers.satellite, lightness, chunk_rows=50)
+        result = composite_layers(
+            layers.satellite, lightness, layers.imhof_shift_a, None, (3.0, -2.0),
+            out=out, chunk_rows=7,
+        )
+
+        assert result is out
+        assert not np.array_equal(out, whole)  # Color shifts applied
+        np.testing.assert_array_equal(
+            composite_layers(layers.satellite, lightness, chunk_rows=7), whole
+        )
+
+    def test_threads_use_separate_buffers(self):
+        """Test concurrent compositing of different tiles gives per-tile results."""
+        tiles = [random_layers(seed=seed) for seed in range(4)]
+        compositor = TileCompositor()
+        expected = [compositor.composite(layers) for layers in tiles]
+        results = [None] * len(tiles)
+
+        def run(i):
+            for _ in range(5):
+                results[i] = compositor.composite(tiles[i])
+
+        threads = [threading.Thread(target=run, args=(i,)) for i in range(len(tiles))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        for result, reference in zip(results, expected):
+            np.testing.assert_array_equal(result, reference)
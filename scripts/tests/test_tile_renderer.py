@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Tests for pyramid rendering (full max zoom, downsampled parents)."""
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.config import OutputConfig, PipelineConfig
+from tile_pipeline.tile_renderer import TileCoord, TileRenderer
+
+SIZE = 32
+PARENT = TileCoord(15, 17160, 11480)
+EDGE_PARENT = TileCoord(15, 17161, 11480)
+
+
+def tile_color(coord: TileCoord) -> tuple[int, int, int]:
+    """Distinct solid color per tile."""
+    return (coord.x * 37 % 256, coord.y * 11 % 256, coord.z * 13 % 256)
+
+
+class SolidTileRenderer(TileRenderer):
+    """Renders solid-color tiles without source data, recording each render."""
+
+    def __init__(self, config: PipelineConfig):
+        super().__init__(config)
+        self.rendered: list[str] = []
+
+    def render_tile(self, coord: TileCoord) -> np.ndarray:
+        self.rendered.append(str(coord))
+        return np.full((SIZE, SIZE, 3), tile_color(coord), dtype=np.uint8)
+
+    def tile_inputs(self, coord: TileCoord) -> dict:
+        return {}
+
+    def prefetch_sources(self, tiles: list[TileCoord], progress: bool = True) -> None:
+        pass
+
+
+@pytest.fixture
+def renderer(temp_dir):
+    """Renderer writing lossless tiles to a temp directory."""
+    config = PipelineConfig(
+        output=OutputConfig(tile_size=SIZE, format="png", output_dir=temp_dir / "out"),
+        cache_dir=temp_dir / "cache",
+    )
+    return SolidTileRenderer(config)
+
+
+def region() -> tuple[float, float, float, float]:
+    """All of PARENT plus the western half of EDGE_PARENT's children."""
+    west, south, east, north = PARENT.bounds
+    child_west, _, child_east, _ = TileCoord(16, EDGE_PARENT.x * 2, PARENT.y * 2).bounds
+    eps = 1e-9
+    return (west + eps, south + eps, (child_west + child_east) / 2, north - eps)
+
+
+def load(renderer: TileRenderer, coord: TileCoord) -> np.ndarray:
+    """Read a saved tile back as an RGB array."""
+    with Image.open(renderer.tile_path(coord)) as img:
+        return np.asarray(img.convert("RGB"))
+
+
+def render(renderer: TileRenderer, **kwargs) -> list[Path]:
+    return renderer.render_pyramid(
+        region(), min_zoom=15, max_zoom=16, workers=2, progress=False, executor="thread", **kwargs
+    )
+
+
+class TestRenderPyramid:
+    """Tests for TileRenderer.render_pyramid and build_parent_tile."""
+
+    def test_parent_is_mosaic_of_children(self, renderer):
+        """Test a parent tile is its four children, downsampled in place."""
+        render(renderer)
+
+        parent = load(renderer, PARENT)
+        assert parent.shape == (SIZE, SIZE, 3)
+        assert str(PARENT) not in renderer.rendered
+
+        half = SIZE // 2
+        for child in PARENT.children():
+            row = (child.y - PARENT.y * 2) * half + half // 2
+            col = (child.x - PARENT.x * 2) * half + half // 2
+            np.testing.assert_array_equal(parent[row, col], tile_color(child))
+
+    def test_edge_parent_rendered_in_full(self, renderer):
+        """Test a parent with missing children falls back to a full render."""
+        render(renderer)
+
+        assert not renderer.tile_exists(TileCoord(16, EDGE_PARENT.x * 2 + 1, PARENT.y * 2))
+        assert str(EDGE_PARENT) in renderer.rendered
+        assert (load(renderer, EDGE_PARENT) == tile_color(EDGE_PARENT)).all()
+
+    def test_rerun_skips_fresh_tiles(self, renderer):
+        """Test a second run renders and rebuilds nothing, unless forced."""
+        first = render(renderer)
+        assert len(renderer.rendered) == 7  # 6 × z16 + the edge parent
+        assert len(first) == 8
+
+        renderer.rendered.clear()
+        assert render(renderer) == []
+        assert renderer.rendered == []
+
+        assert len(render(renderer, force=True)) == 8
+        assert len(renderer.rendered) == 7
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Tests for file and MBTiles tile stores."""
+import multiprocessing
+import sqlite3
+import sys
+import threading
+from pathlib import Path
+
+import numpy as np
+import pytest
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline.config import OutputConfig, PipelineConfig
+from tile_pipeline.sources.elevation import ElevationSource
+from tile_pipeline.tile_renderer import OUTPUT_MBTILES, TileCoord, TileRenderer
+from tile_pipeline.tile_store import (
+    DirectoryTileStore,
+    MBTilesStore,
+    open_tile_store,
+    tile_store_for,
+)
+
+
+def _write_tiles(path: str, worker: int, count: int) -> None:
+    """Process pool target: write tiles into a shared MBTiles file."""
+    store = MBTilesStore(Path(path), "png")
+    for i in range(count):
+        store.put(18, worker, i, f"{worker}/{i}".encode())
+    store.close()
+
+
+@pytest.fixture(params=["files", "mbtiles"])
+def store(request, temp_dir):
+    """One store per backend."""
+    return tile_store_for(temp_dir, "tiles", "png", request.param)
+
+
+class TestTileStore:
+    """Behaviour shared by both backends."""
+
+    def test_roundtrip(self, store):
+        """Test tiles read back as written and missing tiles are None."""
+        store.put(16, 34322, 22950, b"tile")
+        assert store.get(16, 34322, 22950) == b"tile"
+        assert store.get(16, 34322, 22951) is None
+        assert store.has(16, 34322, 22950)
+        assert not store.has(16, 34322, 22951)
+
+    def test_replace_updates_mtime(self, store):
+        """Test rewriting a tile replaces data and bumps its mtime."""
+        store.put(14, 1, 2, b"old")
+        first = store.mtime(14, 1, 2)
+        store.put(14, 1, 2, b"new")
+        assert store.get(14, 1, 2) == b"new"
+        assert store.mtime(14, 1, 2) >= first
+
+    def test_lists_tiles(self, store):
+        """Test tiles() yields XYZ coordinates of every stored tile."""
+        coords = {(14, 1, 2), (15, 3, 4), (16, 5, 6)}
+        for z, x, y in coords:
+            store.put(z, x, y, b"x")
+        assert set(store.tiles()) == coords
+
+    def test_export_to_directory(self, store, temp_dir):
+        """Test export reproduces the z/x/y layout."""
+        store.put(16, 10, 20, b"a")
+        store.put(17, 11, 21, b"b")
+        out = temp_dir / "export"
+
+        assert store.export(out) == 2
+        assert (out / "16" / "10" / "20.png").read_bytes() == b"a"
+        assert store.export(out) == 0
+        assert store.export(out, overwrite=True) == 2
+
+
+class TestMBTilesStore:
+    """MBTiles-specific behaviour."""
+
+    def test_uses_tms_rows(self, temp_dir):
+        """Test rows are stored bottom-up, as the MBTiles spec requires."""
+        path = temp_dir / "t.mbtiles"
+        MBTilesStore(path, "webp").put(2, 1, 0, b"top row")
+
+        with sqlite3.connect(path) as conn:
+            row = conn.execute("SELECT zoom_level, tile_column, tile_row FROM tiles").fetchone()
+            metadata = dict(conn.execute("SELECT name, value FROM metadata"))
+        assert row == (2, 1, 3)
+        assert metadata["format"] == "webp"
+
+    def test_format_from_metadata(self, temp_dir):
+        """Test reopening without a format uses the recorded one."""
+        path = temp_dir / "t.mbtiles"
+        MBTilesStore(path, "jpeg").close()
+        assert MBTilesStore(path).ext == "jpeg"
+
+    def test_concurrent_thread_writers(self, temp_dir):
+        """Test threads sharing a store each get a working connection."""
+        store = MBTilesStore(temp_dir / "t.mbtiles", "png")
+
+        def write(worker):
+            for i in range(50):
+                store.put(18, worker, i, b"x" * 100)
+
+        threads = [threading.Thread(target=write, args=(w,)) for w in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(store) == 200
+
+    def test_concurrent_process_writers(self, temp_dir):
+        """Test worker processes can write to one file at the same time."""
+        path = temp_dir / "t.mbtiles"
+        MBTilesStore(path, "png").close()
+
+        with multiprocessing.get_context("spawn").Pool(3) as pool:
+            pool.starmap(_write_tiles, [(str(path), w, 40) for w in range(3)])
+
+        store = MBTilesStore(path)
+        assert len(store) == 120
+        assert store.get(18, 2, 39) == b"2/39"
+
+    def test_open_by_suffix(self, temp_dir):
+        """Test open_tile_store picks the backend from the path."""
+        assert isinstance(open_tile_store(temp_dir / "a.mbtiles", "png"), MBTilesStore)
+        assert isinstance(open_tile_store(temp_dir / "a", "png"), DirectoryTileStore)
+
+
+class TestBackendsInPipeline:
+    """Source caches and render output on the MBTiles backend."""
+
+    def test_source_cache(self, temp_dir):
+        """Test a source cache lives in one file and reports mtimes."""
+        source = ElevationSource(cache_dir=temp_dir, cache_backend="mbtiles")
+        assert source.cache_mtime(14, 1, 2) is None
+
+        source._save_to_cache(14, 1, 2, b"webp")
+        assert source.cache_mtime(14, 1, 2) is not None
+        assert (temp_dir / "elevation.mbtiles").exists()
+        assert not (temp_dir / "elevation").exists()
+
+    def test_renderer_output_and_pyramid(self, temp_dir):
+        """Test saved tiles and parent builds go through the MBTiles store."""
+        output_dir = temp_dir / "out"
+        config = PipelineConfig(
+            output=OutputConfig(tile_size=64, format="png", output_dir=output_dir, backend="mbtiles"),
+            cache_dir=temp_dir / "cache",
+        )
+        renderer = TileRenderer(config)
+        parent = TileCoord(15, 10, 20)
+        for child in parent.children():
+            image = np.full((64, 64, 3), child.x * 10 % 256, dtype=np.uint8)
+            assert renderer.save_tile(image, child) == output_dir / OUTPUT_MBTILES
+
+        renderer.build_parent_tile(parent)
+
+        assert renderer.tile_exists(parent)
+        assert not list(output_dir.rglob("*.png"))
+        exported = renderer.output_store().export(temp_dir / "files")
+        assert exported == 5
+        with Image.open(temp_dir / "files" / "15" / "10" / "20.png") as img:
+            assert img.size == (64, 64)
@@ -0,0 +1,303 @@
+#!/usr/bin/env python3
+"""Tests for wavefront tile scheduling and the parallel nano stitchers."""
+import base64
+import io
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import pytest
+from PIL import Image
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tile_pipeline import nano_stitcher, nano_stitcher_v2
+from tile_pipeline.render_manifest import MANIFEST_FILENAME
+from tile_pipeline.wavefront import (
+    RateLimitError,
+    TileContext,
+    WavefrontScheduler,
+    l_shaped_dependencies,
+    plan_l_shaped,
+    wavefront_priority,
+)
+
+
+def make_grid(root: Path, width: int, height: int) -> dict[int, dict[int, Path]]:
+    """Write a width×height grid of raw source tiles and collect it."""
+    for x in range(width):
+        for y in range(height):
+            path = root / "16" / str(100 + x) / f"{200 + y}.webp"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            Image.new("RGB", (512, 512), (x * 40, y * 40, 90)).save(path, "WEBP")
+    return nano_stitcher_v2.collect_tile_grid(root)
+
+
+class StubProvider:
+    """Local stand-in for the Gemini API, served over HTTP."""
+
+    def __init__(self, delay: float = 0.05, rate_limited: int = 0):
+        self.delay = delay
+        self.rate_limited = rate_limited
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+        provider = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+                provider.handle(self, body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def handle(self, request, body):
+        with self.lock:
+            self.calls += 1
+            if self.rate_limited > 0:
+                self.rate_limited -= 1
+                limited = True
+            else:
+                limited = False
+                self.in_flight += 1
+                self.max_in_flight = max(self.max_in_flight, self.in_flight)
+
+        if limited:
+            request.send_response(429)
+            request.send_header("Retry-After", "0")
+            request.end_headers()
+            request.wfile.write(b"quota exceeded")
+            return
+
+        time.sleep(self.delay)
+        # Echo the first image back, inverted, as the "styled" result
+        source = Image.open(io.BytesIO(base64.b64decode(
+            body["contents"][0]["parts"][0]["inline_data"]["data"]
+        )))
+        buffer = io.BytesIO()
+        Image.eval(source.convert("RGB"), lambda v: 255 - v).save(buffer, "PNG")
+        payload = {"candidates": [{"content": {"parts": [
+            {"inlineData": {"data": base64.b64encode(buffer.getvalue()).decode()}}
+        ]}}]}
+
+        with self.lock:
+            self.in_flight -= 1
+        data = json.dumps(payload).encode()
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(data)))
+        request.end_headers()
+        request.wfile.write(data)
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def stub_provider(monkeypatch, temp_dir):
+    """Point both stitchers at a local stub provider with an empty response cache."""
+    monkeypatch.setenv("PROVIDER_CACHE_DIR", str(temp_dir / "provider_cache"))
+    provider = StubProvider()
+    monkeypatch.setattr(nano_stitcher, "API_BASE", provider.url)
+    monkeypatch.setattr(nano_stitcher_v2, "API_BASE", provider.url)
+    yield provider
+    provider.close()
+
+
+class TestPlan:
+    """Tests for L-shaped context planning."""
+
+    def test_contexts_and_seed(self, temp_dir):
+        """Test neighbors match the sequential stitcher's choices."""
+        grid = make_grid(temp_dir, 3, 2)
+        contexts, seed = plan_l_shaped(grid)
+
+        assert seed == ((100, 200), (101, 200))
+        assert (101, 200) not in contexts
+        assert contexts[(102, 200)] == TileContext(left=(101, 200))
+        assert contexts[(100, 201)] == TileContext(above=(100, 200))
+        assert contexts[(101, 201)] == TileContext(
+            left=(100, 201), above=(101, 200), above_left=(100, 200)
+        )
+
+    def test_seed_partner_resolves_to_seed_task(self, temp_dir):
+        """Test tiles next to the second seed tile wait on the seed task."""
+        grid = make_grid(temp_dir, 3, 2)
+        deps = l_shaped_dependencies(*plan_l_shaped(grid))
+
+        assert deps[(100, 200)] == set()
+        assert deps[(102, 200)] == {(100, 200)}
+        assert deps[(102, 201)] == {(101, 201), (102, 200), (100, 200)}
+
+    def test_single_column(self, temp_dir):
+        """Test a 1-wide grid has no seed pair and expands vertically."""
+        grid = make_grid(temp_dir, 1, 3)
+        contexts, seed = plan_l_shaped(grid)
+
+        assert seed is None
+        assert contexts[(100, 202)] == TileContext(above=(100, 201))
+
+
+class TestWavefrontScheduler:
+    """Tests for dependency-aware scheduling."""
+
+    def test_respects_dependencies(self):
+        """Test no task starts before its dependencies finished."""
+        finished = []
+        lock = threading.Lock()
+        deps = {(x, y): set() for x in range(4) for y in range(4)}
+        for (x, y) in deps:
+            if x:
+                deps[(x, y)].add((x - 1, y))
+            if y:
+                deps[(x, y)].add((x, y - 1))
+
+        def task(tile):
+            def run():
+                with lock:
+                    assert all(dep in finished for dep in deps[tile])
+                time.sleep(0.01)
+                with lock:
+                    finished.append(tile)
+                return tile
+            return run
+
+        results = {}
+        scheduler = WavefrontScheduler(max_in_flight=4)
+        succeeded = scheduler.run(
+            {tile: task(tile) for tile in deps},
+            deps,
+            lambda key, result, error: results.__setitem__(key, (result, error)),
+            priority=wavefront_priority,
+        )
+
+        assert succeeded == 16
+        assert all(error is None for _, error in results.values())
+
+    def test_bounds_in_flight(self):
+        """Test independent tasks run concurrently, but never above the limit."""
+        active = 0
+        peak = 0
+        lock = threading.Lock()
+
+        def run():
+            nonlocal active, peak
+            with lock:
+                active += 1
+                peak = max(peak, active)
+            time.sleep(0.02)
+            with lock:
+                active -= 1
+
+        scheduler = WavefrontScheduler(max_in_flight=3)
+        scheduler.run({i: run for i in range(12)}, {}, lambda *args: None)
+
+        assert peak == 3
+
+    def test_retries_rate_limits(self):
+        """Test rate-limited tasks are retried and then succeed."""
+        attempts = {"a": 0}
+
+        def run():
+            attempts["a"] += 1
+            if attempts["a"] < 3:
+                raise RateLimitError("slow down", retry_after=0)
+            return "ok"
+
+        results = {}
+        scheduler = WavefrontScheduler(max_in_flight=2)
+        scheduler.run({"a": run}, {}, lambda key, result, error: results.update({key: result}))
+
+        assert results == {"a": "ok"}
+        assert scheduler.retries == 2
+
+    def test_failed_dependency_still_unblocks(self):
+        """Test dependents of a failed task run (with less context)."""
+        def fail():
+            raise ValueError("bad tile")
+
+        errors = {}
+        scheduler = WavefrontScheduler(max_in_flight=2)
+        succeeded = scheduler.run(
+            {"a": fail, "b": lambda: "ok"},
+            {"b": ["a"]},
+            lambda key, result, error: errors.update({key: error}),
+        )
+
+        assert succeeded == 1
+        assert isinstance(errors["a"], ValueError)
+        assert errors["b"] is None
+
+    def test_rejects_cycles(self):
+        """Test a dependency cycle raises instead of hanging."""
+        scheduler = WavefrontScheduler()
+        with pytest.raises(ValueError, match="cycle"):
+            scheduler.run({"a": lambda: 1, "b": lambda: 2}, {"a": ["b"], "b": ["a"]}, lambda *a: None)
+
+
+class TestParallelStitching:
+    """End-to-end stitching against a local stub provider."""
+
+    def test_v2_styles_concurrently_and_resumes(self, temp_dir, stub_provider):
+        """Test both passes run in parallel and a re-run makes no calls."""
+        grid = make_grid(temp_dir / "source", 3, 3)
+        output_dir = temp_dir / "out"
+        work_dir = temp_dir / "work"
+
+        generated = nano_stitcher_v2.process_grid(
+            grid, output_dir, "test style", api_key="stub", max_in_flight=4, work_dir=work_dir
+        )
+
+        assert generated == 9
+        # 8 Pass 1 tasks (the seed pair is one call) + 9 Pass 2 tiles
+        assert stub_provider.calls == 17
+        assert stub_provider.max_in_flight > 1
+        assert len(list((output_dir / "16").rglob("*.webp"))) == 9
+        assert (output_dir / MANIFEST_FILENAME).exists()
+        assert not list(output_dir.rglob("*.tmp"))
+
+        calls = stub_provider.calls
+        assert nano_stitcher_v2.process_grid(
+            grid, output_dir, "test style", api_key="stub", max_in_flight=4, work_dir=work_dir
+        ) == 0
+        assert stub_provider.calls == calls
+
+    def test_v2_resumes_pass2_only(self, temp_dir, stub_provider, monkeypatch):
+        """Test losing Pass 2 outputs only repeats Pass 2 for those tiles."""
+        grid = make_grid(temp_dir / "source", 3, 3)
+        output_dir = temp_dir / "out"
+        work_dir = temp_dir / "work"
+        nano_stitcher_v2.process_grid(grid, output_dir, "test style", api_key="stub", work_dir=work_dir)
+
+        calls = stub_provider.calls
+        (output_dir / "16" / "101" / "201.webp").unlink()
+        # Fresh response cache, so the repeated request reaches the provider
+        monkeypatch.setenv("PROVIDER_CACHE_DIR", str(temp_dir / "provider_cache_2"))
+        nano_stitcher_v2.process_grid(grid, output_dir, "test style", api_key="stub", work_dir=work_dir)
+
+        assert stub_provider.calls == calls + 1
+
+    def test_v1_recovers_from_rate_limits(self, temp_dir, stub_provider):
+        """Test 429 responses are retried instead of aborting the run."""
+        stub_provider.rate_limited = 3
+        grid = make_grid(temp_dir / "source", 3, 3)
+        output_dir = temp_dir / "out"
+
+        generated = nano_stitcher.process_grid(grid, output_dir, "test style", api_key="stub", max_in_flight=3)
+
+        assert generated == 9
+        # 8 tasks (seed pair is one call) + 3 rejected attempts
+        assert stub_provider.calls == 11
+        assert len(list((output_dir / "16").rglob("*.webp"))) == 9
@@ -47,6 +47,7 @@ from .areas import Area, AREAS, get_area, get_area_bounds, list_areas, estimate_
 from .shadow_remover import ShadowRemover, remove_shadows, RemovalMethod
 from .scene_builder import SceneBuilder, build_tile_scene
 from .raytracer import TileRaytracer, SunPosition, render_tile_shadows
+from .city_scene import CityScene, build_city_scene, open_city_scene
 
 __all__ = [
     # Original API
@@ -78,5 +79,8 @@ __all__ = [
     "TileRaytracer",
     "SunPosition",
     "render_tile_shadows",
+    "CityScene",
+    "build_city_scene",
+    "open_city_scene",
 ]
 __version__ = "0.2.0"
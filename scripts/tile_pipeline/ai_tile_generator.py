@@ -26,7 +26,6 @@ Usage:
 """
 
 import base64
-import hashlib
 import io
 import os
 import time
@@ -40,6 +39,7 @@ from PIL import Image
 import requests
 
 from .config import PipelineConfig
+from .provider_cache import ProviderCache, default_provider_cache, request_key
 from .sources.satellite import fetch_satellite_tile, wgs84_to_tile
 from .tile_renderer import TileCoord
 
@@ -317,7 +317,8 @@ class AITileGenerator:
 
         Args:
             api_key: Google AI API key (defaults to GOOGLE_API_KEY env var)
-            cache_dir: Directory for caching results
+            cache_dir: Directory for caching results (responses are kept in
+                its provider_responses/ subdirectory)
             timeout: API timeout in seconds
             model: Model to use (default: gemini-2.0-flash-exp)
         """
@@ -338,37 +339,23 @@ class AITileGenerator:
 
         # Ensure cache directory exists
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.response_cache = (
+            ProviderCache.shared(cache_dir / "provider_responses")
+            if cache_dir is not None
+            else default_provider_cache()
+        )
 
-    def _get_cache_key(self, tile_coord: str, style: str) -> str:
-        """Generate a cache key for tile+style combination."""
-        combined = f"{tile_coord}_{style}_{self.model}"
-        return hashlib.md5(combined.encode()).hexdigest()[:16]
-
-    def _cache_path(self, cache_key: str) -> Path:
-        """Get cache file path."""
-        return self.cache_dir / "ai_tiles" / f"{cache_key}.png"
-
-    def _load_from_cache(self, cache_key: str) -> Optional[NDArray[np.uint8]]:
-        """Load a cached result."""
-        cache_path = self._cache_path(cache_key)
-        if cache_path.exists():
-            with Image.open(cache_path) as img:
-                return np.array(img.convert("RGB"))
-        return None
-
-    def _save_to_cache(self, cache_key: str, image: NDArray[np.uint8]) -> None:
-        """Save a result to cache."""
-        cache_path = self._cache_path(cache_key)
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-        Image.fromarray(image).save(cache_path)
+    @staticmethod
+    def image_to_bytes(image: NDArray[np.uint8], format: str = "PNG") -> bytes:
+        """Encode a numpy array as image file bytes."""
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, format=format)
+        return buffer.getvalue()
 
     @staticmethod
     def image_to_base64(image: NDArray[np.uint8], format: str = "PNG") -> str:
         """Convert numpy array to base64-encoded image string."""
-        img = Image.fromarray(image)
-        buffer = io.BytesIO()
-        img.save(buffer, format=format)
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+        return base64.b64encode(AITileGenerator.image_to_bytes(image, format)).decode("utf-8")
 
     @staticmethod
     def base64_to_image(b64_string: str) -> NDArray[np.uint8]:
@@ -489,12 +476,15 @@ Do not include any text, labels, watermarks, or UI elements. This tile must seam
     ) -> GenerationResult:
         """Generate a stylized tile from Blender render and satellite image.
 
+        Responses are cached by request content (model, prompt, temperature
+        and all input images), so an unchanged tile makes no API call.
+
         Args:
             blender_image: Blender-rendered tile (H, W, 3)
             satellite_image: Satellite imagery tile (H, W, 3)
             style: Style name or StylePreset object
-            tile_coord: Tile coordinate string for caching (e.g., "16/34322/22950")
-            use_cache: Whether to use cached results
+            tile_coord: Tile coordinate string for reporting (e.g., "16/34322/22950")
+            use_cache: Whether to reuse cached responses
 
         Returns:
             GenerationResult with generated image
@@ -508,116 +498,111 @@ Do not include any text, labels, watermarks, or UI elements. This tile must seam
             style_name = style.name.lower().replace(" ", "_")
 
         tile_coord = tile_coord or "unknown"
-
-        # Check cache
-        if use_cache:
-            cache_key = self._get_cache_key(tile_coord, style_name)
-            cached = self._load_from_cache(cache_key)
-            if cached is not None:
-                return GenerationResult(
-                    image=cached,
-                    style=style_name,
-                    tile_coord=tile_coord,
-                    processing_time_ms=0,
-                    cached=True,
-                    model=self.model,
-                    metadata={"from_cache": True},
-                )
-
         start_time = time.time()
 
-        # Convert images to base64
-        blender_b64 = self.image_to_base64(blender_image, format="PNG")
-        satellite_b64 = self.image_to_base64(satellite_image, format="JPEG")
+        # Encode images
+        blender_bytes = self.image_to_bytes(blender_image, format="PNG")
+        satellite_bytes = self.image_to_bytes(satellite_image, format="JPEG")
 
         # Try to load reference image for 3-image pipeline
         reference_image = self._load_reference_image(style_preset.reference_image)
         has_reference = reference_image is not None
+        reference_bytes = [self.image_to_bytes(reference_image, format="PNG")] if has_reference else []
 
         # Build prompt (aware of whether we have a reference image)
         prompt = self._build_prompt(style_preset, tile_coord, has_reference=has_reference)
+        text_response = None
 
-        # Build multi-image Gemini request
-        # Image order: Blender (geometry) → Satellite (textures) → Reference (style, last for aspect ratio)
-        # Text prompt comes AFTER images per Gemini best practices
-        url = f"{self.API_BASE}/{self.model}:generateContent?key={self.api_key}"
-
-        # Build parts list based on whether we have a reference image
-        parts = [
-            {
-                "inline_data": {
-                    "mime_type": "image/png",
-                    "data": blender_b64,
-                }
-            },
-            {
-                "inline_data": {
-                    "mime_type": "image/jpeg",
-                    "data": satellite_b64,
-                }
-            },
-        ]
-
-        # Add reference image if available (placed last for aspect ratio preservation)
-        if has_reference:
-            reference_b64 = self.image_to_base64(reference_image, format="PNG")
-            parts.append({
-                "inline_data": {
-                    "mime_type": "image/png",
-                    "data": reference_b64,
+        def request() -> bytes:
+            nonlocal text_response
+
+            # Build multi-image Gemini request
+            # Image order: Blender (geometry) → Satellite (textures) → Reference (style, last for aspect ratio)
+            # Text prompt comes AFTER images per Gemini best practices
+            url = f"{self.API_BASE}/{self.model}:generateContent?key={self.api_key}"
+
+            # Build parts list based on whether we have a reference image
+            parts = [
+                {
+                    "inline_data": {
+                        "mime_type": "image/png",
+                        "data": base64.b64encode(blender_bytes).decode("utf-8"),
+                    }
+                },
+                {
+                    "inline_data": {
+                        "mime_type": "image/jpeg",
+                        "data": base64.b64encode(satellite_bytes).decode("utf-8"),
+                    }
+                },
+            ]
+
+            # Add reference image if available (placed last for aspect ratio preservation)
+            for data in reference_bytes:
+                parts.append({
+                    "inline_data": {
+                        "mime_type": "image/png",
+                        "data": base64.b64encode(data).decode("utf-8"),
+                    }
+                })
+
+            # Text prompt comes last (after all images)
+            parts.append({"text": prompt})
+
+            payload = {
+                "contents": [{"parts": parts}],
+                "generationConfig": {
+                    "responseModalities": ["image", "text"],
+                    "temperature": style_preset.temperature,
                 }
-            })
-
-        # Text prompt comes last (after all images)
-        parts.append({"text": prompt})
-
-        payload = {
-            "contents": [{"parts": parts}],
-            "generationConfig": {
-                "responseModalities": ["image", "text"],
-                "temperature": style_preset.temperature,
             }
-        }
-
-        # Make API request
-        response = requests.post(
-            url,
-            headers={"Content-Type": "application/json"},
-            json=payload,
-            timeout=self.timeout,
-        )
 
-        # Handle errors
-        if response.status_code != 200:
-            error_detail = response.text[:500] if response.text else "No details"
-            raise ValueError(
-                f"Gemini API error {response.status_code}: {error_detail}"
+            # Make API request
+            response = requests.post(
+                url,
+                headers={"Content-Type": "application/json"},
+                json=payload,
+                timeout=self.timeout,
             )
 
-        result = response.json()
+            # Handle errors
+            if response.status_code != 200:
+                error_detail = response.text[:500] if response.text else "No details"
+                raise ValueError(
+                    f"Gemini API error {response.status_code}: {error_detail}"
+                )
 
-        # Extract image from response
-        generated_image = None
-        text_response = None
+            result = response.json()
+
+            # Extract image from response
+            image_data = None
+            if "candidates" in result:
+                for candidate in result["candidates"]:
+                    if "content" in candidate and "parts" in candidate["content"]:
+                        for part in candidate["content"]["parts"]:
+                            if "inlineData" in part:
+                                image_data = base64.b64decode(part["inlineData"]["data"])
+                            elif "text" in part:
+                                text_response = part["text"]
+
+            if image_data is None:
+                error_msg = (
+                    f"Gemini ({self.model}) did not return an image. "
+                    "The model may not support image generation."
+                )
+                if text_response:
+                    error_msg += f"\nModel response: {text_response[:300]}"
+                raise ValueError(error_msg)
+            return image_data
+
+        key = request_key(
+            "gemini", self.model, prompt, style_preset.temperature,
+            images=[blender_bytes, satellite_bytes], references=reference_bytes,
+        )
+        image_data, cached = self.response_cache.fetch(key, request, refresh=not use_cache)
 
-        if "candidates" in result:
-            for candidate in result["candidates"]:
-                if "content" in candidate and "parts" in candidate["content"]:
-                    for part in candidate["content"]["parts"]:
-                        if "inlineData" in part:
-                            b64_data = part["inlineData"]["data"]
-                            generated_image = self.base64_to_image(b64_data)
-                        elif "text" in part:
-                            text_response = part["text"]
-
-        if generated_image is None:
-            error_msg = (
-                f"Gemini ({self.model}) did not return an image. "
-                "The model may not support image generation."
-            )
-            if text_response:
-                error_msg += f"\nModel response: {text_response[:300]}"
-            raise ValueError(error_msg)
+        with Image.open(io.BytesIO(image_data)) as img:
+            generated_image = np.array(img.convert("RGB"))
 
         # Resize to 512x512 if needed
         if generated_image.shape[:2] != (512, 512):
@@ -627,19 +612,15 @@ Do not include any text, labels, watermarks, or UI elements. This tile must seam
 
         processing_time = int((time.time() - start_time) * 1000)
 
-        # Cache result
-        if use_cache:
-            cache_key = self._get_cache_key(tile_coord, style_name)
-            self._save_to_cache(cache_key, generated_image)
-
         return GenerationResult(
             image=generated_image,
             style=style_name,
             tile_coord=tile_coord,
             processing_time_ms=processing_time,
-            cached=False,
+            cached=cached,
             model=self.model,
             metadata={
+                "from_cache": cached,
                 "prompt_length": len(prompt),
                 "text_response": text_response,
                 "used_reference": has_reference,
@@ -920,7 +901,7 @@ def generate_tiles_for_area(
                 satellite_image=satellite_image,
                 style=style,
                 tile_coord=coord,
-                use_cache=False,  # We already filtered cached tiles
+                use_cache=use_cache,  # Response cache still covers missing outputs
             )
 
             # Save to output directory
@@ -12,17 +12,44 @@ Usage:
     # Generate AO tiles for a specific area
     python ao_tile_generator.py --bounds 8.52,47.36,8.56,47.40 --zoom 16
 
+    # City-wide, four Blender servers rendering in parallel
+    python ao_tile_generator.py --bounds 8.45,47.32,8.62,47.44 --workers 4
+
     # Process existing shadow buffers into tile format
     python ao_tile_generator.py --input-dir blender_output/ --output-dir public/tiles/ao/
 """
 
 import math
-from dataclasses import dataclass
+import shutil
+import tempfile
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterator, List, Optional, Tuple
+from typing import TYPE_CHECKING, Iterator, List, Optional, Tuple
 
 import numpy as np
 from PIL import Image
+from tqdm import tqdm
+
+from .blender_shadows import SunPosition
+from .render_manifest import RenderManifest, file_digest, fingerprint
+from .sources.vector import VectorSource, partition_features_to_tiles
+from .tile_renderer import (
+    BUILDING_BUFFER_METERS,
+    BUILDING_MIN_HEIGHT,
+    TREE_BUFFER_METERS,
+    TREE_MIN_HEIGHT,
+)
+
+if TYPE_CHECKING:
+    from .blender_server import BlenderServerPool
+
+# Overhead sun for AO (simulates ambient light from above)
+# Multiple sun positions could be averaged for better AO
+AO_SUN_AZIMUTH = 180.0
+AO_SUN_ALTITUDE = 60.0
+AO_SUN = SunPosition(azimuth=AO_SUN_AZIMUTH, altitude=AO_SUN_ALTITUDE)
 
 
 @dataclass
@@ -106,21 +133,50 @@ class AOTileGenerator:
     Generates ambient occlusion tiles from Blender shadow buffers.
 
     The workflow:
-    1. For each tile coordinate, gather building/tree data
-    2. Render shadow buffer with Blender
-    3. Extract AO texture from shadow buffer
-    4. Save as web tile (z/x/y.webp)
+    1. Load and index building/tree data once, partition features to tiles
+    2. Export each tile's scene while earlier tiles are rendering
+    3. Render shadow buffers on persistent Blender servers
+    4. Extract AO texture and save as web tile (z/x/y.webp)
+
+    Tiles already produced from the same data and settings are recorded in
+    the output directory's render manifest and skipped on the next run.
 
     Example:
         generator = AOTileGenerator(config)
         generator.generate_tiles(
             bounds=(8.52, 47.36, 8.56, 47.40),
-            output_dir="public/tiles/ao"
+            output_dir="public/tiles/ao",
+            workers=4,
         )
     """
 
-    def __init__(self, config: Optional[AOTileConfig] = None):
+    def __init__(
+        self,
+        config: Optional[AOTileConfig] = None,
+        server_pool: Optional["BlenderServerPool"] = None,
+    ):
+        """Initialize the generator.
+
+        Args:
+            config: AO tile configuration
+            server_pool: Blender servers to render on. If None, a pool with
+                one server per worker is started for each generate_tiles call.
+        """
         self.config = config or AOTileConfig()
+        self.server_pool = server_pool
+
+    def tile_fingerprint(
+        self,
+        buildings_path: Optional[Path],
+        trees_path: Optional[Path],
+    ) -> str:
+        """Fingerprint of the settings and data that determine every tile."""
+        return fingerprint({
+            "config": asdict(self.config),
+            "sun": [AO_SUN_AZIMUTH, AO_SUN_ALTITUDE],
+            "buildings": file_digest(buildings_path) if buildings_path else None,
+            "trees": file_digest(trees_path) if trees_path else None,
+        })
 
     def generate_tiles(
         self,
@@ -128,112 +184,165 @@ class AOTileGenerator:
         output_dir: str,
         buildings_path: Optional[str] = None,
         trees_path: Optional[str] = None,
+        workers: int = 1,
+        force: bool = False,
+        progress: bool = True,
     ) -> List[str]:
         """
         Generate AO tiles for the given bounds.
 
+        Vector sources are parsed and indexed once and features are
+        partitioned to all tiles up front. A single export thread writes
+        scenes ahead of the render workers, so Blender never waits for
+        GeoJSON work.
+
         Args:
             bounds: (west, south, east, north) in WGS84
             output_dir: Base directory for tiles (will create z/x/y structure)
             buildings_path: Path to buildings GeoJSON
             trees_path: Path to trees GeoJSON
+            workers: Number of tiles rendered concurrently
+            force: Re-render tiles even if they are up to date
+            progress: Show progress bar
 
         Returns:
-            List of generated tile paths
+            List of generated tile paths (up-to-date tiles excluded)
         """
+        from .blender_server import BlenderServerPool
+        from .blender_shadows import BlenderConfig, BlenderShadowRenderer
+        from .extract_intermediates import create_ao_texture
+
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+
         output_dir = Path(output_dir)
-        generated = []
+        buildings_path = Path(buildings_path) if buildings_path else None
+        trees_path = Path(trees_path) if trees_path else None
 
         # Get all tiles in bounds
         tiles = list(get_tiles_in_bounds(*bounds, self.config.zoom))
+        tile_fingerprint = self.tile_fingerprint(buildings_path, trees_path)
+
+        manifest = RenderManifest(output_dir)
+        if not force:
+            stale = [
+                tile for tile in tiles
+                if not manifest.is_fresh(str(tile), tile_fingerprint, self._tile_path(output_dir, tile))
+            ]
+            if len(stale) < len(tiles):
+                print(f"Skipping {len(tiles) - len(stale)} up-to-date tiles")
+            tiles = stale
+
         print(f"Generating {len(tiles)} AO tiles at zoom {self.config.zoom}")
+        if not tiles:
+            return []
+
+        buildings, trees = self._load_sources(buildings_path, trees_path)
+        tile_bounds = [tile.bounds_wgs84 for tile in tiles]
+        building_ids = (
+            partition_features_to_tiles(
+                buildings, tile_bounds, BUILDING_BUFFER_METERS, BUILDING_MIN_HEIGHT
+            )
+            if buildings is not None else [[] for _ in tiles]
+        )
+        tree_ids = (
+            partition_features_to_tiles(trees, tile_bounds, TREE_BUFFER_METERS, TREE_MIN_HEIGHT)
+            if trees is not None else [[] for _ in tiles]
+        )
 
-        for i, tile in enumerate(tiles):
-            print(f"  [{i+1}/{len(tiles)}] Processing tile {tile}...")
+        server_pool = self.server_pool or BlenderServerPool(size=workers)
+        renderer = BlenderShadowRenderer(
+            config=BlenderConfig(
+                image_size=self.config.tile_size,
+                samples=self.config.blender_samples,
+                shadow_darkness=self.config.shadow_darkness,
+            ),
+            server_pool=server_pool,
+        )
 
+        # Exported scenes waiting for or in render, bounding temp disk use
+        slots = threading.BoundedSemaphore(workers + 1)
+
+        def export(index: int) -> Path:
+            slots.acquire()
             try:
-                tile_path = self._generate_single_tile(
-                    tile, output_dir, buildings_path, trees_path
+                data_dir = Path(tempfile.mkdtemp(prefix="ao_tile_"))
+                renderer.export_scene(
+                    data_dir,
+                    [buildings.features[i] for i in building_ids[index]],
+                    [trees.features[i] for i in tree_ids[index]],
+                    None,  # Could add DEM here
+                    tile_bounds[index],
+                    AO_SUN,
                 )
-                generated.append(str(tile_path))
-            except Exception as e:
-                print(f"    Error: {e}")
-
-        print(f"Generated {len(generated)} tiles")
-        return generated
-
-    def _generate_single_tile(
-        self,
-        tile: TileCoord,
-        output_dir: Path,
-        buildings_path: Optional[str],
-        trees_path: Optional[str],
-    ) -> Path:
-        """Generate a single AO tile."""
-        from .blender_shadows import BlenderConfig, BlenderShadowRenderer, SunPosition
-        from .extract_intermediates import create_ao_texture
-        from .sources.vector import VectorSource, query_features_in_tile
-
-        # Create output path
-        tile_dir = output_dir / str(tile.z) / str(tile.x)
-        tile_dir.mkdir(parents=True, exist_ok=True)
+                return data_dir
+            except BaseException:
+                slots.release()
+                raise
 
-        ext = self.config.output_format
-        tile_path = tile_dir / f"{tile.y}.{ext}"
-
-        # Skip if already exists
-        if tile_path.exists():
-            print(f"    Skipping (exists): {tile_path}")
+        def render(index: int, exported: Future) -> Path:
+            data_dir = exported.result()
+            try:
+                shadow_buffer = renderer.render_exported(data_dir)
+            finally:
+                shutil.rmtree(data_dir, ignore_errors=True)
+                slots.release()
+            tile_path = self._tile_path(output_dir, tiles[index])
+            tile_path.parent.mkdir(parents=True, exist_ok=True)
+            self._save_tile(create_ao_texture(shadow_buffer), tile_path)
             return tile_path
 
-        # Get tile bounds
-        bounds = tile.bounds_wgs84
+        generated = []
+        exporter = ThreadPoolExecutor(max_workers=1)
+        render_pool = ThreadPoolExecutor(max_workers=workers)
+        try:
+            with exporter, render_pool:
+                # Submitted in tile order, so render workers always wait on
+                # exports the exporter reaches first
+                futures = {
+                    render_pool.submit(render, i, exporter.submit(export, i)): tile
+                    for i, tile in enumerate(tiles)
+                }
+                iterator = tqdm(
+                    as_completed(futures),
+                    total=len(futures),
+                    desc="AO tiles",
+                    disable=not progress,
+                )
+                for future in iterator:
+                    tile = futures[future]
+                    try:
+                        generated.append(str(future.result()))
+                        manifest.record(str(tile), tile_fingerprint)
+                    except Exception as e:
+                        print(f"Error generating {tile}: {e}")
+        finally:
+            manifest.save()
+            if self.server_pool is None:
+                server_pool.close()
 
-        # Load data for this tile
-        buildings = []
-        trees = []
+        print(f"Generated {len(generated)} tiles")
+        return generated
 
+    def _load_sources(
+        self,
+        buildings_path: Optional[Path],
+        trees_path: Optional[Path],
+    ) -> Tuple[Optional[VectorSource], Optional[VectorSource]]:
+        """Parse and index the vector sources for a whole run."""
+        buildings = None
+        trees = None
         if buildings_path:
-            buildings_source = VectorSource(Path(buildings_path), "height")
-            buildings = query_features_in_tile(
-                buildings_source, bounds, buffer_meters=200, min_height=1.0
-            )
-            print(f"    Buildings: {len(buildings)}")
-
+            buildings = VectorSource(buildings_path, "height")
+            print(f"Buildings: {len(buildings.features)}")
         if trees_path:
-            trees_source = VectorSource(Path(trees_path), "estimated_height")
-            trees = query_features_in_tile(
-                trees_source, bounds, buffer_meters=100, min_height=2.0
-            )
-            print(f"    Trees: {len(trees)}")
+            trees = VectorSource(trees_path, "estimated_height")
+            print(f"Trees: {len(trees.features)}")
+        return buildings, trees
 
-        # Render shadow buffer with Blender
-        config = BlenderConfig(
-            image_size=self.config.tile_size,
-            samples=self.config.blender_samples,
-            shadow_darkness=self.config.shadow_darkness,
-        )
-        renderer = BlenderShadowRenderer(config=config)
-
-        # Use overhead sun for AO (simulates ambient light from above)
-        # Multiple sun positions could be averaged for better AO
-        sun = SunPosition(azimuth=180, altitude=60)
-
-        shadow_buffer = renderer.render(
-            buildings=buildings,
-            trees=trees,
-            elevation=None,  # Could add DEM here
-            bounds=bounds,
-            sun=sun,
-        )
-
-        # Extract AO texture
-        ao_texture = create_ao_texture(shadow_buffer)
-
-        # Save tile
-        self._save_tile(ao_texture, tile_path)
-
-        return tile_path
+    def _tile_path(self, output_dir: Path, tile: TileCoord) -> Path:
+        """Output path of a tile in the z/x/y layout."""
+        return output_dir / str(tile.z) / str(tile.x) / f"{tile.y}.{self.config.output_format}"
 
     def _save_tile(self, ao_texture: np.ndarray, path: Path) -> None:
         """Save AO texture as tile image."""
@@ -349,6 +458,10 @@ if __name__ == "__main__":
     parser.add_argument("--output-dir", type=str, default="public/tiles/ao")
     parser.add_argument("--buildings", type=str, help="Buildings GeoJSON path")
     parser.add_argument("--trees", type=str, help="Trees GeoJSON path")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Tiles rendered concurrently (one Blender server each)"
+    )
+    parser.add_argument("--force", action="store_true", help="Re-render up-to-date tiles")
 
     args = parser.parse_args()
 
@@ -362,4 +475,6 @@ if __name__ == "__main__":
         output_dir=args.output_dir,
         buildings_path=args.buildings,
         trees_path=args.trees,
+        workers=args.workers,
+        force=args.force,
     )
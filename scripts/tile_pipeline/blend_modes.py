@@ -216,6 +216,97 @@ def apply_blend(
     return modes[mode](base, blend, opacity)
 
 
+def blend_lightness_inplace(
+    L: NDArray[np.float32],
+    blend: NDArray,
+    mode: BlendMode,
+    opacity: float,
+    scratch: NDArray[np.float32],
+    scratch2: NDArray[np.float32],
+) -> None:
+    """Apply a blend mode to normalized lightness in place.
+
+    Same result as apply_blend followed by the clip in blend_lab_lightness,
+    rewritten as in-place updates on caller-owned buffers so a whole layer
+    stack can be evaluated without allocating. Used by the fused compositor.
+
+    Args:
+        L: Normalized lightness (0-1), 1D float32, updated in place
+        blend: Blend layer values (0-1), same length as L
+        mode: One of "multiply", "soft_light", "screen", "overlay", "normal"
+        opacity: Blend strength (0-1)
+        scratch: Work buffer like L
+        scratch2: Second work buffer like L
+
+    Raises:
+        ValueError: If mode is not recognized
+    """
+    opacity = np.float32(opacity)
+
+    if mode == "multiply":
+        # base × (1 - opacity + opacity × blend)
+        np.multiply(blend, opacity, out=scratch)
+        scratch += 1 - opacity
+        L *= scratch
+    elif mode == "screen":
+        # base + opacity × blend × (1 - base)
+        np.subtract(1, L, out=scratch)
+        scratch *= blend
+        scratch *= opacity
+        L += scratch
+    elif mode == "normal":
+        np.multiply(blend, opacity, out=scratch)
+        L *= 1 - opacity
+        L += scratch
+    elif mode == "soft_light":
+        # base + opacity × (2×blend - 1) × g, where g = base × (1 - base)
+        # for blend <= 0.5 and D(base) - base above. Branches are selected
+        # arithmetically: masked copies are slow on noisy masks.
+        np.maximum(L, 0, out=scratch)
+        np.sqrt(scratch, out=scratch)
+        np.multiply(L, 16, out=scratch2)
+        scratch2 -= 12
+        scratch2 *= L
+        scratch2 += 4
+        scratch2 *= L
+        scratch -= scratch2
+        scratch *= L > 0.25
+        scratch += scratch2  # D(base)
+        scratch -= L
+        np.subtract(1, L, out=scratch2)
+        scratch2 *= L
+        scratch -= scratch2
+        scratch *= blend > 0.5
+        scratch += scratch2  # g
+        np.multiply(blend, 2, out=scratch2)
+        scratch2 -= 1
+        scratch *= scratch2
+        scratch *= opacity
+        L += scratch
+    elif mode == "overlay":
+        # 2 × base × blend below mid-gray, 1 - 2 × (1 - base) × (1 - blend)
+        # = 2 × (base + blend) - 1 - 2 × base × blend above
+        np.multiply(L, blend, out=scratch)
+        scratch *= 2
+        np.add(L, blend, out=scratch2)
+        scratch2 *= 2
+        scratch2 -= 1
+        scratch2 -= scratch
+        scratch2 -= scratch
+        scratch2 *= L > 0.5
+        scratch += scratch2
+        scratch -= L
+        scratch *= opacity
+        L += scratch
+    else:
+        raise ValueError(
+            f"Unknown blend mode: {mode}. "
+            "Use one of ['multiply', 'soft_light', 'screen', 'overlay', 'normal']"
+        )
+
+    np.clip(L, 0, 1, out=L)
+
+
 def blend_lab_lightness(
     lab: NDArray[np.float64],
     blend_mask: NDArray[np.float64],
@@ -27,15 +27,19 @@ import subprocess
 import tempfile
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Callable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
 
 import numpy as np
 from numpy.typing import NDArray
 
+from .blender_scene import SceneLayerBuilder, write_scene
 from .blender_shadows import BlenderConfig, SceneBounds, SunPosition
 from .materials import RenderStyle, get_style
 from .sources.vector import Feature
 
+if TYPE_CHECKING:
+    from .blender_server import BlenderServerPool
+
 
 def _crop_isometric_tile(image: NDArray[np.uint8], target_size: int = 512) -> NDArray[np.uint8]:
     """Crop center region from larger isometric render.
@@ -126,14 +130,20 @@ class BlenderTileRenderer:
         self,
         blender_path: Optional[str] = None,
         config: Optional[ColorRenderConfig] = None,
+        server_pool: Optional["BlenderServerPool"] = None,
     ):
         """Initialize Blender tile renderer.
 
         Args:
             blender_path: Path to Blender executable. If None, searches PATH.
             config: Render configuration.
+            server_pool: Persistent Blender servers to render on. If None,
+                each render starts a new Blender process.
         """
-        self.blender_path = blender_path or self._find_blender()
+        self.server_pool = server_pool
+        self.blender_path = blender_path
+        if self.blender_path is None and server_pool is None:
+            self.blender_path = self._find_blender()
         self.config = config or ColorRenderConfig()
 
     def _find_blender(self) -> str:
@@ -232,7 +242,9 @@ class BlenderTileRenderer:
         scene_bounds = SceneBounds(*bounds)
 
         # Convert buildings to simple format
-        building_data = []
+        building_layer = SceneLayerBuilder(
+            "rings", "footprint", numeric=("height", "elevation")
+        )
         for feature in buildings:
             if feature.geometry_type not in ("Polygon", "MultiPolygon"):
                 continue
@@ -249,49 +261,41 @@ class BlenderTileRenderer:
                 if len(polygon) == 0 or len(polygon[0]) < 3:
                     continue
 
-                footprint = [
-                    list(scene_bounds.wgs84_to_local(lon, lat))
-                    for lon, lat in polygon[0]
-                ]
-
-                building_data.append(
-                    {
-                        "footprint": footprint,
-                        "height": height,
-                        "elevation": base_z,
-                        # Data-driven: include building type for per-type materials
-                        "type": feature.properties.get("art", "default"),
-                        "id": feature.id,
-                    }
+                # Data-driven: include building type for per-type materials
+                building_layer.add(
+                    polygon[0],
+                    height=height,
+                    elevation=base_z,
+                    type=feature.properties.get("art", "default"),
+                    id=feature.id,
                 )
 
         # Convert trees to simple format
-        tree_data = []
+        tree_layer = SceneLayerBuilder(
+            "points", "position", numeric=("height", "crown_radius")
+        )
         for feature in trees:
             if feature.geometry_type != "Point":
                 continue
 
             lon, lat = feature.coordinates
-            x, y = scene_bounds.wgs84_to_local(lon, lat)
 
             height = feature.height if feature.height > 0 else 8.0
             crown_diam = feature.properties.get("crown_diameter", 6.0)
             base_z = feature.properties.get("elevation", 0)
 
-            tree_data.append(
-                {
-                    "position": [x, y, base_z],
-                    "height": height,
-                    "crown_radius": crown_diam / 2,
-                    # Data-driven: include species for per-species colors
-                    "species": feature.properties.get("baumgattunglat", "")
-                              or feature.properties.get("species", ""),
-                    "id": feature.id,
-                }
+            # Data-driven: include species for per-species colors
+            tree_layer.add(
+                (lon, lat, base_z),
+                height=height,
+                crown_radius=crown_diam / 2,
+                species=feature.properties.get("baumgattunglat", "")
+                or feature.properties.get("species", ""),
+                id=feature.id,
             )
 
         # Convert streets to polygons (buffer centerlines)
-        street_data = []
+        street_layer = SceneLayerBuilder("rings", "footprint", numeric=("elevation",))
         if streets:
             for feature in streets:
                 if feature.geometry_type not in ("LineString", "MultiLineString"):
@@ -319,21 +323,15 @@ class BlenderTileRenderer:
                     )
 
                     if poly_coords and len(poly_coords) >= 3:
-                        # Convert to local coordinates
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(lon, lat))
-                            for lon, lat in poly_coords
-                        ]
-
-                        street_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                            "street_type": feature.properties.get("street_type", "default"),
-                            "id": feature.id,
-                        })
+                        street_layer.add(
+                            poly_coords,
+                            elevation=base_z,
+                            street_type=feature.properties.get("street_type", "default"),
+                            id=feature.id,
+                        )
 
         # Convert water bodies to polygons
-        water_data = []
+        water_layer = SceneLayerBuilder("rings", "footprint", numeric=("elevation",))
         if water_bodies:
             for feature in water_bodies:
                 base_z = feature.properties.get("elevation", 0) - 0.1  # Slightly below terrain
@@ -342,30 +340,22 @@ class BlenderTileRenderer:
                 if feature.geometry_type == "Polygon":
                     # Lakes/ponds - use directly
                     if len(feature.coordinates) > 0 and len(feature.coordinates[0]) >= 3:
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(c[0], c[1]))
-                            for c in feature.coordinates[0]
-                        ]
-                        water_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                            "water_type": water_type,
-                            "id": feature.id,
-                        })
+                        water_layer.add(
+                            feature.coordinates[0],
+                            elevation=base_z,
+                            water_type=water_type,
+                            id=feature.id,
+                        )
 
                 elif feature.geometry_type == "MultiPolygon":
                     for polygon in feature.coordinates:
                         if len(polygon) > 0 and len(polygon[0]) >= 3:
-                            footprint = [
-                                list(scene_bounds.wgs84_to_local(c[0], c[1]))
-                                for c in polygon[0]
-                            ]
-                            water_data.append({
-                                "footprint": footprint,
-                                "elevation": base_z,
-                                "water_type": water_type,
-                                "id": feature.id,
-                            })
+                            water_layer.add(
+                                polygon[0],
+                                elevation=base_z,
+                                water_type=water_type,
+                                id=feature.id,
+                            )
 
                 elif feature.geometry_type == "LineString":
                     # Rivers/streams - buffer to polygon
@@ -380,16 +370,12 @@ class BlenderTileRenderer:
                     )
 
                     if poly_coords and len(poly_coords) >= 3:
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(lon, lat))
-                            for lon, lat in poly_coords
-                        ]
-                        water_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                            "water_type": water_type,
-                            "id": feature.id,
-                        })
+                        water_layer.add(
+                            poly_coords,
+                            elevation=base_z,
+                            water_type=water_type,
+                            id=feature.id,
+                        )
 
                 elif feature.geometry_type == "MultiLineString":
                     width = feature.height if feature.height > 0 else 5.0
@@ -404,18 +390,14 @@ class BlenderTileRenderer:
                         )
 
                         if poly_coords and len(poly_coords) >= 3:
-                            footprint = [
-                                list(scene_bounds.wgs84_to_local(lon, lat))
-                                for lon, lat in poly_coords
-                            ]
-                            water_data.append({
-                                "footprint": footprint,
-                                "elevation": base_z,
-                                "water_type": water_type,
-                                "id": feature.id,
-                            })
-
-        # Save scene.json with color mode and style
+                            water_layer.add(
+                                poly_coords,
+                                elevation=base_z,
+                                water_type=water_type,
+                                id=feature.id,
+                            )
+
+        # Save scene.bin with color mode and style
         scene_data = {
             "mode": "color",  # Key flag for color rendering
             "bounds": bounds,
@@ -439,15 +421,25 @@ class BlenderTileRenderer:
                 "render_ground": self.config.render_ground,
                 "render_sky": self.config.render_sky,
             },
-            "buildings": building_data,
-            "trees": tree_data,
-            "streets": street_data,
-            "water_bodies": water_data,
-            "roof_faces": roof_faces or [],
         }
 
-        with open(tmpdir / "scene.json", "w") as f:
-            json.dump(scene_data, f)
+        to_local = scene_bounds.wgs84_to_local_array
+        layers = {
+            "buildings": building_layer.pack("buildings", to_local),
+            "trees": tree_layer.pack("trees", to_local),
+            "streets": street_layer.pack("streets", to_local),
+            "water_bodies": water_layer.pack("water_bodies", to_local),
+        }
+        if roof_faces:
+            # LOD2 roof faces are already 3D polygons in local meters
+            roof_layer = SceneLayerBuilder("rings", "vertices", dims=3)
+            for face in roof_faces:
+                roof_layer.add(
+                    np.asarray(face.get("vertices", []), dtype=np.float64).reshape(-1, 3),
+                    material=face.get("material", "roof_terracotta"),
+                )
+            layers["roof_faces"] = roof_layer.pack("roof_faces")
+        write_scene(tmpdir, scene_data, layers)
 
         # Save elevation
         if elevation is not None and elevation.size > 0:
@@ -461,6 +453,10 @@ class BlenderTileRenderer:
 
     def _run_blender(self, data_dir: Path, output_path: Path) -> None:
         """Run Blender headlessly to render the tile."""
+        if self.server_pool is not None:
+            self.server_pool.render(data_dir, output_path)
+            return
+
         script_path = Path(__file__).parent / "blender_scene.py"
 
         if not script_path.exists():
@@ -619,7 +615,9 @@ class BlenderTileRenderer:
         scene_bounds = SceneBounds(*bounds)
 
         # Convert buildings with roof material inference
-        building_data = []
+        building_layer = SceneLayerBuilder(
+            "rings", "footprint", numeric=("height", "elevation")
+        )
         for feature in buildings:
             if feature.geometry_type not in ("Polygon", "MultiPolygon"):
                 continue
@@ -638,42 +636,38 @@ class BlenderTileRenderer:
                 if len(polygon) == 0 or len(polygon[0]) < 3:
                     continue
 
-                footprint = [
-                    list(scene_bounds.wgs84_to_local(lon, lat))
-                    for lon, lat in polygon[0]
-                ]
-
-                building_data.append({
-                    "footprint": footprint,
-                    "height": height,
-                    "elevation": base_z,
-                    "type": building_type,
-                    "roof_material": roof_material,
-                    "id": feature.id,
-                })
+                building_layer.add(
+                    polygon[0],
+                    height=height,
+                    elevation=base_z,
+                    type=building_type,
+                    roof_material=roof_material,
+                    id=feature.id,
+                )
 
         # Convert trees
-        tree_data = []
+        tree_layer = SceneLayerBuilder(
+            "points", "position", numeric=("height", "crown_radius")
+        )
         for feature in trees:
             if feature.geometry_type != "Point":
                 continue
 
             lon, lat = feature.coordinates
-            x, y = scene_bounds.wgs84_to_local(lon, lat)
 
             height = feature.height if feature.height > 0 else 8.0
             crown_diam = feature.properties.get("crown_diameter", 6.0)
             base_z = feature.properties.get("elevation", 0)
 
-            tree_data.append({
-                "position": [x, y, base_z],
-                "height": height,
-                "crown_radius": crown_diam / 2,
-                "id": feature.id,
-            })
+            tree_layer.add(
+                (lon, lat, base_z),
+                height=height,
+                crown_radius=crown_diam / 2,
+                id=feature.id,
+            )
 
         # Convert streets
-        street_data = []
+        street_layer = SceneLayerBuilder("rings", "footprint", numeric=("elevation",))
         if streets:
             for feature in streets:
                 if feature.geometry_type not in ("LineString", "MultiLineString"):
@@ -700,18 +694,10 @@ class BlenderTileRenderer:
                     )
 
                     if poly_coords and len(poly_coords) >= 3:
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(lon, lat))
-                            for lon, lat in poly_coords
-                        ]
-                        street_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                            "id": feature.id,
-                        })
+                        street_layer.add(poly_coords, elevation=base_z, id=feature.id)
 
         # Convert water bodies
-        water_data = []
+        water_layer = SceneLayerBuilder("rings", "footprint", numeric=("elevation",))
         if water_bodies:
             for feature in water_bodies:
                 base_z = feature.properties.get("elevation", 0) + 0.2  # ABOVE ground for visibility
@@ -719,30 +705,22 @@ class BlenderTileRenderer:
 
                 if feature.geometry_type == "Polygon":
                     if len(feature.coordinates) > 0 and len(feature.coordinates[0]) >= 3:
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(c[0], c[1]))
-                            for c in feature.coordinates[0]
-                        ]
-                        water_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                            "water_type": water_type,
-                            "id": feature.id,
-                        })
+                        water_layer.add(
+                            feature.coordinates[0],
+                            elevation=base_z,
+                            water_type=water_type,
+                            id=feature.id,
+                        )
 
                 elif feature.geometry_type == "MultiPolygon":
                     for polygon in feature.coordinates:
                         if len(polygon) > 0 and len(polygon[0]) >= 3:
-                            footprint = [
-                                list(scene_bounds.wgs84_to_local(c[0], c[1]))
-                                for c in polygon[0]
-                            ]
-                            water_data.append({
-                                "footprint": footprint,
-                                "elevation": base_z,
-                                "water_type": water_type,
-                                "id": feature.id,
-                            })
+                            water_layer.add(
+                                polygon[0],
+                                elevation=base_z,
+                                water_type=water_type,
+                                id=feature.id,
+                            )
 
                 elif feature.geometry_type == "LineString":
                     width = feature.height if feature.height > 0 else 5.0
@@ -758,16 +736,12 @@ class BlenderTileRenderer:
                         from .geometry import clip_polygon_to_bounds
                         clipped = clip_polygon_to_bounds(poly_coords, bounds)
                         if clipped and len(clipped) >= 3:
-                            footprint = [
-                                list(scene_bounds.wgs84_to_local(lon, lat))
-                                for lon, lat in clipped
-                            ]
-                            water_data.append({
-                                "footprint": footprint,
-                                "elevation": base_z,
-                                "water_type": water_type,
-                                "id": feature.id,
-                            })
+                            water_layer.add(
+                                clipped,
+                                elevation=base_z,
+                                water_type=water_type,
+                                id=feature.id,
+                            )
 
         # Build semantic color definitions
         semantic_colors = {
@@ -779,7 +753,7 @@ class BlenderTileRenderer:
             "building_wall": list(SEMANTIC_ELEMENT_COLORS.get("building_wall", (0.92, 0.88, 0.82))),
         }
 
-        # Save scene.json with semantic mode
+        # Save scene.bin with semantic mode
         scene_data = {
             "mode": "semantic",
             "bounds": bounds,
@@ -803,14 +777,16 @@ class BlenderTileRenderer:
                 "tile_size": self.config.tile_size,
                 "soft_shadows": True,
             },
-            "buildings": building_data,
-            "trees": tree_data,
-            "streets": street_data,
-            "water_bodies": water_data,
         }
 
-        with open(tmpdir / "scene.json", "w") as f:
-            json.dump(scene_data, f)
+        to_local = scene_bounds.wgs84_to_local_array
+        layers = {
+            "buildings": building_layer.pack("buildings", to_local),
+            "trees": tree_layer.pack("trees", to_local),
+            "streets": street_layer.pack("streets", to_local),
+            "water_bodies": water_layer.pack("water_bodies", to_local),
+        }
+        write_scene(tmpdir, scene_data, layers)
 
         # Save elevation
         if elevation is not None and elevation.size > 0:
@@ -1029,7 +1005,9 @@ class BlenderTileRenderer:
         scene_bounds = SceneBounds(*bounds)
 
         # Convert buildings to simple format
-        building_data = []
+        building_layer = SceneLayerBuilder(
+            "rings", "footprint", numeric=("height", "elevation")
+        )
         for feature in buildings:
             if feature.geometry_type not in ("Polygon", "MultiPolygon"):
                 continue
@@ -1046,38 +1024,30 @@ class BlenderTileRenderer:
                 if len(polygon) == 0 or len(polygon[0]) < 3:
                     continue
 
-                footprint = [
-                    list(scene_bounds.wgs84_to_local(lon, lat))
-                    for lon, lat in polygon[0]
-                ]
-
-                building_data.append({
-                    "footprint": footprint,
-                    "height": height,
-                    "elevation": base_z,
-                })
+                building_layer.add(polygon[0], height=height, elevation=base_z)
 
         # Convert trees to simple format
-        tree_data = []
+        tree_layer = SceneLayerBuilder(
+            "points", "position", numeric=("height", "crown_radius")
+        )
         for feature in trees:
             if feature.geometry_type != "Point":
                 continue
 
             lon, lat = feature.coordinates
-            x, y = scene_bounds.wgs84_to_local(lon, lat)
 
             height = feature.height if feature.height > 0 else 8.0
             crown_diam = feature.properties.get("crown_diameter", 6.0)
             base_z = feature.properties.get("elevation", 0)
 
-            tree_data.append({
-                "position": [x, y, base_z],
-                "height": height,
-                "crown_radius": crown_diam / 2,
-            })
+            tree_layer.add(
+                (lon, lat, base_z),
+                height=height,
+                crown_radius=crown_diam / 2,
+            )
 
         # Convert streets to polygons (buffer centerlines)
-        street_data = []
+        street_layer = SceneLayerBuilder("rings", "footprint", numeric=("elevation",))
         if streets:
             for feature in streets:
                 if feature.geometry_type not in ("LineString", "MultiLineString"):
@@ -1102,43 +1072,22 @@ class BlenderTileRenderer:
                     )
 
                     if poly_coords and len(poly_coords) >= 3:
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(lon, lat))
-                            for lon, lat in poly_coords
-                        ]
-                        street_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                        })
+                        street_layer.add(poly_coords, elevation=base_z)
 
         # Convert water bodies
-        water_data = []
+        water_layer = SceneLayerBuilder("rings", "footprint", numeric=("elevation",))
         if water_bodies:
             for feature in water_bodies:
                 base_z = feature.properties.get("elevation", 0) + 0.02
 
                 if feature.geometry_type == "Polygon":
                     if len(feature.coordinates) > 0 and len(feature.coordinates[0]) >= 3:
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(c[0], c[1]))
-                            for c in feature.coordinates[0]
-                        ]
-                        water_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                        })
+                        water_layer.add(feature.coordinates[0], elevation=base_z)
 
                 elif feature.geometry_type == "MultiPolygon":
                     for polygon in feature.coordinates:
                         if len(polygon) > 0 and len(polygon[0]) >= 3:
-                            footprint = [
-                                list(scene_bounds.wgs84_to_local(c[0], c[1]))
-                                for c in polygon[0]
-                            ]
-                            water_data.append({
-                                "footprint": footprint,
-                                "elevation": base_z,
-                            })
+                            water_layer.add(polygon[0], elevation=base_z)
 
                 elif feature.geometry_type == "LineString":
                     width = feature.height if feature.height > 0 else 5.0
@@ -1150,16 +1099,9 @@ class BlenderTileRenderer:
                         latitude=scene_bounds.lat_center,
                     )
                     if poly_coords and len(poly_coords) >= 3:
-                        footprint = [
-                            list(scene_bounds.wgs84_to_local(lon, lat))
-                            for lon, lat in poly_coords
-                        ]
-                        water_data.append({
-                            "footprint": footprint,
-                            "elevation": base_z,
-                        })
-
-        # Save scene.json with specified mode
+                        water_layer.add(poly_coords, elevation=base_z)
+
+        # Save scene.bin with specified mode
         scene_data = {
             "mode": mode,  # 'depth', 'normal', or 'edge'
             "bounds": bounds,
@@ -1174,14 +1116,16 @@ class BlenderTileRenderer:
                 "device": self.config.device,
                 "tile_size": self.config.tile_size,
             },
-            "buildings": building_data,
-            "trees": tree_data,
-            "streets": street_data,
-            "water_bodies": water_data,
         }
 
-        with open(tmpdir / "scene.json", "w") as f:
-            json.dump(scene_data, f)
+        to_local = scene_bounds.wgs84_to_local_array
+        layers = {
+            "buildings": building_layer.pack("buildings", to_local),
+            "trees": tree_layer.pack("trees", to_local),
+            "streets": street_layer.pack("streets", to_local),
+            "water_bodies": water_layer.pack("water_bodies", to_local),
+        }
+        write_scene(tmpdir, scene_data, layers)
 
         # Save elevation
         if elevation is not None and elevation.size > 0:
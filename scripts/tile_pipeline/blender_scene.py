@@ -13,8 +13,14 @@ Usage (called by BlenderShadowRenderer or BlenderTileRenderer):
     blender --background --python blender_scene.py -- \\
         --data-dir /path/to/data --output /path/to/output.png
 
+    # Long-running server reading one JSON job per line from stdin
+    # (driven by blender_server.BlenderServerPool)
+    blender --background --python blender_scene.py -- --server
+
 The data directory should contain:
-    - scene.json: Scene configuration, geometry data, and render mode
+    - scene.bin: Scene configuration and render mode plus packed float32
+      geometry buffers per layer (see write_scene). A scene.json with the
+      same content as nested lists is still accepted.
     - elevation.npy: Elevation heightmap (optional)
 
 Output:
@@ -35,11 +41,613 @@ except ImportError:
 import argparse
 import json
 import math
+import struct
 import sys
+import time
+import traceback
 from pathlib import Path
 
 import numpy as np
 
+# Marks protocol replies in server mode; Blender writes its own log to stdout too
+SERVER_REPLY_PREFIX = "@@tile-server@@ "
+
+# =============================================================================
+# Binary scene format (scene.bin)
+# =============================================================================
+#
+# Layout: magic, version (uint32), header length (uint32), JSON header, then
+# raw little-endian array buffers, each aligned to 16 bytes. The header holds
+# the small scene settings (mode, config, sun, style) and, per layer, the
+# names of its packed arrays:
+#
+#   rings  - "<layer>.coords" (V, D) float32 vertices, "<layer>.offsets" (N+1)
+#            int32 ring start indices, one float32 array per numeric attribute
+#   points - "<layer>.coords" (N, 3) float32 positions plus attribute arrays
+#
+# Non-numeric attributes (ids, types, materials) stay in the JSON header.
+
+SCENE_BINARY_FILENAME = "scene.bin"
+SCENE_BINARY_MAGIC = b"TSCN"
+SCENE_BINARY_VERSION = 1
+_BINARY_ALIGNMENT = 16
+_BINARY_PREAMBLE = struct.Struct("<4sII")
+
+
+def _aligned(size: int) -> int:
+    """Round size up to the buffer alignment."""
+    return -(-size // _BINARY_ALIGNMENT) * _BINARY_ALIGNMENT
+
+
+def write_scene_binary(path: Path, header: dict, arrays: dict) -> None:
+    """Write a header and named arrays as a scene.bin file.
+
+    Args:
+        path: Output file path
+        header: JSON-serializable scene header
+        arrays: Mapping of array name to numpy array
+    """
+    arrays = {name: np.ascontiguousarray(a) for name, a in arrays.items()}
+
+    entries = {}
+    offset = 0
+    for name, array in arrays.items():
+        entries[name] = {
+            "dtype": array.dtype.newbyteorder("<").str,
+            "shape": list(array.shape),
+            "offset": offset,
+        }
+        offset += _aligned(array.nbytes)
+
+    header_bytes = json.dumps({**header, "arrays": entries}).encode("utf-8")
+    data_start = _aligned(_BINARY_PREAMBLE.size + len(header_bytes))
+
+    with open(path, "wb") as f:
+        f.write(_BINARY_PREAMBLE.pack(SCENE_BINARY_MAGIC, SCENE_BINARY_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - _BINARY_PREAMBLE.size - len(header_bytes)))
+        for array in arrays.values():
+            data = array.astype(array.dtype.newbyteorder("<"), copy=False)
+            f.write(data.reshape(-1).view(np.uint8).data)
+            f.write(b"\0" * (_aligned(array.nbytes) - array.nbytes))
+
+
+def read_scene_binary(path: Path) -> tuple:
+    """Memory-map a scene.bin file.
+
+    Args:
+        path: File written by write_scene_binary
+
+    Returns:
+        Tuple of (header dict, dict of array name to read-only array view)
+    """
+    with open(path, "rb") as f:
+        magic, version, header_size = _BINARY_PREAMBLE.unpack(f.read(_BINARY_PREAMBLE.size))
+        if magic != SCENE_BINARY_MAGIC:
+            raise ValueError(f"Not a scene file: {path}")
+        if version != SCENE_BINARY_VERSION:
+            raise ValueError(f"Unsupported scene file version {version}: {path}")
+        header = json.loads(f.read(header_size).decode("utf-8"))
+
+    data_start = _aligned(_BINARY_PREAMBLE.size + header_size)
+    buffer = np.memmap(path, dtype=np.uint8, mode="r")
+
+    arrays = {}
+    for name, entry in header.pop("arrays").items():
+        dtype = np.dtype(entry["dtype"])
+        shape = tuple(entry["shape"])
+        start = data_start + entry["offset"]
+        nbytes = dtype.itemsize * int(np.prod(shape, dtype=np.int64))
+        arrays[name] = buffer[start:start + nbytes].view(dtype).reshape(shape)
+
+    return header, arrays
+
+
+class SceneLayerBuilder:
+    """Collects one layer's features into packed arrays for scene.bin.
+
+    Example:
+        buildings = SceneLayerBuilder("rings", "footprint", numeric=("height", "elevation"))
+        buildings.add(ring_lonlat, height=12.0, elevation=0, id="b1")
+        header, arrays = buildings.pack("buildings", to_local=bounds.wgs84_to_local_array)
+    """
+
+    def __init__(self, kind: str, geometry: str, numeric: tuple = (), dims: int = 2):
+        """Initialize an empty layer.
+
+        Args:
+            kind: "rings" (polygon outlines) or "points" (one position per feature)
+            geometry: Key the geometry is exposed under ("footprint", "position", ...)
+            numeric: Attribute names packed as float32 arrays
+            dims: Coordinates per vertex (3 for points and 3D rings)
+        """
+        if kind not in ("rings", "points"):
+            raise ValueError(f"Unknown layer kind: {kind}")
+        self.kind = kind
+        self.geometry = geometry
+        self.numeric = tuple(numeric)
+        self.dims = 3 if kind == "points" else dims
+        self._coords = []
+        self._numeric_values = {name: [] for name in self.numeric}
+        self._other_values = {}
+
+    def __len__(self) -> int:
+        return len(self._coords)
+
+    def add(self, coords, **attributes) -> None:
+        """Add one feature.
+
+        Args:
+            coords: Ring vertices (sequence of positions) or a single position
+            **attributes: Per-feature attributes; names listed in numeric are
+                packed as float32, everything else must be JSON-serializable
+        """
+        array = np.asarray(coords, dtype=np.float64)
+        if self.kind == "points":
+            array = array.reshape(1, -1)
+        self._coords.append(array[:, : self.dims])
+
+        index = len(self._coords) - 1
+        for name, value in attributes.items():
+            if name in self._numeric_values:
+                self._numeric_values[name].append(value)
+            else:
+                values = self._other_values.setdefault(name, [None] * index)
+                values.append(value)
+        for name, values in self._other_values.items():
+            if len(values) == index:
+                values.append(None)
+
+    def pack(self, name: str, to_local=None) -> tuple:
+        """Pack the collected features.
+
+        Args:
+            name: Layer name, used as prefix for the array names
+            to_local: Optional callable(x, y) -> (N, 2) array applied to the
+                first two coordinate columns (e.g. WGS84 to scene meters)
+
+        Returns:
+            Tuple of (layer header dict, dict of arrays)
+        """
+        count = len(self._coords)
+        if count:
+            coords = np.concatenate(self._coords)
+        else:
+            coords = np.zeros((0, self.dims))
+        if to_local is not None and len(coords):
+            coords[:, :2] = to_local(coords[:, 0], coords[:, 1])
+
+        arrays = {f"{name}.coords": coords.astype(np.float32)}
+        if self.kind == "rings":
+            lengths = np.array([len(c) for c in self._coords], dtype=np.int64)
+            offsets = np.zeros(count + 1, dtype=np.int32)
+            np.cumsum(lengths, out=offsets[1:])
+            arrays[f"{name}.offsets"] = offsets
+
+        for attribute, values in self._numeric_values.items():
+            if len(values) != count:
+                raise ValueError(f"Attribute '{attribute}' missing on some {name} features")
+            arrays[f"{name}.{attribute}"] = np.asarray(values, dtype=np.float32)
+
+        header = {
+            "kind": self.kind,
+            "geometry": self.geometry,
+            "count": count,
+            "numeric": list(self.numeric),
+            "values": self._other_values,
+        }
+        return header, arrays
+
+
+class SceneLayer:
+    """Packed features of one scene.bin layer.
+
+    Iterating or indexing yields the same per-feature dicts that scene.json
+    holds, with geometry as zero-copy array views, so per-feature render
+    code works unchanged. Batched mesh builders use the arrays directly.
+    """
+
+    def __init__(self, name: str, header: dict, arrays: dict):
+        self.name = name
+        self.kind = header["kind"]
+        self.geometry = header["geometry"]
+        self.count = header["count"]
+        self.coords = arrays[f"{name}.coords"]
+        self.offsets = arrays.get(f"{name}.offsets")
+        self.columns = {attr: arrays[f"{name}.{attr}"] for attr in header["numeric"]}
+        self.values = header.get("values", {})
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index: int) -> dict:
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(index)
+
+        if self.kind == "rings":
+            geometry = self.coords[self.offsets[index]:self.offsets[index + 1]]
+        else:
+            geometry = self.coords[index]
+
+        feature = {self.geometry: geometry}
+        for attr, column in self.columns.items():
+            feature[attr] = float(column[index])
+        for attr, values in self.values.items():
+            if values[index] is not None:
+                feature[attr] = values[index]
+        return feature
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self[index]
+
+
+def load_scene(data_dir: Path) -> dict:
+    """Load exported scene data, preferring scene.bin over scene.json.
+
+    Args:
+        data_dir: Directory written by the tile renderer
+
+    Returns:
+        Scene dict; with scene.bin, layers are SceneLayer objects
+    """
+    binary_path = Path(data_dir) / SCENE_BINARY_FILENAME
+    if not binary_path.exists():
+        with open(Path(data_dir) / "scene.json") as f:
+            return json.load(f)
+
+    header, arrays = read_scene_binary(binary_path)
+    scene_data = dict(header.get("scene", {}))
+    for name, layer in header.get("layers", {}).items():
+        scene_data[name] = SceneLayer(name, layer, arrays)
+    return scene_data
+
+
+def write_scene(data_dir: Path, scene: dict, layers: dict) -> None:
+    """Write scene settings and packed layers to data_dir/scene.bin.
+
+    Args:
+        data_dir: Scene export directory
+        scene: Small JSON settings (mode, bounds, config, sun, style, ...)
+        layers: Mapping of layer name to (layer header, arrays) from
+            SceneLayerBuilder.pack
+    """
+    arrays = {}
+    layer_headers = {}
+    for name, (layer_header, layer_arrays) in layers.items():
+        layer_headers[name] = layer_header
+        arrays.update(layer_arrays)
+
+    write_scene_binary(
+        Path(data_dir) / SCENE_BINARY_FILENAME,
+        {"scene": scene, "layers": layer_headers},
+        arrays,
+    )
+
+
+# =============================================================================
+# Batched mesh buffers
+# =============================================================================
+#
+# These build whole layers as one vertex array plus loop/polygon index arrays
+# with numpy, which Blender ingests with foreach_set in a few bulk calls
+# instead of one bmesh vertex at a time.
+
+
+def _ring_arrays(features, geometry: str = "footprint") -> tuple:
+    """Coordinates and ring offsets of a layer (SceneLayer or list of dicts)."""
+    if isinstance(features, SceneLayer):
+        return np.asarray(features.coords, dtype=np.float64), np.asarray(features.offsets)
+
+    rings = [np.asarray(f[geometry], dtype=np.float64).reshape(-1, 2) for f in features]
+    offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+    np.cumsum([len(r) for r in rings], out=offsets[1:])
+    coords = np.concatenate(rings) if rings else np.zeros((0, 2))
+    return coords, offsets
+
+
+def _feature_column(features, name: str, default: float) -> np.ndarray:
+    """Per-feature numeric attribute of a layer as float64."""
+    if isinstance(features, SceneLayer) and name in features.columns:
+        return np.asarray(features.columns[name], dtype=np.float64)
+    return np.array([f.get(name, default) for f in features], dtype=np.float64)
+
+
+def _normalized_rings(coords: np.ndarray, offsets: np.ndarray) -> tuple:
+    """Drop closing vertices and degenerate rings, and orient rings CCW.
+
+    Returns:
+        Tuple of (vertex xy (M, 2), ring start (R,), ring length (R,),
+        index of the source ring for each kept ring (R,))
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    starts = offsets[:-1]
+    lengths = np.diff(offsets)
+
+    # GeoJSON rings repeat the first vertex at the end
+    nonempty = lengths > 0
+    closed = np.zeros(len(lengths), dtype=bool)
+    last = np.maximum(offsets[1:] - 1, 0)
+    if len(coords):
+        closed[nonempty] = np.all(
+            coords[starts[nonempty]] == coords[last[nonempty]], axis=1
+        ) & (lengths[nonempty] > 1)
+    lengths = lengths - closed
+
+    rings = np.flatnonzero(lengths >= 3)
+    starts = starts[rings]
+    lengths = lengths[rings]
+
+    # Gather kept vertices ring by ring
+    ring_of = np.repeat(np.arange(len(rings)), lengths)
+    new_starts = np.zeros(len(rings), dtype=np.int64)
+    if len(rings):
+        np.cumsum(lengths[:-1], out=new_starts[1:])
+    local = np.arange(len(ring_of)) - new_starts[ring_of]
+    xy = coords[starts[ring_of] + local, :2]
+
+    # Signed area (shoelace); reverse clockwise rings
+    nxt = np.where(local + 1 == lengths[ring_of], new_starts[ring_of], np.arange(len(ring_of)) + 1)
+    cross = xy[:, 0] * xy[nxt, 1] - xy[nxt, 0] * xy[:, 1]
+    area = np.bincount(ring_of, weights=cross, minlength=len(rings))
+    clockwise = area < 0
+    flip = clockwise[ring_of]
+    source = np.where(flip, new_starts[ring_of] + lengths[ring_of] - 1 - local, np.arange(len(ring_of)))
+    xy = xy[source]
+
+    return xy, new_starts, lengths, rings
+
+
+def _ring_topology(starts: np.ndarray, lengths: np.ndarray) -> tuple:
+    """Per-vertex ring index, and index of the next vertex in the same ring."""
+    count = int(lengths.sum())
+    ring_of = np.repeat(np.arange(len(lengths)), lengths)
+    index = np.arange(count)
+    nxt = index + 1
+    ends = starts + lengths
+    nxt[ends - 1] = starts
+    return ring_of, nxt
+
+
+def extrusion_buffers(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    heights: np.ndarray,
+    bases: np.ndarray,
+) -> tuple:
+    """Mesh buffers for footprints extruded into prisms.
+
+    Each ring becomes a bottom face (facing down), a top face (facing up)
+    and one outward-facing quad per edge.
+
+    Args:
+        coords: (V, 2) ring vertices
+        offsets: (N+1,) ring start offsets into coords
+        heights: (N,) extrusion heights
+        bases: (N,) base elevations
+
+    Returns:
+        Tuple of (vertices (2M, 3) float32, loop vertex indices int32,
+        polygon loop starts int32, polygon loop totals int32)
+    """
+    xy, starts, lengths, rings = _normalized_rings(coords, offsets)
+    m = len(xy)
+    ring_of, nxt = _ring_topology(starts, lengths)
+
+    base = np.asarray(bases, dtype=np.float64)[rings][ring_of]
+    top = base + np.asarray(heights, dtype=np.float64)[rings][ring_of]
+
+    vertices = np.empty((2 * m, 3), dtype=np.float32)
+    vertices[:m, :2] = xy
+    vertices[:m, 2] = base
+    vertices[m:, :2] = xy
+    vertices[m:, 2] = top
+
+    index = np.arange(m)
+    local = index - starts[ring_of]
+    bottom_loops = starts[ring_of] + lengths[ring_of] - 1 - local  # Reversed: faces down
+    top_loops = m + index
+    wall_loops = np.stack([index, nxt, m + nxt, m + index], axis=1).ravel()
+
+    loops = np.concatenate([bottom_loops, top_loops, wall_loops]).astype(np.int32)
+    loop_starts = np.concatenate([starts, m + starts, 2 * m + 4 * index]).astype(np.int32)
+    loop_totals = np.concatenate([lengths, lengths, np.full(m, 4)]).astype(np.int32)
+    return vertices, loops, loop_starts, loop_totals
+
+
+def flat_polygon_buffers(
+    coords: np.ndarray,
+    offsets: np.ndarray,
+    elevations: np.ndarray,
+) -> tuple:
+    """Mesh buffers for flat, upward-facing polygons (streets, water).
+
+    Args:
+        coords: (V, 2) ring vertices
+        offsets: (N+1,) ring start offsets into coords
+        elevations: (N,) polygon heights
+
+    Returns:
+        Tuple of (vertices, loop vertex indices, loop starts, loop totals)
+    """
+    xy, starts, lengths, rings = _normalized_rings(coords, offsets)
+    ring_of = np.repeat(np.arange(len(lengths)), lengths)
+
+    vertices = np.empty((len(xy), 3), dtype=np.float32)
+    vertices[:, :2] = xy
+    vertices[:, 2] = np.asarray(elevations, dtype=np.float64)[rings][ring_of]
+
+    loops = np.arange(len(xy), dtype=np.int32)
+    return vertices, loops, starts.astype(np.int32), lengths.astype(np.int32)
+
+
+def frustum_buffers(
+    centers: np.ndarray,
+    bottom_radii: np.ndarray,
+    top_radii: np.ndarray,
+    depths: np.ndarray,
+    segments: int,
+) -> tuple:
+    """Mesh buffers for capped cones/cylinders, like primitive_cone_add.
+
+    Args:
+        centers: (N, 3) object centers (midway between the caps)
+        bottom_radii: (N,) bottom cap radii
+        top_radii: (N,) top cap radii
+        depths: (N,) heights
+        segments: Vertices per cap
+
+    Returns:
+        Tuple of (vertices, loop vertex indices, loop starts, loop totals)
+    """
+    n = len(centers)
+    angle = np.linspace(0, 2 * np.pi, segments, endpoint=False)
+    ring = np.stack([np.cos(angle), np.sin(angle)], axis=1)  # (S, 2) CCW
+
+    centers = np.asarray(centers, dtype=np.float64).reshape(n, 1, 3)
+    half = np.asarray(depths, dtype=np.float64).reshape(n, 1) / 2
+
+    vertices = np.empty((n, 2, segments, 3), dtype=np.float32)
+    for cap, radii, dz in ((0, bottom_radii, -half), (1, top_radii, half)):
+        radii = np.asarray(radii, dtype=np.float64).reshape(n, 1, 1)
+        vertices[:, cap, :, :2] = centers[:, :, :2] + ring * radii
+        vertices[:, cap, :, 2] = centers[:, :, 2] + dz
+
+    # Per-object topology, offset by 2*segments vertices per object
+    s = np.arange(segments)
+    template = np.concatenate([
+        s[::-1],                                                             # Bottom cap (down)
+        segments + s,                                                        # Top cap (up)
+        np.stack([s, (s + 1) % segments, segments + (s + 1) % segments, segments + s], 1).ravel(),
+    ])
+    loops = (template + (2 * segments * np.arange(n))[:, None]).ravel().astype(np.int32)
+
+    totals = np.concatenate([[segments, segments], np.full(segments, 4)])
+    per_object = len(template)
+    template_starts = np.concatenate([[0], np.cumsum(totals)[:-1]])
+    loop_starts = (template_starts + per_object * np.arange(n)[:, None]).ravel().astype(np.int32)
+    loop_totals = np.tile(totals, n).astype(np.int32)
+
+    return vertices.reshape(-1, 3), loops, loop_starts, loop_totals
+
+
+def tree_buffers(trees) -> tuple:
+    """Crown and trunk mesh buffers for a tree layer, matching create_tree.
+
+    Args:
+        trees: SceneLayer or list of tree dicts (position, height, crown_radius)
+
+    Returns:
+        Tuple of (crown buffers, trunk buffers)
+    """
+    if isinstance(trees, SceneLayer):
+        positions = np.asarray(trees.coords, dtype=np.float64)
+    else:
+        positions = np.array([t["position"] for t in trees], dtype=np.float64).reshape(-1, 3)
+    heights = _feature_column(trees, "height", 8.0)
+    crown_radii = _feature_column(trees, "crown_radius", 3.0)
+
+    crown_height = heights * 0.7
+    crown_centers = positions.copy()
+    crown_centers[:, 2] += heights * 0.3 + crown_height / 2
+    crowns = frustum_buffers(
+        crown_centers, crown_radii, np.full(len(heights), 0.1), crown_height, 8
+    )
+
+    trunk_height = heights * 0.35
+    trunk_radius = crown_radii * 0.1
+    trunk_centers = positions.copy()
+    trunk_centers[:, 2] += trunk_height / 2
+    trunks = frustum_buffers(trunk_centers, trunk_radius, trunk_radius, trunk_height, 6)
+
+    return crowns, trunks
+
+
+def grid_buffers(elevation: np.ndarray, width_meters: float, height_meters: float) -> tuple:
+    """Mesh buffers for a heightmap grid, matching create_terrain_mesh."""
+    h, w = elevation.shape
+    px, py = np.meshgrid(
+        np.arange(w) / (w - 1) * width_meters,
+        np.arange(h) / (h - 1) * height_meters,
+    )
+    vertices = np.stack([px, py, elevation], axis=-1).reshape(-1, 3).astype(np.float32)
+
+    i = (np.arange(h - 1)[:, None] * w + np.arange(w - 1)[None, :]).ravel()
+    loops = np.stack([i, i + 1, i + w + 1, i + w], axis=1).ravel().astype(np.int32)
+    loop_starts = (4 * np.arange(len(i))).astype(np.int32)
+    loop_totals = np.full(len(i), 4, dtype=np.int32)
+    return vertices, loops, loop_starts, loop_totals
+
+
+def create_mesh_object(name: str, buffers: tuple, material=None) -> object:
+    """Create a mesh object from batched buffers with bulk foreach_set calls.
+
+    Args:
+        name: Object and mesh name
+        buffers: (vertices, loop vertex indices, loop starts, loop totals)
+        material: Optional material for all faces
+
+    Returns:
+        Blender mesh object, or None for empty buffers
+    """
+    if bpy is None:
+        return None
+
+    vertices, loops, loop_starts, loop_totals = buffers
+    if len(loop_starts) == 0:
+        return None
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(vertices))
+    mesh.vertices.foreach_set("co", np.ascontiguousarray(vertices, dtype=np.float32).ravel())
+    mesh.loops.add(len(loops))
+    mesh.loops.foreach_set("vertex_index", np.ascontiguousarray(loops, dtype=np.int32))
+    mesh.polygons.add(len(loop_starts))
+    mesh.polygons.foreach_set("loop_start", np.ascontiguousarray(loop_starts, dtype=np.int32))
+    if bpy.app.version < (4, 0, 0):
+        # Blender 4 derives polygon sizes from the loop starts
+        mesh.polygons.foreach_set("loop_total", np.ascontiguousarray(loop_totals, dtype=np.int32))
+
+    mesh.update(calc_edges=True)
+    mesh.validate()
+
+    if material is not None:
+        mesh.materials.append(material)
+
+    obj = bpy.data.objects.new(name, mesh)
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+
+def create_building_layer(buildings, material=None, name: str = "Buildings") -> object:
+    """Create all buildings of a layer as one extruded mesh object."""
+    coords, offsets = _ring_arrays(buildings)
+    buffers = extrusion_buffers(
+        coords,
+        offsets,
+        _feature_column(buildings, "height", 10.0),
+        _feature_column(buildings, "elevation", 0.0),
+    )
+    return create_mesh_object(name, buffers, material)
+
+
+def create_tree_layer(trees, crown_material=None, trunk_material=None) -> tuple:
+    """Create all trees of a layer as one crown and one trunk mesh object."""
+    crowns, trunks = tree_buffers(trees)
+    return (
+        create_mesh_object("Tree_Crowns", crowns, crown_material),
+        create_mesh_object("Tree_Trunks", trunks, trunk_material),
+    )
+
+
+def create_flat_layer(features, z_offset: float, material=None, name: str = "Polygons") -> object:
+    """Create all street or water polygons of a layer as one flat mesh object."""
+    coords, offsets = _ring_arrays(features)
+    elevations = _feature_column(features, "elevation", 0.0) + z_offset
+    return create_mesh_object(name, flat_polygon_buffers(coords, offsets, elevations), material)
+
 
 def clear_scene():
     """Remove all objects from the Blender scene."""
@@ -78,45 +686,7 @@ def create_terrain_mesh(
     if bpy is None:
         return None
 
-    h, w = elevation.shape
-
-    # Create bmesh for building geometry
-    bm = bmesh.new()
-
-    # Create vertex grid
-    for y in range(h):
-        for x in range(w):
-            # Map to world coordinates
-            px = (x / (w - 1)) * width_meters
-            py = (y / (h - 1)) * height_meters
-            pz = elevation[y, x]
-            bm.verts.new((px, py, pz))
-
-    bm.verts.ensure_lookup_table()
-
-    # Create faces (quads)
-    for y in range(h - 1):
-        for x in range(w - 1):
-            i = y * w + x
-            v1 = bm.verts[i]
-            v2 = bm.verts[i + 1]
-            v3 = bm.verts[i + w + 1]
-            v4 = bm.verts[i + w]
-            try:
-                bm.faces.new((v1, v2, v3, v4))
-            except ValueError:
-                # Face already exists or invalid
-                pass
-
-    # Create mesh object
-    mesh = bpy.data.meshes.new("Terrain")
-    bm.to_mesh(mesh)
-    bm.free()
-
-    obj = bpy.data.objects.new("Terrain", mesh)
-    bpy.context.collection.objects.link(obj)
-
-    return obj
+    return create_mesh_object("Terrain", grid_buffers(elevation, width_meters, height_meters))
 
 
 def create_building(
@@ -1380,18 +1950,41 @@ def main():
         argv = []
 
     parser = argparse.ArgumentParser(description="Blender tile renderer")
-    parser.add_argument("--data-dir", required=True, help="Directory with scene data")
-    parser.add_argument("--output", required=True, help="Output image path")
+    parser.add_argument("--data-dir", help="Directory with scene data")
+    parser.add_argument("--output", help="Output image path")
     parser.add_argument("--save-blend", help="Save .blend file to this path (optional)")
+    parser.add_argument(
+        "--server",
+        action="store_true",
+        help="Stay running and serve render jobs read as JSON lines from stdin",
+    )
 
     args = parser.parse_args(argv)
 
-    data_dir = Path(args.data_dir)
-    output_path = Path(args.output)
+    if args.server:
+        serve(sys.stdin, sys.stdout, render=_render_server_job)
+        return
 
-    # Load scene data
-    with open(data_dir / "scene.json") as f:
-        scene_data = json.load(f)
+    if not args.data_dir or not args.output:
+        parser.error("--data-dir and --output are required unless --server is given")
+
+    render_job(
+        Path(args.data_dir),
+        Path(args.output),
+        Path(args.save_blend) if args.save_blend else None,
+    )
+
+
+def render_job(data_dir: Path, output_path: Path, save_blend: Path = None) -> None:
+    """Build the scene exported to data_dir and render it.
+
+    Args:
+        data_dir: Directory containing scene.json and optional elevation.npy
+        output_path: Output image path
+        save_blend: Save the built scene as a .blend file (optional)
+    """
+    # Load scene data (scene.bin, or scene.json from older exporters)
+    scene_data = load_scene(data_dir)
 
     # Load elevation if available
     elevation_path = data_dir / "elevation.npy"
@@ -1444,13 +2037,85 @@ def main():
         )
 
     # Save .blend file if requested
-    if args.save_blend:
-        blend_path = Path(args.save_blend)
+    if save_blend:
+        blend_path = Path(save_blend)
         blend_path.parent.mkdir(parents=True, exist_ok=True)
         bpy.ops.wm.save_as_mainfile(filepath=str(blend_path))
         print(f"Saved Blender file: {blend_path}")
 
 
+def _render_server_job(data_dir: Path, output_path: Path) -> None:
+    """Render one server job starting from a freshly loaded startup file.
+
+    Modes change scene-wide settings (Freestyle, world, film transparency),
+    so the file is reset between jobs. The process itself, with Cycles
+    devices and compiled kernels, stays alive.
+    """
+    bpy.ops.wm.read_homefile()
+    render_job(data_dir, output_path)
+
+
+def _send_reply(replies, message: dict) -> None:
+    """Write one protocol reply line and flush it immediately."""
+    replies.write(SERVER_REPLY_PREFIX + json.dumps(message) + "\n")
+    replies.flush()
+
+
+def serve(requests, replies, render=render_job) -> int:
+    """Serve render jobs until end of input or a shutdown request.
+
+    Each request is one JSON line ``{"id": ..., "data_dir": ..., "output": ...}``;
+    ``{"command": "shutdown"}`` stops the loop. Each reply is one JSON line
+    prefixed with SERVER_REPLY_PREFIX so clients can pick it out of Blender's
+    own log output. A ``{"ready": true}`` reply is sent on startup.
+
+    Args:
+        requests: Text stream of request lines (stdin in Blender)
+        replies: Text stream for reply lines (stdout in Blender)
+        render: Callable(data_dir, output_path) that renders one job
+
+    Returns:
+        Number of jobs rendered successfully
+    """
+    _send_reply(replies, {"ready": True})
+
+    rendered = 0
+    for line in requests:
+        line = line.strip()
+        if not line:
+            continue
+
+        try:
+            job = json.loads(line)
+        except ValueError as e:
+            _send_reply(replies, {"id": None, "ok": False, "error": f"Invalid job: {e}"})
+            continue
+
+        if job.get("command") == "shutdown":
+            break
+
+        start = time.perf_counter()
+        try:
+            render(Path(job["data_dir"]), Path(job["output"]))
+        except Exception:
+            _send_reply(replies, {
+                "id": job.get("id"),
+                "ok": False,
+                "error": traceback.format_exc(),
+            })
+            continue
+
+        rendered += 1
+        _send_reply(replies, {
+            "id": job.get("id"),
+            "ok": True,
+            "output": job["output"],
+            "seconds": round(time.perf_counter() - start, 3),
+        })
+
+    return rendered
+
+
 def _render_shadow_mode(
     scene_data: dict,
     config: dict,
@@ -1477,33 +2142,12 @@ def _render_shadow_mode(
     # Create buildings
     buildings = scene_data.get("buildings", [])
     print(f"  Creating {len(buildings)} buildings...")
-    for i, b in enumerate(buildings):
-        building = create_building(
-            b["footprint"],
-            b["height"],
-            b.get("elevation", 0),
-            f"Building_{i}",
-        )
-        if building and building_mat:
-            if building.data.materials:
-                building.data.materials[0] = building_mat
-            else:
-                building.data.materials.append(building_mat)
+    create_building_layer(buildings, building_mat)
 
     # Create trees
     trees = scene_data.get("trees", [])
     print(f"  Creating {len(trees)} trees...")
-    for i, t in enumerate(trees):
-        crown, trunk = create_tree(
-            t["position"],
-            t["height"],
-            t.get("crown_radius", 3),
-            f"Tree_{i}",
-        )
-        if crown and building_mat:
-            crown.data.materials.append(building_mat)
-        if trunk and building_mat:
-            trunk.data.materials.append(building_mat)
+    create_tree_layer(trees, building_mat, building_mat)
 
     # Setup sun
     sun_data = scene_data.get("sun", {})
@@ -2169,59 +2813,24 @@ def _render_depth_mode(
     buildings = scene_data.get("buildings", [])
     print(f"  Creating {len(buildings)} buildings...")
 
-    for i, b in enumerate(buildings):
-        building = create_building(
-            b["footprint"],
-            b["height"],
-            b.get("elevation", 0),
-            f"Building_{i}",
-        )
-        if building and depth_mat:
-            if building.data.materials:
-                building.data.materials[0] = depth_mat
-            else:
-                building.data.materials.append(depth_mat)
+    create_building_layer(buildings, depth_mat)
 
     # Create trees with depth material
     trees = scene_data.get("trees", [])
     print(f"  Creating {len(trees)} trees...")
-    for i, t in enumerate(trees):
-        crown, trunk = create_tree(
-            t["position"],
-            t["height"],
-            t.get("crown_radius", 3),
-            f"Tree_{i}",
-        )
-        if crown and depth_mat:
-            crown.data.materials.append(depth_mat)
-        if trunk and depth_mat:
-            trunk.data.materials.append(depth_mat)
+    create_tree_layer(trees, depth_mat, depth_mat)
 
     # Create streets with depth material
     streets = scene_data.get("streets", [])
     if streets:
         print(f"  Creating {len(streets)} streets...")
-        for i, s in enumerate(streets):
-            street = create_street(
-                s["footprint"],
-                s.get("elevation", 0),
-                f"Street_{i}",
-            )
-            if street and depth_mat:
-                street.data.materials.append(depth_mat)
+        create_flat_layer(streets, STREET_Z_OFFSET, depth_mat, "Streets")
 
     # Create water bodies with depth material
     water_bodies = scene_data.get("water_bodies", [])
     if water_bodies:
         print(f"  Creating {len(water_bodies)} water bodies...")
-        for i, w in enumerate(water_bodies):
-            water = create_water_body(
-                w["footprint"],
-                w.get("elevation", 0),
-                f"Water_{i}",
-            )
-            if water and depth_mat:
-                water.data.materials.append(depth_mat)
+        create_flat_layer(water_bodies, WATER_Z_OFFSET, depth_mat, "Water")
 
     # No lighting needed - using emission shaders
 
@@ -2293,59 +2902,24 @@ def _render_normal_mode(
     buildings = scene_data.get("buildings", [])
     print(f"  Creating {len(buildings)} buildings...")
 
-    for i, b in enumerate(buildings):
-        building = create_building(
-            b["footprint"],
-            b["height"],
-            b.get("elevation", 0),
-            f"Building_{i}",
-        )
-        if building and normal_mat:
-            if building.data.materials:
-                building.data.materials[0] = normal_mat
-            else:
-                building.data.materials.append(normal_mat)
+    create_building_layer(buildings, normal_mat)
 
     # Create trees with normal material
     trees = scene_data.get("trees", [])
     print(f"  Creating {len(trees)} trees...")
-    for i, t in enumerate(trees):
-        crown, trunk = create_tree(
-            t["position"],
-            t["height"],
-            t.get("crown_radius", 3),
-            f"Tree_{i}",
-        )
-        if crown and normal_mat:
-            crown.data.materials.append(normal_mat)
-        if trunk and normal_mat:
-            trunk.data.materials.append(normal_mat)
+    create_tree_layer(trees, normal_mat, normal_mat)
 
     # Create streets with normal material
     streets = scene_data.get("streets", [])
     if streets:
         print(f"  Creating {len(streets)} streets...")
-        for i, s in enumerate(streets):
-            street = create_street(
-                s["footprint"],
-                s.get("elevation", 0),
-                f"Street_{i}",
-            )
-            if street and normal_mat:
-                street.data.materials.append(normal_mat)
+        create_flat_layer(streets, STREET_Z_OFFSET, normal_mat, "Streets")
 
     # Create water bodies with normal material
     water_bodies = scene_data.get("water_bodies", [])
     if water_bodies:
         print(f"  Creating {len(water_bodies)} water bodies...")
-        for i, w in enumerate(water_bodies):
-            water = create_water_body(
-                w["footprint"],
-                w.get("elevation", 0),
-                f"Water_{i}",
-            )
-            if water and normal_mat:
-                water.data.materials.append(normal_mat)
+        create_flat_layer(water_bodies, WATER_Z_OFFSET, normal_mat, "Water")
 
     # No lighting needed - using emission shaders
 
@@ -2428,59 +3002,24 @@ def _render_edge_mode(
         output = nodes.new("ShaderNodeOutputMaterial")
         edge_mat.node_tree.links.new(emission.outputs["Emission"], output.inputs["Surface"])
 
-    for i, b in enumerate(buildings):
-        building = create_building(
-            b["footprint"],
-            b["height"],
-            b.get("elevation", 0),
-            f"Building_{i}",
-        )
-        if building and edge_mat:
-            if building.data.materials:
-                building.data.materials[0] = edge_mat
-            else:
-                building.data.materials.append(edge_mat)
+    create_building_layer(buildings, edge_mat)
 
     # Create trees with white material
     trees = scene_data.get("trees", [])
     print(f"  Creating {len(trees)} trees...")
-    for i, t in enumerate(trees):
-        crown, trunk = create_tree(
-            t["position"],
-            t["height"],
-            t.get("crown_radius", 3),
-            f"Tree_{i}",
-        )
-        if crown and edge_mat:
-            crown.data.materials.append(edge_mat)
-        if trunk and edge_mat:
-            trunk.data.materials.append(edge_mat)
+    create_tree_layer(trees, edge_mat, edge_mat)
 
     # Create streets with edge material (will show street edges in Freestyle)
     streets = scene_data.get("streets", [])
     if streets:
         print(f"  Creating {len(streets)} streets...")
-        for i, s in enumerate(streets):
-            street = create_street(
-                s["footprint"],
-                s.get("elevation", 0),
-                f"Street_{i}",
-            )
-            if street and edge_mat:
-                street.data.materials.append(edge_mat)
+        create_flat_layer(streets, STREET_Z_OFFSET, edge_mat, "Streets")
 
     # Create water bodies with edge material
     water_bodies = scene_data.get("water_bodies", [])
     if water_bodies:
         print(f"  Creating {len(water_bodies)} water bodies...")
-        for i, w in enumerate(water_bodies):
-            water = create_water_body(
-                w["footprint"],
-                w.get("elevation", 0),
-                f"Water_{i}",
-            )
-            if water and edge_mat:
-                water.data.materials.append(edge_mat)
+        create_flat_layer(water_bodies, WATER_Z_OFFSET, edge_mat, "Water")
 
     # No sun needed - using emission materials and Freestyle
 
@@ -2753,31 +3292,15 @@ def _render_semantic_mode(
     # Create trees - NO TRUNKS for semantic mode (causes black dots from top-down view)
     trees = scene_data.get("trees", [])
     print(f"  Creating {len(trees)} trees (no trunks)...")
-    for i, t in enumerate(trees):
-        crown, trunk = create_tree(
-            t["position"],
-            t["height"],
-            t.get("crown_radius", 3),
-            f"Tree_{i}",
-        )
-        if crown and tree_mat:
-            crown.data.materials.append(tree_mat)
-        # DELETE trunk - it shows through cone in top-down view causing black dots
-        if trunk and bpy is not None:
-            bpy.data.objects.remove(trunk, do_unlink=True)
+    if trees:
+        crowns, _trunks = tree_buffers(trees)
+        create_mesh_object("Tree_Crowns", crowns, tree_mat)
 
     # Create streets
     streets = scene_data.get("streets", [])
     if streets:
         print(f"  Creating {len(streets)} streets...")
-        for i, s in enumerate(streets):
-            street = create_street(
-                s["footprint"],
-                s.get("elevation", 0),
-                f"Street_{i}",
-            )
-            if street and street_mat:
-                street.data.materials.append(street_mat)
+        create_flat_layer(streets, STREET_Z_OFFSET, street_mat, "Streets")
 
     # Create water bodies
     water_bodies = scene_data.get("water_bodies", [])
@@ -0,0 +1,401 @@
+"""
+Persistent Blender render servers.
+
+Starting Blender costs seconds per tile: the binary loads, the Cycles add-on
+registers, and GPU devices and kernels are initialized before the first
+sample is traced. A server keeps one ``blender_scene.py --server`` process
+alive and feeds it tile jobs over its stdin/stdout pipes, so that cost is
+paid once per process instead of once per tile.
+
+Protocol (one JSON object per line, see blender_scene.serve):
+    request: {"id": 3, "data_dir": "/tmp/x", "output": "/tmp/x/render.png"}
+    reply:   @@tile-server@@ {"id": 3, "ok": true, "output": "...", "seconds": 1.2}
+
+Replies carry the output path, not the image: Blender writes render results
+(and render_meta.json) to files, and the job's temp directory is already
+local to the client, so encoding the PNG into the pipe would only add a copy.
+
+Usage:
+    from .blender_server import BlenderServerPool
+
+    with BlenderServerPool(size=2) as pool:
+        renderer = BlenderTileRenderer(server_pool=pool)
+        image = renderer.render(...)
+
+    # Without Blender (tests): serve jobs with a Python callable in-process
+    pool = BlenderServerPool(size=2, factory=lambda: BlenderServer.in_process(fake_render))
+"""
+
+import json
+import os
+import queue
+import subprocess
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Callable, List, Optional
+
+from .blender_scene import SERVER_REPLY_PREFIX, serve
+
+# Lines of Blender log output kept for error messages
+LOG_TAIL_LINES = 200
+
+
+class BlenderServer:
+    """Client for one long-running render server.
+
+    The server may be a Blender subprocess (``launch``) or a thread running
+    the same serve loop with a Python render function (``in_process``).
+    Jobs are sent one at a time; ``render`` blocks until the reply arrives.
+    """
+
+    def __init__(
+        self,
+        requests,
+        replies,
+        process: Optional[subprocess.Popen] = None,
+        thread: Optional[threading.Thread] = None,
+        timeout: float = 300.0,
+    ):
+        """Wrap the request/reply streams of a running server.
+
+        Args:
+            requests: Writable text stream connected to the server's input
+            replies: Readable text stream connected to the server's output
+            process: Blender subprocess, if the server is external
+            thread: Serving thread, if the server runs in-process
+            timeout: Seconds to wait for startup and for each job
+        """
+        self._requests = requests
+        self._process = process
+        self._thread = thread
+        self.timeout = timeout
+
+        self._lock = threading.Lock()
+        self._replies: "queue.Queue[Optional[dict]]" = queue.Queue()
+        self._log: deque = deque(maxlen=LOG_TAIL_LINES)
+        self._next_id = 0
+        self._closed = False
+
+        self._reader = threading.Thread(
+            target=self._read_replies, args=(replies,), daemon=True
+        )
+        self._reader.start()
+
+        ready = self._wait_reply()
+        if not ready.get("ready"):
+            raise RuntimeError(f"Unexpected server greeting: {ready}")
+
+    @classmethod
+    def launch(
+        cls,
+        blender_path: str,
+        script_path: Optional[Path] = None,
+        timeout: float = 300.0,
+    ) -> "BlenderServer":
+        """Start a Blender process in server mode.
+
+        Args:
+            blender_path: Path to Blender executable
+            script_path: Scene script (defaults to blender_scene.py next to this file)
+            timeout: Seconds to wait for startup and for each job
+
+        Returns:
+            Connected server client
+        """
+        script_path = script_path or Path(__file__).parent / "blender_scene.py"
+        if not script_path.exists():
+            raise FileNotFoundError(f"Blender scene script not found: {script_path}")
+
+        process = subprocess.Popen(
+            [
+                blender_path,
+                "--background",
+                "--python",
+                str(script_path),
+                "--",
+                "--server",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+            bufsize=1,
+        )
+        try:
+            return cls(process.stdin, process.stdout, process=process, timeout=timeout)
+        except Exception:
+            process.kill()
+            process.wait()
+            raise
+
+    @classmethod
+    def in_process(
+        cls,
+        render: Callable[[Path, Path], None],
+        timeout: float = 300.0,
+    ) -> "BlenderServer":
+        """Run the server loop in a thread with a Python render function.
+
+        Speaks the same protocol over OS pipes as a Blender subprocess, so
+        the client and pool can be exercised without Blender installed.
+
+        Args:
+            render: Callable(data_dir, output_path) standing in for Blender
+            timeout: Seconds to wait for startup and for each job
+
+        Returns:
+            Connected server client
+        """
+        request_read, request_write = os.pipe()
+        reply_read, reply_write = os.pipe()
+
+        server_in = os.fdopen(request_read, "r")
+        server_out = os.fdopen(reply_write, "w")
+
+        def run():
+            with server_in, server_out:
+                serve(server_in, server_out, render=render)
+
+        thread = threading.Thread(target=run, daemon=True)
+        thread.start()
+
+        return cls(
+            os.fdopen(request_write, "w"),
+            os.fdopen(reply_read, "r"),
+            thread=thread,
+            timeout=timeout,
+        )
+
+    def _read_replies(self, replies) -> None:
+        """Forward protocol replies to the queue and keep the log tail."""
+        with replies:
+            for line in replies:
+                marker = line.find(SERVER_REPLY_PREFIX)
+                if marker < 0:
+                    self._log.append(line.rstrip())
+                    continue
+                payload = line[marker + len(SERVER_REPLY_PREFIX):]
+                try:
+                    self._replies.put(json.loads(payload))
+                except ValueError:
+                    self._log.append(line.rstrip())
+        self._replies.put(None)  # End of output: server exited
+
+    def _wait_reply(self) -> dict:
+        """Block for the next reply, failing on timeout or server exit."""
+        try:
+            reply = self._replies.get(timeout=self.timeout)
+        except queue.Empty:
+            self.close(kill=True)
+            raise RuntimeError(
+                f"Blender server timed out after {self.timeout:.0f}s:\n{self.log_tail()}"
+            )
+        if reply is None:
+            self._closed = True
+            raise RuntimeError(f"Blender server exited:\n{self.log_tail()}")
+        return reply
+
+    def log_tail(self) -> str:
+        """Recent non-protocol output from the server."""
+        return "\n".join(self._log)
+
+    @property
+    def alive(self) -> bool:
+        """Whether the server can still accept jobs."""
+        if self._closed:
+            return False
+        if self._process is not None:
+            return self._process.poll() is None
+        if self._thread is not None:
+            return self._thread.is_alive()
+        return True
+
+    def render(self, data_dir: Path, output_path: Path) -> Path:
+        """Render the scene exported to data_dir.
+
+        Args:
+            data_dir: Directory with scene.json and elevation.npy
+            output_path: Where the server writes the rendered image
+
+        Returns:
+            Path of the rendered image
+        """
+        with self._lock:
+            if not self.alive:
+                raise RuntimeError("Blender server is not running")
+
+            self._next_id += 1
+            job_id = self._next_id
+            job = {"id": job_id, "data_dir": str(data_dir), "output": str(output_path)}
+            try:
+                self._requests.write(json.dumps(job) + "\n")
+                self._requests.flush()
+            except (BrokenPipeError, OSError, ValueError) as e:
+                self._closed = True
+                raise RuntimeError(f"Blender server connection lost: {e}") from e
+
+            reply = self._wait_reply()
+
+        if reply.get("id") != job_id:
+            raise RuntimeError(f"Blender server replied to job {reply.get('id')}, expected {job_id}")
+        if not reply.get("ok"):
+            raise RuntimeError(f"Blender render failed:\n{reply.get('error', '')}")
+        return Path(reply["output"])
+
+    def close(self, kill: bool = False) -> None:
+        """Stop the server.
+
+        Args:
+            kill: Terminate the process instead of asking it to shut down
+        """
+        if not self._closed and not kill:
+            try:
+                self._requests.write(json.dumps({"command": "shutdown"}) + "\n")
+                self._requests.flush()
+            except (BrokenPipeError, OSError, ValueError):
+                pass
+        self._closed = True
+
+        try:
+            self._requests.close()
+        except (BrokenPipeError, OSError):
+            pass
+
+        if self._process is not None:
+            if kill:
+                self._process.kill()
+            try:
+                self._process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self._process.kill()
+                self._process.wait()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+
+
+class BlenderServerPool:
+    """A fixed-size pool of render servers shared by renderer threads.
+
+    Servers start lazily on first demand. A job waits for an idle server,
+    and a server that dies is dropped and replaced on the next job.
+
+    Example:
+        with BlenderServerPool(size=2) as pool:
+            shadow_renderer = BlenderShadowRenderer(server_pool=pool)
+            color_renderer = BlenderTileRenderer(server_pool=pool)
+    """
+
+    def __init__(
+        self,
+        size: int = 1,
+        blender_path: Optional[str] = None,
+        factory: Optional[Callable[[], BlenderServer]] = None,
+        timeout: float = 300.0,
+    ):
+        """Initialize the pool.
+
+        Args:
+            size: Maximum number of concurrent servers
+            blender_path: Path to Blender executable. If None, searches PATH.
+            factory: Callable returning a new BlenderServer (overrides blender_path)
+            timeout: Seconds to wait for startup and for each job
+        """
+        if size < 1:
+            raise ValueError(f"Pool size must be at least 1, got {size}")
+
+        if factory is None:
+            if blender_path is None:
+                from .blender_shadows import BlenderShadowRenderer
+
+                blender_path = BlenderShadowRenderer().blender_path
+
+            def factory() -> BlenderServer:
+                return BlenderServer.launch(blender_path, timeout=timeout)
+
+        self.size = size
+        self._factory = factory
+        self._idle: "queue.LifoQueue[BlenderServer]" = queue.LifoQueue()
+        self._servers: List[BlenderServer] = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def _acquire(self) -> BlenderServer:
+        """Take an idle server, starting one if the pool has room."""
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+
+            with self._lock:
+                if self._closed:
+                    raise RuntimeError("Blender server pool is closed")
+                if len(self._servers) < self.size:
+                    # Reserve the slot before the slow startup
+                    self._servers.append(None)
+                    break
+
+            # All servers busy; poll so a slot freed by a dead server is noticed
+            try:
+                return self._idle.get(timeout=0.1)
+            except queue.Empty:
+                continue
+
+        try:
+            server = self._factory()
+        except Exception:
+            with self._lock:
+                self._servers.remove(None)
+            raise
+
+        with self._lock:
+            self._servers[self._servers.index(None)] = server
+        return server
+
+    def _release(self, server: BlenderServer) -> None:
+        """Return a server to the pool, or drop it if it died."""
+        if server.alive and not self._closed:
+            self._idle.put(server)
+            return
+        with self._lock:
+            if server in self._servers:
+                self._servers.remove(server)
+        server.close(kill=True)
+
+    def render(self, data_dir: Path, output_path: Path) -> Path:
+        """Render one job on the next idle server.
+
+        Args:
+            data_dir: Directory with scene.json and elevation.npy
+            output_path: Where the server writes the rendered image
+
+        Returns:
+            Path of the rendered image
+        """
+        server = self._acquire()
+        try:
+            return server.render(data_dir, output_path)
+        finally:
+            self._release(server)
+
+    @property
+    def running(self) -> int:
+        """Number of servers currently started."""
+        with self._lock:
+            return sum(1 for server in self._servers if server is not None)
+
+    def close(self) -> None:
+        """Shut down all servers."""
+        with self._lock:
+            self._closed = True
+            servers = [server for server in self._servers if server is not None]
+            self._servers = []
+        for server in servers:
+            server.close()
+
+    def __enter__(self) -> "BlenderServerPool":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
@@ -6,6 +6,7 @@ Can run headlessly without GUI.
 
 This module provides GPU-accelerated ray-traced shadow rendering by:
 1. Exporting tile data (buildings, trees, elevation) to temporary files
+   (packed binary geometry in scene.bin, elevation.npy)
 2. Running Blender headlessly with a Python script
 3. Reading the rendered shadow buffer back
 
@@ -20,19 +21,22 @@ Usage:
         --data-dir /tmp/tile_data --output shadow.png
 """
 
-import json
 import shutil
 import subprocess
 import tempfile
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Callable, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, List, Optional, Tuple
 
 import numpy as np
 from numpy.typing import NDArray
 
+from .blender_scene import SceneLayerBuilder, write_scene
 from .sources.vector import Feature
 
+if TYPE_CHECKING:
+    from .blender_server import BlenderServerPool
+
 
 @dataclass
 class SunPosition:
@@ -126,6 +130,26 @@ class SceneBounds:
         y = (lat - self.south) * self.meters_per_deg_y
         return (x, y)
 
+    def wgs84_to_local_array(
+        self, lons: NDArray[np.float64], lats: NDArray[np.float64]
+    ) -> NDArray[np.float64]:
+        """Vectorized wgs84_to_local.
+
+        Args:
+            lons: Longitudes (N,)
+            lats: Latitudes (N,)
+
+        Returns:
+            Array (N, 2) of local [x, y] meters from the SW corner
+        """
+        return np.stack(
+            [
+                (np.asarray(lons) - self.west) * self.meters_per_deg_x,
+                (np.asarray(lats) - self.south) * self.meters_per_deg_y,
+            ],
+            axis=-1,
+        )
+
 
 class BlenderShadowRenderer:
     """Renders shadow buffers using Blender's Cycles engine.
@@ -152,14 +176,20 @@ class BlenderShadowRenderer:
         self,
         blender_path: Optional[str] = None,
         config: Optional[BlenderConfig] = None,
+        server_pool: Optional["BlenderServerPool"] = None,
     ):
         """Initialize Blender shadow renderer.
 
         Args:
             blender_path: Path to Blender executable. If None, searches PATH.
             config: Render configuration.
+            server_pool: Persistent Blender servers to render on. If None,
+                each render starts a new Blender process.
         """
-        self.blender_path = blender_path or self._find_blender()
+        self.server_pool = server_pool
+        self.blender_path = blender_path
+        if self.blender_path is None and server_pool is None:
+            self.blender_path = self._find_blender()
         self.config = config or BlenderConfig()
 
     def _find_blender(self) -> str:
@@ -224,18 +254,50 @@ class BlenderShadowRenderer:
             )
             report("export", 1.0)
 
-            # Step 2: Run Blender
+            # Step 2: Run Blender and load the result
             report("render", 0.0)
-            output_path = tmpdir / "shadow.png"
-            self._run_blender(tmpdir, output_path)
-            report("render", 0.9)
-
-            # Step 3: Load result
-            shadow_buffer = self._load_shadow_buffer(output_path)
+            shadow_buffer = self.render_exported(tmpdir)
             report("render", 1.0)
 
             return shadow_buffer
 
+    def export_scene(
+        self,
+        data_dir: Path,
+        buildings: List[Feature],
+        trees: List[Feature],
+        elevation: Optional[NDArray[np.float32]],
+        bounds: Tuple[float, float, float, float],
+        sun: SunPosition,
+    ) -> None:
+        """Write a tile's scene to data_dir for a later render_exported().
+
+        Args:
+            data_dir: Existing directory to write the scene into
+            buildings: Building features with footprints and heights
+            trees: Tree features with positions and heights
+            elevation: Elevation heightmap (H, W) in meters, or None for flat
+            bounds: (west, south, east, north) in WGS84
+            sun: Sun position for shadow direction
+        """
+        self._export_scene_data(data_dir, buildings, trees, elevation, bounds, sun)
+
+    def render_exported(self, data_dir: Path) -> NDArray[np.float32]:
+        """Render a scene previously written by export_scene().
+
+        Splitting export from rendering lets batch jobs export the next
+        tile while Blender is still busy with the current one.
+
+        Args:
+            data_dir: Directory holding the exported scene
+
+        Returns:
+            Shadow buffer (H, W) float32, as returned by render()
+        """
+        output_path = data_dir / "shadow.png"
+        self._run_blender(data_dir, output_path)
+        return self._load_shadow_buffer(output_path)
+
     def _export_scene_data(
         self,
         tmpdir: Path,
@@ -248,8 +310,10 @@ class BlenderShadowRenderer:
         """Export all scene data to temporary directory."""
         scene_bounds = SceneBounds(*bounds)
 
-        # Convert buildings to simple format
-        building_data = []
+        # Pack buildings as outer rings plus per-building columns
+        building_layer = SceneLayerBuilder(
+            "rings", "footprint", numeric=("height", "elevation")
+        )
         for feature in buildings:
             if feature.geometry_type not in ("Polygon", "MultiPolygon"):
                 continue
@@ -266,42 +330,26 @@ class BlenderShadowRenderer:
                 if len(polygon) == 0 or len(polygon[0]) < 3:
                     continue
 
-                # Convert outer ring to local coordinates
-                footprint = [
-                    list(scene_bounds.wgs84_to_local(lon, lat))
-                    for lon, lat in polygon[0]
-                ]
-
-                building_data.append(
-                    {
-                        "footprint": footprint,
-                        "height": height,
-                        "elevation": base_z,
-                    }
-                )
-
-        # Convert trees to simple format
-        tree_data = []
+                building_layer.add(polygon[0], height=height, elevation=base_z)
+
+        # Pack trees as [lon, lat, base_z] points
+        tree_layer = SceneLayerBuilder(
+            "points", "position", numeric=("height", "crown_radius")
+        )
         for feature in trees:
             if feature.geometry_type != "Point":
                 continue
 
             lon, lat = feature.coordinates
-            x, y = scene_bounds.wgs84_to_local(lon, lat)
-
             height = feature.height if feature.height > 0 else 8.0
             crown_diam = feature.properties.get("crown_diameter", 6.0)
             base_z = feature.properties.get("elevation", 0)
 
-            tree_data.append(
-                {
-                    "position": [x, y, base_z],
-                    "height": height,
-                    "crown_radius": crown_diam / 2,
-                }
+            tree_layer.add(
+                (lon, lat, base_z), height=height, crown_radius=crown_diam / 2
             )
 
-        # Save scene.json
+        # Save scene.bin
         scene_data = {
             "bounds": bounds,
             "bounds_meters": {
@@ -322,12 +370,16 @@ class BlenderShadowRenderer:
                 "tile_size": self.config.tile_size,
                 "soft_shadows": self.config.soft_shadows,
             },
-            "buildings": building_data,
-            "trees": tree_data,
         }
-
-        with open(tmpdir / "scene.json", "w") as f:
-            json.dump(scene_data, f)
+        to_local = scene_bounds.wgs84_to_local_array
+        write_scene(
+            tmpdir,
+            scene_data,
+            {
+                "buildings": building_layer.pack("buildings", to_local),
+                "trees": tree_layer.pack("trees", to_local),
+            },
+        )
 
         # Save elevation
         if elevation is not None and elevation.size > 0:
@@ -342,6 +394,10 @@ class BlenderShadowRenderer:
 
     def _run_blender(self, data_dir: Path, output_path: Path) -> None:
         """Run Blender headlessly to render shadows."""
+        if self.server_pool is not None:
+            self.server_pool.render(data_dir, output_path)
+            return
+
         script_path = Path(__file__).parent / "blender_scene.py"
 
         if not script_path.exists():
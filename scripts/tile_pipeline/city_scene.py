@@ -0,0 +1,549 @@
+"""
+City-wide shadow scene with a persistent bounding volume hierarchy.
+
+Per-tile ray tracing rebuilds the same buildings for every tile (each tile
+scene carries a 200 m shadow buffer), and every point query builds its own
+local scene. A city scene is built once instead: all buildings, trees and
+optional LOD2 meshes as one triangle soup in a common metric frame (Web
+Mercator meters from the south-west corner of the city bounds), plus a
+packed BVH over the triangles. Both are saved as .npy files and loaded
+with mmap, so every worker process shares one copy:
+
+    triangles.npy          float32 (T, 3, 3)  triangle corners
+    bvh_order.npy          int64 (T,)         triangle ids in Hilbert order (the leaves)
+    bvh_bounds.npy         float32 (N, 6)     node boxes, leaves first, root last
+    bvh_level_offsets.npy  int64 (L + 1)      start of each level in bvh_bounds
+    meta.json              version, bounds and the source files it was built from
+
+The BVH is packed like sources.spatial_index.PackedIndex (Hilbert sort,
+fixed-size nodes built bottom-up) but over 3D boxes. Rays walk it level by
+level with vectorized slab tests on (ray, node) pairs and finish with a
+vectorized Möller–Trumbore test on (ray, triangle) pairs.
+
+Tile renders and point queries keep casting rays in their own local frame;
+CityScene.intersector(bounds) shifts ray origins by the frame's offset from
+the city origin, so nothing is assembled per tile.
+
+The scene holds no terrain mesh (a city-wide DEM would dwarf the buildings).
+Ray origins are still placed on each tile's elevation grid, so building and
+tree shadows fall on slopes correctly, but terrain does not shadow itself:
+a ridge does not darken the valley behind it as it does with a per-tile
+mesh that includes the DEM. Hillshade covers slopes facing away from the sun.
+
+Example:
+    build_city_scene(buildings_path, trees_path)
+    scene = open_city_scene(DEFAULT_CITY_SCENE_DIR, buildings_path, trees_path)
+    raytracer = TileRaytracer(scene, tile_bounds, config)
+"""
+
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .config import DEFAULT_CACHE_DIR
+from .scene_builder import SceneBounds, SceneBuilder
+from .sources.spatial_index import DEFAULT_NODE_SIZE, HILBERT_BITS, _expand_children, hilbert_index
+from .sources.feature_store import DEFAULT_STORE_DIR
+from .sources.vector import VectorSource
+from .tile_renderer import BUILDING_MIN_HEIGHT, TREE_MIN_HEIGHT
+
+
+CITY_SCENE_VERSION = 1
+
+# Default location (alongside the feature stores, not in public/)
+DEFAULT_CITY_SCENE_DIR = DEFAULT_CACHE_DIR.parent / "city-scene"
+
+# Rays per BVH walk (bounds the size of the (ray, node) pair arrays)
+DEFAULT_RAY_BATCH = 1024
+
+# Hits closer than this along a ray count as self-intersection
+HIT_EPSILON = 1e-6
+
+_ARRAY_NAMES = ("triangles", "bvh_order", "bvh_bounds", "bvh_level_offsets")
+
+
+def _ray_hits_boxes(
+    boxes: NDArray[np.float64],
+    origins: NDArray[np.float64],
+    inv_directions: NDArray[np.float64],
+) -> NDArray[np.bool_]:
+    """Row-wise slab test of rays (t >= 0) against (min xyz, max xyz) boxes."""
+    t1 = (boxes[:, :3] - origins) * inv_directions
+    t2 = (boxes[:, 3:] - origins) * inv_directions
+    t_near = np.minimum(t1, t2).max(axis=1)
+    t_far = np.maximum(t1, t2).min(axis=1)
+    return t_far >= np.maximum(t_near, 0.0)
+
+
+def ray_triangle_hits(
+    origins: NDArray[np.float64],
+    directions: NDArray[np.float64],
+    triangles: NDArray[np.float64],
+) -> NDArray[np.bool_]:
+    """Row-wise Möller–Trumbore test (two-sided, hits in front of the origin).
+
+    Args:
+        origins: (P, 3) ray origins
+        directions: (P, 3) ray directions
+        triangles: (P, 3, 3) triangle corners
+
+    Returns:
+        (P,) True where ray i hits triangle i
+    """
+    v0 = triangles[:, 0]
+    e1 = triangles[:, 1] - v0
+    e2 = triangles[:, 2] - v0
+
+    p = np.cross(directions, e2)
+    det = np.einsum("ij,ij->i", e1, p)
+    valid = np.abs(det) > 1e-12
+    inv_det = np.divide(1.0, det, out=np.zeros_like(det), where=valid)
+
+    s = origins - v0
+    u = np.einsum("ij,ij->i", s, p) * inv_det
+    q = np.cross(s, e1)
+    v = np.einsum("ij,ij->i", directions, q) * inv_det
+    t = np.einsum("ij,ij->i", e2, q) * inv_det
+
+    return valid & (u >= 0) & (v >= 0) & (u + v <= 1) & (t > HIT_EPSILON)
+
+
+class PackedBVH:
+    """Static packed bounding volume hierarchy over 3D boxes."""
+
+    def __init__(
+        self,
+        order: NDArray[np.int64],
+        level_bounds: NDArray[np.float32],
+        level_offsets: NDArray[np.int64],
+        node_size: int = DEFAULT_NODE_SIZE,
+    ):
+        """Wrap prebuilt BVH arrays (use build() or CityScene.load()).
+
+        Args:
+            order: Primitive ids in Hilbert order (the leaf level)
+            level_bounds: (min xyz, max xyz) boxes of all levels, leaves first
+            level_offsets: Start of each level in level_bounds, plus the end
+            node_size: Children per node
+        """
+        self.order = order
+        self.level_bounds = level_bounds
+        self.level_offsets = level_offsets
+        self.node_size = node_size
+
+    @classmethod
+    def build(
+        cls,
+        boxes: NDArray[np.float64],
+        node_size: int = DEFAULT_NODE_SIZE,
+    ) -> "PackedBVH":
+        """Bulk-build a BVH from an (N, 6) array of primitive boxes.
+
+        Primitives are sorted along a Hilbert curve of their xy centers
+        (cities are flat, so 2D locality is what matters).
+        """
+        boxes = np.asarray(boxes, dtype=np.float32).reshape(-1, 6)
+        n = len(boxes)
+
+        if n == 0:
+            return cls(
+                np.zeros(0, dtype=np.int64),
+                np.zeros((0, 6), dtype=np.float32),
+                np.zeros(1, dtype=np.int64),
+                node_size,
+            )
+
+        cx = (boxes[:, 0].astype(np.float64) + boxes[:, 3]) / 2
+        cy = (boxes[:, 1].astype(np.float64) + boxes[:, 4]) / 2
+        grid_max = (1 << HILBERT_BITS) - 1
+        gx = (cx - cx.min()) / max(cx.max() - cx.min(), 1e-12) * grid_max
+        gy = (cy - cy.min()) / max(cy.max() - cy.min(), 1e-12) * grid_max
+        keys = hilbert_index(gx.astype(np.uint32), gy.astype(np.uint32))
+        order = np.argsort(keys, kind="stable").astype(np.int64)
+
+        levels = [boxes[order]]
+        while len(levels[-1]) > 1:
+            level = levels[-1]
+            starts = np.arange(0, len(level), node_size)
+            parent = np.empty((len(starts), 6), dtype=np.float32)
+            parent[:, :3] = np.minimum.reduceat(level[:, :3], starts, axis=0)
+            parent[:, 3:] = np.maximum.reduceat(level[:, 3:], starts, axis=0)
+            levels.append(parent)
+
+        level_offsets = np.cumsum([0] + [len(level) for level in levels]).astype(np.int64)
+        return cls(order, np.concatenate(levels), level_offsets, node_size)
+
+    def _level(self, level: int) -> NDArray[np.float32]:
+        return self.level_bounds[self.level_offsets[level]:self.level_offsets[level + 1]]
+
+    def candidates(
+        self,
+        origins: NDArray[np.float64],
+        inv_directions: NDArray[np.float64],
+    ) -> Tuple[NDArray[np.int64], NDArray[np.int64]]:
+        """(ray, primitive) pairs whose leaf boxes the rays pass through.
+
+        Args:
+            origins: (R, 3) ray origins
+            inv_directions: (R, 3) reciprocal ray directions
+
+        Returns:
+            Tuple of (ray indices, primitive ids), one entry per pair
+        """
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+        n_levels = len(self.level_offsets) - 1
+        if n_levels == 0 or len(origins) == 0:
+            return empty
+
+        # Start with every (ray, root-level node) pair
+        top = self._level(n_levels - 1)
+        ray_ids = np.repeat(np.arange(len(origins)), len(top))
+        nodes = np.tile(np.arange(len(top)), len(origins))
+
+        for level in range(n_levels - 1, -1, -1):
+            boxes = np.asarray(self._level(level)[nodes], dtype=np.float64)
+            hit = _ray_hits_boxes(boxes, origins[ray_ids], inv_directions[ray_ids])
+            ray_ids, nodes = ray_ids[hit], nodes[hit]
+            if level == 0 or len(nodes) == 0:
+                break
+            nodes, counts = _expand_children(
+                nodes, self.node_size, self.level_offsets[level] - self.level_offsets[level - 1]
+            )
+            ray_ids = np.repeat(ray_ids, counts)
+
+        if len(nodes) == 0 or level != 0:
+            return empty
+        return ray_ids, np.asarray(self.order[nodes], dtype=np.int64)
+
+    def query(self, bounds: Tuple[float, float, float, float]) -> NDArray[np.int64]:
+        """Find ids of primitives whose boxes overlap an xy rectangle.
+
+        Args:
+            bounds: (min_x, min_y, max_x, max_y) in the BVH's frame
+
+        Returns:
+            Primitive ids in ascending order
+        """
+        n_levels = len(self.level_offsets) - 1
+        if n_levels == 0:
+            return np.zeros(0, dtype=np.int64)
+
+        min_x, min_y, max_x, max_y = bounds
+        nodes = np.arange(len(self._level(n_levels - 1)))
+        for level in range(n_levels - 1, -1, -1):
+            boxes = self._level(level)[nodes]
+            hit = (
+                (boxes[:, 3] >= min_x) & (boxes[:, 0] <= max_x) &
+                (boxes[:, 4] >= min_y) & (boxes[:, 1] <= max_y)
+            )
+            nodes = nodes[hit]
+            if level == 0 or len(nodes) == 0:
+                break
+            nodes, _ = _expand_children(
+                nodes, self.node_size, self.level_offsets[level] - self.level_offsets[level - 1]
+            )
+
+        if len(nodes) == 0 or level != 0:
+            return np.zeros(0, dtype=np.int64)
+        return np.sort(np.asarray(self.order[nodes], dtype=np.int64))
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+
+class CityScene:
+    """Triangles of a whole city plus their BVH, in one metric frame."""
+
+    def __init__(
+        self,
+        triangles: NDArray[np.float32],
+        bvh: PackedBVH,
+        bounds: Tuple[float, float, float, float],
+        meta: Optional[dict[str, Any]] = None,
+    ):
+        """Wrap scene arrays (use from_mesh(), load() or build_city_scene()).
+
+        Args:
+            triangles: (T, 3, 3) triangle corners in the city frame
+            bvh: BVH over the triangles
+            bounds: (west, south, east, north) city bounds in WGS84; the
+                frame origin is their south-west corner in Web Mercator
+            meta: Build metadata (saved as meta.json)
+        """
+        self.triangles = triangles
+        self.bvh = bvh
+        self.bounds = SceneBounds(*bounds)
+        self.meta = meta or {}
+
+    @classmethod
+    def from_mesh(
+        cls,
+        mesh,
+        bounds: Tuple[float, float, float, float],
+        node_size: int = DEFAULT_NODE_SIZE,
+    ) -> "CityScene":
+        """Build a scene from a mesh in the local frame of bounds.
+
+        Args:
+            mesh: trimesh.Trimesh, e.g. from SceneBuilder(bounds).build()
+            bounds: (west, south, east, north) the mesh was built for
+            node_size: BVH children per node
+        """
+        triangles = np.asarray(mesh.vertices, dtype=np.float32)[np.asarray(mesh.faces)]
+        boxes = np.concatenate([triangles.min(axis=1), triangles.max(axis=1)], axis=1)
+        return cls(triangles, PackedBVH.build(boxes, node_size), bounds)
+
+    def offset(self, bounds: SceneBounds) -> NDArray[np.float64]:
+        """Shift from a local frame (SceneBounds of a tile or area) to the city frame."""
+        return np.array([
+            bounds.sw_mercator[0] - self.bounds.sw_mercator[0],
+            bounds.sw_mercator[1] - self.bounds.sw_mercator[1],
+            0.0,
+        ])
+
+    def intersector(self, bounds: SceneBounds) -> "CitySceneIntersector":
+        """Ray intersector taking ray origins in the local frame of bounds."""
+        return CitySceneIntersector(self, bounds)
+
+    def covers(self, bounds: Tuple[float, float, float, float]) -> bool:
+        """Whether the scene holds all geometry inside WGS84 bounds.
+
+        A scene built from the full extent of its sources covers any area;
+        one built for an area covers bounds inside that area.
+        """
+        if self.meta.get("complete"):
+            return True
+        west, south, east, north = bounds
+        return (
+            west >= self.bounds.west and south >= self.bounds.south and
+            east <= self.bounds.east and north <= self.bounds.north
+        )
+
+    def intersects_any(
+        self,
+        origins: NDArray[np.float64],
+        directions: NDArray[np.float64],
+        ray_batch: int = DEFAULT_RAY_BATCH,
+    ) -> NDArray[np.bool_]:
+        """Check which rays hit any triangle.
+
+        Args:
+            origins: (N, 3) ray origins in the city frame
+            directions: (N, 3) ray directions, or one (3,) direction for all
+            ray_batch: Rays per BVH walk (memory control)
+
+        Returns:
+            (N,) True where the ray hits the scene
+        """
+        origins = np.asarray(origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(directions, dtype=np.float64), origins.shape)
+        hits = np.zeros(len(origins), dtype=bool)
+
+        for start in range(0, len(origins), ray_batch):
+            batch_origins = origins[start:start + ray_batch]
+            batch_dirs = directions[start:start + ray_batch]
+
+            # Avoid division by zero for axis-parallel rays
+            safe = np.where(np.abs(batch_dirs) < 1e-12, np.copysign(1e-12, batch_dirs), batch_dirs)
+            ray_ids, triangle_ids = self.bvh.candidates(batch_origins, 1.0 / safe)
+            if len(ray_ids) == 0:
+                continue
+
+            hit = ray_triangle_hits(
+                batch_origins[ray_ids],
+                batch_dirs[ray_ids],
+                np.asarray(self.triangles[triangle_ids], dtype=np.float64),
+            )
+            hits[start + ray_ids[hit]] = True
+
+        return hits
+
+    def save(self, directory: Path) -> None:
+        """Save scene arrays and metadata as files in a directory."""
+        directory.mkdir(parents=True, exist_ok=True)
+        np.save(directory / "triangles.npy", self.triangles)
+        np.save(directory / "bvh_order.npy", self.bvh.order)
+        np.save(directory / "bvh_bounds.npy", self.bvh.level_bounds)
+        np.save(directory / "bvh_level_offsets.npy", self.bvh.level_offsets)
+        meta = dict(self.meta)
+        meta.update({
+            "version": CITY_SCENE_VERSION,
+            "bounds": [self.bounds.west, self.bounds.south, self.bounds.east, self.bounds.north],
+            "node_size": self.bvh.node_size,
+            "triangles": len(self.triangles),
+        })
+        with open(directory / "meta.json", "w") as f:
+            json.dump(meta, f)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["CityScene"]:
+        """Memory-map a saved scene, or return None if it is missing or outdated."""
+        meta_path = directory / "meta.json"
+        if not meta_path.exists():
+            return None
+        try:
+            with open(meta_path) as f:
+                meta = json.load(f)
+        except (json.JSONDecodeError, OSError):
+            return None
+        if meta.get("version") != CITY_SCENE_VERSION:
+            return None
+        if not all((directory / f"{name}.npy").exists() for name in _ARRAY_NAMES):
+            return None
+
+        bvh = PackedBVH(
+            np.load(directory / "bvh_order.npy", mmap_mode="r"),
+            np.load(directory / "bvh_bounds.npy", mmap_mode="r"),
+            np.load(directory / "bvh_level_offsets.npy"),
+            meta["node_size"],
+        )
+        triangles = np.load(directory / "triangles.npy", mmap_mode="r")
+        return cls(triangles, bvh, tuple(meta["bounds"]), meta)
+
+    def __len__(self) -> int:
+        return len(self.triangles)
+
+
+class CitySceneIntersector:
+    """Ray intersector for one local frame (a tile or query area) of a city scene.
+
+    Provides the intersects_any() of trimesh's RayMeshIntersector, so it
+    can stand in wherever TileRaytracer or the query engine use one.
+    """
+
+    def __init__(self, scene: CityScene, bounds: SceneBounds):
+        self.scene = scene
+        self.shift = scene.offset(bounds)
+
+    def intersects_any(
+        self,
+        ray_origins: NDArray[np.float64],
+        ray_directions: NDArray[np.float64],
+    ) -> NDArray[np.bool_]:
+        """Check which rays (origins in the local frame) hit the city scene."""
+        origins = np.asarray(ray_origins, dtype=np.float64) + self.shift
+        return self.scene.intersects_any(origins, ray_directions)
+
+
+def _source_meta(path: Optional[Path]) -> Optional[dict[str, Any]]:
+    """Identity of a source file (None if it does not exist)."""
+    if path is None or not path.exists():
+        return None
+    stat = path.stat()
+    return {"path": str(path.resolve()), "size": stat.st_size, "mtime": stat.st_mtime}
+
+
+def build_city_scene(
+    buildings_path: Path,
+    trees_path: Optional[Path],
+    output_dir: Path = DEFAULT_CITY_SCENE_DIR,
+    bounds: Optional[Tuple[float, float, float, float]] = None,
+    lod2_dir: Optional[Path] = None,
+    node_size: int = DEFAULT_NODE_SIZE,
+    store_dir: Optional[Path] = DEFAULT_STORE_DIR,
+) -> Path:
+    """Build the city scene once and save it for tile renders and queries.
+
+    The scene is written to a temporary directory and renamed into place,
+    so concurrent readers never see a partial scene.
+
+    Args:
+        buildings_path: Buildings GeoJSON
+        trees_path: Trees GeoJSON (None or missing to skip trees)
+        output_dir: Scene directory
+        bounds: (west, south, east, north) area in WGS84 (default: the
+            extent of all buildings and trees)
+        lod2_dir: Directory of LOD2 OBJ files to add (optional)
+        node_size: BVH children per node
+        store_dir: Directory for the memory-mapped feature stores
+
+    Returns:
+        Path to the scene directory
+    """
+    buildings = VectorSource(buildings_path, height_field="height", store_dir=store_dir)
+    has_trees = trees_path is not None and trees_path.exists()
+    trees = (
+        VectorSource(trees_path, height_field="estimated_height", store_dir=store_dir)
+        if has_trees else None
+    )
+    complete = bounds is None
+    if complete:
+        extents = np.array([buildings.extent] + ([trees.extent] if trees is not None else []))
+        bounds = (
+            float(np.nanmin(extents[:, 0])), float(np.nanmin(extents[:, 1])),
+            float(np.nanmax(extents[:, 2])), float(np.nanmax(extents[:, 3])),
+        )
+    if any(np.isnan(bounds)):
+        raise ValueError(f"No features in {buildings_path} to build a city scene from")
+
+    builder = SceneBuilder(bounds)
+    building_ids = buildings.query_ids(bounds, BUILDING_MIN_HEIGHT)
+    if len(building_ids):
+        builder.add_buildings([buildings.features[i] for i in building_ids])
+    if trees is not None:
+        tree_ids = trees.query_ids(bounds, TREE_MIN_HEIGHT)
+        if len(tree_ids):
+            builder.add_trees([trees.features[i] for i in tree_ids])
+    if lod2_dir is not None:
+        metadata_path = lod2_dir / "metadata.json"
+        builder.add_lod2_buildings(
+            str(lod2_dir), str(metadata_path) if metadata_path.exists() else None
+        )
+
+    scene = CityScene.from_mesh(builder.build(), bounds, node_size)
+    scene.meta = {
+        "sources": {
+            "buildings": _source_meta(buildings_path),
+            "trees": _source_meta(trees_path),
+            "lod2": str(lod2_dir.resolve()) if lod2_dir is not None else None,
+        },
+        "complete": complete,
+        "buildings": builder.stats.num_buildings,
+        "lod2_buildings": builder.stats.num_lod2_buildings,
+        "trees": builder.stats.num_trees,
+    }
+
+    tmp_path = output_dir.with_name(f"{output_dir.name}.tmp-{os.getpid()}")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    scene.save(tmp_path)
+
+    if output_dir.exists():
+        shutil.rmtree(output_dir, ignore_errors=True)
+    try:
+        os.replace(tmp_path, output_dir)
+    except OSError:
+        # Another process finished building first; use its scene
+        shutil.rmtree(tmp_path, ignore_errors=True)
+
+    return output_dir
+
+
+def open_city_scene(
+    directory: Optional[Path],
+    buildings_path: Path,
+    trees_path: Optional[Path],
+) -> Optional[CityScene]:
+    """Open a built city scene if it matches the current source files.
+
+    Returns:
+        CityScene, or None if there is no scene or it was built from
+        different (or since modified) buildings or trees
+    """
+    if directory is None:
+        return None
+    scene = CityScene.load(directory)
+    if scene is None:
+        return None
+
+    sources = scene.meta.get("sources", {})
+    if sources.get("buildings") != _source_meta(buildings_path):
+        return None
+    if sources.get("trees") != _source_meta(trees_path):
+        return None
+    return scene
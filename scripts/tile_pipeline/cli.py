@@ -155,6 +155,10 @@ def cmd_render(args: argparse.Namespace) -> int:
     config = PipelineConfig()
     if args.output_dir:
         config.output.output_dir = Path(args.output_dir)
+    if args.fetch_concurrency:
+        config.fetch_concurrency = args.fetch_concurrency
+    config.output.backend = args.output_backend
+    config.cache_backend = args.cache_backend
 
     # Parse bounds - priority: --area > --lat/--lng > --bounds > default
     if args.area:
@@ -219,6 +223,7 @@ def cmd_render(args: argparse.Namespace) -> int:
             preset_name=args.preset,
             style_name=style,
             samples=args.blender_samples,
+            blender_servers=args.blender_servers,
         )
     else:
         renderer = TileRenderer(
@@ -246,13 +251,25 @@ def cmd_render(args: argparse.Namespace) -> int:
 
     # Render
     try:
-        if args.workers > 1:
+        if args.pyramid:
+            paths = renderer.render_pyramid(
+                bounds=bounds,
+                min_zoom=min_zoom,
+                max_zoom=max_zoom,
+                workers=args.workers,
+                progress=True,
+                executor=args.executor,
+                force=args.force,
+            )
+        elif args.workers > 1:
             paths = renderer.render_parallel(
                 bounds=bounds,
                 min_zoom=min_zoom,
                 max_zoom=max_zoom,
                 workers=args.workers,
                 progress=True,
+                executor=args.executor,
+                force=args.force,
             )
         else:
             paths = renderer.render_all(
@@ -260,6 +277,7 @@ def cmd_render(args: argparse.Namespace) -> int:
                 min_zoom=min_zoom,
                 max_zoom=max_zoom,
                 progress=True,
+                force=args.force,
             )
 
         print(f"Rendered {len(paths)} tiles")
@@ -276,6 +294,9 @@ def cmd_render(args: argparse.Namespace) -> int:
             traceback.print_exc()
         return 1
 
+    finally:
+        renderer.close()
+
 
 def cmd_presets(args: argparse.Namespace) -> int:
     """List available time presets."""
@@ -314,6 +335,24 @@ def cmd_styles(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_export_tiles(args: argparse.Namespace) -> int:
+    """Export a packed tile store to the z/x/y directory layout."""
+    from .tile_store import MBTILES_SUFFIX, MBTilesStore
+
+    source = Path(args.source)
+    if source.suffix != MBTILES_SUFFIX or not source.exists():
+        print(f"Error: {source} is not an existing {MBTILES_SUFFIX} file", file=sys.stderr)
+        return 1
+
+    store = MBTilesStore(source, args.format)
+    output_dir = Path(args.output_dir) if args.output_dir else source.parent
+    written = store.export(output_dir, overwrite=args.force)
+    store.close()
+
+    print(f"Exported {written} tiles to {output_dir}")
+    return 0
+
+
 def cmd_areas(args: argparse.Namespace) -> int:
     """List predefined Zürich areas."""
     from .areas import AREAS, estimate_tiles
@@ -556,6 +595,116 @@ def cmd_shadow_timeline(args: argparse.Namespace) -> int:
     return 0
 
 
+def cmd_sun_exposure(args: argparse.Namespace) -> int:
+    """Precompute the annual sun-exposure raster product."""
+    from .sun_exposure import SunExposureConfig, build_sun_exposure, DEFAULT_SUN_EXPOSURE_DIR
+    from .query import DEFAULT_BUILDINGS_PATH, DEFAULT_TREES_PATH
+    from .areas import get_area
+
+    if args.area:
+        try:
+            bounds = get_area(args.area).bounds
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    elif args.bounds:
+        bounds = tuple(float(x) for x in args.bounds.split(","))
+    else:
+        print("Error: --area or --bounds is required", file=sys.stderr)
+        return 1
+
+    config = SunExposureConfig(
+        zoom=args.zoom,
+        raster_size=args.raster_size,
+        cadence=args.cadence,
+        interval_minutes=args.interval,
+    )
+    if args.heights:
+        config.heights = tuple(float(h) for h in args.heights.split(","))
+
+    output_dir = Path(args.output_dir) if args.output_dir else DEFAULT_SUN_EXPOSURE_DIR
+    index_path = build_sun_exposure(
+        bounds,
+        DEFAULT_BUILDINGS_PATH,
+        DEFAULT_TREES_PATH,
+        output_dir,
+        config,
+        force=args.force,
+    )
+    print(f"✓ Sun-exposure index written to {index_path}")
+    return 0
+
+
+def cmd_city_scene(args: argparse.Namespace) -> int:
+    """Build the city-wide shadow scene used by queries and sun exposure."""
+    from .city_scene import DEFAULT_CITY_SCENE_DIR, CityScene, build_city_scene
+    from .query import DEFAULT_BUILDINGS_PATH, DEFAULT_TREES_PATH
+    from .areas import get_area
+
+    bounds = None
+    if args.area:
+        try:
+            bounds = get_area(args.area).bounds
+        except ValueError as e:
+            print(f"Error: {e}", file=sys.stderr)
+            return 1
+    elif args.bounds:
+        bounds = tuple(float(x) for x in args.bounds.split(","))
+
+    output_dir = Path(args.output_dir) if args.output_dir else DEFAULT_CITY_SCENE_DIR
+    lod2_dir = Path(args.lod2_dir) if args.lod2_dir else None
+    try:
+        build_city_scene(
+            DEFAULT_BUILDINGS_PATH,
+            DEFAULT_TREES_PATH,
+            output_dir,
+            bounds=bounds,
+            lod2_dir=lod2_dir,
+        )
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    scene = CityScene.load(output_dir)
+    print(
+        f"✓ City scene written to {output_dir}: {scene.meta['buildings']} buildings, "
+        f"{scene.meta['lod2_buildings']} LOD2, {scene.meta['trees']} trees, "
+        f"{len(scene):,} triangles"
+    )
+    return 0
+
+
+def cmd_sun_hours(args: argparse.Namespace) -> int:
+    """Look up sun hours from the precomputed sun-exposure product."""
+    from datetime import datetime
+    from .query import get_sun_hours
+
+    try:
+        day = datetime.strptime(args.date, "%Y-%m-%d")
+    except ValueError as e:
+        print(f"Error parsing date: {e}", file=sys.stderr)
+        return 1
+
+    height = args.height
+    if args.floor is not None:
+        height = (args.floor * 3.0) + 1.5
+
+    product_dir = Path(args.product_dir) if args.product_dir else None
+    try:
+        hours = get_sun_hours(args.lat, args.lng, day, height=height, product_dir=product_dir)
+    except FileNotFoundError as e:
+        print(f"Error: no sun-exposure product ({e}); run 'sun-exposure' first", file=sys.stderr)
+        return 1
+
+    if hours is None:
+        print("Error: location is outside the sun-exposure product", file=sys.stderr)
+        return 1
+
+    print(f"☀️ ~{hours:.1f} hours of direct sun at ({args.lat:.5f}, {args.lng:.5f}), "
+          f"{height:.1f}m on {args.date}")
+    return 0
+
+
 def cmd_nearest(args: argparse.Namespace) -> int:
     """Find nearest amenity."""
     from .query import find_nearest_amenity
@@ -1545,8 +1694,8 @@ def cmd_render_styled(args: argparse.Namespace) -> int:
     # Load vector data
     print("Loading data...")
     try:
-        buildings_source = load_buildings(config.sources.buildings_path)
-        trees_source = load_trees(config.sources.trees_path)
+        buildings_source = load_buildings(config.sources.buildings_path, store_dir=config.feature_store_dir)
+        trees_source = load_trees(config.sources.trees_path, store_dir=config.feature_store_dir)
         buildings = query_features_in_tile(buildings_source, bounds, buffer_meters=50)
         trees = query_features_in_tile(trees_source, bounds, buffer_meters=20)
         print(f"  Buildings: {len(buildings)}")
@@ -1757,8 +1906,8 @@ def cmd_batch_render_styled(args: argparse.Namespace) -> int:
     # Load config and data sources
     config = PipelineConfig()
     print("Loading data sources...")
-    buildings_source = load_buildings(config.sources.buildings_path)
-    trees_source = load_trees(config.sources.trees_path)
+    buildings_source = load_buildings(config.sources.buildings_path, store_dir=config.feature_store_dir)
+    trees_source = load_trees(config.sources.trees_path, store_dir=config.feature_store_dir)
 
     # LLM style (optional)
     llm_style = None
@@ -2009,13 +2158,13 @@ def cmd_render_semantic(args: argparse.Namespace) -> int:
 
     # Load data
     print("  Loading building data...")
-    vector_source = VectorSource(config.sources.buildings_path)
+    vector_source = VectorSource(config.sources.buildings_path, store_dir=config.feature_store_dir)
     buildings = list(vector_source.query(bounds))
     print(f"  Found {len(buildings)} buildings")
 
     # Load trees
     print("  Loading tree data...")
-    tree_source = VectorSource(config.sources.trees_path)
+    tree_source = VectorSource(config.sources.trees_path, store_dir=config.feature_store_dir)
     trees = list(tree_source.query(bounds))
     print(f"  Found {len(trees)} trees")
 
@@ -2024,7 +2173,7 @@ def cmd_render_semantic(args: argparse.Namespace) -> int:
     water_path = config.sources.buildings_path.parent / "zurich-water.geojson"
     if water_path.exists():
         print("  Loading water data...")
-        water_source = VectorSource(water_path, height_field="width")
+        water_source = VectorSource(water_path, height_field="width", store_dir=config.feature_store_dir)
         water_bodies = list(water_source.query(bounds))
         print(f"  Found {len(water_bodies)} water bodies")
         for w in water_bodies:
@@ -2037,7 +2186,7 @@ def cmd_render_semantic(args: argparse.Namespace) -> int:
     streets_path = config.sources.buildings_path.parent / "zurich-streets.geojson"
     if streets_path.exists():
         print("  Loading street data...")
-        streets_source = VectorSource(streets_path)
+        streets_source = VectorSource(streets_path, store_dir=config.feature_store_dir)
         streets = list(streets_source.query(bounds))
         print(f"  Found {len(streets)} streets")
 
@@ -2185,11 +2334,28 @@ def main() -> int:
                               help="Visual style for rendered mode (see 'styles' command)")
     render_parser.add_argument("--output-dir", help="Output directory")
     render_parser.add_argument("--workers", type=int, default=4, help="Parallel workers")
+    render_parser.add_argument("--executor", choices=["process", "thread"], default="process",
+                              help="Parallel backend for --workers > 1 (default: process)")
+    render_parser.add_argument("--fetch-concurrency", type=int,
+                              help="Source tile downloads in flight while prefetching (default: 16)")
+    render_parser.add_argument("--output-backend", choices=["files", "mbtiles"], default="files",
+                              help="Write tiles as z/x/y files or into a single tiles.mbtiles "
+                                   "in the output directory (default: files)")
+    render_parser.add_argument("--cache-backend", choices=["files", "mbtiles"], default="files",
+                              help="Cache source tiles as files or in one .mbtiles per source "
+                                   "(default: files)")
     render_parser.add_argument("--use-blender", action="store_true",
                               help="Use Blender Cycles for shadows (satellite mode only)")
     render_parser.add_argument("--blender-samples", type=int, default=64,
                               help="Blender Cycles samples (higher=better, slower)")
+    render_parser.add_argument("--blender-servers", type=int, default=0,
+                              help="Keep N Blender processes running and reuse them across tiles "
+                                   "(rendered mode; 0 = one process per tile)")
     render_parser.add_argument("--dry-run", action="store_true", help="Count tiles only")
+    render_parser.add_argument("--pyramid", action="store_true",
+                              help="Fully render only --max-zoom; build lower zooms by downsampling children")
+    render_parser.add_argument("--force", action="store_true",
+                              help="Re-render tiles even if the render manifest marks them up to date")
     render_parser.add_argument("-y", "--yes", action="store_true", help="Skip confirmation")
 
     # Presets command
@@ -2204,6 +2370,18 @@ def main() -> int:
     # Info command
     subparsers.add_parser("info", help="Show data source information")
 
+    # Export packed tiles command
+    export_parser = subparsers.add_parser(
+        "export-tiles", help="Export an .mbtiles tile store to z/x/y files"
+    )
+    export_parser.add_argument("source", help="Path to the .mbtiles file")
+    export_parser.add_argument("--output-dir",
+                               help="Target directory (default: the .mbtiles file's directory)")
+    export_parser.add_argument("--format", choices=["webp", "png", "jpeg"],
+                               help="File extension for exported tiles (default: the store's format)")
+    export_parser.add_argument("--force", action="store_true",
+                               help="Overwrite tiles that already exist in the target")
+
     # =========================================================================
     # SPATIAL QUERY COMMANDS
     # =========================================================================
@@ -2257,6 +2435,55 @@ def main() -> int:
                                 help="Floor number (overrides --height)")
     timeline_parser.add_argument("--json", action="store_true", help="Output as JSON")
 
+    # sun-exposure command - Precompute annual sun-hours rasters
+    sun_exposure_parser = subparsers.add_parser(
+        "sun-exposure",
+        help="Precompute annual sun-exposure rasters",
+        description="Ray trace sun hours per tile and height band for representative days."
+    )
+    sun_exposure_parser.add_argument("--area", help="Predefined area name (see 'areas' command)")
+    sun_exposure_parser.add_argument("--bounds", help="Bounds as west,south,east,north")
+    sun_exposure_parser.add_argument("--zoom", type=int, default=16, help="Tile zoom level (default: 16)")
+    sun_exposure_parser.add_argument("--raster-size", type=int, default=64,
+                                     help="Raster cells per tile side (default: 64)")
+    sun_exposure_parser.add_argument("--cadence", choices=["month", "week"], default="month",
+                                     help="Representative days (default: month)")
+    sun_exposure_parser.add_argument("--interval", type=int, default=30,
+                                     help="Minutes between sun samples (default: 30)")
+    sun_exposure_parser.add_argument("--heights",
+                                     help="Comma-separated height bands in meters")
+    sun_exposure_parser.add_argument("--output-dir", help="Product directory")
+    sun_exposure_parser.add_argument("--force", action="store_true",
+                                     help="Rebuild tiles even if they are up to date")
+
+    # city-scene command - Build the persistent city-wide shadow scene
+    city_scene_parser = subparsers.add_parser(
+        "city-scene",
+        help="Build the city-wide shadow scene",
+        description="Build all buildings and trees once into a BVH that shadow "
+                    "queries and sun-exposure tiles ray trace against."
+    )
+    city_scene_parser.add_argument("--area", help="Predefined area name (default: all buildings)")
+    city_scene_parser.add_argument("--bounds", help="Bounds as west,south,east,north")
+    city_scene_parser.add_argument("--lod2-dir", help="Directory of LOD2 OBJ files to include")
+    city_scene_parser.add_argument("--output-dir", help="Scene directory (default: .cache/city-scene)")
+
+    # sun-hours command - O(1) lookup in the sun-exposure product
+    sun_hours_parser = subparsers.add_parser(
+        "sun-hours",
+        help="Look up sun hours from the sun-exposure product",
+        description="Fast sun-hours lookup for a point (requires 'sun-exposure' first)."
+    )
+    sun_hours_parser.add_argument("--lat", type=float, required=True, help="Latitude (WGS84)")
+    sun_hours_parser.add_argument("--lng", type=float, required=True, help="Longitude (WGS84)")
+    sun_hours_parser.add_argument("--date", default=datetime.now().strftime("%Y-%m-%d"),
+                                  help="Date YYYY-MM-DD (default: today)")
+    sun_hours_parser.add_argument("--height", type=float, default=1.7,
+                                  help="Height in meters (default: 1.7m standing)")
+    sun_hours_parser.add_argument("--floor", type=int,
+                                  help="Floor number (overrides --height)")
+    sun_hours_parser.add_argument("--product-dir", help="Product directory")
+
     # nearest command - Find nearest amenity
     nearest_parser = subparsers.add_parser(
         "nearest",
@@ -2687,6 +2914,8 @@ Examples:
         return cmd_areas(args)
     elif args.command == "info":
         return cmd_info(args)
+    elif args.command == "export-tiles":
+        return cmd_export_tiles(args)
     # Spatial query commands
     elif args.command == "shadow":
         return cmd_shadow(args)
@@ -2694,6 +2923,12 @@ Examples:
         return cmd_balcony(args)
     elif args.command == "shadow-timeline":
         return cmd_shadow_timeline(args)
+    elif args.command == "sun-exposure":
+        return cmd_sun_exposure(args)
+    elif args.command == "city-scene":
+        return cmd_city_scene(args)
+    elif args.command == "sun-hours":
+        return cmd_sun_hours(args)
     elif args.command == "nearest":
         return cmd_nearest(args)
     elif args.command == "find":
@@ -7,7 +7,12 @@ including blend opacities, source URLs, and output settings.
 
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Optional
+
+from .tile_store import TileBackend
+
+# Default source tile cache; other caches (e.g. feature stores) sit next to it
+DEFAULT_CACHE_DIR = Path(".cache/tiles")
 
 
 @dataclass
@@ -39,6 +44,8 @@ class SourceConfig:
 
     # Mapterhorn terrain tiles (Terrarium encoding)
     elevation_url: str = "https://tiles.mapterhorn.com/{z}/{x}/{y}.webp"
+    # Deepest elevation zoom to fetch; deeper tiles are cut from their ancestor
+    elevation_max_zoom: Optional[int] = None
 
     # Local GeoJSON files
     buildings_path: Path = field(
@@ -65,6 +72,8 @@ class OutputConfig:
     output_dir: Path = field(
         default_factory=lambda: Path("public/tiles/photorealistic")
     )
+    # "files": output_dir/z/x/y.format; "mbtiles": output_dir/tiles.mbtiles
+    backend: TileBackend = "files"
 
 
 @dataclass
@@ -107,9 +116,22 @@ class PipelineConfig:
 
     # Processing
     workers: int = 4
-    cache_dir: Path = field(default_factory=lambda: Path(".cache/tiles"))
+    fetch_concurrency: int = 16  # Source tile downloads in flight while prefetching
+    cache_dir: Path = field(default_factory=lambda: DEFAULT_CACHE_DIR)
+    # "files": cache_dir/{satellite,elevation}/z/x/y; "mbtiles": one file per source
+    cache_backend: TileBackend = "files"
 
     def __post_init__(self) -> None:
         """Ensure directories exist."""
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.output.output_dir.mkdir(parents=True, exist_ok=True)
+
+    @property
+    def feature_store_dir(self) -> Path:
+        """Directory for memory-mapped vector feature stores (next to cache_dir)."""
+        return self.cache_dir.parent / "features"
+
+    @property
+    def city_scene_dir(self) -> Path:
+        """Directory of the prebuilt city-wide shadow scene (next to cache_dir)."""
+        return self.cache_dir.parent / "city-scene"
@@ -16,6 +16,8 @@ from typing import Optional
 import requests
 from PIL import Image
 
+from ..provider_cache import default_provider_cache, request_key
+
 # Gemini API configuration
 API_BASE = "https://generativelanguage.googleapis.com/v1beta"
 MODEL = "models/gemini-2.5-flash-image"
@@ -310,12 +312,37 @@ def call_gemini(
     temperature: float = 0.3,
     api_key: Optional[str] = None,
 ) -> Image.Image:
-    """Call Gemini API with image and prompt, return styled image."""
+    """Call Gemini API with image and prompt, return styled image.
+
+    Responses are cached by request content (see provider_cache), so
+    re-running an experiment with unchanged inputs makes no API call.
+    """
+    image_bytes = image_to_bytes(image)
+    key = request_key("gemini", MODEL, prompt, temperature, images=[image_bytes])
+    data, _ = default_provider_cache().fetch(
+        key, lambda: _request_gemini(image_bytes, prompt, temperature, api_key)
+    )
+
+    img = bytes_to_image(data)
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    if img.size != expected_size:
+        img = img.resize(expected_size, Image.LANCZOS)
+    return img
+
+
+def _request_gemini(
+    image_bytes: bytes,
+    prompt: str,
+    temperature: float,
+    api_key: Optional[str],
+) -> bytes:
+    """Send one image + prompt to Gemini and return the generated image bytes."""
     api_key = api_key or os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("API key required. Set GOOGLE_API_KEY environment variable.")
 
-    img_b64 = image_to_base64(image)
+    img_b64 = base64.b64encode(image_bytes).decode("utf-8")
 
     url = f"{API_BASE}/{MODEL}:generateContent?key={api_key}"
     payload = {
@@ -349,13 +376,7 @@ def call_gemini(
             if "content" in candidate and "parts" in candidate["content"]:
                 for part in candidate["content"]["parts"]:
                     if "inlineData" in part:
-                        img_bytes = base64.b64decode(part["inlineData"]["data"])
-                        img = Image.open(io.BytesIO(img_bytes))
-                        if img.mode != "RGB":
-                            img = img.convert("RGB")
-                        if img.size != expected_size:
-                            img = img.resize(expected_size, Image.LANCZOS)
-                        return img
+                        return base64.b64decode(part["inlineData"]["data"])
 
     raise ValueError("Gemini did not return an image in the response")
 
@@ -0,0 +1,240 @@
+"""
+Heightfield shadow backend for 2.5D scenes.
+
+Extruded footprints, tree volumes and a terrain DEM are fully described by
+a height raster, so shadow rays do not need ray-triangle tests. This
+backend rasterizes the scene triangles once into a max-height grid
+covering the tile plus a padding (shadows cast from outside the tile),
+then marches all rays through the grid in lock-step: at step k every ray
+samples the cell k steps towards the sun and compares it with its own
+height there. Cost is O(rays × steps) in NumPy; steps are bounded by the
+tallest occluder, and rays leave the loop as soon as they are blocked.
+
+Limits of the 2.5D model: overhangs are filled (light never passes under
+a tree crown), and faces smaller than a cell are represented by their
+vertices only.
+
+Example:
+    config = RayTracerConfig(backend="heightfield")
+    raytracer = TileRaytracer(mesh, bounds, config)
+"""
+
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Union
+
+import numpy as np
+from numpy.typing import NDArray
+
+from .scene_builder import SceneBounds
+
+if TYPE_CHECKING:
+    import trimesh
+    from .city_scene import CityScene
+
+
+# Default grid resolution and padding around the tile (meters)
+DEFAULT_CELL_SIZE = 1.0
+DEFAULT_PADDING = 200.0
+
+# (triangle, cell) pairs rasterized per chunk (memory control)
+_RASTER_CHUNK = 2_000_000
+
+
+def rasterize_max_heights(
+    triangles: NDArray[np.float64],
+    origin: tuple[float, float],
+    cell_size: float,
+    shape: tuple[int, int],
+) -> NDArray[np.float32]:
+    """Highest triangle surface over each cell center of a grid.
+
+    Row 0 is the north edge, like the shadow images. Vertical triangles
+    (walls) have no area from above and are skipped; faces too small to
+    contain a cell center have their vertices splatted into their cells
+    instead, so objects thinner than a cell still occlude.
+
+    Args:
+        triangles: (T, 3, 3) triangle corners in local meters
+        origin: (x, y) of the grid's north-west corner
+        cell_size: Cell edge in meters
+        shape: (rows, cols)
+
+    Returns:
+        (rows, cols) float32 heights, -inf where nothing is above the cell
+    """
+    rows, cols = shape
+    grid = np.full(rows * cols, -np.inf, dtype=np.float32)
+    if len(triangles) == 0:
+        return grid.reshape(shape)
+
+    # Grid coordinates: column from x, row from y (rows grow southwards)
+    gx = (triangles[:, :, 0] - origin[0]) / cell_size - 0.5
+    gy = (origin[1] - triangles[:, :, 1]) / cell_size - 0.5
+    z = triangles[:, :, 2]
+
+    # Faces with area from above, clipped to the grid
+    area = (gx[:, 1] - gx[:, 0]) * (gy[:, 2] - gy[:, 0]) - (gx[:, 2] - gx[:, 0]) * (gy[:, 1] - gy[:, 0])
+    c0 = np.clip(np.ceil(gx.min(axis=1)), 0, cols).astype(np.int64)
+    c1 = np.clip(np.floor(gx.max(axis=1)), -1, cols - 1).astype(np.int64)
+    r0 = np.clip(np.ceil(gy.min(axis=1)), 0, rows).astype(np.int64)
+    r1 = np.clip(np.floor(gy.max(axis=1)), -1, rows - 1).astype(np.int64)
+    width = np.maximum(c1 - c0 + 1, 0)
+    counts = width * np.maximum(r1 - r0 + 1, 0)
+    flat = np.abs(area) > 1e-9
+    faces = np.flatnonzero(flat & (counts > 0))
+    covered = np.zeros(len(triangles), dtype=bool)
+
+    # Chunks of faces with a bounded number of (face, cell) pairs
+    cumulative = np.cumsum(counts[faces])
+    bounds = np.searchsorted(cumulative, np.arange(_RASTER_CHUNK, cumulative[-1], _RASTER_CHUNK)) if len(faces) else []
+    for chunk in np.split(faces, np.unique(np.asarray(bounds, dtype=np.int64) + 1)):
+        if len(chunk) == 0:
+            continue
+        n = counts[chunk]
+        face = np.repeat(chunk, n)
+        local = np.arange(len(face)) - np.repeat(np.cumsum(n) - n, n)
+        dr, dc = np.divmod(local, width[face])
+        r = r0[face] + dr
+        c = c0[face] + dc
+
+        # Barycentric weights of the cell center
+        x0, y0 = gx[face, 0], gy[face, 0]
+        w1 = ((c - x0) * (gy[face, 2] - y0) - (gx[face, 2] - x0) * (r - y0)) / area[face]
+        w2 = ((gx[face, 1] - x0) * (r - y0) - (c - x0) * (gy[face, 1] - y0)) / area[face]
+        w0 = 1 - w1 - w2
+        hit = (w0 >= -1e-9) & (w1 >= -1e-9) & (w2 >= -1e-9)
+
+        height = w0 * z[face, 0] + w1 * z[face, 1] + w2 * z[face, 2]
+        np.maximum.at(grid, r[hit] * cols + c[hit], height[hit].astype(np.float32))
+        covered[face[hit]] = True
+
+    # Faces between cell centers: splat their vertices instead
+    small = flat & ~covered
+    vc = np.floor(gx[small] + 0.5).astype(np.int64).ravel()
+    vr = np.floor(gy[small] + 0.5).astype(np.int64).ravel()
+    inside = (vc >= 0) & (vc < cols) & (vr >= 0) & (vr < rows)
+    np.maximum.at(grid, vr[inside] * cols + vc[inside], z[small].ravel()[inside].astype(np.float32))
+
+    return grid.reshape(shape)
+
+
+@dataclass
+class HeightField:
+    """Max-height grid of a scene around one tile, with ray marching.
+
+    Provides the intersects_any() of trimesh's RayMeshIntersector, so
+    TileRaytracer casts its shadow rays through it unchanged.
+    """
+
+    heights: NDArray[np.float32]   # (rows, cols), row 0 = north
+    origin: tuple[float, float]     # (x, y) of the north-west corner, local meters
+    cell_size: float
+
+    @classmethod
+    def from_scene(
+        cls,
+        scene: Union["trimesh.Trimesh", "CityScene"],
+        bounds: SceneBounds,
+        cell_size: float = DEFAULT_CELL_SIZE,
+        padding: float = DEFAULT_PADDING,
+    ) -> "HeightField":
+        """Rasterize a tile mesh or a CityScene around a tile.
+
+        Args:
+            scene: Mesh in the tile's local frame, or a city scene
+            bounds: Tile bounds (defines the local frame)
+            cell_size: Grid resolution in meters
+            padding: Extent beyond the tile edges in meters
+
+        Returns:
+            HeightField covering the tile plus padding
+        """
+        from .city_scene import CityScene
+
+        pad = int(np.ceil(padding / cell_size))
+        cols = int(np.ceil(bounds.width_meters / cell_size)) + 2 * pad
+        rows = int(np.ceil(bounds.height_meters / cell_size)) + 2 * pad
+        west = -pad * cell_size
+        north = bounds.height_meters + pad * cell_size
+
+        if isinstance(scene, CityScene):
+            shift = scene.offset(bounds)
+            # Only triangles whose BVH leaves overlap the grid, moved to the tile frame
+            near = scene.bvh.query((
+                west + shift[0], north - rows * cell_size + shift[1],
+                west + cols * cell_size + shift[0], north + shift[1],
+            ))
+            triangles = np.asarray(scene.triangles[near], dtype=np.float64) - shift
+        else:
+            triangles = np.asarray(scene.vertices, dtype=np.float64)[np.asarray(scene.faces)]
+
+        heights = rasterize_max_heights(triangles, (west, north), cell_size, (rows, cols))
+        return cls(heights, (west, north), cell_size)
+
+    def intersects_any(
+        self,
+        ray_origins: NDArray[np.float64],
+        ray_directions: NDArray[np.float64],
+    ) -> NDArray[np.bool_]:
+        """Check which rays are blocked by the height grid.
+
+        Rays march in steps of one cell along their horizontal direction,
+        starting in their own cell (a point under a roof is blocked).
+        Rays that do not point upwards count as blocked; rays that leave
+        the grid unblocked count as free.
+
+        Args:
+            ray_origins: (N, 3) origins in the tile's local frame
+            ray_directions: (N, 3) directions, or one (3,) direction for all
+
+        Returns:
+            (N,) True where the ray is blocked
+        """
+        origins = np.asarray(ray_origins, dtype=np.float64).reshape(-1, 3)
+        directions = np.broadcast_to(np.asarray(ray_directions, dtype=np.float64), origins.shape)
+        rows, cols = self.heights.shape
+        hits = np.zeros(len(origins), dtype=bool)
+
+        horizontal = np.hypot(directions[:, 0], directions[:, 1])
+        upward = directions[:, 2] > 0
+        hits[~upward] = True
+
+        top = self.heights.max() if self.heights.size else -np.inf
+        if not np.isfinite(top):
+            return hits
+
+        # Per ray: start cell, cell offset and climb per step
+        col = (origins[:, 0] - self.origin[0]) / self.cell_size - 0.5
+        row = (self.origin[1] - origins[:, 1]) / self.cell_size - 0.5
+        safe = np.maximum(horizontal, 1e-12)
+        d_col = directions[:, 0] / safe
+        d_row = -directions[:, 1] / safe
+        climb = directions[:, 2] / safe * self.cell_size
+
+        # Steps until the ray is above everything (or leaves the grid)
+        max_steps = int(np.ceil(np.hypot(rows, cols)))
+        needed = np.where(
+            horizontal > 1e-12,
+            np.ceil((top - origins[:, 2]) / np.maximum(climb, 1e-12)),
+            0,
+        )
+        steps = np.clip(needed, 0, max_steps).astype(np.int64)
+
+        active = np.flatnonzero(upward & (origins[:, 2] < top))
+        k = 0
+        while len(active):
+            c = np.rint(col[active] + k * d_col[active]).astype(np.int64)
+            r = np.rint(row[active] + k * d_row[active]).astype(np.int64)
+            inside = (c >= 0) & (c < cols) & (r >= 0) & (r < rows)
+
+            blocked = np.zeros(len(active), dtype=bool)
+            blocked[inside] = (
+                self.heights[r[inside], c[inside]]
+                > origins[active[inside], 2] + k * climb[active[inside]]
+            )
+            hits[active[blocked]] = True
+
+            active = active[inside & ~blocked & (k < steps[active])]
+            k += 1
+
+        return hits
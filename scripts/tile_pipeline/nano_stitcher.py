@@ -13,6 +13,9 @@ Processing Order:
     y=1  [5]   [6]   [7]   [8]   ← L-shaped: use above + left for each
     y=2  [9]  [10]  [11]  [12]
 
+    Each tile only waits for its left and upper neighbors, so tiles on the
+    same anti-diagonal (e.g. 3, 6 and 9) are styled concurrently.
+
 Usage:
     python scripts/tile_pipeline/nano_stitcher.py \\
         --source public/tiles/hybrid-golden_hour \\
@@ -36,8 +39,34 @@ from typing import Iterator
 import requests
 from PIL import Image
 
-# Gemini API configuration
-API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+try:
+    from .provider_cache import default_provider_cache, request_key
+    from .render_manifest import RenderManifest, fingerprint
+    from .wavefront import (
+        RATE_LIMIT_STATUS,
+        RateLimitError,
+        WavefrontScheduler,
+        l_shaped_dependencies,
+        parse_retry_after,
+        plan_l_shaped,
+        wavefront_priority,
+    )
+except ImportError:
+    # Running as a script: siblings are importable as top-level modules
+    from provider_cache import default_provider_cache, request_key
+    from render_manifest import RenderManifest, fingerprint
+    from wavefront import (
+        RATE_LIMIT_STATUS,
+        RateLimitError,
+        WavefrontScheduler,
+        l_shaped_dependencies,
+        parse_retry_after,
+        plan_l_shaped,
+        wavefront_priority,
+    )
+
+# Gemini API configuration (GEMINI_API_BASE points at a stub server for testing)
+API_BASE = os.environ.get("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
 MODEL = "models/gemini-2.5-flash-image"
 
 # Tile dimensions
@@ -121,6 +150,19 @@ def load_image(path: Path) -> Image.Image:
         return img.copy()
 
 
+def tile_path(base_dir: Path, x: int, y: int) -> Path:
+    """Path of a zoom-16 tile under base_dir."""
+    return base_dir / "16" / str(x) / f"{y}.webp"
+
+
+def save_tile(path: Path, img: Image.Image) -> None:
+    """Save a tile atomically so an interrupted run never leaves a truncated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    img.save(tmp_path, "WEBP", quality=90)
+    os.replace(tmp_path, path)
+
+
 def image_to_bytes(img: Image.Image, format: str = "PNG") -> bytes:
     """Convert PIL Image to bytes."""
     buffer = io.BytesIO()
@@ -181,28 +223,25 @@ def get_grid_bounds(grid: dict[int, dict[int, Path]]) -> tuple[int, int, int, in
 # GEMINI API CALLS
 # =============================================================================
 
-def call_gemini(
-    image: Image.Image,
+def request_gemini_image(
+    images: list[bytes],
     prompt: str,
-    expected_size: tuple[int, int],
-    temperature: float = 0.3,
+    temperature: float,
     api_key: str | None = None,
-) -> Image.Image:
-    """Call Gemini API with image and prompt, return styled image."""
+) -> bytes:
+    """Send PNG images + prompt to Gemini and return the generated image bytes."""
     api_key = api_key or os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("API key required. Set GOOGLE_API_KEY environment variable.")
 
-    img_b64 = image_to_base64(image)
-
     url = f"{API_BASE}/{MODEL}:generateContent?key={api_key}"
+    parts = [
+        {"inline_data": {"mime_type": "image/png", "data": base64.b64encode(data).decode("utf-8")}}
+        for data in images
+    ]
+    parts.append({"text": prompt})
     payload = {
-        "contents": [{
-            "parts": [
-                {"inline_data": {"mime_type": "image/png", "data": img_b64}},
-                {"text": prompt},
-            ]
-        }],
+        "contents": [{"parts": parts}],
         "generationConfig": {
             "responseModalities": ["image", "text"],
             "temperature": temperature,
@@ -218,6 +257,11 @@ def call_gemini(
 
     if response.status_code != 200:
         error_detail = response.text[:500] if response.text else "No details"
+        if response.status_code in RATE_LIMIT_STATUS:
+            raise RateLimitError(
+                f"Gemini API rate limit {response.status_code}: {error_detail}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
         raise ValueError(f"Gemini API error {response.status_code}: {error_detail}")
 
     result = response.json()
@@ -228,18 +272,42 @@ def call_gemini(
             if "content" in candidate and "parts" in candidate["content"]:
                 for part in candidate["content"]["parts"]:
                     if "inlineData" in part:
-                        img_bytes = base64.b64decode(part["inlineData"]["data"])
-                        img = Image.open(io.BytesIO(img_bytes))
-                        if img.mode != "RGB":
-                            img = img.convert("RGB")
-                        # Resize to expected if different
-                        if img.size != expected_size:
-                            img = img.resize(expected_size, Image.LANCZOS)
-                        return img
+                        return base64.b64decode(part["inlineData"]["data"])
 
     raise ValueError("Gemini did not return an image in the response")
 
 
+def decode_image(data: bytes, expected_size: tuple[int, int]) -> Image.Image:
+    """Decode a generated image as RGB at the expected size."""
+    img = Image.open(io.BytesIO(data))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    # Resize to expected if different
+    if img.size != expected_size:
+        img = img.resize(expected_size, Image.LANCZOS)
+    return img
+
+
+def call_gemini(
+    image: Image.Image,
+    prompt: str,
+    expected_size: tuple[int, int],
+    temperature: float = 0.3,
+    api_key: str | None = None,
+) -> Image.Image:
+    """Call Gemini API with image and prompt, return styled image.
+
+    Responses are cached by request content (see provider_cache), so
+    re-running with unchanged inputs makes no API call.
+    """
+    image_bytes = image_to_bytes(image)
+    key = request_key("gemini", MODEL, prompt, temperature, images=[image_bytes])
+    data, _ = default_provider_cache().fetch(
+        key, lambda: request_gemini_image([image_bytes], prompt, temperature, api_key)
+    )
+    return decode_image(data, expected_size)
+
+
 # =============================================================================
 # GENERATION FUNCTIONS WITH CONTEXT
 # =============================================================================
@@ -378,15 +446,74 @@ Return exactly 512×1024 pixels. Keep TOP unchanged, style only BOTTOM."""
 # MAIN PROCESSING ORCHESTRATION
 # =============================================================================
 
+def style_l_shaped_tile(
+    tile: tuple[int, int],
+    grid: dict[int, dict[int, Path]],
+    styled: dict[tuple[int, int], Image.Image],
+    contexts: dict,
+    seed: tuple | None,
+    user_prompt: str,
+    temperature: float,
+    api_key: str | None,
+) -> tuple[str, dict[tuple[int, int], Image.Image]]:
+    """
+    Pass 1 for one task: style a tile against its styled left/upper neighbors.
+
+    Picks the richest context available (seed pair, L-shaped, horizontal,
+    vertical, or alone). The seed task returns both seed tiles.
+    Returns (description, {(x, y): styled tile}).
+    """
+    x, y = tile
+    raw_tile = load_image(grid[y][x])
+
+    if seed is not None and tile == seed[0]:
+        x1, _ = seed[1]
+        styled_a, styled_b = generate_seed_pair(
+            raw_tile, load_image(grid[y][x1]), user_prompt, temperature, api_key
+        )
+        return "Seed pair", {tile: styled_a, seed[1]: styled_b}
+
+    context = contexts[tile]
+    styled_left = styled.get(context.left)
+    styled_above = styled.get(context.above)
+    styled_above_left = styled.get(context.above_left)
+
+    if styled_above_left and styled_above and styled_left:
+        mode = "L-shaped expand"
+        new_styled = generate_l_shaped(
+            styled_above_left, styled_above, styled_left, raw_tile,
+            user_prompt, temperature, api_key
+        )
+    elif styled_left:
+        mode = "Horizontal expand"
+        new_styled = generate_horizontal(styled_left, raw_tile, user_prompt, temperature, api_key)
+    elif styled_above:
+        mode = "Vertical expand"
+        new_styled = generate_vertical_pair(styled_above, raw_tile, user_prompt, temperature, api_key)
+    else:
+        # No context: style alone (seed pair with the tile duplicated, keep left)
+        mode = "Single"
+        new_styled, _ = generate_seed_pair(raw_tile, raw_tile, user_prompt, temperature, api_key)
+
+    return mode, {tile: new_styled}
+
+
 def process_grid(
     grid: dict[int, dict[int, Path]],
     output_dir: Path,
     user_prompt: str,
     temperature: float = 0.3,
     api_key: str | None = None,
+    max_in_flight: int = 4,
 ) -> int:
     """
     Process entire grid with context-aware stitching.
+
+    A tile only depends on its left and upper neighbors, so each
+    anti-diagonal is styled concurrently (up to max_in_flight requests).
+    A render manifest records finished tiles; re-running with the same
+    prompt and temperature skips them.
+
     Returns number of tiles generated.
     """
     min_x, min_y, max_x, max_y = get_grid_bounds(grid)
@@ -399,205 +526,54 @@ def process_grid(
     print(f"  X range: {min_x} to {max_x}")
     print(f"  Y range: {min_y} to {max_y}")
 
-    # Storage for styled tiles
-    styled: dict[int, dict[int, Image.Image]] = defaultdict(dict)
+    # Styled tiles, written only from the scheduling thread
+    styled: dict[tuple[int, int], Image.Image] = {}
     generated = 0
 
-    # Helper to get output path
-    def get_output_path(x: int, y: int) -> Path:
-        # Assume zoom 16 (most common)
-        return output_dir / "16" / str(x) / f"{y}.webp"
-
-    # Helper to check if already exists
-    def tile_exists(x: int, y: int) -> bool:
-        return get_output_path(x, y).exists()
-
-    # Helper to save tile
-    def save_tile(x: int, y: int, img: Image.Image):
-        path = get_output_path(x, y)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        img.save(path, "WEBP", quality=90)
-
-    # Helper to load styled tile from disk if exists
-    def load_styled(x: int, y: int) -> Image.Image | None:
-        if (y, x) in [(y_, x_) for y_ in styled for x_ in styled[y_]]:
-            return styled[y][x]
-        path = get_output_path(x, y)
-        if path.exists():
-            return load_image(path)
-        return None
-
-    # ==========================================================================
-    # PHASE 1: First row - seed pair + horizontal expansion
-    # ==========================================================================
-
-    first_row_y = min_y
-    first_row_xs = sorted(grid[first_row_y].keys())
-
-    if len(first_row_xs) == 0:
-        print("  ❌ No tiles in first row")
-        return 0
-
-    print(f"\n  Phase 1: First row (y={first_row_y})")
-
-    if len(first_row_xs) == 1:
-        # Single tile in row - just style it alone
-        x = first_row_xs[0]
-        if not tile_exists(x, first_row_y):
-            print(f"    [{x},{first_row_y}] Single tile...", end=" ", flush=True)
-            raw = load_image(grid[first_row_y][x])
-            # Use seed pair logic but with same tile duplicated (will cut left)
-            styled_a, _ = generate_seed_pair(raw, raw, user_prompt, temperature, api_key)
-            styled[first_row_y][x] = styled_a
-            save_tile(x, first_row_y, styled_a)
-            generated += 1
-            print("✓")
-        else:
-            styled[first_row_y][x] = load_image(get_output_path(x, first_row_y))
-            print(f"    [{x},{first_row_y}] Exists, skipped")
+    contexts, seed = plan_l_shaped(grid)
+    manifest = RenderManifest(output_dir, save_interval=0.0)
+    tile_fingerprint = fingerprint({"prompt": user_prompt, "temperature": temperature})
 
-    else:
-        # Multiple tiles - seed pair then horizontal expansion
-        x0, x1 = first_row_xs[0], first_row_xs[1]
-
-        # Check if seed pair already done
-        if tile_exists(x0, first_row_y) and tile_exists(x1, first_row_y):
-            styled[first_row_y][x0] = load_image(get_output_path(x0, first_row_y))
-            styled[first_row_y][x1] = load_image(get_output_path(x1, first_row_y))
-            print(f"    [{x0},{first_row_y}]+[{x1},{first_row_y}] Seed pair exists, skipped")
-        else:
-            print(f"    [{x0},{first_row_y}]+[{x1},{first_row_y}] Seed pair...", end=" ", flush=True)
-            start = time.time()
-            raw_a = load_image(grid[first_row_y][x0])
-            raw_b = load_image(grid[first_row_y][x1])
-            styled_a, styled_b = generate_seed_pair(raw_a, raw_b, user_prompt, temperature, api_key)
-            styled[first_row_y][x0] = styled_a
-            styled[first_row_y][x1] = styled_b
-            save_tile(x0, first_row_y, styled_a)
-            save_tile(x1, first_row_y, styled_b)
-            generated += 2
-            print(f"✓ ({time.time() - start:.1f}s)")
-
-        # Horizontal expansion for remaining tiles
-        for i in range(2, len(first_row_xs)):
-            x = first_row_xs[i]
-            x_prev = first_row_xs[i - 1]
-
-            if tile_exists(x, first_row_y):
-                styled[first_row_y][x] = load_image(get_output_path(x, first_row_y))
-                print(f"    [{x},{first_row_y}] Exists, skipped")
-                continue
-
-            print(f"    [{x},{first_row_y}] Horizontal expand...", end=" ", flush=True)
-            start = time.time()
+    def is_done(x: int, y: int) -> bool:
+        return manifest.is_fresh(f"{x}/{y}", tile_fingerprint, tile_path(output_dir, x, y))
+
+    tasks = {}
+    for tile in contexts:
+        owned = [tile, seed[1]] if seed is not None and tile == seed[0] else [tile]
+        if all(is_done(*t) for t in owned):
+            for t in owned:
+                styled[t] = load_image(tile_path(output_dir, *t))
+            continue
 
-            styled_left = styled[first_row_y].get(x_prev) or load_styled(x_prev, first_row_y)
-            if styled_left is None:
-                print("✗ Missing left neighbor!")
-                continue
-
-            raw_right = load_image(grid[first_row_y][x])
-            new_styled = generate_horizontal(styled_left, raw_right, user_prompt, temperature, api_key)
-            styled[first_row_y][x] = new_styled
-            save_tile(x, first_row_y, new_styled)
-            generated += 1
-            print(f"✓ ({time.time() - start:.1f}s)")
-
-    # ==========================================================================
-    # PHASE 2: Remaining rows - L-shaped context
-    # ==========================================================================
-
-    remaining_ys = sorted([y for y in grid.keys() if y != first_row_y])
-
-    for row_idx, y in enumerate(remaining_ys):
-        y_above = first_row_y if row_idx == 0 else remaining_ys[row_idx - 1]
-        row_xs = sorted(grid[y].keys())
-
-        print(f"\n  Phase 2: Row y={y} (above: y={y_above})")
-
-        for col_idx, x in enumerate(row_xs):
-            if tile_exists(x, y):
-                styled[y][x] = load_image(get_output_path(x, y))
-                print(f"    [{x},{y}] Exists, skipped")
-                continue
-
-            raw_tile = load_image(grid[y][x])
-
-            # First column of row - use vertical expansion if no left neighbor
-            if col_idx == 0:
-                # Check if we have a tile above
-                styled_above = load_styled(x, y_above)
-
-                if styled_above is None:
-                    # No above tile, style alone
-                    print(f"    [{x},{y}] Single (no above)...", end=" ", flush=True)
-                    start = time.time()
-                    styled_a, _ = generate_seed_pair(raw_tile, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = styled_a
-                    save_tile(x, y, styled_a)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-                else:
-                    # Vertical expansion
-                    print(f"    [{x},{y}] Vertical expand...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_vertical_pair(styled_above, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-            else:
-                # L-shaped context: above-left, above, left, new
-                x_left = row_xs[col_idx - 1]
-
-                styled_above_left = load_styled(x_left, y_above)
-                styled_above = load_styled(x, y_above)
-                styled_left = load_styled(x_left, y)
-
-                # Check what context we have
-                if styled_above_left and styled_above and styled_left:
-                    # Full L-shaped context
-                    print(f"    [{x},{y}] L-shaped expand...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_l_shaped(
-                        styled_above_left, styled_above, styled_left, raw_tile,
-                        user_prompt, temperature, api_key
-                    )
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-                elif styled_left:
-                    # Only left neighbor - horizontal expansion
-                    print(f"    [{x},{y}] Horizontal expand (partial)...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_horizontal(styled_left, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-                elif styled_above:
-                    # Only above neighbor - vertical expansion
-                    print(f"    [{x},{y}] Vertical expand (partial)...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_vertical_pair(styled_above, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-                else:
-                    # No context available - style alone
-                    print(f"    [{x},{y}] Single (no context)...", end=" ", flush=True)
-                    start = time.time()
-                    styled_a, _ = generate_seed_pair(raw_tile, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = styled_a
-                    save_tile(x, y, styled_a)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
+        def run(tile=tile):
+            start = time.time()
+            mode, images = style_l_shaped_tile(
+                tile, grid, styled, contexts, seed, user_prompt, temperature, api_key
+            )
+            for (x, y), img in images.items():
+                save_tile(tile_path(output_dir, x, y), img)
+            return mode, images, time.time() - start
+
+        tasks[tile] = run
+
+    print(f"\n  Styling {len(tasks)} tiles, {len(contexts) - len(tasks)} resumed "
+          f"({max_in_flight} in flight)")
+
+    def record(tile, result, error):
+        nonlocal generated
+        if error is not None:
+            print(f"    [{tile[0]},{tile[1]}] ✗ Error: {error}")
+            raise error
+        mode, images, elapsed = result
+        for (x, y), img in images.items():
+            styled[(x, y)] = img
+            manifest.record(f"{x}/{y}", tile_fingerprint)
+        generated += len(images)
+        labels = "+".join(f"[{x},{y}]" for x, y in images)
+        print(f"    {labels} {mode} ✓ ({elapsed:.1f}s)")
+
+    scheduler = WavefrontScheduler(max_in_flight=max_in_flight)
+    scheduler.run(tasks, l_shaped_dependencies(contexts, seed), record, priority=wavefront_priority)
 
     return generated
 
@@ -726,6 +702,12 @@ Examples:
         type=str,
         help="Google AI API key (or set GOOGLE_API_KEY env var)",
     )
+    parser.add_argument(
+        "--max-in-flight", "-j",
+        type=int,
+        default=4,
+        help="Maximum concurrent API requests (tiles on the same wavefront)",
+    )
 
     args = parser.parse_args()
 
@@ -742,6 +724,7 @@ Examples:
     print(f"  Output:      {output_dir}")
     print(f"  Style:       {args.style_name}")
     print(f"  Temperature: {args.temperature}")
+    print(f"  In flight:   {args.max_in_flight}")
     print(f"  Prompt:      {args.prompt[:50]}{'...' if len(args.prompt) > 50 else ''}")
     print(f"{'═' * 50}")
 
@@ -765,6 +748,7 @@ Examples:
             user_prompt=args.prompt,
             temperature=args.temperature,
             api_key=args.api_key,
+            max_in_flight=args.max_in_flight,
         )
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
@@ -13,6 +13,12 @@ Why Two Passes?
     Pass 1 only has context from top-left (already processed tiles).
     Pass 2 has ALL neighbors styled, so each tile sees its actual surroundings.
 
+Scheduling:
+    A Pass 1 tile only waits for its left and upper neighbors, so all tiles
+    on one anti-diagonal are styled concurrently (--max-in-flight). Pass 2
+    tiles only read Pass 1 results and run concurrently as well. Rate limits
+    are retried with backoff, and re-running resumes where a run stopped.
+
 Usage:
     python scripts/tile_pipeline/nano_stitcher_v2.py \\
         --source public/tiles/hybrid-golden_hour \\
@@ -36,8 +42,34 @@ from typing import Iterator
 import requests
 from PIL import Image
 
-# Gemini API configuration
-API_BASE = "https://generativelanguage.googleapis.com/v1beta"
+try:
+    from .provider_cache import default_provider_cache, request_key
+    from .render_manifest import RenderManifest, fingerprint
+    from .wavefront import (
+        RATE_LIMIT_STATUS,
+        RateLimitError,
+        WavefrontScheduler,
+        l_shaped_dependencies,
+        parse_retry_after,
+        plan_l_shaped,
+        wavefront_priority,
+    )
+except ImportError:
+    # Running as a script: siblings are importable as top-level modules
+    from provider_cache import default_provider_cache, request_key
+    from render_manifest import RenderManifest, fingerprint
+    from wavefront import (
+        RATE_LIMIT_STATUS,
+        RateLimitError,
+        WavefrontScheduler,
+        l_shaped_dependencies,
+        parse_retry_after,
+        plan_l_shaped,
+        wavefront_priority,
+    )
+
+# Gemini API configuration (GEMINI_API_BASE points at a stub server for testing)
+API_BASE = os.environ.get("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
 MODEL = "models/gemini-2.5-flash-image"
 
 # Tile dimensions
@@ -129,6 +161,19 @@ def load_image(path: Path) -> Image.Image:
         return img.copy()
 
 
+def tile_path(base_dir: Path, x: int, y: int) -> Path:
+    """Path of a zoom-16 tile under base_dir."""
+    return base_dir / "16" / str(x) / f"{y}.webp"
+
+
+def save_tile(path: Path, img: Image.Image) -> None:
+    """Save a tile atomically so an interrupted run never leaves a truncated file."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+    img.save(tmp_path, "WEBP", quality=90)
+    os.replace(tmp_path, path)
+
+
 def image_to_bytes(img: Image.Image, format: str = "PNG") -> bytes:
     """Convert PIL Image to bytes."""
     buffer = io.BytesIO()
@@ -189,28 +234,25 @@ def get_grid_bounds(grid: dict[int, dict[int, Path]]) -> tuple[int, int, int, in
 # GEMINI API CALLS
 # =============================================================================
 
-def call_gemini(
-    image: Image.Image,
+def request_gemini_image(
+    images: list[bytes],
     prompt: str,
-    expected_size: tuple[int, int],
-    temperature: float = 0.3,
+    temperature: float,
     api_key: str | None = None,
-) -> Image.Image:
-    """Call Gemini API with image and prompt, return styled image."""
+) -> bytes:
+    """Send PNG images + prompt to Gemini and return the generated image bytes."""
     api_key = api_key or os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
     if not api_key:
         raise ValueError("API key required. Set GOOGLE_API_KEY environment variable.")
 
-    img_b64 = image_to_base64(image)
-
     url = f"{API_BASE}/{MODEL}:generateContent?key={api_key}"
+    parts = [
+        {"inline_data": {"mime_type": "image/png", "data": base64.b64encode(data).decode("utf-8")}}
+        for data in images
+    ]
+    parts.append({"text": prompt})
     payload = {
-        "contents": [{
-            "parts": [
-                {"inline_data": {"mime_type": "image/png", "data": img_b64}},
-                {"text": prompt},
-            ]
-        }],
+        "contents": [{"parts": parts}],
         "generationConfig": {
             "responseModalities": ["image", "text"],
             "temperature": temperature,
@@ -226,6 +268,11 @@ def call_gemini(
 
     if response.status_code != 200:
         error_detail = response.text[:500] if response.text else "No details"
+        if response.status_code in RATE_LIMIT_STATUS:
+            raise RateLimitError(
+                f"Gemini API rate limit {response.status_code}: {error_detail}",
+                retry_after=parse_retry_after(response.headers.get("Retry-After")),
+            )
         raise ValueError(f"Gemini API error {response.status_code}: {error_detail}")
 
     result = response.json()
@@ -236,18 +283,42 @@ def call_gemini(
             if "content" in candidate and "parts" in candidate["content"]:
                 for part in candidate["content"]["parts"]:
                     if "inlineData" in part:
-                        img_bytes = base64.b64decode(part["inlineData"]["data"])
-                        img = Image.open(io.BytesIO(img_bytes))
-                        if img.mode != "RGB":
-                            img = img.convert("RGB")
-                        # Resize to expected if different
-                        if img.size != expected_size:
-                            img = img.resize(expected_size, Image.LANCZOS)
-                        return img
+                        return base64.b64decode(part["inlineData"]["data"])
 
     raise ValueError("Gemini did not return an image in the response")
 
 
+def decode_image(data: bytes, expected_size: tuple[int, int]) -> Image.Image:
+    """Decode a generated image as RGB at the expected size."""
+    img = Image.open(io.BytesIO(data))
+    if img.mode != "RGB":
+        img = img.convert("RGB")
+    # Resize to expected if different
+    if img.size != expected_size:
+        img = img.resize(expected_size, Image.LANCZOS)
+    return img
+
+
+def call_gemini(
+    image: Image.Image,
+    prompt: str,
+    expected_size: tuple[int, int],
+    temperature: float = 0.3,
+    api_key: str | None = None,
+) -> Image.Image:
+    """Call Gemini API with image and prompt, return styled image.
+
+    Responses are cached by request content (see provider_cache), so
+    re-running with unchanged inputs makes no API call.
+    """
+    image_bytes = image_to_bytes(image)
+    key = request_key("gemini", MODEL, prompt, temperature, images=[image_bytes])
+    data, _ = default_provider_cache().fetch(
+        key, lambda: request_gemini_image([image_bytes], prompt, temperature, api_key)
+    )
+    return decode_image(data, expected_size)
+
+
 def call_gemini_with_reference(
     context_image: Image.Image,
     style_reference: Image.Image,
@@ -257,55 +328,17 @@ def call_gemini_with_reference(
     api_key: str | None = None,
 ) -> Image.Image:
     """Call Gemini API with context image + style reference, return styled image."""
-    api_key = api_key or os.environ.get("GOOGLE_API_KEY") or os.environ.get("GEMINI_API_KEY")
-    if not api_key:
-        raise ValueError("API key required. Set GOOGLE_API_KEY environment variable.")
-
-    context_b64 = image_to_base64(context_image)
-    reference_b64 = image_to_base64(style_reference)
-
-    url = f"{API_BASE}/{MODEL}:generateContent?key={api_key}"
-    payload = {
-        "contents": [{
-            "parts": [
-                {"inline_data": {"mime_type": "image/png", "data": context_b64}},
-                {"inline_data": {"mime_type": "image/png", "data": reference_b64}},
-                {"text": prompt},
-            ]
-        }],
-        "generationConfig": {
-            "responseModalities": ["image", "text"],
-            "temperature": temperature,
-        },
-    }
-
-    response = requests.post(
-        url,
-        headers={"Content-Type": "application/json"},
-        json=payload,
-        timeout=300,
+    context_bytes = image_to_bytes(context_image)
+    reference_bytes = image_to_bytes(style_reference)
+    key = request_key(
+        "gemini", MODEL, prompt, temperature,
+        images=[context_bytes], references=[reference_bytes],
     )
-
-    if response.status_code != 200:
-        error_detail = response.text[:500] if response.text else "No details"
-        raise ValueError(f"Gemini API error {response.status_code}: {error_detail}")
-
-    result = response.json()
-
-    if "candidates" in result:
-        for candidate in result["candidates"]:
-            if "content" in candidate and "parts" in candidate["content"]:
-                for part in candidate["content"]["parts"]:
-                    if "inlineData" in part:
-                        img_bytes = base64.b64decode(part["inlineData"]["data"])
-                        img = Image.open(io.BytesIO(img_bytes))
-                        if img.mode != "RGB":
-                            img = img.convert("RGB")
-                        if img.size != expected_size:
-                            img = img.resize(expected_size, Image.LANCZOS)
-                        return img
-
-    raise ValueError("Gemini did not return an image in the response")
+    data, _ = default_provider_cache().fetch(
+        key,
+        lambda: request_gemini_image([context_bytes, reference_bytes], prompt, temperature, api_key),
+    )
+    return decode_image(data, expected_size)
 
 
 def create_style_reference(
@@ -528,16 +561,107 @@ Return exactly 512×1024 pixels. Keep TOP unchanged, style only BOTTOM."""
 # MAIN PROCESSING ORCHESTRATION
 # =============================================================================
 
+def style_l_shaped_tile(
+    tile: tuple[int, int],
+    grid: dict[int, dict[int, Path]],
+    styled: dict[tuple[int, int], Image.Image],
+    contexts: dict,
+    seed: tuple | None,
+    user_prompt: str,
+    temperature: float,
+    api_key: str | None,
+) -> tuple[str, dict[tuple[int, int], Image.Image]]:
+    """
+    Pass 1 for one task: style a tile against its styled left/upper neighbors.
+
+    Picks the richest context available (seed pair, L-shaped, horizontal,
+    vertical, or alone). The seed task returns both seed tiles.
+    Returns (description, {(x, y): styled tile}).
+    """
+    x, y = tile
+    raw_tile = load_image(grid[y][x])
+
+    if seed is not None and tile == seed[0]:
+        x1, _ = seed[1]
+        styled_a, styled_b = generate_seed_pair(
+            raw_tile, load_image(grid[y][x1]), user_prompt, temperature, api_key
+        )
+        return "Seed pair", {tile: styled_a, seed[1]: styled_b}
+
+    context = contexts[tile]
+    styled_left = styled.get(context.left)
+    styled_above = styled.get(context.above)
+    styled_above_left = styled.get(context.above_left)
+
+    if styled_above_left and styled_above and styled_left:
+        mode = "L-shaped expand"
+        new_styled = generate_l_shaped(
+            styled_above_left, styled_above, styled_left, raw_tile,
+            user_prompt, temperature, api_key
+        )
+    elif styled_left:
+        mode = "Horizontal expand"
+        new_styled = generate_horizontal(styled_left, raw_tile, user_prompt, temperature, api_key)
+    elif styled_above:
+        mode = "Vertical expand"
+        new_styled = generate_vertical_pair(styled_above, raw_tile, user_prompt, temperature, api_key)
+    else:
+        # No context: style alone (seed pair with the tile duplicated, keep left)
+        mode = "Single"
+        new_styled, _ = generate_seed_pair(raw_tile, raw_tile, user_prompt, temperature, api_key)
+
+    return mode, {tile: new_styled}
+
+
+def build_pass2_context(
+    styled: dict[tuple[int, int], Image.Image],
+    raw_tile: Image.Image,
+    x: int,
+    y: int,
+) -> tuple[Image.Image, str] | None:
+    """
+    Build the 2×2 Pass 2 context: 3 styled Pass 1 neighbors + the raw tile.
+
+    Returns (context_2x2, position of the raw tile), or None if no 2×2
+    block around the tile is fully styled.
+    """
+    above = styled.get((x, y - 1))
+    below = styled.get((x, y + 1))
+    left = styled.get((x - 1, y))
+    right = styled.get((x + 1, y))
+
+    # Try to find best configuration (prefer having more context)
+    if above and left and styled.get((x - 1, y - 1)):
+        return stitch_2x2(styled[(x - 1, y - 1)], above, left, raw_tile), 'br'
+    if above and right and styled.get((x + 1, y - 1)):
+        return stitch_2x2(above, styled[(x + 1, y - 1)], raw_tile, right), 'bl'
+    if below and left and styled.get((x - 1, y + 1)):
+        return stitch_2x2(left, raw_tile, styled[(x - 1, y + 1)], below), 'tr'
+    if below and right and styled.get((x + 1, y + 1)):
+        return stitch_2x2(raw_tile, right, below, styled[(x + 1, y + 1)]), 'tl'
+    return None
+
+
 def process_grid(
     grid: dict[int, dict[int, Path]],
     output_dir: Path,
     user_prompt: str,
     temperature: float = 0.3,
     api_key: str | None = None,
+    max_in_flight: int = 4,
+    work_dir: Path | None = None,
 ) -> int:
     """
     Process entire grid with context-aware stitching.
-    Returns number of tiles generated.
+
+    Pass 1 tiles only depend on their left and upper neighbors, so each
+    anti-diagonal is styled concurrently (up to max_in_flight requests).
+    Pass 1 results are kept in work_dir (default .stitch_cache/<style>/pass1)
+    so Pass 2 can be resumed; every Pass 2 tile only reads Pass 1 tiles and
+    all of them run concurrently. Both passes keep a render manifest, and
+    re-running with the same prompt and temperature skips finished tiles.
+
+    Returns number of tiles generated in Pass 1.
     """
     min_x, min_y, max_x, max_y = get_grid_bounds(grid)
 
@@ -549,294 +673,120 @@ def process_grid(
     print(f"  X range: {min_x} to {max_x}")
     print(f"  Y range: {min_y} to {max_y}")
 
-    # Storage for styled tiles
-    styled: dict[int, dict[int, Image.Image]] = defaultdict(dict)
-    generated = 0
-
-    # Helper to get output path
-    def get_output_path(x: int, y: int) -> Path:
-        # Assume zoom 16 (most common)
-        return output_dir / "16" / str(x) / f"{y}.webp"
-
-    # Helper to check if already exists
-    def tile_exists(x: int, y: int) -> bool:
-        return get_output_path(x, y).exists()
-
-    # Helper to save tile
-    def save_tile(x: int, y: int, img: Image.Image):
-        path = get_output_path(x, y)
-        path.parent.mkdir(parents=True, exist_ok=True)
-        img.save(path, "WEBP", quality=90)
-
-    # Helper to load styled tile from disk if exists
-    def load_styled(x: int, y: int) -> Image.Image | None:
-        if (y, x) in [(y_, x_) for y_ in styled for x_ in styled[y_]]:
-            return styled[y][x]
-        path = get_output_path(x, y)
-        if path.exists():
-            return load_image(path)
-        return None
-
-    # ==========================================================================
-    # PHASE 1: First row - seed pair + horizontal expansion
-    # ==========================================================================
-
-    first_row_y = min_y
-    first_row_xs = sorted(grid[first_row_y].keys())
-
-    if len(first_row_xs) == 0:
-        print("  ❌ No tiles in first row")
-        return 0
-
-    print(f"\n  Phase 1: First row (y={first_row_y})")
-
-    if len(first_row_xs) == 1:
-        # Single tile in row - just style it alone
-        x = first_row_xs[0]
-        if not tile_exists(x, first_row_y):
-            print(f"    [{x},{first_row_y}] Single tile...", end=" ", flush=True)
-            raw = load_image(grid[first_row_y][x])
-            # Use seed pair logic but with same tile duplicated (will cut left)
-            styled_a, _ = generate_seed_pair(raw, raw, user_prompt, temperature, api_key)
-            styled[first_row_y][x] = styled_a
-            save_tile(x, first_row_y, styled_a)
-            generated += 1
-            print("✓")
-        else:
-            styled[first_row_y][x] = load_image(get_output_path(x, first_row_y))
-            print(f"    [{x},{first_row_y}] Exists, skipped")
-
-    else:
-        # Multiple tiles - seed pair then horizontal expansion
-        x0, x1 = first_row_xs[0], first_row_xs[1]
-
-        # Check if seed pair already done
-        if tile_exists(x0, first_row_y) and tile_exists(x1, first_row_y):
-            styled[first_row_y][x0] = load_image(get_output_path(x0, first_row_y))
-            styled[first_row_y][x1] = load_image(get_output_path(x1, first_row_y))
-            print(f"    [{x0},{first_row_y}]+[{x1},{first_row_y}] Seed pair exists, skipped")
-        else:
-            print(f"    [{x0},{first_row_y}]+[{x1},{first_row_y}] Seed pair...", end=" ", flush=True)
-            start = time.time()
-            raw_a = load_image(grid[first_row_y][x0])
-            raw_b = load_image(grid[first_row_y][x1])
-            styled_a, styled_b = generate_seed_pair(raw_a, raw_b, user_prompt, temperature, api_key)
-            styled[first_row_y][x0] = styled_a
-            styled[first_row_y][x1] = styled_b
-            save_tile(x0, first_row_y, styled_a)
-            save_tile(x1, first_row_y, styled_b)
-            generated += 2
-            print(f"✓ ({time.time() - start:.1f}s)")
-
-        # Horizontal expansion for remaining tiles
-        for i in range(2, len(first_row_xs)):
-            x = first_row_xs[i]
-            x_prev = first_row_xs[i - 1]
-
-            if tile_exists(x, first_row_y):
-                styled[first_row_y][x] = load_image(get_output_path(x, first_row_y))
-                print(f"    [{x},{first_row_y}] Exists, skipped")
-                continue
-
-            print(f"    [{x},{first_row_y}] Horizontal expand...", end=" ", flush=True)
-            start = time.time()
-
-            styled_left = styled[first_row_y].get(x_prev) or load_styled(x_prev, first_row_y)
-            if styled_left is None:
-                print("✗ Missing left neighbor!")
-                continue
+    pass1_dir = (work_dir or Path(".stitch_cache") / output_dir.name) / "pass1"
+    scheduler = WavefrontScheduler(max_in_flight=max_in_flight)
 
-            raw_right = load_image(grid[first_row_y][x])
-            new_styled = generate_horizontal(styled_left, raw_right, user_prompt, temperature, api_key)
-            styled[first_row_y][x] = new_styled
-            save_tile(x, first_row_y, new_styled)
-            generated += 1
-            print(f"✓ ({time.time() - start:.1f}s)")
+    # Pass 1 tiles, written only from the scheduling thread
+    styled: dict[tuple[int, int], Image.Image] = {}
+    generated = 0
 
     # ==========================================================================
-    # PHASE 2: Remaining rows - L-shaped context
+    # PASS 1: Seed pair, then L-shaped context, one wavefront at a time
     # ==========================================================================
 
-    remaining_ys = sorted([y for y in grid.keys() if y != first_row_y])
+    contexts, seed = plan_l_shaped(grid)
+    pass1_manifest = RenderManifest(pass1_dir, save_interval=0.0)
+    pass1_fingerprint = fingerprint({"pass": 1, "prompt": user_prompt, "temperature": temperature})
 
-    for row_idx, y in enumerate(remaining_ys):
-        y_above = first_row_y if row_idx == 0 else remaining_ys[row_idx - 1]
-        row_xs = sorted(grid[y].keys())
+    def pass1_done(x: int, y: int) -> bool:
+        return pass1_manifest.is_fresh(f"{x}/{y}", pass1_fingerprint, tile_path(pass1_dir, x, y))
 
-        print(f"\n  Phase 2: Row y={y} (above: y={y_above})")
-
-        for col_idx, x in enumerate(row_xs):
-            if tile_exists(x, y):
-                styled[y][x] = load_image(get_output_path(x, y))
-                print(f"    [{x},{y}] Exists, skipped")
-                continue
+    tasks = {}
+    for tile in contexts:
+        owned = [tile, seed[1]] if seed is not None and tile == seed[0] else [tile]
+        if all(pass1_done(*t) for t in owned):
+            for t in owned:
+                styled[t] = load_image(tile_path(pass1_dir, *t))
+            continue
 
-            raw_tile = load_image(grid[y][x])
-
-            # First column of row - use vertical expansion if no left neighbor
-            if col_idx == 0:
-                # Check if we have a tile above
-                styled_above = load_styled(x, y_above)
-
-                if styled_above is None:
-                    # No above tile, style alone
-                    print(f"    [{x},{y}] Single (no above)...", end=" ", flush=True)
-                    start = time.time()
-                    styled_a, _ = generate_seed_pair(raw_tile, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = styled_a
-                    save_tile(x, y, styled_a)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-                else:
-                    # Vertical expansion
-                    print(f"    [{x},{y}] Vertical expand...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_vertical_pair(styled_above, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-            else:
-                # L-shaped context: above-left, above, left, new
-                x_left = row_xs[col_idx - 1]
-
-                styled_above_left = load_styled(x_left, y_above)
-                styled_above = load_styled(x, y_above)
-                styled_left = load_styled(x_left, y)
-
-                # Check what context we have
-                if styled_above_left and styled_above and styled_left:
-                    # Full L-shaped context
-                    print(f"    [{x},{y}] L-shaped expand...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_l_shaped(
-                        styled_above_left, styled_above, styled_left, raw_tile,
-                        user_prompt, temperature, api_key
-                    )
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-                elif styled_left:
-                    # Only left neighbor - horizontal expansion
-                    print(f"    [{x},{y}] Horizontal expand (partial)...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_horizontal(styled_left, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-                elif styled_above:
-                    # Only above neighbor - vertical expansion
-                    print(f"    [{x},{y}] Vertical expand (partial)...", end=" ", flush=True)
-                    start = time.time()
-                    new_styled = generate_vertical_pair(styled_above, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = new_styled
-                    save_tile(x, y, new_styled)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
-
-                else:
-                    # No context available - style alone
-                    print(f"    [{x},{y}] Single (no context)...", end=" ", flush=True)
-                    start = time.time()
-                    styled_a, _ = generate_seed_pair(raw_tile, raw_tile, user_prompt, temperature, api_key)
-                    styled[y][x] = styled_a
-                    save_tile(x, y, styled_a)
-                    generated += 1
-                    print(f"✓ ({time.time() - start:.1f}s)")
+        def run(tile=tile):
+            start = time.time()
+            mode, images = style_l_shaped_tile(
+                tile, grid, styled, contexts, seed, user_prompt, temperature, api_key
+            )
+            for (x, y), img in images.items():
+                save_tile(tile_path(pass1_dir, x, y), img)
+            return mode, images, time.time() - start
+
+        tasks[tile] = run
+
+    print(f"\n  Pass 1: {len(tasks)} to style, {len(contexts) - len(tasks)} resumed "
+          f"({max_in_flight} in flight)")
+
+    def record_pass1(tile, result, error):
+        nonlocal generated
+        if error is not None:
+            print(f"    [{tile[0]},{tile[1]}] ✗ Error: {error}")
+            raise error
+        mode, images, elapsed = result
+        for (x, y), img in images.items():
+            styled[(x, y)] = img
+            pass1_manifest.record(f"{x}/{y}", pass1_fingerprint)
+        generated += len(images)
+        labels = "+".join(f"[{x},{y}]" for x, y in images)
+        print(f"    {labels} {mode} ✓ ({elapsed:.1f}s)")
+
+    scheduler.run(
+        tasks, l_shaped_dependencies(contexts, seed), record_pass1, priority=wavefront_priority
+    )
 
     # ==========================================================================
     # PASS 2: Regenerate with style reference + full 2×2 context
     # ==========================================================================
 
     print(f"\n  Creating style reference from Pass 1...")
-    style_reference = create_style_reference(styled, grid)
+    styled_rows: dict[int, dict[int, Image.Image]] = defaultdict(dict)
+    for (x, y), img in styled.items():
+        styled_rows[y][x] = img
+    style_reference = create_style_reference(styled_rows, grid)
     print(f"    Style reference: {style_reference.size}")
 
-    print(f"\n  Pass 2: Regenerate with style reference + 2×2 context")
-
-    all_ys = sorted(grid.keys())
-    all_xs = sorted(set(x for row in grid.values() for x in row.keys()))
+    pass2_manifest = RenderManifest(output_dir, save_interval=0.0)
+    pass2_fingerprint = fingerprint({"pass": 2, "prompt": user_prompt, "temperature": temperature})
 
-    for y in all_ys:
+    tasks = {}
+    for y in sorted(grid.keys()):
         for x in sorted(grid[y].keys()):
-            # Get all 4 neighbors from Pass 1 (styled)
-            styled_above = styled.get(y - 1, {}).get(x)
-            styled_below = styled.get(y + 1, {}).get(x)
-            styled_left = styled.get(y, {}).get(x - 1)
-            styled_right = styled.get(y, {}).get(x + 1)
-
-            # Get raw source tile
-            raw_tile = load_image(grid[y][x])
-
-            # Determine best 2×2 configuration based on available neighbors
-            # We need 3 styled neighbors + 1 raw tile in a 2×2 grid
-
-            context_2x2 = None
-            position = None
-
-            # Try to find best configuration (prefer having more context)
-            if styled_above and styled_left and styled.get(y - 1, {}).get(x - 1):
-                # Can use top-left, top, left + raw at bottom-right
-                context_2x2 = stitch_2x2(
-                    styled.get(y - 1, {}).get(x - 1),  # above-left
-                    styled_above,                       # above
-                    styled_left,                        # left
-                    raw_tile                            # raw at bottom-right
-                )
-                position = 'br'
-
-            elif styled_above and styled_right and styled.get(y - 1, {}).get(x + 1):
-                # Can use top, top-right, raw at bottom-left, right
-                context_2x2 = stitch_2x2(
-                    styled_above,                       # above
-                    styled.get(y - 1, {}).get(x + 1),  # above-right
-                    raw_tile,                           # raw at bottom-left
-                    styled_right                        # right
-                )
-                position = 'bl'
-
-            elif styled_below and styled_left and styled.get(y + 1, {}).get(x - 1):
-                # Can use left, raw at top-right, below-left, below
-                context_2x2 = stitch_2x2(
-                    styled_left,                        # left
-                    raw_tile,                           # raw at top-right
-                    styled.get(y + 1, {}).get(x - 1),  # below-left
-                    styled_below                        # below
-                )
-                position = 'tr'
-
-            elif styled_below and styled_right and styled.get(y + 1, {}).get(x + 1):
-                # Can use raw at top-left, right, below, below-right
-                context_2x2 = stitch_2x2(
-                    raw_tile,                           # raw at top-left
-                    styled_right,                       # right
-                    styled_below,                       # below
-                    styled.get(y + 1, {}).get(x + 1)   # below-right
-                )
-                position = 'tl'
-
-            if context_2x2 is None:
-                # Not enough neighbors for 2×2, skip Pass 2 for this tile
-                print(f"    [{x},{y}] Skip (insufficient neighbors)")
+            if (x, y) not in styled:
+                continue
+            output_path = tile_path(output_dir, x, y)
+            if pass2_manifest.is_fresh(f"{x}/{y}", pass2_fingerprint, output_path):
                 continue
 
-            print(f"    [{x},{y}] Pass 2 ({position})...", end=" ", flush=True)
-            start = time.time()
-
-            try:
+            def run(x=x, y=y, output_path=output_path):
+                start = time.time()
+                raw_tile = load_image(grid[y][x])
+                context = build_pass2_context(styled, raw_tile, x, y)
+                if context is None:
+                    # Not enough neighbors for 2×2, keep the Pass 1 tile
+                    save_tile(output_path, styled[(x, y)])
+                    return None, 0.0
+                context_2x2, position = context
                 new_styled = generate_with_reference(
                     context_2x2, style_reference, position, user_prompt, temperature, api_key
                 )
-                styled[y][x] = new_styled
-                save_tile(x, y, new_styled)
-                print(f"✓ ({time.time() - start:.1f}s)")
-            except Exception as e:
-                print(f"✗ Error: {e}")
+                save_tile(output_path, new_styled)
+                return position, time.time() - start
+
+            tasks[(x, y)] = run
+
+    print(f"\n  Pass 2: Regenerate {len(tasks)} tiles with style reference + 2×2 context")
+
+    def record_pass2(tile, result, error):
+        x, y = tile
+        if error is not None:
+            # Fall back to the Pass 1 tile; the next run retries this one
+            save_tile(tile_path(output_dir, x, y), styled[tile])
+            print(f"    [{x},{y}] ✗ Error: {error}")
+            return
+        position, elapsed = result
+        pass2_manifest.record(f"{x}/{y}", pass2_fingerprint)
+        if position is None:
+            print(f"    [{x},{y}] Skip (insufficient neighbors)")
+        else:
+            print(f"    [{x},{y}] Pass 2 ({position}) ✓ ({elapsed:.1f}s)")
+
+    scheduler.run(tasks, {}, record_pass2, priority=wavefront_priority)
 
     return generated
 
@@ -965,6 +915,17 @@ Examples:
         type=str,
         help="Google AI API key (or set GOOGLE_API_KEY env var)",
     )
+    parser.add_argument(
+        "--max-in-flight", "-j",
+        type=int,
+        default=4,
+        help="Maximum concurrent API requests (tiles on the same wavefront)",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        help="Directory for Pass 1 tiles (default: .stitch_cache/<style-name>)",
+    )
 
     args = parser.parse_args()
 
@@ -981,6 +942,7 @@ Examples:
     print(f"  Output:      {output_dir}")
     print(f"  Style:       {args.style_name}")
     print(f"  Temperature: {args.temperature}")
+    print(f"  In flight:   {args.max_in_flight}")
     print(f"  Prompt:      {args.prompt[:50]}{'...' if len(args.prompt) > 50 else ''}")
     print(f"{'═' * 50}")
 
@@ -1004,6 +966,8 @@ Examples:
             user_prompt=args.prompt,
             temperature=args.temperature,
             api_key=args.api_key,
+            max_in_flight=args.max_in_flight,
+            work_dir=args.work_dir,
         )
     except KeyboardInterrupt:
         print("\n\n⚠️  Interrupted by user")
@@ -40,6 +40,12 @@ from typing import Optional
 import requests
 from PIL import Image
 
+try:
+    from .provider_cache import default_provider_cache, request_key
+except ImportError:
+    # Running as a script: siblings are importable as top-level modules
+    from provider_cache import default_provider_cache, request_key
+
 # API configurations
 GEMINI_API_BASE = "https://generativelanguage.googleapis.com/v1beta"
 GEMINI_MODEL = "models/gemini-2.5-flash-image"
@@ -90,11 +96,16 @@ def load_image(path: Path) -> Image.Image:
         return img.copy()
 
 
-def image_to_base64(img: Image.Image) -> str:
-    """Convert PIL Image to base64 string."""
+def image_to_bytes(img: Image.Image) -> bytes:
+    """Convert PIL Image to PNG bytes."""
     buffer = io.BytesIO()
     img.save(buffer, format="PNG")
-    return base64.b64encode(buffer.getvalue()).decode("utf-8")
+    return buffer.getvalue()
+
+
+def image_to_base64(img: Image.Image) -> str:
+    """Convert PIL Image to base64 string."""
+    return base64.b64encode(image_to_bytes(img)).decode("utf-8")
 
 
 def stitch_2x2(tiles: list[Image.Image]) -> Image.Image:
@@ -371,14 +382,29 @@ def call_provider(
     api_key: Optional[str] = None,
     style_reference: Optional[Image.Image] = None,
 ) -> Image.Image:
-    """Dispatch to the appropriate provider."""
+    """Dispatch to the appropriate provider.
+
+    Responses are cached by request content (see provider_cache), so
+    re-running with unchanged inputs makes no API call.
+    """
     if provider == "gemini":
-        return call_gemini(image, prompt, temperature, api_key, style_reference)
+        call, model = call_gemini, GEMINI_MODEL
     elif provider == "openai":
-        return call_openai(image, prompt, temperature, api_key, style_reference)
+        call, model = call_openai, OPENAI_MODEL
     else:
         raise ValueError(f"Unknown provider: {provider}. Use one of: {PROVIDERS}")
 
+    references = [image_to_bytes(style_reference)] if style_reference is not None else []
+    key = request_key(
+        provider, model, prompt, temperature,
+        images=[image_to_bytes(image)], references=references,
+    )
+    data, _ = default_provider_cache().fetch(
+        key,
+        lambda: image_to_bytes(call(image, prompt, temperature, api_key, style_reference)),
+    )
+    return Image.open(io.BytesIO(data)).convert("RGB")
+
 
 # =============================================================================
 # MAIN PROCESSING
@@ -0,0 +1,263 @@
+"""
+Content-addressed response cache for AI styling providers.
+
+Responses are keyed by a hash of what was actually sent: provider, model,
+prompt, temperature, every input and reference image (as bytes) and any
+other request parameters. Tile coordinates and style names only matter
+as far as they change the request. Re-running an area or an experiment
+with unchanged inputs therefore makes no API calls, and changing a prompt
+or an upstream render can never return a stale result.
+
+Entries are plain files under the cache directory. When the directory
+grows past ``max_bytes``, the least recently used entries are removed.
+Concurrent identical requests within a process are coalesced: one thread
+calls the provider and the others wait for its result.
+
+Example:
+    cache = default_provider_cache()
+    key = request_key("gemini", MODEL, prompt, 0.3, images=[tile_png])
+    image_bytes, cached = cache.fetch(key, lambda: call_api(tile_png, prompt))
+"""
+
+import hashlib
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Callable, Iterable, Optional
+
+
+DEFAULT_CACHE_DIR = Path(".cache") / "provider_responses"
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+
+# Bump to invalidate every cached response (e.g. if the key layout changes)
+KEY_VERSION = 1
+
+
+def request_key(
+    provider: str,
+    model: str,
+    prompt: str,
+    temperature: Optional[float] = None,
+    images: Iterable[bytes] = (),
+    references: Iterable[bytes] = (),
+    params: Optional[dict[str, Any]] = None,
+) -> str:
+    """Hash everything that determines a provider response.
+
+    Args:
+        provider: Provider ID ('gemini', 'openai', 'replicate', ...)
+        model: Model name or version
+        prompt: Full prompt text as sent
+        temperature: Sampling temperature, if the provider takes one
+        images: Input image bytes, in request order
+        references: Style/mood reference image bytes, in request order
+        params: Any other request parameters (size, seed, strength, ...)
+
+    Returns:
+        Hex digest identifying the request
+    """
+    digest = hashlib.sha256()
+    header = {
+        "version": KEY_VERSION,
+        "provider": provider,
+        "model": model,
+        "temperature": temperature,
+        "params": params or {},
+    }
+    digest.update(json.dumps(header, sort_keys=True, default=str).encode())
+    digest.update(b"\0prompt\0" + prompt.encode())
+    for role, blobs in (("image", images), ("reference", references)):
+        for blob in blobs:
+            digest.update(f"\0{role}:{len(blob)}\0".encode())
+            digest.update(blob)
+    return digest.hexdigest()
+
+
+class ProviderCache:
+    """Disk-backed, size-bounded LRU cache of provider responses.
+
+    Use ``ProviderCache.shared(cache_dir)`` rather than the constructor so
+    that every styler writing to one directory also shares the in-flight
+    request table (and therefore coalesces).
+    """
+
+    _instances: dict[Path, "ProviderCache"] = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, cache_dir: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        """Open (or create) a cache directory.
+
+        Args:
+            cache_dir: Directory holding cached responses
+            max_bytes: Total size above which old entries are evicted
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+        self._lock = threading.Lock()
+        self._in_flight: dict[str, Future] = {}
+        # key -> (size, last use); rebuilt from the directory on open
+        self._entries: dict[str, tuple[int, float]] = {}
+        self._total_bytes = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        for path in self.cache_dir.glob("*/*.bin"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            self._entries[path.stem] = (stat.st_size, stat.st_mtime)
+            self._total_bytes += stat.st_size
+
+    @classmethod
+    def shared(cls, cache_dir: Path, max_bytes: Optional[int] = None) -> "ProviderCache":
+        """Process-wide cache instance for a directory."""
+        resolved = Path(cache_dir).resolve()
+        with cls._instances_lock:
+            cache = cls._instances.get(resolved)
+            if cache is None:
+                cache = cls(resolved, max_bytes or DEFAULT_MAX_BYTES)
+                cls._instances[resolved] = cache
+            elif max_bytes is not None:
+                cache.max_bytes = max_bytes
+            return cache
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / key[:2] / f"{key}.bin"
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return a cached response and mark it as recently used."""
+        path = self._path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(key)
+            return None
+
+        now = time.time()
+        try:
+            os.utime(path, (now, now))
+        except OSError:
+            pass
+        with self._lock:
+            self._remember(key, len(data), now)
+        return data
+
+    def put(self, key: str, data: bytes) -> None:
+        """Store a response atomically, evicting old entries if over budget."""
+        path = self._path(key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        tmp_path.write_bytes(data)
+        os.replace(tmp_path, path)
+
+        with self._lock:
+            self._remember(key, len(data), time.time())
+            self._evict()
+
+    def fetch(
+        self,
+        key: str,
+        call: Callable[[], bytes],
+        refresh: bool = False,
+    ) -> tuple[bytes, bool]:
+        """Return the cached response for key, calling the provider on a miss.
+
+        Identical concurrent requests share one provider call. Errors are
+        not cached: every waiter sees the exception and a later fetch
+        calls the provider again.
+
+        Args:
+            key: Request key from request_key()
+            call: Makes the provider request and returns the response bytes
+            refresh: Skip the lookup and overwrite the entry with a new call
+
+        Returns:
+            (response bytes, True if served from cache or another caller's request)
+        """
+        if not refresh:
+            data = self.get(key)
+            if data is not None:
+                self.hits += 1
+                return data, True
+
+        with self._lock:
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+
+        if not owner:
+            self.coalesced += 1
+            return future.result(), True
+
+        try:
+            # A request that finished between the lookup and registering
+            # this one has already stored the response
+            data = None if refresh else self.get(key)
+            if data is not None:
+                self.hits += 1
+                future.set_result(data)
+                return data, True
+
+            self.misses += 1
+            data = call()
+            self.put(key, data)
+            future.set_result(data)
+            return data, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def _remember(self, key: str, size: int, last_used: float) -> None:
+        previous = self._entries.get(key)
+        if previous is not None:
+            self._total_bytes -= previous[0]
+        self._entries[key] = (size, last_used)
+        self._total_bytes += size
+
+    def _forget(self, key: str) -> None:
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._total_bytes -= previous[0]
+
+    def _evict(self) -> None:
+        """Remove least recently used entries until under budget (lock held)."""
+        if self._total_bytes <= self.max_bytes:
+            return
+        for key, _ in sorted(self._entries.items(), key=lambda item: item[1][1]):
+            if self._total_bytes <= self.max_bytes:
+                break
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+            self._forget(key)
+
+
+def default_provider_cache() -> ProviderCache:
+    """Shared cache in PROVIDER_CACHE_DIR (default .cache/provider_responses).
+
+    PROVIDER_CACHE_MAX_MB bounds its size (default 2048).
+    """
+    cache_dir = Path(os.environ.get("PROVIDER_CACHE_DIR", DEFAULT_CACHE_DIR))
+    max_mb = os.environ.get("PROVIDER_CACHE_MAX_MB")
+    return ProviderCache.shared(cache_dir, int(max_mb) * 1024 ** 2 if max_mb else None)
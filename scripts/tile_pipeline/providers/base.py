@@ -28,6 +28,12 @@ from typing import Optional
 import litellm
 from PIL import Image
 
+try:
+    from ..provider_cache import default_provider_cache, request_key
+except ImportError:
+    # Imported as a top-level package (tile_pipeline on sys.path)
+    from provider_cache import default_provider_cache, request_key
+
 
 # Model mappings for each provider
 PROVIDER_MODELS = {
@@ -181,29 +187,37 @@ class TileStyler:
             images.append(io.BytesIO(processed_mood))
             full_prompt += "\n\nUse the color palette and mood from the reference image provided."
 
-        # Call LiteLLM
-        try:
-            response = litellm.image_edit(
-                model=self.model,
-                image=images if len(images) > 1 else images[0],
-                prompt=full_prompt,
-                size="512x512" if self.provider not in ("stability",) else "1024x1024",
-                response_format="b64_json",
-            )
-        except Exception as e:
-            raise RuntimeError(f"LiteLLM error ({self.provider}): {e}") from e
-
-        # Extract image bytes from response
-        if hasattr(response, "data") and response.data:
-            b64_data = response.data[0].b64_json
-            if b64_data:
-                return StyleResult(
-                    image_bytes=base64.b64decode(b64_data),
-                    provider=self.provider,
+        size = "512x512" if self.provider not in ("stability",) else "1024x1024"
+
+        def call() -> bytes:
+            try:
+                response = litellm.image_edit(
                     model=self.model,
+                    image=images if len(images) > 1 else images[0],
+                    prompt=full_prompt,
+                    size=size,
+                    response_format="b64_json",
                 )
-
-        raise RuntimeError(f"No image returned from {self.provider}")
+            except Exception as e:
+                raise RuntimeError(f"LiteLLM error ({self.provider}): {e}") from e
+
+            # Extract image bytes from response
+            if hasattr(response, "data") and response.data:
+                b64_data = response.data[0].b64_json
+                if b64_data:
+                    return base64.b64decode(b64_data)
+
+            raise RuntimeError(f"No image returned from {self.provider}")
+
+        # Responses are cached by request content, so repeats make no API call
+        key = request_key(
+            self.provider, self.model, full_prompt,
+            images=[processed_tile],
+            references=[processed_mood] if mood_bytes else [],
+            params={"size": size},
+        )
+        image_bytes, _ = default_provider_cache().fetch(key, call)
+        return StyleResult(image_bytes=image_bytes, provider=self.provider, model=self.model)
 
 
 def list_providers() -> dict[str, str]:
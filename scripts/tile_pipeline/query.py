@@ -11,16 +11,21 @@ Uses the existing ray tracing infrastructure for accurate shadow computation
 against 65k buildings and 80k trees.
 """
 
+from collections import OrderedDict
 from dataclasses import dataclass
-from datetime import datetime
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional, Dict, Any, Tuple
+from typing import List, Optional, Dict, Any, Sequence, Tuple, Union
 import json
+import math
 
 import numpy as np
+from numpy.typing import NDArray
 
-from .raytracer import SunPosition, TileRaytracer, RayTracerConfig
+from .city_scene import DEFAULT_CITY_SCENE_DIR, CityScene, open_city_scene
+from .raytracer import SunPosition, TileRaytracer
 from .scene_builder import SceneBuilder, SceneBounds
+from .sources.feature_store import DEFAULT_STORE_DIR
 from .sources.vector import VectorSource, Feature
 
 
@@ -80,44 +85,36 @@ class AmenityResult:
         }
 
 
-def _build_local_scene(
-    lat: float,
-    lng: float,
-    radius_deg: float = 0.002,  # ~200m
-    buildings_path: Path = DEFAULT_BUILDINGS_PATH,
-    trees_path: Path = DEFAULT_TREES_PATH,
-    include_trees: bool = True,
-) -> tuple:
-    """Build a local 3D scene around a query point.
+@dataclass
+class LocalScene:
+    """A built local scene, ready for ray casting."""
+
+    mesh: Any  # trimesh.Trimesh (None for a view into the city scene)
+    bounds: SceneBounds
+    intersector: Any  # trimesh RayMeshIntersector
+
+
+def _create_intersector(mesh) -> Any:
+    """Create a ray intersector, preferring Embree when available."""
+    import trimesh
+    try:
+        return trimesh.ray.ray_pyembree.RayMeshIntersector(mesh)
+    except (ImportError, AttributeError):
+        return trimesh.ray.ray_triangle.RayMeshIntersector(mesh)
 
-    Args:
-        lat: Latitude (WGS84)
-        lng: Longitude (WGS84)
-        radius_deg: Query radius in degrees (~0.002 = ~200m)
-        buildings_path: Path to buildings GeoJSON
-        trees_path: Path to trees GeoJSON
-        include_trees: Whether to include trees in scene
+
+def _build_scene_from_sources(
+    bounds: Tuple[float, float, float, float],
+    buildings_source: VectorSource,
+    trees_source: Optional[VectorSource],
+) -> tuple:
+    """Build a local 3D scene for WGS84 bounds from loaded sources.
 
     Returns:
         Tuple of (mesh, scene_bounds)
     """
-    # Create bounds around query point
-    bounds = (
-        lng - radius_deg,  # west
-        lat - radius_deg,  # south
-        lng + radius_deg,  # east
-        lat + radius_deg,  # north
-    )
-
-    # Load buildings in bounds
-    buildings_source = VectorSource(buildings_path, height_field="height")
     buildings = list(buildings_source.query(bounds, min_height=1))
-
-    # Load trees if requested
-    trees = []
-    if include_trees and trees_path.exists():
-        trees_source = VectorSource(trees_path, height_field="estimated_height")
-        trees = list(trees_source.query(bounds))
+    trees = list(trees_source.query(bounds)) if trees_source is not None else []
 
     # Build scene
     builder = SceneBuilder(bounds, image_size=256)  # Small for point queries
@@ -134,6 +131,379 @@ def _build_local_scene(
     return mesh, builder.bounds
 
 
+class ShadowQueryEngine:
+    """Long-lived engine for repeated shadow queries.
+
+    Loads the building and tree sources once and keeps recently built
+    local scenes (mesh + intersector) in an LRU cache. Scene bounds are the
+    query area plus radius_deg, snapped outward to a grid of cell_size_deg,
+    and the snapped bounds are the cache key: every point inside a cell
+    shares one scene, so repeated point/time queries in the same
+    neighbourhood skip scene building entirely.
+
+    If a city scene (see city_scene.build_city_scene) built from the same
+    buildings and trees exists in city_scene_dir, areas it covers are
+    served from its BVH and no local scene is built at all.
+
+    Example:
+        engine = ShadowQueryEngine()
+        for time in times:
+            engine.shadow_at(47.376, 8.54, time, height=9.0)
+    """
+
+    def __init__(
+        self,
+        buildings_path: Path = DEFAULT_BUILDINGS_PATH,
+        trees_path: Path = DEFAULT_TREES_PATH,
+        radius_deg: float = 0.002,  # ~200m
+        cell_size_deg: float = 0.001,  # ~100m
+        max_scenes: int = 16,
+        city_scene_dir: Optional[Path] = DEFAULT_CITY_SCENE_DIR,
+        store_dir: Optional[Path] = DEFAULT_STORE_DIR,
+    ):
+        """Initialize the engine (sources load lazily on first query).
+
+        Args:
+            buildings_path: Path to buildings GeoJSON
+            trees_path: Path to trees GeoJSON
+            radius_deg: Minimum scene radius around any query point
+            cell_size_deg: Grid cell size used to share scenes between points
+            max_scenes: Number of built scenes to keep cached
+            city_scene_dir: Prebuilt city scene to use when current
+                (None = always build local scenes)
+            store_dir: Directory for the memory-mapped feature stores
+        """
+        self.buildings_path = buildings_path
+        self.trees_path = trees_path
+        self.radius_deg = radius_deg
+        self.cell_size_deg = cell_size_deg
+        self.max_scenes = max_scenes
+        self.city_scene_dir = city_scene_dir
+        self.store_dir = store_dir
+
+        self._buildings: Optional[VectorSource] = None
+        self._trees: Optional[VectorSource] = None
+        self._city_scene: Optional[CityScene] = None
+        self._city_scene_checked = False
+        self._scenes: "OrderedDict[tuple, LocalScene]" = OrderedDict()
+
+    @property
+    def buildings(self) -> VectorSource:
+        """Lazy-load buildings."""
+        if self._buildings is None:
+            self._buildings = VectorSource(self.buildings_path, height_field="height", store_dir=self.store_dir)
+        return self._buildings
+
+    @property
+    def trees(self) -> Optional[VectorSource]:
+        """Lazy-load trees (None if the file is missing)."""
+        if self._trees is None and self.trees_path.exists():
+            self._trees = VectorSource(self.trees_path, height_field="estimated_height", store_dir=self.store_dir)
+        return self._trees
+
+    @property
+    def city_scene(self) -> Optional[CityScene]:
+        """Lazy-open the city scene (None if missing or built from other data)."""
+        if not self._city_scene_checked:
+            self._city_scene = open_city_scene(
+                self.city_scene_dir, self.buildings_path, self.trees_path
+            )
+            self._city_scene_checked = True
+        return self._city_scene
+
+    def scene_for(self, lat: float, lng: float, include_trees: bool = True) -> LocalScene:
+        """Get (or build and cache) the scene covering a query point.
+
+        Args:
+            lat: Latitude (WGS84)
+            lng: Longitude (WGS84)
+            include_trees: Whether the scene includes trees
+
+        Returns:
+            LocalScene for the grid cell containing the point
+        """
+        return self.scene_for_bounds((lng, lat, lng, lat), include_trees)
+
+    def scene_for_bounds(
+        self,
+        bounds: Tuple[float, float, float, float],
+        include_trees: bool = True,
+    ) -> LocalScene:
+        """Get (or build and cache) a scene covering an area.
+
+        Args:
+            bounds: (west, south, east, north) area that queries fall in
+            include_trees: Whether the scene includes trees
+
+        Returns:
+            LocalScene covering bounds plus radius_deg on every side
+        """
+        cell = self.cell_size_deg
+        west, south, east, north = bounds
+        key = (
+            math.floor((west - self.radius_deg) / cell),
+            math.floor((south - self.radius_deg) / cell),
+            math.ceil((east + self.radius_deg) / cell),
+            math.ceil((north + self.radius_deg) / cell),
+            include_trees,
+        )
+
+        scene = self._scenes.get(key)
+        if scene is not None:
+            self._scenes.move_to_end(key)
+            return scene
+
+        snapped = (key[0] * cell, key[1] * cell, key[2] * cell, key[3] * cell)
+        city_scene = self.city_scene
+        if city_scene is not None and city_scene.covers(snapped):
+            # The city scene always includes trees
+            scene_bounds = SceneBounds(*snapped)
+            scene = LocalScene(None, scene_bounds, city_scene.intersector(scene_bounds))
+        else:
+            mesh, scene_bounds = _build_scene_from_sources(
+                snapped,
+                self.buildings,
+                self.trees if include_trees else None,
+            )
+            scene = LocalScene(mesh, scene_bounds, _create_intersector(mesh))
+
+        self._scenes[key] = scene
+        if len(self._scenes) > self.max_scenes:
+            self._scenes.popitem(last=False)
+        return scene
+
+    def shadow_at(
+        self,
+        lat: float,
+        lng: float,
+        time: datetime,
+        height: float = 1.7,
+    ) -> ShadowResult:
+        """Get shadow intensity at a 3D point for a given time.
+
+        See get_shadow_at() for argument details.
+        """
+        # 1. Calculate sun position
+        sun = SunPosition.from_datetime(lat, lng, time)
+
+        # Check if sun is below horizon
+        if sun.altitude <= 0:
+            return ShadowResult(
+                latitude=lat,
+                longitude=lng,
+                time=time,
+                height=height,
+                shadow=1.0,  # Full shadow (night)
+                source="night",
+            )
+
+        # 2. Get local scene (only trees below query height matter)
+        include_trees = height < 25  # Trees typically < 20m
+        scene = self.scene_for(lat, lng, include_trees)
+
+        # 3. Cast single ray from query point (local coordinates) towards sun
+        local_x, local_y = scene.bounds.wgs84_to_local(lng, lat)
+        ray_origin = np.array([[local_x, local_y, height]])
+        ray_direction = sun.ray_direction
+        directions = np.array([ray_direction / np.linalg.norm(ray_direction)])
+        hits = scene.intersector.intersects_any(ray_origin, directions)
+
+        shadow = 1.0 if hits[0] else 0.0
+
+        return ShadowResult(
+            latitude=lat,
+            longitude=lng,
+            time=time,
+            height=height,
+            shadow=shadow,
+            source="building" if shadow > 0 else None,
+        )
+
+    def shadow_timeline(
+        self,
+        lat: float,
+        lng: float,
+        date: datetime,
+        height: float = 1.7,
+        interval_minutes: int = 60,
+        start_hour: int = 6,
+        end_hour: int = 20,
+    ) -> List[ShadowResult]:
+        """Get shadow timeline for a point throughout a day.
+
+        See get_shadow_timeline() for argument details.
+        """
+        # Sample throughout the day
+        times = []
+        for hour in range(start_hour, end_hour + 1):
+            for minute in range(0, 60, interval_minutes):
+                if hour == end_hour and minute > 0:
+                    break
+                times.append(date.replace(hour=hour, minute=minute, second=0, microsecond=0))
+
+        # One batched cast for all times (only trees below query height matter)
+        shadows = self.shadow_matrix([lat], [lng], times, heights=height, include_trees=height < 25)[0]
+
+        results = []
+        for time, shadow in zip(times, shadows):
+            if SunPosition.from_datetime(lat, lng, time).altitude <= 0:
+                source = "night"
+            else:
+                source = "building" if shadow > 0 else None
+            results.append(ShadowResult(
+                latitude=lat,
+                longitude=lng,
+                time=time,
+                height=height,
+                shadow=float(shadow),
+                source=source,
+            ))
+        return results
+
+    def shadow_matrix(
+        self,
+        lats: Sequence[float],
+        lngs: Sequence[float],
+        times: Sequence[datetime],
+        heights: Union[float, Sequence[float]] = 1.7,
+        include_trees: bool = True,
+        batch_size: int = 500_000,
+    ) -> NDArray[np.float32]:
+        """Compute shadows for N points × M times in batched ray casts.
+
+        Builds one scene covering all points, computes the M sun positions
+        once, and casts every (point, time) ray through the intersector in
+        batches of batch_size. Sun positions are computed at the centroid
+        of the points (differences across the city are far below 0.1°).
+
+        Args:
+            lats: N latitudes (WGS84)
+            lngs: N longitudes (WGS84)
+            times: M timezone-aware datetimes
+            heights: Height above ground per point, or one height for all
+            include_trees: Whether trees can cast shadows
+            batch_size: Rays per intersector call (memory control)
+
+        Returns:
+            (N, M) float32 array: 0.0 = sun, 1.0 = shadow (or sun below horizon)
+        """
+        lats = np.asarray(lats, dtype=np.float64).ravel()
+        lngs = np.asarray(lngs, dtype=np.float64).ravel()
+        heights = np.broadcast_to(np.asarray(heights, dtype=np.float64), lats.shape)
+        n_points, n_times = len(lats), len(times)
+
+        shadows = np.ones((n_points, n_times), dtype=np.float32)
+        if n_points == 0 or n_times == 0:
+            return shadows
+
+        # Sun directions for all times (night stays fully shadowed)
+        center_lat, center_lng = float(lats.mean()), float(lngs.mean())
+        day_columns = []
+        directions = []
+        for column, time in enumerate(times):
+            sun = SunPosition.from_datetime(center_lat, center_lng, time)
+            if sun.altitude > 0:
+                day_columns.append(column)
+                directions.append(sun.ray_direction / np.linalg.norm(sun.ray_direction))
+
+        if not day_columns:
+            return shadows
+
+        scene = self.scene_for_bounds(
+            (lngs.min(), lats.min(), lngs.max(), lats.max()), include_trees
+        )
+        origins = np.empty((n_points, 3), dtype=np.float64)
+        origins[:, :2] = scene.bounds.wgs84_to_local_array(lngs, lats)
+        origins[:, 2] = heights
+        directions = np.asarray(directions)
+        day_columns = np.asarray(day_columns)
+
+        # Flattened (point, time) ray index, streamed in batches
+        n_day = len(day_columns)
+        total = n_points * n_day
+        for start in range(0, total, batch_size):
+            flat = np.arange(start, min(start + batch_size, total))
+            point_idx, time_idx = np.divmod(flat, n_day)
+            hits = scene.intersector.intersects_any(origins[point_idx], directions[time_idx])
+            shadows[point_idx, day_columns[time_idx]] = hits.astype(np.float32)
+
+        return shadows
+
+    def clear(self) -> None:
+        """Drop all cached scenes (sources stay loaded, the city scene is reopened)."""
+        self._scenes.clear()
+        self._city_scene = None
+        self._city_scene_checked = False
+
+
+# Shared engines for the module-level query functions, keyed by data paths
+_engines: Dict[Tuple[Path, Path], ShadowQueryEngine] = {}
+
+
+def get_query_engine(
+    buildings_path: Path = DEFAULT_BUILDINGS_PATH,
+    trees_path: Path = DEFAULT_TREES_PATH,
+) -> ShadowQueryEngine:
+    """Get the process-wide query engine for a pair of data files."""
+    key = (Path(buildings_path), Path(trees_path))
+    if key not in _engines:
+        _engines[key] = ShadowQueryEngine(*key)
+    return _engines[key]
+
+
+def sample_times(
+    start: datetime,
+    end: datetime,
+    interval_minutes: int = 60,
+) -> List[datetime]:
+    """Evenly spaced datetimes from start to end (inclusive).
+
+    Args:
+        start: First sample time
+        end: Last possible sample time
+        interval_minutes: Minutes between samples
+
+    Returns:
+        List of datetimes
+    """
+    step = timedelta(minutes=interval_minutes)
+    times = []
+    time = start
+    while time <= end:
+        times.append(time)
+        time += step
+    return times
+
+
+def get_shadow_matrix(
+    lats: Sequence[float],
+    lngs: Sequence[float],
+    times: Sequence[datetime],
+    heights: Union[float, Sequence[float]] = 1.7,
+    buildings_path: Path = DEFAULT_BUILDINGS_PATH,
+    trees_path: Path = DEFAULT_TREES_PATH,
+) -> NDArray[np.float32]:
+    """
+    Get shadows for many points at many times in one batched query.
+
+    Use sample_times() to build the time axis from a date range, e.g.
+    every 15 minutes of an afternoon for a set of benches.
+
+    Args:
+        lats: N latitudes (WGS84)
+        lngs: N longitudes (WGS84)
+        times: M timezone-aware datetimes
+        heights: Height above ground per point, or one height for all
+        buildings_path: Path to buildings GeoJSON
+        trees_path: Path to trees GeoJSON
+
+    Returns:
+        (N, M) array: 0.0 = sun, 1.0 = shadow or night
+    """
+    engine = get_query_engine(buildings_path, trees_path)
+    return engine.shadow_matrix(lats, lngs, times, heights=heights)
+
+
 def get_shadow_at(
     lat: float,
     lng: float,
@@ -148,6 +518,9 @@ def get_shadow_at(
     Uses ray tracing against building and tree geometry.
     Height is CRITICAL for balcony queries!
 
+    Sources and local scenes are cached in a shared ShadowQueryEngine, so
+    repeated calls in one process only pay for the ray cast.
+
     Args:
         lat: Latitude (WGS84)
         lng: Longitude (WGS84)
@@ -169,65 +542,8 @@ def get_shadow_at(
         # 10th floor (~30m) - probably sunny!
         get_shadow_at(47.376, 8.54, time, height=30.0)
     """
-    # 1. Calculate sun position
-    sun = SunPosition.from_datetime(lat, lng, time)
-
-    # Check if sun is below horizon
-    if sun.altitude <= 0:
-        return ShadowResult(
-            latitude=lat,
-            longitude=lng,
-            time=time,
-            height=height,
-            shadow=1.0,  # Full shadow (night)
-            source="night",
-        )
-
-    # 2. Build local scene (only trees below query height matter)
-    include_trees = height < 25  # Trees typically < 20m
-    mesh, scene_bounds = _build_local_scene(
-        lat, lng,
-        buildings_path=buildings_path,
-        trees_path=trees_path,
-        include_trees=include_trees,
-    )
-
-    # 3. Set up ray tracer for single-point query
-    config = RayTracerConfig(
-        image_size=4,  # Tiny grid, we only need one point
-        samples_per_pixel=1,
-        ray_offset=0.05,
-    )
-
-    # 4. Convert query point to local coordinates
-    local_x, local_y = scene_bounds.wgs84_to_local(lng, lat)
-
-    # 5. Cast single ray from query point towards sun
-    # Create ray origin at query position and height
-    ray_origin = np.array([[local_x, local_y, height]])
-    ray_direction = sun.ray_direction
-
-    # Create intersector
-    import trimesh
-    try:
-        intersector = trimesh.ray.ray_pyembree.RayMeshIntersector(mesh)
-    except (ImportError, AttributeError):
-        intersector = trimesh.ray.ray_triangle.RayMeshIntersector(mesh)
-
-    # Cast ray
-    directions = np.array([ray_direction / np.linalg.norm(ray_direction)])
-    hits = intersector.intersects_any(ray_origin, directions)
-
-    shadow = 1.0 if hits[0] else 0.0
-
-    return ShadowResult(
-        latitude=lat,
-        longitude=lng,
-        time=time,
-        height=height,
-        shadow=shadow,
-        source="building" if shadow > 0 else None,
-    )
+    engine = get_query_engine(buildings_path, trees_path)
+    return engine.shadow_at(lat, lng, time, height=height)
 
 
 def get_shadow_timeline(
@@ -244,8 +560,8 @@ def get_shadow_timeline(
     """
     Get shadow timeline for a point throughout a day.
 
-    Efficient implementation that builds the scene once and reuses it
-    for all time samples.
+    Builds the scene once and casts the rays for all time samples in one
+    batch (ShadowQueryEngine.shadow_matrix).
 
     Args:
         lat: Latitude (WGS84)
@@ -261,68 +577,53 @@ def get_shadow_timeline(
     Returns:
         List of ShadowResult for each time point
     """
-    # Build scene once
-    include_trees = height < 25
-    mesh, scene_bounds = _build_local_scene(
-        lat, lng,
-        buildings_path=buildings_path,
-        trees_path=trees_path,
-        include_trees=include_trees,
+    engine = get_query_engine(buildings_path, trees_path)
+    return engine.shadow_timeline(
+        lat, lng, date,
+        height=height,
+        interval_minutes=interval_minutes,
+        start_hour=start_hour,
+        end_hour=end_hour,
     )
 
-    # Convert query point to local coordinates
-    local_x, local_y = scene_bounds.wgs84_to_local(lng, lat)
-    ray_origin = np.array([[local_x, local_y, height]])
 
-    # Create intersector once
-    import trimesh
-    try:
-        intersector = trimesh.ray.ray_pyembree.RayMeshIntersector(mesh)
-    except (ImportError, AttributeError):
-        intersector = trimesh.ray.ray_triangle.RayMeshIntersector(mesh)
+_sun_exposure_products: Dict[Path, Any] = {}
 
-    results = []
 
-    # Sample throughout the day
-    for hour in range(start_hour, end_hour + 1):
-        for minute in range(0, 60, interval_minutes):
-            if hour == end_hour and minute > 0:
-                break
-
-            time = date.replace(hour=hour, minute=minute, second=0, microsecond=0)
-
-            # Calculate sun position
-            sun = SunPosition.from_datetime(lat, lng, time)
-
-            # Check if sun is below horizon
-            if sun.altitude <= 0:
-                results.append(ShadowResult(
-                    latitude=lat,
-                    longitude=lng,
-                    time=time,
-                    height=height,
-                    shadow=1.0,
-                    source="night",
-                ))
-                continue
+def get_sun_hours(
+    lat: float,
+    lng: float,
+    day: datetime,
+    height: float = 1.7,
+    product_dir: Optional[Path] = None,
+) -> Optional[float]:
+    """
+    Look up hours of direct sun from the precomputed sun-exposure product.
 
-            # Cast ray
-            ray_direction = sun.ray_direction / np.linalg.norm(sun.ray_direction)
-            directions = np.array([ray_direction])
-            hits = intersector.intersects_any(ray_origin, directions)
+    O(1) raster lookup (see sun_exposure.py) instead of a scene build and
+    a day of ray casts. Build the product first with the CLI
+    `sun-exposure` command.
 
-            shadow = 1.0 if hits[0] else 0.0
+    Args:
+        lat: Latitude
+        lng: Longitude
+        day: Date (only the day of year is used)
+        height: Height above ground in meters
+        product_dir: Product directory (default: DEFAULT_SUN_EXPOSURE_DIR)
 
-            results.append(ShadowResult(
-                latitude=lat,
-                longitude=lng,
-                time=time,
-                height=height,
-                shadow=shadow,
-                source="building" if shadow > 0 else None,
-            ))
+    Returns:
+        Sun hours, or None if the point is outside the product
+    """
+    from .sun_exposure import DEFAULT_SUN_EXPOSURE_DIR, SunExposureProduct
 
-    return results
+    product_dir = product_dir or DEFAULT_SUN_EXPOSURE_DIR
+    product = _sun_exposure_products.get(product_dir)
+    if product is None:
+        product = SunExposureProduct(product_dir)
+        _sun_exposure_products[product_dir] = product
+
+    day = day.date() if isinstance(day, datetime) else day
+    return product.sun_hours(lat, lng, day, height)
 
 
 def get_balcony_sun_exposure(
@@ -358,7 +659,7 @@ def get_balcony_sun_exposure(
     # Calculate balcony height
     balcony_height = (floor * floor_height) + 1.5  # +1.5m for railing/standing
 
-    # Get timeline with 30-minute intervals
+    # Get timeline with 30-minute intervals (one batched ray cast)
     results = get_shadow_timeline(
         lat, lng, date,
         height=balcony_height,
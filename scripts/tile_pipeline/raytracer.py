@@ -7,14 +7,16 @@ accurate building and tree shadows.
 
 Features:
 - True ray tracing from 3D scene
-- Soft shadows via multi-sample anti-aliasing
+- Soft shadows via multi-sample anti-aliasing, cast as one ray stream
+  and optionally refined only near shadow edges
 - Configurable sun position
 - Progress reporting for large scenes
 """
 
 from dataclasses import dataclass
-from typing import Optional, Tuple, Callable
+from typing import TYPE_CHECKING, Iterator, Literal, Optional, Tuple, Callable, Union
 import math
+import time
 
 import numpy as np
 from numpy.typing import NDArray
@@ -23,6 +25,17 @@ from scipy import ndimage
 
 from .scene_builder import SceneBuilder, SceneBounds
 
+if TYPE_CHECKING:
+    from .city_scene import CityScene
+
+
+# Rays per intersector call when RayTracerConfig.batch_size is None.
+# trimesh's ray_triangle intersector expands per-ray candidate triangles
+# and needs small batches; Embree, the city BVH and the heightfield
+# stream large ones with little memory.
+RAY_TRIANGLE_BATCH_SIZE = 10_000
+STREAM_BATCH_SIZE = 262_144
+
 
 @dataclass
 class SunPosition:
@@ -92,10 +105,22 @@ class RayTracerConfig:
     samples_per_pixel: int = 1     # 1 = hard shadows, 4+ = soft
     jitter_amount: float = 0.5     # Jitter in pixels for soft shadows
 
+    # Adaptive sampling: a first pass casts adaptive_first_pass samples
+    # everywhere, the remaining samples only go to pixels near shadow edges
+    adaptive_sampling: bool = False
+    adaptive_first_pass: int = 1
+    adaptive_edge_radius: int = 1  # Pixels around a detected edge to refine
+
     # Performance
-    batch_size: int = 10000        # Rays per batch (memory control)
+    batch_size: Optional[int] = None  # Rays per batch (None = tuned per intersector)
     use_embree: bool = True        # Use Embree accelerator if available
 
+    # Shadow backend: "mesh" casts rays against triangles, "heightfield"
+    # marches them through a rasterized 2.5D height grid (see heightfield.py)
+    backend: Literal["mesh", "heightfield"] = "mesh"
+    heightfield_cell_size: float = 1.0   # Meters per height grid cell
+    heightfield_padding: float = 200.0   # Meters of grid beyond the tile edges
+
     # Ray offset to avoid self-intersection
     ray_offset: float = 0.1        # Meters above ground
 
@@ -111,6 +136,14 @@ class TileRaytracer:
     from each pixel towards the sun. Pixels where rays hit geometry
     are marked as in shadow.
 
+    Instead of a per-tile mesh, the ray tracer can also take a prebuilt
+    city_scene.CityScene: rays are then cast against the city-wide BVH,
+    shifted by the tile's offset from the city origin.
+
+    With config.backend = "heightfield" the scene is rasterized once into
+    a height grid and rays are marched through it instead (faster, exact
+    for 2.5D geometry; see heightfield.py).
+
     Example:
         # Build scene
         builder = SceneBuilder(bounds)
@@ -121,18 +154,21 @@ class TileRaytracer:
         # Ray trace shadows
         raytracer = TileRaytracer(scene, bounds)
         shadow_buffer = raytracer.render(sun_position)
+
+        # Or against the city scene (see city_scene.build_city_scene)
+        raytracer = TileRaytracer(open_city_scene(...), bounds)
     """
 
     def __init__(
         self,
-        mesh: trimesh.Trimesh,
+        mesh: Union[trimesh.Trimesh, "CityScene"],
         bounds: Tuple[float, float, float, float],
         config: Optional[RayTracerConfig] = None,
     ):
         """Initialize ray tracer.
 
         Args:
-            mesh: Combined 3D scene mesh
+            mesh: Combined 3D scene mesh, or a CityScene covering the tile
             bounds: (west, south, east, north) in WGS84
             config: Ray tracing configuration
         """
@@ -145,6 +181,23 @@ class TileRaytracer:
 
     def _create_intersector(self):
         """Create the ray-mesh intersector."""
+        from .city_scene import CityScene
+
+        if self.config.backend == "heightfield":
+            from .heightfield import HeightField
+
+            return HeightField.from_scene(
+                self.mesh,
+                self.scene_bounds,
+                cell_size=self.config.heightfield_cell_size,
+                padding=self.config.heightfield_padding,
+            )
+        if self.config.backend != "mesh":
+            raise ValueError(f"Unknown shadow backend: {self.config.backend!r}")
+
+        if isinstance(self.mesh, CityScene):
+            return self.mesh.intersector(self.scene_bounds)
+
         # Try to use Embree for better performance
         if self.config.use_embree:
             try:
@@ -175,45 +228,38 @@ class TileRaytracer:
             - shadow_darkness = fully shadowed
         """
         size = self.config.image_size
-        samples = self.config.samples_per_pixel
+        samples = max(self.config.samples_per_pixel, 1)
+        ground = self._ground_heights(size, elevation_grid)
 
-        # Initialize shadow accumulator
-        shadow_acc = np.zeros((size, size), dtype=np.float32)
-
-        # Generate sample positions for multi-sampling
+        # Stratified sample positions for multi-sampling
         if samples > 1:
-            # Stratified sampling pattern
-            sample_offsets = self._generate_sample_offsets(samples)
+            offsets = self._generate_sample_offsets(samples) * self.config.jitter_amount
         else:
-            sample_offsets = np.array([[0.0, 0.0]])
-
-        total_samples = samples
-        samples_done = 0
+            offsets = np.zeros((1, 2))
 
-        for offset in sample_offsets:
-            # Generate ray origins for this sample
-            origins = self._generate_ray_origins(
-                size,
-                elevation_grid,
-                offset[0] * self.config.jitter_amount,
-                offset[1] * self.config.jitter_amount,
-            )
+        first = samples
+        if self.config.adaptive_sampling:
+            first = min(max(self.config.adaptive_first_pass, 1), samples)
 
-            # Cast rays in batches
-            hits = self._cast_shadow_rays_batched(
-                origins,
-                sun.ray_direction,
-                progress_callback,
-                base_progress=samples_done / total_samples,
-                progress_range=1 / total_samples,
-            )
-
-            # Accumulate hits
-            shadow_acc += hits.reshape(size, size)
-            samples_done += 1
+        # First pass: every pixel, all its samples in one ray stream
+        shadow_buffer = self._cast_pixel_samples(
+            ground, offsets[:first], None, sun.ray_direction,
+            progress_callback, progress_range=first / samples,
+        )
 
-        # Normalize by number of samples
-        shadow_buffer = shadow_acc / total_samples
+        # Refinement: remaining samples for pixels near shadow edges
+        if first < samples:
+            pixels = np.flatnonzero(self._shadow_edges(shadow_buffer))
+            if len(pixels):
+                refined = self._cast_pixel_samples(
+                    ground, offsets[first:], pixels, sun.ray_direction,
+                    progress_callback, base_progress=first / samples,
+                    progress_range=1 - first / samples,
+                )
+                coverage = shadow_buffer.reshape(-1)
+                coverage[pixels] = (coverage[pixels] * first + refined * (samples - first)) / samples
+            if progress_callback:
+                progress_callback(1.0)
 
         # Convert hits (1=shadow) to shadow mask (darkness=shadow, 1=lit)
         shadow_mask = 1.0 - shadow_buffer * (1.0 - self.config.shadow_darkness)
@@ -229,54 +275,44 @@ class TileRaytracer:
 
     def _generate_sample_offsets(self, n_samples: int) -> NDArray[np.float64]:
         """Generate stratified sample offsets for anti-aliasing."""
-        # Use a grid pattern with jitter
+        # Divide the pixel into a grid, with random jitter within each cell
         grid_size = int(math.ceil(math.sqrt(n_samples)))
-        offsets = []
-
-        for i in range(grid_size):
-            for j in range(grid_size):
-                if len(offsets) >= n_samples:
-                    break
-                # Stratified: divide pixel into grid, random within each cell
-                ox = (i + 0.5) / grid_size - 0.5
-                oy = (j + 0.5) / grid_size - 0.5
-                # Add small random jitter within stratified cell
-                ox += (np.random.random() - 0.5) / grid_size
-                oy += (np.random.random() - 0.5) / grid_size
-                offsets.append([ox, oy])
-
-        return np.array(offsets[:n_samples])
+        i, j = np.divmod(np.arange(n_samples), grid_size)
+        jitter = (np.random.random((n_samples, 2)) - 0.5) / grid_size
 
-    def _generate_ray_origins(
+        return np.column_stack([
+            (i + 0.5) / grid_size - 0.5 + jitter[:, 0],
+            (j + 0.5) / grid_size - 0.5 + jitter[:, 1],
+        ])
+
+    def _shadow_edges(self, coverage: NDArray[np.float32]) -> NDArray[np.bool_]:
+        """Pixels within adaptive_edge_radius of a shadow boundary.
+
+        Args:
+            coverage: (H, W) fraction of samples in shadow
+
+        Returns:
+            (H, W) True where the neighbourhood is not uniformly lit or shadowed
+        """
+        window = 2 * max(self.config.adaptive_edge_radius, 0) + 1
+        low = ndimage.minimum_filter(coverage, size=window, mode="nearest")
+        high = ndimage.maximum_filter(coverage, size=window, mode="nearest")
+        return (high > low) | ((coverage > 0) & (coverage < 1))
+
+    def _ground_heights(
         self,
         size: int,
         elevation_grid: Optional[NDArray[np.float32]],
-        jitter_x: float = 0,
-        jitter_y: float = 0,
     ) -> NDArray[np.float64]:
-        """Generate ray origin points on the ground plane.
+        """Ray origin heights per output pixel (elevation + ray offset).
 
         Args:
             size: Grid resolution
-            elevation_grid: Optional elevation data
-            jitter_x, jitter_y: Sub-pixel jitter in pixels
+            elevation_grid: Optional elevation data, resampled to size × size
 
         Returns:
-            Array of shape (size*size, 3) with [x, y, z] coordinates
+            Array of shape (size, size)
         """
-        # Create pixel grid
-        pixel_x = np.arange(size) + 0.5 + jitter_x
-        pixel_y = np.arange(size) + 0.5 + jitter_y
-
-        # Convert to local coordinates (meters)
-        # X goes from 0 to width_meters
-        # Y goes from 0 to height_meters (but image Y is flipped)
-        x = pixel_x / size * self.scene_bounds.width_meters
-        y = (size - pixel_y) / size * self.scene_bounds.height_meters  # Flip Y
-
-        xx, yy = np.meshgrid(x, y)
-
-        # Get Z from elevation or use flat ground
         if elevation_grid is not None:
             # Resample elevation to output size
             from scipy.ndimage import zoom
@@ -290,78 +326,201 @@ class TileRaytracer:
             zz = np.zeros((size, size))
 
         # Add small offset to avoid self-intersection with ground
-        zz = zz + self.config.ray_offset
+        return np.asarray(zz, dtype=np.float64) + self.config.ray_offset
 
-        # Flatten to (N, 3)
-        origins = np.column_stack([
-            xx.ravel(),
-            yy.ravel(),
-            zz.ravel(),
-        ])
+    def _pixel_origins(
+        self,
+        ground: NDArray[np.float64],
+        pixels: NDArray[np.int64],
+        offsets: Optional[NDArray[np.float64]] = None,
+    ) -> NDArray[np.float64]:
+        """Ray origins for (pixel, sub-pixel offset) pairs.
 
-        return origins
+        Args:
+            ground: (size, size) origin heights from _ground_heights
+            pixels: (K,) flat pixel indices (row * size + col)
+            offsets: (K, 2) sub-pixel jitter in pixels, or (2,) for all rays;
+                None = pixel centers
 
-    def _cast_shadow_rays_batched(
+        Returns:
+            Array of shape (K, 3)
+        """
+        size = ground.shape[0]
+        rows, cols = np.divmod(pixels, size)
+        if offsets is None:
+            offsets = np.zeros(2)
+        offsets = np.broadcast_to(offsets, (len(pixels), 2))
+
+        # Convert to local coordinates (meters); image Y is flipped
+        x = (cols + 0.5 + offsets[:, 0]) / size * self.scene_bounds.width_meters
+        y = (size - (rows + 0.5 + offsets[:, 1])) / size * self.scene_bounds.height_meters
+        z = ground.reshape(-1)[pixels]
+
+        return np.column_stack([x, y, z])
+
+    def _cast_pixel_samples(
         self,
-        origins: NDArray[np.float64],
+        ground: NDArray[np.float64],
+        offsets: NDArray[np.float64],
+        pixels: Optional[NDArray[np.int64]],
         direction: NDArray[np.float64],
         progress_callback: Optional[Callable[[float], None]],
         base_progress: float = 0,
         progress_range: float = 1,
-    ) -> NDArray[np.bool_]:
-        """Cast shadow rays in batches for memory efficiency.
+    ) -> NDArray[np.float32]:
+        """Fraction of samples in shadow, casting all samples as one stream.
+
+        Rays are generated batch by batch from (sample, pixel) index ranges
+        and their hits counted per pixel, so memory depends on the batch
+        size, not on samples × pixels.
 
         Args:
-            origins: Ray origin points (N, 3)
+            ground: (size, size) origin heights from _ground_heights
+            offsets: (S, 2) sub-pixel jitter in pixels
+            pixels: Flat pixel indices to sample; None = all pixels
             direction: Shadow ray direction (3,)
             progress_callback: Progress callback
             base_progress: Starting progress value
-            progress_range: Progress range for this batch set
+            progress_range: Progress range for these samples
 
         Returns:
-            Boolean array of hits (True = in shadow)
+            (size, size) coverage when pixels is None, otherwise (P,)
+        """
+        all_pixels = np.arange(ground.size) if pixels is None else pixels
+        n_pixels = len(all_pixels)
+
+        def rays(start: int, end: int):
+            sample, index = np.divmod(np.arange(start, end), n_pixels)
+            return self._pixel_origins(ground, all_pixels[index], offsets[sample]), direction
+
+        counts = np.zeros(n_pixels, dtype=np.int64)
+        stream = self._cast_ray_stream(
+            len(offsets) * n_pixels, rays, progress_callback, base_progress, progress_range
+        )
+        for start, end, hits in stream:
+            counts += np.bincount(np.arange(start, end)[hits] % n_pixels, minlength=n_pixels)
+        coverage = (counts / len(offsets)).astype(np.float32)
+
+        if pixels is None:
+            return coverage.reshape(ground.shape)
+        return coverage
+
+    def _generate_ray_origins(
+        self,
+        size: int,
+        elevation_grid: Optional[NDArray[np.float32]],
+        jitter_x: float = 0,
+        jitter_y: float = 0,
+    ) -> NDArray[np.float64]:
+        """Generate ray origin points on the ground plane.
+
+        Args:
+            size: Grid resolution
+            elevation_grid: Optional elevation data
+            jitter_x, jitter_y: Sub-pixel jitter in pixels
+
+        Returns:
+            Array of shape (size*size, 3) with [x, y, z] coordinates
         """
-        n_rays = len(origins)
-        batch_size = self.config.batch_size
-        hits = np.zeros(n_rays, dtype=bool)
+        ground = self._ground_heights(size, elevation_grid)
+        return self._pixel_origins(ground, np.arange(size * size), np.array([jitter_x, jitter_y]))
+
+    def _batch_size(self) -> int:
+        """Rays per intersector call (config.batch_size or tuned default)."""
+        if self.config.batch_size:
+            return self.config.batch_size
+        if isinstance(self._intersector, trimesh.ray.ray_triangle.RayMeshIntersector):
+            return RAY_TRIANGLE_BATCH_SIZE
+        return STREAM_BATCH_SIZE
+
+    def _cast_ray_stream(
+        self,
+        n_rays: int,
+        rays: Callable[[int, int], Tuple[NDArray[np.float64], NDArray[np.float64]]],
+        progress_callback: Optional[Callable[[float], None]],
+        base_progress: float = 0,
+        progress_range: float = 1,
+    ) -> Iterator[Tuple[int, int, NDArray[np.bool_]]]:
+        """Cast a stream of shadow rays, generating each batch on demand.
 
-        # Normalize direction
-        direction = direction / np.linalg.norm(direction)
+        Args:
+            n_rays: Total number of rays
+            rays: Callable(start, end) returning (origins (K, 3), directions
+                (3,) or (K, 3)) for rays start..end of the stream
+            progress_callback: Progress callback
+            base_progress: Starting progress value
+            progress_range: Progress range for this stream
 
-        # All rays have the same direction
-        directions = np.broadcast_to(direction, (n_rays, 3)).copy()
+        Yields:
+            (start, end, hits) per batch, hits True = in shadow
+        """
+        batch_size = self._batch_size()
 
-        # Process in batches
         for i in range(0, n_rays, batch_size):
             end = min(i + batch_size, n_rays)
 
-            batch_origins = origins[i:end]
-            batch_dirs = directions[i:end]
+            batch_origins, direction = rays(i, end)
+            direction = np.asarray(direction, dtype=np.float64)
+            direction = direction / np.linalg.norm(direction, axis=-1, keepdims=True)
+            batch_dirs = np.broadcast_to(direction, batch_origins.shape)
 
             # Cast rays
             try:
                 # intersects_any returns boolean array
-                batch_hits = self._intersector.intersects_any(
-                    batch_origins,
-                    batch_dirs,
+                batch_hits = np.asarray(
+                    self._intersector.intersects_any(batch_origins, batch_dirs), dtype=bool
                 )
-                hits[i:end] = batch_hits
             except Exception:
                 # Fallback: slower but more robust
+                batch_hits = np.zeros(end - i, dtype=bool)
                 for j, (o, d) in enumerate(zip(batch_origins, batch_dirs)):
                     try:
                         locations, _, _ = self._intersector.intersects_location(
                             [o], [d]
                         )
-                        hits[i + j] = len(locations) > 0
+                        batch_hits[j] = len(locations) > 0
                     except Exception:
-                        hits[i + j] = False
+                        batch_hits[j] = False
 
             # Report progress
             if progress_callback:
                 progress = base_progress + (end / n_rays) * progress_range
                 progress_callback(progress)
 
+            yield i, end, batch_hits
+
+    def _cast_shadow_rays_batched(
+        self,
+        origins: NDArray[np.float64],
+        direction: NDArray[np.float64],
+        progress_callback: Optional[Callable[[float], None]],
+        base_progress: float = 0,
+        progress_range: float = 1,
+    ) -> NDArray[np.bool_]:
+        """Cast shadow rays in batches for memory efficiency.
+
+        Args:
+            origins: Ray origin points (N, 3)
+            direction: Shadow ray direction (3,), or one per ray (N, 3)
+            progress_callback: Progress callback
+            base_progress: Starting progress value
+            progress_range: Progress range for this batch set
+
+        Returns:
+            Boolean array of hits (True = in shadow)
+        """
+        direction = np.asarray(direction, dtype=np.float64)
+        per_ray = direction.ndim == 2
+
+        def rays(start: int, end: int):
+            return origins[start:end], direction[start:end] if per_ray else direction
+
+        hits = np.zeros(len(origins), dtype=bool)
+        stream = self._cast_ray_stream(
+            len(origins), rays, progress_callback, base_progress, progress_range
+        )
+        for start, end, batch_hits in stream:
+            hits[start:end] = batch_hits
         return hits
 
     def render_multi_bounce(
@@ -411,23 +570,25 @@ class TileRaytracer:
             AO buffer (1 = fully visible, 0 = fully occluded)
         """
         size = self.config.image_size
-        ao_acc = np.zeros((size, size), dtype=np.float32)
 
         # Generate hemisphere directions (cosine-weighted)
         directions = self._generate_hemisphere_directions(n_samples)
 
-        origins = self._generate_ray_origins(size, elevation_grid)
+        # All directions for all pixels as one ray stream (direction-major),
+        # generated per batch
+        ground = self._ground_heights(size, elevation_grid)
+        n_pixels = size * size
 
-        for direction in directions:
-            # Cast rays
-            hits = self._cast_shadow_rays_batched(
-                origins, direction, None
-            )
-            # Accumulate misses (visible = 1)
-            ao_acc += ~hits.reshape(size, size)
+        def rays(start: int, end: int):
+            sample, pixels = np.divmod(np.arange(start, end), n_pixels)
+            return self._pixel_origins(ground, pixels), directions[sample]
+
+        counts = np.zeros(n_pixels, dtype=np.int64)
+        for start, end, hits in self._cast_ray_stream(n_samples * n_pixels, rays, None):
+            counts += np.bincount(np.arange(start, end)[hits] % n_pixels, minlength=n_pixels)
 
-        # Normalize
-        ao_buffer = ao_acc / n_samples
+        # Fraction of misses (visible = 1)
+        ao_buffer = 1.0 - counts.reshape(size, size) / n_samples
 
         return ao_buffer.astype(np.float32)
 
@@ -436,21 +597,15 @@ class TileRaytracer:
         n_samples: int,
     ) -> NDArray[np.float64]:
         """Generate cosine-weighted hemisphere directions."""
-        directions = []
-
-        for _ in range(n_samples):
-            # Cosine-weighted hemisphere sampling
-            u1, u2 = np.random.random(2)
-            theta = 2 * math.pi * u1
-            r = math.sqrt(u2)
-
-            x = r * math.cos(theta)
-            y = r * math.sin(theta)
-            z = math.sqrt(1 - u2)  # Pointing up
-
-            directions.append([x, y, z])
-
-        return np.array(directions)
+        u = np.random.random((n_samples, 2))
+        theta = 2 * math.pi * u[:, 0]
+        r = np.sqrt(u[:, 1])
+
+        return np.column_stack([
+            r * np.cos(theta),
+            r * np.sin(theta),
+            np.sqrt(1 - u[:, 1]),  # Pointing up
+        ])
 
 
 def render_tile_shadows(
@@ -533,3 +688,52 @@ def compare_shadow_methods(
         "samples_per_pixel": 4,
         "resolution": image_size,
     }
+
+
+def benchmark_shadow_backends(
+    mesh: trimesh.Trimesh,
+    bounds: Tuple[float, float, float, float],
+    suns: list[SunPosition],
+    image_size: int = 512,
+    elevation: Optional[NDArray[np.float32]] = None,
+) -> dict[str, dict]:
+    """Time each shadow backend and compare it with trimesh's ray tracer.
+
+    Runs hard shadows (one sample per pixel) for every sun position with
+    the trimesh ray-triangle intersector (the reference), Embree (when
+    installed) and the heightfield backend.
+
+    Returns:
+        Per backend: setup and render seconds, and the fraction of pixels
+        agreeing with the reference
+    """
+    backends = {
+        "trimesh": RayTracerConfig(image_size=image_size, use_embree=False),
+        "heightfield": RayTracerConfig(image_size=image_size, backend="heightfield"),
+    }
+    try:
+        trimesh.ray.ray_pyembree.RayMeshIntersector(mesh)
+        backends["embree"] = RayTracerConfig(image_size=image_size, use_embree=True)
+    except (ImportError, AttributeError):
+        pass
+
+    results = {}
+    reference = None
+    for name, config in backends.items():
+        start = time.perf_counter()
+        raytracer = TileRaytracer(mesh, bounds, config)
+        setup = time.perf_counter() - start
+
+        start = time.perf_counter()
+        images = np.stack([raytracer.render(sun, elevation) for sun in suns])
+        render = time.perf_counter() - start
+
+        if reference is None:
+            reference = images
+        results[name] = {
+            "setup_seconds": setup,
+            "render_seconds": render,
+            "agreement": float(np.mean(images == reference)),
+        }
+
+    return results
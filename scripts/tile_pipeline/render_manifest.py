@@ -0,0 +1,114 @@
+"""
+Render manifest for resumable, incremental area renders.
+
+Each output directory gets a ``render_manifest.json`` that records, per
+tile, a fingerprint of everything that went into it: preset, style,
+blend/config values, the mtimes of the cached satellite and elevation
+source tiles, and a hash of the vector data. Re-running a render skips
+tiles whose fingerprint is unchanged and whose output file still exists,
+so crash recovery and style tweaks only pay for the tiles that changed.
+"""
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Any, Optional, Union
+
+
+MANIFEST_FILENAME = "render_manifest.json"
+MANIFEST_VERSION = 1
+
+
+def fingerprint(inputs: dict[str, Any]) -> str:
+    """Hash a JSON-serializable dict of render inputs.
+
+    Args:
+        inputs: Render inputs (nested dicts/lists of plain values)
+
+    Returns:
+        Hex digest that changes whenever any input changes
+    """
+    payload = json.dumps(inputs, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> Optional[str]:
+    """Content hash of a file, or None if it does not exist."""
+    if not path.exists():
+        return None
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        while chunk := f.read(chunk_size):
+            digest.update(chunk)
+    return digest.hexdigest()[:32]
+
+
+class RenderManifest:
+    """Per-tile input fingerprints for one output directory.
+
+    Only the coordinating process reads and writes the manifest; worker
+    processes never touch it. Saves are atomic (write to a temp file,
+    then rename) so a crash mid-save never corrupts the manifest.
+    """
+
+    def __init__(self, output_dir: Path, save_interval: float = 10.0):
+        """Load (or start) the manifest for an output directory.
+
+        Args:
+            output_dir: Render output directory
+            save_interval: Minimum seconds between automatic saves
+        """
+        self.path = output_dir / MANIFEST_FILENAME
+        self.save_interval = save_interval
+        self.tiles: dict[str, str] = {}
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+        if self.path.exists():
+            try:
+                with open(self.path) as f:
+                    data = json.load(f)
+                if data.get("version") == MANIFEST_VERSION:
+                    self.tiles = data.get("tiles", {})
+            except (json.JSONDecodeError, OSError) as e:
+                print(f"Warning: ignoring unreadable manifest {self.path}: {e}")
+
+    def is_fresh(self, key: str, tile_fingerprint: str, tile_path: Union[Path, bool]) -> bool:
+        """Check whether a tile can be skipped.
+
+        Args:
+            key: Tile key ("z/x/y")
+            tile_fingerprint: Fingerprint of the tile's current inputs
+            tile_path: Expected output file, or whether the output exists
+                (for tiles kept in a TileStore rather than as files)
+
+        Returns:
+            True if the recorded fingerprint matches and the output exists
+        """
+        if self.tiles.get(key) != tile_fingerprint:
+            return False
+        return tile_path if isinstance(tile_path, bool) else tile_path.exists()
+
+    def record(self, key: str, tile_fingerprint: str) -> None:
+        """Record a freshly rendered tile, saving periodically."""
+        self.tiles[key] = tile_fingerprint
+        self._dirty = True
+        if time.monotonic() - self._last_save >= self.save_interval:
+            self.save()
+
+    def save(self) -> None:
+        """Atomically write the manifest if it has unsaved changes."""
+        if not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".json.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({"version": MANIFEST_VERSION, "tiles": self.tiles}, f)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        self._last_save = time.monotonic()
+
+    def __len__(self) -> int:
+        return len(self.tiles)
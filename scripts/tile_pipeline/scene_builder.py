@@ -26,6 +26,247 @@ from .sources.vector import Feature
 EARTH_RADIUS = 6378137.0
 
 
+# Terrain simplification defaults: height tolerance (m) and face budget
+TERRAIN_MAX_ERROR = 0.5
+TERRAIN_MAX_FACES = 10000
+
+
+def grid_faces(rows: int, cols: int) -> NDArray[np.int64]:
+    """Triangle indices for a rows × cols vertex grid (row-major).
+
+    Each quad (v0, v1 on top, v2, v3 below) is split along the v1–v2
+    diagonal into (v0, v2, v1) and (v1, v2, v3).
+    """
+    v0 = (np.arange(rows - 1)[:, None] * cols + np.arange(cols - 1)[None, :]).ravel()
+    v1 = v0 + 1
+    v2 = v0 + cols
+    v3 = v2 + 1
+    quads = np.stack([v0, v2, v1, v1, v2, v3], axis=1)
+    return quads.reshape(-1, 3)
+
+
+def grid_sample_indices(n: int, stride: int) -> NDArray[np.intp]:
+    """Every stride-th index of 0..n-1, always including the last one."""
+    indices = np.arange(0, n, stride)
+    if indices[-1] != n - 1:
+        indices = np.append(indices, n - 1)
+    return indices
+
+
+def terrain_mesh_error(
+    elevation: NDArray[np.float32],
+    rows: NDArray[np.intp],
+    cols: NDArray[np.intp],
+) -> float:
+    """Largest height difference between a decimated mesh and the heightmap.
+
+    The decimated surface is interpolated exactly as grid_faces()
+    triangulates it, at every full-resolution sample.
+    """
+    h, w = elevation.shape
+    # Cell containing each full-resolution row/column, and position within it
+    ri = np.clip(np.searchsorted(rows, np.arange(h), side="right") - 1, 0, len(rows) - 2)
+    ci = np.clip(np.searchsorted(cols, np.arange(w), side="right") - 1, 0, len(cols) - 2)
+    t = ((np.arange(h) - rows[ri]) / (rows[ri + 1] - rows[ri]))[:, None]
+    u = ((np.arange(w) - cols[ci]) / (cols[ci + 1] - cols[ci]))[None, :]
+
+    coarse = elevation[np.ix_(rows, cols)].astype(np.float64)
+    z0 = coarse[ri][:, ci]
+    z1 = coarse[ri][:, ci + 1]
+    z2 = coarse[ri + 1][:, ci]
+    z3 = coarse[ri + 1][:, ci + 1]
+
+    upper = z0 + u * (z1 - z0) + t * (z2 - z0)
+    lower = z3 + (1 - u) * (z2 - z3) + (1 - t) * (z1 - z3)
+    surface = np.where(u + t <= 1, upper, lower)
+    return float(np.max(np.abs(surface - elevation)))
+
+
+def terrain_grid_stride(
+    elevation: NDArray[np.float32],
+    max_error: float = TERRAIN_MAX_ERROR,
+    max_faces: int = TERRAIN_MAX_FACES,
+) -> int:
+    """Sampling stride for a decimated terrain grid.
+
+    Starts from the finest stride that fits the face budget and doubles
+    it while the mesh stays within max_error of the heightmap, so flat
+    tiles get a few dozen triangles and rough ones keep their detail.
+
+    Args:
+        elevation: Heightmap (H, W)
+        max_error: Largest allowed height deviation in meters
+        max_faces: Face budget
+
+    Returns:
+        Stride in heightmap samples (1 = full resolution)
+    """
+    h, w = elevation.shape
+
+    def face_count(stride: int) -> int:
+        return 2 * (len(grid_sample_indices(h, stride)) - 1) * (len(grid_sample_indices(w, stride)) - 1)
+
+    stride = 1
+    while face_count(stride) > max_faces and stride < max(h, w) - 1:
+        stride += 1
+
+    while stride * 2 < max(h, w):
+        coarser = stride * 2
+        error = terrain_mesh_error(
+            elevation, grid_sample_indices(h, coarser), grid_sample_indices(w, coarser)
+        )
+        if error > max_error:
+            break
+        stride = coarser
+
+    return stride
+
+
+def _gather_rings(
+    lengths: NDArray[np.int64],
+) -> Tuple[NDArray[np.int64], NDArray[np.int64], NDArray[np.int64]]:
+    """Index rings of the given lengths packed back to back.
+
+    Returns:
+        Tuple of (ring of each packed vertex, its position within the ring,
+        start of each ring in the packed array)
+    """
+    ring_of = np.repeat(np.arange(len(lengths)), lengths)
+    packed_starts = np.zeros(len(lengths), dtype=np.int64)
+    if len(lengths):
+        np.cumsum(lengths[:-1], out=packed_starts[1:])
+    local = np.arange(len(ring_of)) - packed_starts[ring_of]
+    return ring_of, local, packed_starts
+
+
+def extrusion_arrays(
+    coords: NDArray[np.float64],
+    offsets: NDArray[np.int64],
+    ring_polygon: NDArray[np.int64],
+    heights: NDArray[np.float64],
+    bases: NDArray[np.float64],
+) -> Tuple[NDArray[np.float64], NDArray[np.int64], NDArray[np.int64]]:
+    """Vertex and face buffers for many footprints extruded into prisms.
+
+    Rings are packed back to back; each polygon's outer ring comes first,
+    followed by its holes. Closing vertices and rings with fewer than three
+    vertices or no area are dropped (a polygon without a usable outer ring
+    is dropped entirely). Outer rings are oriented CCW and holes CW, so
+    the wall quads of both face outwards. Caps are triangulated by earcut.
+
+    Args:
+        coords: (V, 2) local ring vertices
+        offsets: (R+1,) ring start offsets into coords
+        ring_polygon: (R,) polygon index of each ring
+        heights: (P,) extrusion height per polygon
+        bases: (P,) base elevation per polygon
+
+    Returns:
+        Tuple of (vertices (2M, 3), faces (F, 3), indices of the polygons
+        that were kept)
+    """
+    import mapbox_earcut
+
+    coords = np.asarray(coords, dtype=np.float64)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    ring_polygon = np.asarray(ring_polygon, dtype=np.int64)
+    empty = (np.empty((0, 3)), np.empty((0, 3), dtype=np.int64), np.empty(0, dtype=np.int64))
+    if len(coords) == 0:
+        return empty
+
+    starts = offsets[:-1]
+    lengths = np.diff(offsets)
+    is_outer = np.ones(len(lengths), dtype=bool)
+    is_outer[1:] = ring_polygon[1:] != ring_polygon[:-1]
+
+    # GeoJSON rings repeat the first vertex at the end
+    last = np.maximum(offsets[1:] - 1, 0)
+    first = np.minimum(starts, len(coords) - 1)
+    lengths = lengths - ((lengths > 1) & np.all(coords[first] == coords[last], axis=1))
+
+    # Signed ring areas (shoelace)
+    ring_of, local, packed_starts = _gather_rings(lengths)
+    xy = coords[starts[ring_of] + local]
+    nxt = np.where(local + 1 == lengths[ring_of], packed_starts[ring_of], np.arange(len(xy)) + 1)
+    cross = xy[:, 0] * xy[nxt, 1] - xy[nxt, 0] * xy[:, 1]
+    area = np.bincount(ring_of, weights=cross, minlength=len(lengths)) / 2
+
+    keep = (lengths >= 3) & (np.abs(area) > 1e-9)
+    outer_kept = np.zeros(int(ring_polygon.max()) + 1, dtype=bool)
+    outer_kept[ring_polygon[is_outer]] = keep[is_outer]
+    keep &= outer_kept[ring_polygon]
+    if not keep.any():
+        return empty
+
+    # Repack kept rings: outer rings CCW, holes CW
+    flip = (area > 0) != is_outer
+    xy = xy[keep[ring_of]]
+    rings = np.flatnonzero(keep)
+    lengths = lengths[rings]
+    ring_of, local, starts = _gather_rings(lengths)
+    source = np.where(flip[rings][ring_of], starts[ring_of] + lengths[ring_of] - 1 - local, np.arange(len(xy)))
+    xy = xy[source]
+    m = len(xy)
+    index = np.arange(m)
+    nxt = np.where(local + 1 == lengths[ring_of], starts[ring_of], index + 1)
+
+    polygon = ring_polygon[rings]
+    base = np.asarray(bases, dtype=np.float64)[polygon][ring_of]
+    top = base + np.asarray(heights, dtype=np.float64)[polygon][ring_of]
+    vertices = np.empty((2 * m, 3), dtype=np.float64)
+    vertices[:m, :2] = xy
+    vertices[:m, 2] = base
+    vertices[m:, :2] = xy
+    vertices[m:, 2] = top
+
+    # Caps: earcut per polygon on its slice of the packed rings
+    ends = starts + lengths
+    first_ring = np.flatnonzero(is_outer[rings])
+    last_ring = np.append(first_ring[1:], len(rings)) - 1
+    caps = []
+    for r0, r1 in zip(first_ring, last_ring):
+        v0 = starts[r0]
+        triangles = mapbox_earcut.triangulate_float64(
+            xy[v0:ends[r1]], (ends[r0:r1 + 1] - v0).astype(np.uint32)
+        )
+        caps.append(triangles.astype(np.int64) + v0)
+    caps = np.concatenate(caps).reshape(-1, 3)
+
+    # Orient cap triangles to face up
+    a, b, c = xy[caps[:, 0]], xy[caps[:, 1]], xy[caps[:, 2]]
+    down = (b[:, 0] - a[:, 0]) * (c[:, 1] - a[:, 1]) - (b[:, 1] - a[:, 1]) * (c[:, 0] - a[:, 0]) < 0
+    caps[down] = caps[down][:, ::-1]
+
+    walls = np.stack([index, nxt, m + nxt, index, m + nxt, m + index], axis=1).reshape(-1, 3)
+    faces = np.concatenate([caps[:, ::-1], caps + m, walls])
+
+    return vertices, faces, np.unique(polygon)
+
+
+def stamp_template(
+    vertices: NDArray[np.float64],
+    faces: NDArray[np.int64],
+    offsets: NDArray[np.float64],
+    scales: NDArray[np.float64],
+) -> Tuple[NDArray[np.float64], NDArray[np.int64]]:
+    """Copies of a template mesh, scaled and translated per instance.
+
+    Args:
+        vertices: (V, 3) template vertices
+        faces: (F, 3) template faces
+        offsets: (N, 3) translation per instance
+        scales: (N, 3) x/y/z scale per instance
+
+    Returns:
+        Tuple of (vertices (N*V, 3), faces (N*F, 3))
+    """
+    offsets = np.asarray(offsets, dtype=np.float64)
+    scales = np.asarray(scales, dtype=np.float64)
+    placed = vertices[None, :, :] * scales[:, None, :] + offsets[:, None, :]
+    stamped = faces[None, :, :] + (len(vertices) * np.arange(len(offsets)))[:, None, None]
+    return placed.reshape(-1, 3), stamped.reshape(-1, 3)
+
+
 @dataclass
 class SceneBounds:
     """Geographic bounds with Web Mercator coordinate conversion.
@@ -87,6 +328,26 @@ class SceneBounds:
         y = my - self.sw_mercator[1]
         return (x, y)
 
+    def wgs84_to_local_array(
+        self,
+        lons: NDArray[np.float64],
+        lats: NDArray[np.float64],
+    ) -> NDArray[np.float64]:
+        """Vectorized wgs84_to_local for many points.
+
+        Returns:
+            Array of shape (N, 2) with local (x, y) coordinates
+        """
+        lons = np.asarray(lons, dtype=np.float64)
+        lats = np.asarray(lats, dtype=np.float64)
+        local = np.empty(lons.shape + (2,), dtype=np.float64)
+        local[..., 0] = np.radians(lons) * EARTH_RADIUS - self.sw_mercator[0]
+        local[..., 1] = (
+            np.log(np.tan(np.pi / 4 + np.radians(lats) / 2)) * EARTH_RADIUS
+            - self.sw_mercator[1]
+        )
+        return local
+
     def local_to_wgs84(self, x: float, y: float) -> Tuple[float, float]:
         """Convert local scene coordinates back to WGS84."""
         mx = x + self.sw_mercator[0]
@@ -190,26 +451,37 @@ class SceneBuilder:
         elevation: NDArray[np.float32],
         z_scale: float = 1.0,
         simplify: bool = True,
+        max_error: float = TERRAIN_MAX_ERROR,
+        max_faces: int = TERRAIN_MAX_FACES,
     ) -> "SceneBuilder":
         """Add terrain mesh from elevation heightmap.
 
+        With simplify, the mesh is built directly on a decimated regular
+        grid: the coarsest grid whose surface stays within max_error of
+        the full-resolution heightmap, and within max_faces.
+
         Args:
             elevation: 2D array of elevation values in meters (H, W)
             z_scale: Vertical exaggeration factor
             simplify: Whether to simplify the mesh for performance
+            max_error: Largest allowed height deviation in meters (simplify only)
+            max_faces: Face budget (simplify only); overrides max_error
 
         Returns:
             Self for method chaining
         """
         h, w = elevation.shape
+        stride = terrain_grid_stride(elevation, max_error, max_faces) if simplify else 1
+        rows = grid_sample_indices(h, stride)
+        cols = grid_sample_indices(w, stride)
 
         # Create grid of vertices
-        x = np.linspace(0, self.bounds.width_meters, w)
-        y = np.linspace(0, self.bounds.height_meters, h)
+        x = np.linspace(0, self.bounds.width_meters, w)[cols]
+        y = np.linspace(0, self.bounds.height_meters, h)[rows]
         xx, yy = np.meshgrid(x, y)
 
         # Scale elevation
-        zz = elevation * z_scale
+        zz = elevation[np.ix_(rows, cols)] * z_scale
 
         # Flatten to vertex array
         vertices = np.column_stack([
@@ -218,32 +490,10 @@ class SceneBuilder:
             zz.ravel()
         ])
 
-        # Create faces (two triangles per quad)
-        faces = []
-        for i in range(h - 1):
-            for j in range(w - 1):
-                # Vertex indices
-                v0 = i * w + j
-                v1 = i * w + j + 1
-                v2 = (i + 1) * w + j
-                v3 = (i + 1) * w + j + 1
-
-                # Two triangles per quad
-                faces.append([v0, v2, v1])
-                faces.append([v1, v2, v3])
-
-        faces = np.array(faces)
-
-        # Create mesh
-        terrain = trimesh.Trimesh(vertices=vertices, faces=faces)
-
-        if simplify and len(terrain.faces) > 10000:
-            # Simplify large terrains (requires fast_simplification package)
-            try:
-                terrain = terrain.simplify_quadric_decimation(10000)
-            except (ImportError, ModuleNotFoundError):
-                # fast_simplification not installed, skip simplification
-                pass
+        # Create mesh (two triangles per quad)
+        terrain = trimesh.Trimesh(
+            vertices=vertices, faces=grid_faces(len(rows), len(cols)), process=False
+        )
 
         self._meshes.append(terrain)
         self.stats.num_terrain_vertices = len(vertices)
@@ -257,6 +507,10 @@ class SceneBuilder:
     ) -> "SceneBuilder":
         """Add building meshes by extruding footprints.
 
+        All footprints are extruded together into a single mesh: ring
+        coordinates are converted in one pass and caps and walls are built
+        as array operations (see extrusion_arrays).
+
         Args:
             features: Building features with height and polygon coordinates
             default_height: Height to use if feature has no height
@@ -264,6 +518,11 @@ class SceneBuilder:
         Returns:
             Self for method chaining
         """
+        rings = []
+        ring_polygon = []
+        heights = []
+        bases = []
+
         for feature in features:
             if feature.geometry_type not in ("Polygon", "MultiPolygon"):
                 continue
@@ -280,10 +539,32 @@ class SceneBuilder:
                 polygons = feature.coordinates
 
             for polygon in polygons:
-                mesh = self._extrude_polygon(polygon, height, base_z)
-                if mesh is not None:
-                    self._meshes.append(mesh)
-                    self.stats.num_buildings += 1
+                if len(polygon) == 0 or len(polygon[0]) < 3:
+                    continue
+                for ring in polygon:
+                    if len(ring) >= 3:
+                        rings.append(np.asarray(ring, dtype=np.float64)[:, :2])
+                        ring_polygon.append(len(heights))
+                heights.append(height)
+                bases.append(base_z)
+
+        if not rings:
+            return self
+
+        lonlat = np.concatenate(rings)
+        offsets = np.zeros(len(rings) + 1, dtype=np.int64)
+        np.cumsum([len(ring) for ring in rings], out=offsets[1:])
+
+        vertices, faces, kept = extrusion_arrays(
+            self.bounds.wgs84_to_local_array(lonlat[:, 0], lonlat[:, 1]),
+            offsets,
+            np.array(ring_polygon),
+            np.array(heights, dtype=np.float64),
+            np.array(bases, dtype=np.float64),
+        )
+        if len(faces):
+            self._meshes.append(trimesh.Trimesh(vertices=vertices, faces=faces, process=False))
+            self.stats.num_buildings += len(kept)
 
         return self
 
@@ -469,6 +750,9 @@ class SceneBuilder:
     ) -> "SceneBuilder":
         """Add tree volumes as cones or cylinders.
 
+        Every tree is a scaled copy of one 8-sided template, so all trees
+        end up in a single mesh.
+
         Args:
             features: Tree features with position and dimensions
             default_height: Height if not specified
@@ -478,45 +762,48 @@ class SceneBuilder:
         Returns:
             Self for method chaining
         """
+        positions = []
+        heights = []
+        radii = []
+        bases = []
+
         for feature in features:
             if feature.geometry_type != "Point":
                 continue
 
-            lon, lat = feature.coordinates
-            x, y = self.bounds.wgs84_to_local(lon, lat)
-
-            height = feature.height if feature.height > 0 else default_height
+            positions.append(feature.coordinates[:2])
+            heights.append(feature.height if feature.height > 0 else default_height)
             crown_diam = feature.properties.get("crown_diameter", default_crown_radius * 2)
-            crown_radius = crown_diam / 2
+            radii.append(crown_diam / 2)
 
             # Get base elevation
             base_z = feature.properties.get("elevation", 0)
+            bases.append(base_z)
 
-            # Create tree volume
-            if use_cones:
-                # Cone for deciduous trees (inverted cone = crown shape)
-                tree = trimesh.creation.cone(
-                    radius=crown_radius,
-                    height=height,
-                    sections=8,  # Low-poly for performance
-                )
-                # Move to position (cone is centered at origin)
-                tree.vertices[:, 2] += base_z + height / 2
-            else:
-                # Cylinder for conifers
-                tree = trimesh.creation.cylinder(
-                    radius=crown_radius,
-                    height=height,
-                    sections=8,
-                )
-                tree.vertices[:, 2] += base_z + height / 2
+        if not positions:
+            return self
 
-            # Translate to position
-            tree.vertices[:, 0] += x
-            tree.vertices[:, 1] += y
+        # Unit template (low-poly for performance): a cone for deciduous
+        # trees (crown shape), a cylinder for conifers
+        if use_cones:
+            template = trimesh.creation.cone(radius=1.0, height=1.0, sections=8)
+        else:
+            template = trimesh.creation.cylinder(radius=1.0, height=1.0, sections=8)
 
-            self._meshes.append(tree)
-            self.stats.num_trees += 1
+        lonlat = np.asarray(positions, dtype=np.float64)
+        heights = np.asarray(heights, dtype=np.float64)
+        radii = np.asarray(radii, dtype=np.float64)
+
+        offsets = np.empty((len(lonlat), 3))
+        offsets[:, :2] = self.bounds.wgs84_to_local_array(lonlat[:, 0], lonlat[:, 1])
+        offsets[:, 2] = np.asarray(bases, dtype=np.float64) + heights / 2
+        scales = np.column_stack([radii, radii, heights])
+
+        vertices, faces = stamp_template(
+            np.asarray(template.vertices), np.asarray(template.faces), offsets, scales
+        )
+        self._meshes.append(trimesh.Trimesh(vertices=vertices, faces=faces, process=False))
+        self.stats.num_trees += len(lonlat)
 
         return self
 
@@ -806,67 +1093,6 @@ class SceneBuilder:
 
         return self
 
-    def _extrude_polygon(
-        self,
-        polygon_coords: List[List[Tuple[float, float]]],
-        height: float,
-        base_z: float = 0,
-    ) -> Optional[trimesh.Trimesh]:
-        """Extrude a polygon to create a building mesh.
-
-        Args:
-            polygon_coords: List of rings [outer, hole1, hole2, ...]
-            height: Extrusion height in meters
-            base_z: Base elevation in meters
-
-        Returns:
-            Trimesh object or None if invalid
-        """
-        if len(polygon_coords) == 0 or len(polygon_coords[0]) < 3:
-            return None
-
-        try:
-            # Convert outer ring to local coordinates
-            outer_ring = polygon_coords[0]
-            local_coords = np.array([
-                self.bounds.wgs84_to_local(lon, lat)
-                for lon, lat in outer_ring
-            ])
-
-            # Create 2D polygon path
-            from shapely.geometry import Polygon as ShapelyPolygon
-
-            # Handle holes if present
-            if len(polygon_coords) > 1:
-                holes = [
-                    [self.bounds.wgs84_to_local(lon, lat) for lon, lat in ring]
-                    for ring in polygon_coords[1:]
-                ]
-                shapely_poly = ShapelyPolygon(local_coords, holes)
-            else:
-                shapely_poly = ShapelyPolygon(local_coords)
-
-            if not shapely_poly.is_valid:
-                shapely_poly = shapely_poly.buffer(0)  # Fix invalid geometry
-
-            if shapely_poly.is_empty:
-                return None
-
-            # Extrude using trimesh
-            mesh = trimesh.creation.extrude_polygon(
-                shapely_poly,
-                height=height,
-            )
-
-            # Move to correct Z position
-            mesh.vertices[:, 2] += base_z
-
-            return mesh
-
-        except Exception as e:
-            # Invalid geometry - skip silently
-            return None
-
     def build(self) -> trimesh.Trimesh:
         """Combine all meshes into a single scene.
 
@@ -41,7 +41,6 @@ Requires:
 """
 
 import base64
-import hashlib
 import io
 import os
 import time
@@ -53,6 +52,8 @@ import numpy as np
 from numpy.typing import NDArray
 from PIL import Image
 
+from .provider_cache import ProviderCache, default_provider_cache, request_key
+
 
 # =============================================================================
 # SD STYLE PRESETS
@@ -434,6 +435,43 @@ def list_img2img_styles() -> dict[str, str]:
 # =============================================================================
 
 
+def run_replicate_model(replicate, model: str, image_bytes: bytes, inputs: dict) -> bytes:
+    """Run a Replicate image model on PNG bytes and download the output image.
+
+    Args:
+        replicate: The replicate module
+        model: Model version ID
+        image_bytes: PNG input image, sent as a data URI
+        inputs: Remaining model inputs
+
+    Returns:
+        Bytes of the generated image file
+    """
+    import requests
+
+    image_uri = "data:image/png;base64," + base64.b64encode(image_bytes).decode("utf-8")
+    output = replicate.run(model, input={"image": image_uri, **inputs})
+
+    # Handle output - Replicate returns URL(s)
+    output_url = output[0] if isinstance(output, list) else str(output)
+    response = requests.get(output_url, timeout=60)
+    response.raise_for_status()
+    return response.content
+
+
+def _response_cache(cache_dir: Optional[Path]) -> ProviderCache:
+    """Response cache under cache_dir, or the default shared one."""
+    if cache_dir is None:
+        return default_provider_cache()
+    return ProviderCache.shared(cache_dir / "provider_responses")
+
+
+def _decode_rgb(data: bytes) -> NDArray[np.uint8]:
+    """Decode image file bytes to an RGB array."""
+    with Image.open(io.BytesIO(data)) as img:
+        return np.array(img.convert("RGB"))
+
+
 @dataclass
 class SatelliteStyleResult:
     """Result from a satellite tile style transfer operation."""
@@ -497,7 +535,8 @@ class SatelliteStyleTransfer:
 
         Args:
             api_token: Replicate API token (defaults to REPLICATE_API_TOKEN env var)
-            cache_dir: Directory for caching results
+            cache_dir: Directory for caching results (responses are kept in
+                its provider_responses/ subdirectory)
             timeout: API timeout in seconds
         """
         self.api_token = api_token or os.environ.get("REPLICATE_API_TOKEN")
@@ -513,6 +552,7 @@ class SatelliteStyleTransfer:
 
         # Ensure cache directory exists
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.response_cache = _response_cache(cache_dir)
 
         # Lazy import replicate
         self._replicate = None
@@ -531,28 +571,12 @@ class SatelliteStyleTransfer:
                 )
         return self._replicate
 
-    def _get_cache_key(self, tile_coord: str, style: str, seed: int) -> str:
-        """Generate a cache key for tile+style+seed combination."""
-        combined = f"{tile_coord}_{style}_pix2pix_{seed}"
-        return hashlib.md5(combined.encode()).hexdigest()[:16]
-
-    def _cache_path(self, cache_key: str) -> Path:
-        """Get cache file path."""
-        return self.cache_dir / "satellite_styled" / f"{cache_key}.png"
-
-    def _load_from_cache(self, cache_key: str) -> Optional[NDArray[np.uint8]]:
-        """Load a cached result."""
-        cache_path = self._cache_path(cache_key)
-        if cache_path.exists():
-            with Image.open(cache_path) as img:
-                return np.array(img.convert("RGB"))
-        return None
-
-    def _save_to_cache(self, cache_key: str, image: NDArray[np.uint8]) -> None:
-        """Save a result to cache."""
-        cache_path = self._cache_path(cache_key)
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-        Image.fromarray(image).save(cache_path)
+    @staticmethod
+    def image_to_bytes(image: NDArray[np.uint8], format: str = "PNG") -> bytes:
+        """Encode a numpy array as image file bytes."""
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, format=format)
+        return buffer.getvalue()
 
     @staticmethod
     def image_to_data_uri(image: NDArray[np.uint8], format: str = "PNG") -> str:
@@ -587,10 +611,10 @@ class SatelliteStyleTransfer:
         Args:
             satellite_image: Satellite RGB image (H, W, 3)
             style: Style name or Img2ImgStylePreset object
-            tile_coord: Tile coordinate string for caching (e.g., "16/34322/22950")
+            tile_coord: Tile coordinate string for reporting (e.g., "16/34322/22950")
             seed: Random seed (None = use style's default seed)
             image_guidance_scale: Override style's image_guidance_scale (higher = more faithful)
-            use_cache: Whether to use cached results
+            use_cache: Whether to reuse cached responses
 
         Returns:
             SatelliteStyleResult with transformed image
@@ -607,23 +631,6 @@ class SatelliteStyleTransfer:
         actual_seed = seed if seed is not None else style_preset.seed
         actual_image_guidance = image_guidance_scale if image_guidance_scale is not None else style_preset.image_guidance_scale
 
-        # Check cache
-        if use_cache:
-            cache_key = self._get_cache_key(tile_coord, style_name, actual_seed)
-            cached = self._load_from_cache(cache_key)
-            if cached is not None:
-                return SatelliteStyleResult(
-                    image=cached,
-                    style=style_name,
-                    tile_coord=tile_coord,
-                    processing_time_ms=0,
-                    cached=True,
-                    seed=actual_seed,
-                    image_guidance_scale=actual_image_guidance,
-                    model="instruct-pix2pix",
-                    metadata={"from_cache": True},
-                )
-
         start_time = time.time()
 
         # Ensure image is 512x512
@@ -632,34 +639,30 @@ class SatelliteStyleTransfer:
             pil_img = pil_img.resize((512, 512), Image.LANCZOS)
             satellite_image = np.array(pil_img)
 
-        # Convert to data URI for Replicate
-        image_uri = self.image_to_data_uri(satellite_image, format="PNG")
-
-        # Run InstructPix2Pix via Replicate
-        try:
-            output = self.replicate.run(
-                self.INSTRUCT_PIX2PIX_MODEL,
-                input={
-                    "image": image_uri,
-                    "prompt": style_preset.prompt,
-                    "num_inference_steps": style_preset.num_inference_steps,
-                    "guidance_scale": style_preset.guidance_scale,
-                    "image_guidance_scale": actual_image_guidance,
-                    "seed": actual_seed,
-                },
-            )
-
-            # Handle output - Replicate returns URL(s)
-            if isinstance(output, list):
-                output_url = output[0]
-            else:
-                output_url = output
+        # Run InstructPix2Pix via Replicate (responses cached by request content)
+        image_bytes = self.image_to_bytes(satellite_image)
+        inputs = {
+            "prompt": style_preset.prompt,
+            "num_inference_steps": style_preset.num_inference_steps,
+            "guidance_scale": style_preset.guidance_scale,
+            "image_guidance_scale": actual_image_guidance,
+            "seed": actual_seed,
+        }
 
-            # Download generated image
-            generated_image = self.url_to_image(output_url)
+        def request() -> bytes:
+            try:
+                return run_replicate_model(
+                    self.replicate, self.INSTRUCT_PIX2PIX_MODEL, image_bytes, inputs
+                )
+            except Exception as e:
+                raise ValueError(f"Replicate API error: {e}")
 
-        except Exception as e:
-            raise ValueError(f"Replicate API error: {e}")
+        key = request_key(
+            "replicate", self.INSTRUCT_PIX2PIX_MODEL, style_preset.prompt,
+            images=[image_bytes], params=inputs,
+        )
+        data, cached = self.response_cache.fetch(key, request, refresh=not use_cache)
+        generated_image = _decode_rgb(data)
 
         # Ensure output is 512x512
         if generated_image.shape[:2] != (512, 512):
@@ -669,21 +672,17 @@ class SatelliteStyleTransfer:
 
         processing_time = int((time.time() - start_time) * 1000)
 
-        # Cache result
-        if use_cache:
-            cache_key = self._get_cache_key(tile_coord, style_name, actual_seed)
-            self._save_to_cache(cache_key, generated_image)
-
         return SatelliteStyleResult(
             image=generated_image,
             style=style_name,
             tile_coord=tile_coord,
             processing_time_ms=processing_time,
-            cached=False,
+            cached=cached,
             seed=actual_seed,
             image_guidance_scale=actual_image_guidance,
             model="instruct-pix2pix",
             metadata={
+                "from_cache": cached,
                 "prompt": style_preset.prompt,
                 "image_guidance_scale": actual_image_guidance,
                 "steps": style_preset.num_inference_steps,
@@ -763,7 +762,8 @@ class SDTileGenerator:
 
         Args:
             api_token: Replicate API token (defaults to REPLICATE_API_TOKEN env var)
-            cache_dir: Directory for caching results
+            cache_dir: Directory for caching results (responses are kept in
+                its provider_responses/ subdirectory)
             timeout: API timeout in seconds
             use_sdxl: Use SDXL model (True) or SD 1.5 (False)
         """
@@ -781,6 +781,7 @@ class SDTileGenerator:
 
         # Ensure cache directory exists
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.response_cache = _response_cache(cache_dir)
 
         # Lazy import replicate
         self._replicate = None
@@ -799,28 +800,12 @@ class SDTileGenerator:
                 )
         return self._replicate
 
-    def _get_cache_key(self, tile_coord: str, style: str, seed: int) -> str:
-        """Generate a cache key for tile+style+seed combination."""
-        combined = f"{tile_coord}_{style}_sd_{seed}"
-        return hashlib.md5(combined.encode()).hexdigest()[:16]
-
-    def _cache_path(self, cache_key: str) -> Path:
-        """Get cache file path."""
-        return self.cache_dir / "sd_tiles" / f"{cache_key}.png"
-
-    def _load_from_cache(self, cache_key: str) -> Optional[NDArray[np.uint8]]:
-        """Load a cached result."""
-        cache_path = self._cache_path(cache_key)
-        if cache_path.exists():
-            with Image.open(cache_path) as img:
-                return np.array(img.convert("RGB"))
-        return None
-
-    def _save_to_cache(self, cache_key: str, image: NDArray[np.uint8]) -> None:
-        """Save a result to cache."""
-        cache_path = self._cache_path(cache_key)
-        cache_path.parent.mkdir(parents=True, exist_ok=True)
-        Image.fromarray(image).save(cache_path)
+    @staticmethod
+    def image_to_bytes(image: NDArray[np.uint8], format: str = "PNG") -> bytes:
+        """Encode a numpy array as image file bytes."""
+        buffer = io.BytesIO()
+        Image.fromarray(image).save(buffer, format=format)
+        return buffer.getvalue()
 
     @staticmethod
     def image_to_data_uri(image: NDArray[np.uint8], format: str = "PNG") -> str:
@@ -854,28 +839,21 @@ class SDTileGenerator:
         Returns:
             Grayscale depth map (H, W) where white=far, black=near
         """
-        # Convert to data URI
-        rgb_uri = self.image_to_data_uri(rgb_image, format="PNG")
+        image_bytes = self.image_to_bytes(rgb_image)
+        inputs = {"model_type": "dpt_beit_large_512"}  # Best quality
+        key = request_key(
+            "replicate", self.DEPTH_ESTIMATION_MODEL, "", images=[image_bytes], params=inputs
+        )
 
         print("    Estimating depth with MiDaS...")
         try:
-            output = self.replicate.run(
-                self.DEPTH_ESTIMATION_MODEL,
-                input={
-                    "image": rgb_uri,
-                    "model_type": "dpt_beit_large_512",  # Best quality
-                },
+            data, _ = self.response_cache.fetch(
+                key,
+                lambda: run_replicate_model(
+                    self.replicate, self.DEPTH_ESTIMATION_MODEL, image_bytes, inputs
+                ),
             )
-
-            # Download depth map
-            if isinstance(output, str):
-                depth_url = output
-            elif isinstance(output, list):
-                depth_url = output[0]
-            else:
-                depth_url = str(output)
-
-            depth_image = self.url_to_image(depth_url)
+            depth_image = _decode_rgb(data)
 
             # Convert to grayscale if needed
             if len(depth_image.shape) == 3:
@@ -906,9 +884,9 @@ class SDTileGenerator:
             depth_map: Depth pass from Blender (H, W) or (H, W, 3) grayscale.
                       If None, depth will be estimated from blender_image using MiDaS.
             style: Style name or SDStylePreset object
-            tile_coord: Tile coordinate string for caching (e.g., "16/34322/22950")
+            tile_coord: Tile coordinate string for reporting (e.g., "16/34322/22950")
             seed: Random seed (None = use style's default seed)
-            use_cache: Whether to use cached results
+            use_cache: Whether to reuse cached responses
 
         Returns:
             SDGenerationResult with generated image
@@ -924,22 +902,6 @@ class SDTileGenerator:
         tile_coord = tile_coord or "unknown"
         actual_seed = seed if seed is not None else style_preset.seed
 
-        # Check cache
-        if use_cache:
-            cache_key = self._get_cache_key(tile_coord, style_name, actual_seed)
-            cached = self._load_from_cache(cache_key)
-            if cached is not None:
-                return SDGenerationResult(
-                    image=cached,
-                    style=style_name,
-                    tile_coord=tile_coord,
-                    processing_time_ms=0,
-                    cached=True,
-                    seed=actual_seed,
-                    model="sd-controlnet-depth",
-                    metadata={"from_cache": True},
-                )
-
         start_time = time.time()
 
         # Estimate depth if not provided
@@ -962,35 +924,29 @@ class SDTileGenerator:
             pil_depth = pil_depth.resize((512, 512), Image.LANCZOS)
             depth_rgb = np.array(pil_depth)
 
-        # Convert to data URI for Replicate
-        depth_uri = self.image_to_data_uri(depth_rgb, format="PNG")
-
-        # Run ControlNet Depth model via Replicate
+        # Run ControlNet Depth model via Replicate (responses cached by request content)
         # Note: lucataco/sdxl-controlnet-depth uses these parameters:
         # - image, prompt, num_inference_steps, condition_scale, seed
-        try:
-            output = self.replicate.run(
-                self.CONTROLNET_MODEL,
-                input={
-                    "image": depth_uri,
-                    "prompt": style_preset.prompt,
-                    "num_inference_steps": style_preset.num_inference_steps,
-                    "condition_scale": min(1.0, style_preset.controlnet_conditioning_scale),  # Clamp to 0-1
-                    "seed": actual_seed,
-                },
-            )
-
-            # Handle output - Replicate returns URL(s)
-            if isinstance(output, list):
-                output_url = output[0]
-            else:
-                output_url = output
+        depth_bytes = self.image_to_bytes(depth_rgb)
+        inputs = {
+            "prompt": style_preset.prompt,
+            "num_inference_steps": style_preset.num_inference_steps,
+            "condition_scale": min(1.0, style_preset.controlnet_conditioning_scale),  # Clamp to 0-1
+            "seed": actual_seed,
+        }
 
-            # Download generated image
-            generated_image = self.url_to_image(output_url)
+        def request() -> bytes:
+            try:
+                return run_replicate_model(self.replicate, self.CONTROLNET_MODEL, depth_bytes, inputs)
+            except Exception as e:
+                raise ValueError(f"Replicate API error: {e}")
 
-        except Exception as e:
-            raise ValueError(f"Replicate API error: {e}")
+        key = request_key(
+            "replicate", self.CONTROLNET_MODEL, style_preset.prompt,
+            images=[depth_bytes], params=inputs,
+        )
+        data, cached = self.response_cache.fetch(key, request, refresh=not use_cache)
+        generated_image = _decode_rgb(data)
 
         # Resize to 512x512 if needed
         if generated_image.shape[:2] != (512, 512):
@@ -1000,20 +956,16 @@ class SDTileGenerator:
 
         processing_time = int((time.time() - start_time) * 1000)
 
-        # Cache result
-        if use_cache:
-            cache_key = self._get_cache_key(tile_coord, style_name, actual_seed)
-            self._save_to_cache(cache_key, generated_image)
-
         return SDGenerationResult(
             image=generated_image,
             style=style_name,
             tile_coord=tile_coord,
             processing_time_ms=processing_time,
-            cached=False,
+            cached=cached,
             seed=actual_seed,
             model="sd-controlnet-depth",
             metadata={
+                "from_cache": cached,
                 "prompt": style_preset.prompt[:100] + "...",
                 "controlnet_scale": style_preset.controlnet_conditioning_scale,
                 "steps": style_preset.num_inference_steps,
@@ -1233,7 +1185,7 @@ def generate_sd_tiles_for_area(
                 style=style,
                 tile_coord=coord,
                 seed=actual_seed,
-                use_cache=False,  # We already filtered cached tiles
+                use_cache=use_cache,  # Response cache still covers missing outputs
             )
 
             # Save to output directory
@@ -1393,7 +1345,7 @@ def generate_satellite_styled_tiles(
                 tile_coord=coord,
                 seed=actual_seed,
                 image_guidance_scale=actual_image_guidance,
-                use_cache=False,  # We already filtered cached tiles
+                use_cache=use_cache,  # Response cache still covers missing outputs
             )
 
             # Save to output directory
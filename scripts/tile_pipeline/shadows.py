@@ -66,6 +66,12 @@ def building_shadows(
     - 1.0 = no shadow (full light)
     - darkness value = in shadow
 
+    Overlapping shadows multiply, so the mask value is
+    (1 - (1 - darkness)) ** n for a pixel covered by n building shadows.
+    All buildings are drawn onto one reusable canvas; only each shadow's
+    pixel bounding box is read back into an integer coverage count, and
+    the count is mapped to mask values in a single lookup at the end.
+
     Args:
         features: Building features with height and polygon coordinates
         bounds: (west, south, east, north) in WGS84 degrees
@@ -77,22 +83,18 @@ def building_shadows(
     Returns:
         Shadow mask of shape (size, size) with values darkness to 1.0
     """
-    # Initialize with full light
-    shadow_mask = np.ones((size, size), dtype=np.float32)
+    # Number of building shadows covering each pixel
+    coverage = np.zeros((size, size), dtype=np.uint16)
+    canvas = Image.new("L", (size, size), 0)
+    draw = ImageDraw.Draw(canvas)
 
     west, south, east, north = bounds
-    x_range = east - west
-    y_range = north - south
 
     # Meters per degree at this latitude
     lat_center = (south + north) / 2
     meters_per_deg_x = 111000 * math.cos(math.radians(lat_center))
     meters_per_deg_y = 111000
 
-    # Pixels per meter
-    pixels_per_meter_x = size / (x_range * meters_per_deg_x)
-    pixels_per_meter_y = size / (y_range * meters_per_deg_y)
-
     for feature in features:
         if feature.height <= 0:
             continue
@@ -113,69 +115,81 @@ def building_shadows(
 
         for polygon in polygons:
             # Outer ring only for shadow (holes don't cast shadows)
-            outer_ring = polygon[0]
+            outer_ring = np.asarray(polygon[0], dtype=np.float64)[:, :2]
 
-            # Create shadow polygon by offsetting vertices
-            shadow_ring = [(x + dx_deg, y + dy_deg) for x, y in outer_ring]
+            # Shadow outline is the footprint offset along the shadow direction
+            shadow_ring = outer_ring + (dx_deg, dy_deg)
 
-            # Create combined footprint + shadow polygon
-            # This creates the characteristic shadow shape
             _render_shadow_polygon(
-                shadow_mask,
+                coverage,
+                canvas,
+                draw,
                 outer_ring,
                 shadow_ring,
                 bounds,
                 size,
-                1.0 - darkness,
             )
 
-    return shadow_mask
+    # Map counts to repeated multiplication by the shadow factor (identical
+    # to multiplying one shadow into a float32 mask at a time)
+    shadow_value = 1.0 - darkness
+    max_count = int(coverage.max()) if coverage.size else 0
+    lut = np.ones(max_count + 1, dtype=np.float32)
+    for n in range(1, max_count + 1):
+        lut[n] = np.float32(np.float64(lut[n - 1]) * (1 - shadow_value))
+
+    return lut[coverage]
 
 
 def _render_shadow_polygon(
-    mask: NDArray[np.float32],
-    footprint: list[tuple[float, float]],
-    shadow: list[tuple[float, float]],
+    coverage: NDArray[np.uint16],
+    canvas: Image.Image,
+    draw: ImageDraw.ImageDraw,
+    footprint: NDArray[np.float64],
+    shadow: NDArray[np.float64],
     bounds: tuple[float, float, float, float],
     size: int,
-    shadow_value: float,
 ) -> None:
-    """Render a shadow polygon onto the mask in-place.
+    """Add one building's shadow to the coverage count in-place.
 
     Creates a shadow that extends from building footprint to shadow outline.
+    The shape is drawn onto the shared blank canvas, its bounding box is
+    read back and added to coverage, and the box is cleared again.
     """
     west, south, east, north = bounds
 
-    def to_pixel(x: float, y: float) -> tuple[int, int]:
-        px = int((x - west) / (east - west) * size)
-        py = int((north - y) / (north - south) * size)  # Flip Y
-        return (px, py)
+    # Same truncation as int() on Python floats
+    def to_pixel(ring: NDArray[np.float64]) -> list[tuple[int, int]]:
+        px = ((ring[:, 0] - west) / (east - west) * size).astype(np.int64)
+        py = ((north - ring[:, 1]) / (north - south) * size).astype(np.int64)  # Flip Y
+        return list(zip(px.tolist(), py.tolist()))
 
-    # Create image for this shadow
-    img = Image.new("L", (size, size), 0)
-    draw = ImageDraw.Draw(img)
+    fp = to_pixel(footprint)
+    sh = to_pixel(shadow)
+
+    # Pixel bounding box of everything drawn, clipped to the tile
+    xs = [p[0] for p in fp + sh]
+    ys = [p[1] for p in fp + sh]
+    x0, x1 = max(min(xs) - 1, 0), min(max(xs) + 2, size)
+    y0, y1 = max(min(ys) - 1, 0), min(max(ys) + 2, size)
+    if x0 >= x1 or y0 >= y1:
+        return
 
     # Draw the shadow polygon (outline connects footprint to shadow)
     # Method: draw lines between corresponding vertices
-    for i in range(len(footprint)):
+    n = len(fp)
+    for i in range(n):
         # Quad from footprint edge to shadow edge
-        fp1 = to_pixel(*footprint[i])
-        fp2 = to_pixel(*footprint[(i + 1) % len(footprint)])
-        sh1 = to_pixel(*shadow[i])
-        sh2 = to_pixel(*shadow[(i + 1) % len(shadow)])
-
-        # Draw as polygon (trapezoid connecting the two edges)
-        quad = [fp1, fp2, sh2, sh1]
+        quad = [fp[i], fp[(i + 1) % n], sh[(i + 1) % n], sh[i]]
         draw.polygon(quad, fill=255)
 
     # Draw the shadow footprint (far end)
-    shadow_pixels = [to_pixel(x, y) for x, y in shadow]
-    if len(shadow_pixels) >= 3:
-        draw.polygon(shadow_pixels, fill=255)
+    if len(sh) >= 3:
+        draw.polygon(sh, fill=255)
 
-    # Apply to mask (multiply to accumulate shadows)
-    shadow_arr = np.array(img) / 255.0
-    mask *= (1 - shadow_arr * shadow_value)
+    box = (x0, y0, x1, y1)
+    coverage[y0:y1, x0:x1] += np.asarray(canvas.crop(box)) > 0
+    canvas.paste(0, box)
 
 
 def tree_shadows(
@@ -5,11 +5,15 @@ Provides unified access to:
 - SWISSIMAGE satellite imagery (WMTS)
 - Mapterhorn terrain elevation (Terrarium-encoded WebP)
 - Stadt Zürich vector data (buildings, trees)
+- Concurrent prefetching of raster tiles into the cache
 """
 
 from .satellite import fetch_satellite_tile, SatelliteSource
 from .elevation import fetch_elevation_tile, decode_terrarium, ElevationSource
-from .vector import VectorSource, query_features_in_tile
+from .vector import VectorSource, query_features_in_tile, partition_features_to_tiles
+from .feature_store import FeatureStore, build_feature_store, open_feature_store
+from .spatial_index import PackedIndex
+from .prefetch import TilePrefetcher, TileRequest
 
 __all__ = [
     "fetch_satellite_tile",
@@ -19,4 +23,11 @@ __all__ = [
     "ElevationSource",
     "VectorSource",
     "query_features_in_tile",
+    "partition_features_to_tiles",
+    "FeatureStore",
+    "build_feature_store",
+    "open_feature_store",
+    "PackedIndex",
+    "TilePrefetcher",
+    "TileRequest",
 ]
@@ -10,20 +10,27 @@ This gives a range of -32768m to +32767m with ~0.1m precision.
 """
 
 import io
+import os
+import threading
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional
 
 import numpy as np
 from numpy.typing import NDArray
-import requests
 from PIL import Image
 
 from ..config import PipelineConfig
+from ..tile_store import TileBackend, TileStore, tile_store_for
+from .prefetch import TileRequest, make_session
 
 
 # Default Mapterhorn terrain tiles URL
 DEFAULT_ELEVATION_URL = "https://tiles.mapterhorn.com/{z}/{x}/{y}.webp"
 
+# Decoded grids kept in memory per source (512×512 float32 = 1 MiB each)
+DEFAULT_MEMORY_TILES = 64
+
 
 def decode_terrarium(rgb: NDArray[np.uint8]) -> NDArray[np.float32]:
     """Decode Terrarium-encoded RGB to elevation in meters.
@@ -66,14 +73,35 @@ def encode_terrarium(elevation: NDArray[np.float32]) -> NDArray[np.uint8]:
     return np.stack([r, g, b], axis=-1)
 
 
+def resample_elevation(elevation: NDArray[np.float32], size: int) -> NDArray[np.float32]:
+    """Bilinearly resample an elevation grid (or sub-window) to size × size."""
+    img = Image.fromarray(np.ascontiguousarray(elevation, dtype=np.float32))
+    img = img.resize((size, size), Image.Resampling.BILINEAR)
+    return np.asarray(img, dtype=np.float32)
+
+
 class ElevationSource:
-    """Manages fetching and caching of terrain elevation tiles."""
+    """Manages fetching and caching of terrain elevation tiles.
+
+    Decoded elevation is cached at two levels so a tile used by several
+    renders is only WebP- and Terrarium-decoded once:
+
+    - on disk, as float32 .npy files under cache_dir/elevation_decoded/,
+      memory-mapped on load (rebuilt when the raw tile is newer)
+    - in memory, as an LRU of the most recently used grids
+
+    Arrays returned by fetch() and fetch_and_resize() are shared between
+    callers and therefore read-only; copy before modifying.
+    """
 
     def __init__(
         self,
         url_template: str = DEFAULT_ELEVATION_URL,
         cache_dir: Optional[Path] = None,
         timeout: int = 30,
+        cache_backend: TileBackend = "files",
+        memory_tiles: int = DEFAULT_MEMORY_TILES,
+        max_zoom: Optional[int] = None,
     ):
         """Initialize elevation source.
 
@@ -81,38 +109,112 @@ class ElevationSource:
             url_template: URL pattern with {z}, {x}, {y} placeholders
             cache_dir: Directory for tile cache (None = no caching)
             timeout: Request timeout in seconds
+            cache_backend: "files" (elevation/z/x/y.webp under cache_dir) or
+                "mbtiles" (a single elevation.mbtiles file)
+            memory_tiles: Decoded grids kept in memory (0 disables)
+            max_zoom: Deepest zoom fetched from the server. Tiles below it
+                are cut from their ancestor at max_zoom and resampled.
         """
         self.url_template = url_template
         self.cache_dir = cache_dir
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "ZurichTilePipeline/1.0"
-        })
+        self.memory_tiles = memory_tiles
+        self.max_zoom = max_zoom
+        self.session = make_session("ZurichTilePipeline/1.0")
+
+        self._decoded: OrderedDict[tuple, NDArray[np.float32]] = OrderedDict()
+        self._decoded_lock = threading.Lock()
 
+        self.store: Optional[TileStore] = None
         if cache_dir:
             cache_dir.mkdir(parents=True, exist_ok=True)
-
-    def _cache_path(self, z: int, x: int, y: int) -> Optional[Path]:
-        """Get cache file path for a tile."""
-        if not self.cache_dir:
-            return None
-        return self.cache_dir / "elevation" / f"{z}" / f"{x}" / f"{y}.webp"
+            self.store = tile_store_for(cache_dir, "elevation", "webp", cache_backend)
 
     def _load_from_cache(self, z: int, x: int, y: int) -> Optional[NDArray[np.uint8]]:
         """Load raw tile from cache if available."""
-        cache_path = self._cache_path(z, x, y)
-        if cache_path and cache_path.exists():
-            with Image.open(cache_path) as img:
-                return np.array(img.convert("RGB"))
-        return None
+        data = self.store.get(z, x, y) if self.store is not None else None
+        if data is None:
+            return None
+        with Image.open(io.BytesIO(data)) as img:
+            return np.array(img.convert("RGB"))
 
     def _save_to_cache(self, z: int, x: int, y: int, data: bytes) -> None:
         """Save tile data to cache."""
-        cache_path = self._cache_path(z, x, y)
-        if cache_path:
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            cache_path.write_bytes(data)
+        if self.store is not None:
+            self.store.put(z, x, y, data)
+
+    def _decoded_path(self, z: int, x: int, y: int) -> Optional[Path]:
+        """Path of a tile's decoded .npy cache file."""
+        if not self.cache_dir:
+            return None
+        return self.cache_dir / "elevation_decoded" / f"{z}" / f"{x}" / f"{y}.npy"
+
+    def _load_decoded(self, z: int, x: int, y: int) -> Optional[NDArray[np.float32]]:
+        """Memory-map a decoded tile if it is at least as new as the raw tile."""
+        path = self._decoded_path(z, x, y)
+        raw_mtime = self.store.mtime(z, x, y) if self.store is not None else None
+        if path is None or raw_mtime is None:
+            return None
+        try:
+            if path.stat().st_mtime < raw_mtime:
+                return None
+            return np.load(path, mmap_mode="r")
+        except (FileNotFoundError, ValueError):
+            return None
+
+    def _save_decoded(
+        self, z: int, x: int, y: int, elevation: NDArray[np.float32]
+    ) -> NDArray[np.float32]:
+        """Write a decoded tile to the .npy cache and return it memory-mapped."""
+        path = self._decoded_path(z, x, y)
+        if path is None:
+            elevation.setflags(write=False)
+            return elevation
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp_path, "wb") as f:
+            np.save(f, elevation)
+        os.replace(tmp_path, path)
+        return np.load(path, mmap_mode="r")
+
+    def _remember(self, key: tuple, elevation: NDArray[np.float32]) -> NDArray[np.float32]:
+        """Add a grid to the in-memory LRU and return it."""
+        if self.memory_tiles > 0:
+            with self._decoded_lock:
+                self._decoded[key] = elevation
+                self._decoded.move_to_end(key)
+                while len(self._decoded) > self.memory_tiles:
+                    self._decoded.popitem(last=False)
+        return elevation
+
+    def _recall(self, key: tuple) -> Optional[NDArray[np.float32]]:
+        """Look up a grid in the in-memory LRU."""
+        with self._decoded_lock:
+            elevation = self._decoded.get(key)
+            if elevation is not None:
+                self._decoded.move_to_end(key)
+            return elevation
+
+    def source_tile(self, z: int, x: int, y: int) -> tuple[int, int, int]:
+        """Server tile that covers (z, x, y): itself, or its ancestor at max_zoom."""
+        if self.max_zoom is None or z <= self.max_zoom:
+            return (z, x, y)
+        shift = z - self.max_zoom
+        return (self.max_zoom, x >> shift, y >> shift)
+
+    def cache_mtime(self, z: int, x: int, y: int) -> Optional[float]:
+        """Get cache mtime of the tile's elevation source (None if not cached)."""
+        if self.store is None:
+            return None
+        return self.store.mtime(*self.source_tile(z, x, y))
+
+    def prefetch_requests(self, z: int, x: int, y: int) -> list[TileRequest]:
+        """Source tile behind an output tile, for TilePrefetcher (empty without a cache)."""
+        if self.store is None:
+            return []
+        sz, sx, sy = self.source_tile(z, x, y)
+        return [TileRequest(self.url_template.format(z=sz, x=sx, y=sy), self.store, sz, sx, sy)]
 
     def fetch_raw(self, z: int, x: int, y: int) -> NDArray[np.uint8]:
         """Fetch raw RGB tile (Terrarium-encoded).
@@ -145,16 +247,74 @@ class ElevationSource:
     def fetch(self, z: int, x: int, y: int) -> NDArray[np.float32]:
         """Fetch and decode elevation tile.
 
+        Served from memory, then from the decoded .npy cache, and only
+        decoded from the raw tile when neither has it.
+
         Args:
             z: Zoom level
             x: Tile X coordinate
             y: Tile Y coordinate
 
         Returns:
-            Elevation array in meters (Mapterhorn uses 512×512 tiles)
+            Read-only elevation array in meters (Mapterhorn uses 512×512 tiles)
+        """
+        key = (z, x, y)
+        elevation = self._recall(key)
+        if elevation is not None:
+            return elevation
+
+        elevation = self._load_decoded(z, x, y)
+        if elevation is None:
+            rgb = self.fetch_raw(z, x, y)
+            elevation = self._save_decoded(z, x, y, decode_terrarium(rgb))
+        return self._remember(key, elevation)
+
+    def fetch_window(
+        self,
+        z: int,
+        x: int,
+        y: int,
+        source_zoom: int,
+        target_size: int = 512,
+    ) -> NDArray[np.float32]:
+        """Cut a tile's area out of its ancestor at source_zoom.
+
+        The sub-window is a view into the ancestor's cached grid and is
+        only copied when it has to be resampled to target_size.
+
+        Args:
+            z: Zoom level of the requested tile (>= source_zoom)
+            x: Tile X coordinate
+            y: Tile Y coordinate
+            source_zoom: Zoom level of the ancestor to cut from
+            target_size: Output size in pixels
+
+        Returns:
+            Read-only elevation array of shape (target_size, target_size)
         """
-        rgb = self.fetch_raw(z, x, y)
-        return decode_terrarium(rgb)
+        shift = z - source_zoom
+        if shift < 0:
+            raise ValueError(f"source_zoom {source_zoom} is deeper than tile zoom {z}")
+        parent = self.fetch(source_zoom, x >> shift, y >> shift)
+
+        scale = 1 << shift
+        size = parent.shape[0] // scale
+        if shift == 0:
+            window = parent
+        else:
+            ox = (x % scale) * size
+            oy = (y % scale) * size
+            window = parent[oy:oy + size, ox:ox + size]
+        if size == target_size:
+            return window
+
+        key = (z, x, y, source_zoom, target_size)
+        elevation = self._recall(key)
+        if elevation is None:
+            elevation = resample_elevation(window, target_size)
+            elevation.setflags(write=False)
+            self._remember(key, elevation)
+        return elevation
 
     def fetch_and_resize(
         self,
@@ -166,7 +326,8 @@ class ElevationSource:
         """Fetch elevation tile and resize to target size.
 
         Note: Mapterhorn tiles are already 512×512 (unlike standard 256×256),
-        so we fetch a single tile and resize if needed.
+        so we fetch a single tile and resize if needed. Zooms beyond
+        max_zoom are served as resampled sub-windows of the ancestor tile.
 
         Args:
             z: Zoom level at OUTPUT resolution
@@ -175,19 +336,10 @@ class ElevationSource:
             target_size: Output size in pixels
 
         Returns:
-            Elevation array of shape (target_size, target_size)
+            Read-only elevation array of shape (target_size, target_size)
         """
-        # Fetch single tile (Mapterhorn tiles are 512×512)
-        elevation = self.fetch(z, x, y)
-
-        # Resize if needed
-        if elevation.shape[0] != target_size:
-            from PIL import Image
-            img = Image.fromarray(elevation)
-            img = img.resize((target_size, target_size), Image.Resampling.BILINEAR)
-            elevation = np.array(img, dtype=np.float32)
-
-        return elevation
+        source_zoom = self.source_tile(z, x, y)[0]
+        return self.fetch_window(z, x, y, source_zoom, target_size)
 
 
 def fetch_elevation_tile(
@@ -215,6 +367,8 @@ def fetch_elevation_tile(
     source = ElevationSource(
         url_template=config.sources.elevation_url,
         cache_dir=config.cache_dir,
+        cache_backend=config.cache_backend,
+        max_zoom=config.sources.elevation_max_zoom,
     )
 
     return source.fetch_and_resize(z, x, y, target_size)
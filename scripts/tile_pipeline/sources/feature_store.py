@@ -0,0 +1,370 @@
+"""
+Columnar, memory-mapped feature store for vector data.
+
+Parsing the 65k-building GeoJSON into nested Python lists costs several
+seconds and hundreds of MB per process. The feature store converts a
+GeoJSON file once into flat NumPy arrays saved as ``.npy`` files:
+
+    coords.npy           float64 (N, 2)  all vertices, back to back
+    ring_offsets.npy     int64 (R + 1)   ring r spans coords[ro[r]:ro[r+1]]
+    part_offsets.npy     int64 (P + 1)   part p spans rings[po[p]:po[p+1]]
+    feature_offsets.npy  int64 (F + 1)   feature f spans parts[fo[f]:fo[f+1]]
+    geometry_types.npy   uint8 (F,)      index into GEOMETRY_TYPES
+    heights.npy          float64 (F,)    parsed height field
+    bounds.npy           float64 (F, 4)  (min_x, min_y, max_x, max_y)
+    properties.bin       JSON blobs      decoded lazily per feature
+    properties_offsets.npy int64 (F + 1)
+    meta.json            source path/size/mtime, height field, version
+
+Arrays are opened with ``mmap_mode="r"``, so every worker process shares
+the same page-cache pages instead of holding its own parsed copy.
+
+Geometry layout: a Polygon is one part of rings; a MultiPolygon is several
+parts; a Point, MultiPoint or LineString is one part with one ring; a
+MultiLineString is one part whose rings are the lines.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+from pathlib import Path
+from typing import Any, Iterator, Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+from ..config import DEFAULT_CACHE_DIR
+
+
+STORE_VERSION = 1
+
+# Default location for built stores: next to the default tile cache (see
+# PipelineConfig.feature_store_dir for a configured pipeline), not in public/
+DEFAULT_STORE_DIR = DEFAULT_CACHE_DIR.parent / "features"
+
+GEOMETRY_TYPES = (
+    "Point", "MultiPoint", "LineString", "MultiLineString", "Polygon", "MultiPolygon",
+)
+_GEOMETRY_CODES = {name: code for code, name in enumerate(GEOMETRY_TYPES)}
+
+_ARRAY_NAMES = (
+    "coords",
+    "ring_offsets",
+    "part_offsets",
+    "feature_offsets",
+    "geometry_types",
+    "heights",
+    "bounds",
+    "properties_offsets",
+)
+
+
+def parse_height(props: dict, height_field: str) -> float:
+    """Read a feature height from properties, with the usual fallbacks."""
+    height = props.get(height_field)
+    if height is None:
+        # Try common alternative names
+        height = props.get("hoehe") or props.get("HOEHE") or 0
+    if height is None or height == "":
+        height = 0
+
+    try:
+        return float(height)
+    except (ValueError, TypeError):
+        return 0.0
+
+
+def _geometry_parts(geometry_type: str, coordinates: list) -> list[list[list]]:
+    """Normalize GeoJSON coordinates to a list of parts of rings."""
+    if geometry_type == "Point":
+        return [[[coordinates]]]
+    elif geometry_type in ("MultiPoint", "LineString"):
+        return [[coordinates]]
+    elif geometry_type in ("MultiLineString", "Polygon"):
+        return [coordinates]
+    elif geometry_type == "MultiPolygon":
+        return coordinates
+    raise ValueError(f"Unsupported geometry type: {geometry_type}")
+
+
+def store_path_for(
+    geojson_path: Path,
+    height_field: str,
+    store_dir: Path = DEFAULT_STORE_DIR,
+) -> Path:
+    """Get the store directory used for a GeoJSON file and height field.
+
+    The name includes a short hash of the resolved GeoJSON path, so files
+    with the same name in different folders get separate stores.
+    """
+    path_hash = hashlib.sha256(str(geojson_path.resolve()).encode()).hexdigest()[:8]
+    return store_dir / f"{geojson_path.stem}-{path_hash}.{height_field}"
+
+
+def _source_meta(geojson_path: Path, height_field: str) -> dict[str, Any]:
+    """Metadata identifying the GeoJSON a store was built from."""
+    stat = geojson_path.stat()
+    return {
+        "version": STORE_VERSION,
+        "source": str(geojson_path.resolve()),
+        "source_size": stat.st_size,
+        "source_mtime": stat.st_mtime,
+        "height_field": height_field,
+    }
+
+
+def is_store_current(store_path: Path, geojson_path: Path, height_field: str) -> bool:
+    """Check whether a built store matches the current GeoJSON file."""
+    meta_path = store_path / "meta.json"
+    if not meta_path.exists():
+        return False
+    try:
+        with open(meta_path) as f:
+            meta = json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return False
+    expected = _source_meta(geojson_path, height_field)
+    return all(meta.get(key) == value for key, value in expected.items())
+
+
+def build_feature_store(
+    geojson_path: Path,
+    height_field: str = "height",
+    store_path: Optional[Path] = None,
+) -> Path:
+    """Convert a GeoJSON file into a columnar feature store.
+
+    The store is written to a temporary directory and swapped into place
+    with renames (old store moved aside, new one renamed in, old one
+    deleted), so concurrent readers never see a partial store.
+
+    Args:
+        geojson_path: Source GeoJSON file
+        height_field: Property name for feature height
+        store_path: Output directory (defaults to store_path_for())
+
+    Returns:
+        Path to the store directory
+
+    Raises:
+        ValueError: If a feature has an unsupported geometry type
+    """
+    store_path = store_path or store_path_for(geojson_path, height_field)
+
+    with open(geojson_path) as f:
+        data = json.load(f)
+
+    coords: list = []
+    ring_offsets = [0]
+    part_offsets = [0]
+    feature_offsets = [0]
+    geometry_types = []
+    heights = []
+    bounds = []
+    properties_blob = bytearray()
+    properties_offsets = [0]
+
+    for feature in data.get("features", []):
+        geom = feature.get("geometry") or {}
+        props = feature.get("properties") or {}
+        geometry_type = geom.get("type", "")
+
+        first_coord = len(coords)
+        for part in _geometry_parts(geometry_type, geom.get("coordinates", [])):
+            for ring in part:
+                coords.extend(c[:2] for c in ring)
+                ring_offsets.append(len(coords))
+            part_offsets.append(len(ring_offsets) - 1)
+        feature_offsets.append(len(part_offsets) - 1)
+
+        feature_coords = coords[first_coord:]
+        if feature_coords:
+            xs = [c[0] for c in feature_coords]
+            ys = [c[1] for c in feature_coords]
+            bounds.append((min(xs), min(ys), max(xs), max(ys)))
+        else:
+            # Empty geometry never intersects a query
+            bounds.append((np.nan, np.nan, np.nan, np.nan))
+
+        geometry_types.append(_GEOMETRY_CODES[geometry_type])
+        heights.append(parse_height(props, height_field))
+        properties_blob += json.dumps(props, separators=(",", ":")).encode()
+        properties_offsets.append(len(properties_blob))
+
+    arrays = {
+        "coords": np.asarray(coords, dtype=np.float64).reshape(-1, 2),
+        "ring_offsets": np.asarray(ring_offsets, dtype=np.int64),
+        "part_offsets": np.asarray(part_offsets, dtype=np.int64),
+        "feature_offsets": np.asarray(feature_offsets, dtype=np.int64),
+        "geometry_types": np.asarray(geometry_types, dtype=np.uint8),
+        "heights": np.asarray(heights, dtype=np.float64),
+        "bounds": np.asarray(bounds, dtype=np.float64).reshape(-1, 4),
+        "properties_offsets": np.asarray(properties_offsets, dtype=np.int64),
+    }
+
+    tmp_path = store_path.with_name(f"{store_path.name}.tmp-{os.getpid()}")
+    if tmp_path.exists():
+        shutil.rmtree(tmp_path)
+    tmp_path.mkdir(parents=True)
+
+    for name, array in arrays.items():
+        np.save(tmp_path / f"{name}.npy", array)
+    (tmp_path / "properties.bin").write_bytes(bytes(properties_blob))
+    with open(tmp_path / "meta.json", "w") as f:
+        json.dump(_source_meta(geojson_path, height_field), f)
+
+    old_path = store_path.with_name(f"{store_path.name}.old-{os.getpid()}")
+    try:
+        os.rename(store_path, old_path)
+    except FileNotFoundError:
+        pass
+    try:
+        os.replace(tmp_path, store_path)
+    except OSError:
+        # Another process swapped its store in first; use that one
+        shutil.rmtree(tmp_path, ignore_errors=True)
+    shutil.rmtree(old_path, ignore_errors=True)
+
+    return store_path
+
+
+class FeatureStore:
+    """Read-only, memory-mapped view of a built feature store.
+
+    Behaves like a sequence of features: ``store[i]`` returns a lightweight
+    StoredFeature that decodes coordinates and properties on access.
+    """
+
+    def __init__(self, store_path: Path):
+        """Open a built store.
+
+        Args:
+            store_path: Store directory created by build_feature_store()
+        """
+        self.path = store_path
+        for name in _ARRAY_NAMES:
+            setattr(self, name, np.load(store_path / f"{name}.npy", mmap_mode="r"))
+
+        properties_path = store_path / "properties.bin"
+        if properties_path.stat().st_size:
+            self._properties = np.memmap(properties_path, dtype=np.uint8, mode="r")
+        else:
+            # np.memmap cannot map an empty file
+            self._properties = np.zeros(0, dtype=np.uint8)
+
+    def rings(self, index: int) -> list[NDArray[np.float64]]:
+        """Get all rings of a feature as (n, 2) coordinate views."""
+        part_start, part_end = self.feature_offsets[index], self.feature_offsets[index + 1]
+        ring_start, ring_end = self.part_offsets[part_start], self.part_offsets[part_end]
+        offsets = self.ring_offsets[ring_start:ring_end + 1]
+        return [self.coords[offsets[i]:offsets[i + 1]] for i in range(len(offsets) - 1)]
+
+    def coordinates(self, index: int) -> Any:
+        """Rebuild GeoJSON-style nested coordinates for a feature."""
+        geometry_type = GEOMETRY_TYPES[self.geometry_types[index]]
+        part_start, part_end = self.feature_offsets[index], self.feature_offsets[index + 1]
+
+        parts = []
+        for part in range(part_start, part_end):
+            ring_start, ring_end = self.part_offsets[part], self.part_offsets[part + 1]
+            parts.append([
+                self.coords[self.ring_offsets[r]:self.ring_offsets[r + 1]].tolist()
+                for r in range(ring_start, ring_end)
+            ])
+
+        if geometry_type == "Point":
+            return parts[0][0][0]
+        elif geometry_type in ("MultiPoint", "LineString"):
+            return parts[0][0]
+        elif geometry_type in ("MultiLineString", "Polygon"):
+            return parts[0]
+        return parts
+
+    def properties(self, index: int) -> dict:
+        """Decode a feature's properties."""
+        start, end = self.properties_offsets[index], self.properties_offsets[index + 1]
+        return json.loads(self._properties[start:end].tobytes())
+
+    def __getitem__(self, index: int) -> "StoredFeature":
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError(index)
+        return StoredFeature(self, int(index))
+
+    def __iter__(self) -> Iterator["StoredFeature"]:
+        for i in range(len(self)):
+            yield StoredFeature(self, i)
+
+    def __len__(self) -> int:
+        return len(self.heights)
+
+
+class StoredFeature:
+    """Feature view backed by a FeatureStore.
+
+    Exposes the same attributes as sources.vector.Feature. Coordinates and
+    properties are decoded on first access and then kept.
+    """
+
+    __slots__ = ("_store", "id", "_coordinates", "_properties")
+
+    def __init__(self, store: FeatureStore, index: int):
+        self._store = store
+        self.id = index
+        self._coordinates = None
+        self._properties = None
+
+    @property
+    def geometry_type(self) -> str:
+        return GEOMETRY_TYPES[self._store.geometry_types[self.id]]
+
+    @property
+    def coordinates(self) -> Any:
+        if self._coordinates is None:
+            self._coordinates = self._store.coordinates(self.id)
+        return self._coordinates
+
+    @property
+    def height(self) -> float:
+        return float(self._store.heights[self.id])
+
+    @property
+    def properties(self) -> dict:
+        if self._properties is None:
+            self._properties = self._store.properties(self.id)
+        return self._properties
+
+    @property
+    def bounds(self) -> tuple[float, float, float, float]:
+        """Get bounding box (min_x, min_y, max_x, max_y)."""
+        return tuple(float(v) for v in self._store.bounds[self.id])
+
+    def rings(self) -> list[NDArray[np.float64]]:
+        """Get all rings as (n, 2) coordinate views (no list conversion)."""
+        return self._store.rings(self.id)
+
+    def __repr__(self) -> str:
+        return f"StoredFeature(id={self.id}, geometry_type={self.geometry_type!r}, height={self.height})"
+
+
+def open_feature_store(
+    geojson_path: Path,
+    height_field: str = "height",
+    store_dir: Path = DEFAULT_STORE_DIR,
+) -> FeatureStore:
+    """Open the feature store for a GeoJSON file, building it if stale.
+
+    Args:
+        geojson_path: Source GeoJSON file
+        height_field: Property name for feature height
+        store_dir: Directory holding built stores
+
+    Returns:
+        Memory-mapped FeatureStore
+    """
+    store_path = store_path_for(geojson_path, height_field, store_dir)
+    if not is_store_current(store_path, geojson_path, height_field):
+        build_feature_store(geojson_path, height_field, store_path)
+    return FeatureStore(store_path)
@@ -0,0 +1,200 @@
+"""
+Concurrent prefetching of raster source tiles into the source caches.
+
+SatelliteSource and ElevationSource fetch one tile per blocking request,
+so a cold render spends most of its time waiting on round trips (four of
+them per satellite output tile). Before rendering, the renderer collects
+every source tile the job needs, and the TilePrefetcher downloads the
+uncached ones concurrently over a single pooled session. The sources
+then read them from the cache as usual.
+
+Transient failures (connection errors, 429 and 5xx responses) are retried
+with exponential backoff, honouring Retry-After. A 404 means the tile is
+outside the service's coverage; it is counted as missing. Failures are
+reported, not raised: the render then hits the same error for that tile
+and handles it like any other.
+
+Example:
+    prefetcher = TilePrefetcher(concurrency=16)
+    result = prefetcher.prefetch(satellite.prefetch_requests(16, 34322, 22950))
+    print(result.summary())
+"""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from tqdm import tqdm
+from urllib3.util.retry import Retry
+
+from ..tile_store import TileStore
+
+
+USER_AGENT = "ZurichTilePipeline/1.0"
+
+# Statuses worth retrying (rate limits and transient server errors)
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+@dataclass(frozen=True)
+class TileRequest:
+    """One source tile to download into a cache store."""
+
+    url: str
+    store: TileStore
+    z: int
+    x: int
+    y: int
+
+    @property
+    def key(self) -> tuple[int, int, int, int]:
+        return (id(self.store), self.z, self.x, self.y)
+
+
+@dataclass
+class PrefetchResult:
+    """Outcome of a prefetch run."""
+
+    fetched: int = 0
+    cached: int = 0
+    missing: int = 0
+    bytes: int = 0
+    failed: dict[str, str] = field(default_factory=dict)
+
+    def summary(self) -> str:
+        parts = [f"{self.fetched} fetched", f"{self.cached} cached"]
+        if self.missing:
+            parts.append(f"{self.missing} missing")
+        if self.failed:
+            parts.append(f"{len(self.failed)} failed")
+        return f"Prefetched source tiles: {', '.join(parts)} ({self.bytes / 1e6:.1f} MB)"
+
+
+def make_session(
+    user_agent: str = USER_AGENT,
+    pool_size: int = 10,
+    retries: int = 3,
+    backoff: float = 0.5,
+) -> requests.Session:
+    """Create a session with a connection pool and transient-error retries.
+
+    Args:
+        user_agent: User-Agent header for every request
+        pool_size: Connections kept open per host
+        retries: Retries per request for connection errors, 429 and 5xx
+        backoff: Backoff factor in seconds (doubles per retry)
+
+    Returns:
+        Configured requests.Session
+    """
+    retry = Retry(
+        total=retries,
+        backoff_factor=backoff,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(["GET"]),
+        respect_retry_after_header=True,
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update({"User-Agent": user_agent})
+    return session
+
+
+class TilePrefetcher:
+    """Downloads source tiles into the cache with bounded concurrency."""
+
+    def __init__(
+        self,
+        concurrency: int = 16,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: int = 30,
+        user_agent: str = USER_AGENT,
+    ):
+        """Configure the prefetcher.
+
+        Args:
+            concurrency: Maximum requests in flight
+            retries: Retries per tile for connection errors, 429 and 5xx
+            backoff: Backoff factor in seconds (doubles per retry)
+            timeout: Request timeout in seconds
+            user_agent: User-Agent header for every request
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.session = make_session(user_agent, concurrency, retries, backoff)
+
+    def prefetch(
+        self,
+        tiles: Iterable[TileRequest],
+        progress: bool = False,
+    ) -> PrefetchResult:
+        """Download every tile that is not in its store yet.
+
+        Duplicate requests (e.g. a source tile shared by two zoom levels)
+        are fetched once.
+
+        Args:
+            tiles: Tiles to make available in the cache
+            progress: Show a progress bar
+
+        Returns:
+            PrefetchResult with counts and per-URL failures
+        """
+        result = PrefetchResult()
+        pending: list[TileRequest] = []
+        seen: set[tuple[int, int, int, int]] = set()
+        for request in tiles:
+            if request.key in seen:
+                continue
+            seen.add(request.key)
+            if request.store.has(request.z, request.x, request.y):
+                result.cached += 1
+            else:
+                pending.append(request)
+
+        if not pending:
+            return result
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            futures = {pool.submit(self._fetch, request): request for request in pending}
+            iterator = tqdm(
+                as_completed(futures),
+                total=len(futures),
+                desc="Prefetching source tiles",
+                disable=not progress,
+            )
+            for future in iterator:
+                request = futures[future]
+                try:
+                    size = future.result()
+                except Exception as e:
+                    result.failed[request.url] = str(e)
+                    continue
+                if size is None:
+                    result.missing += 1
+                else:
+                    result.fetched += 1
+                    result.bytes += size
+
+        return result
+
+    def _fetch(self, request: TileRequest) -> Optional[int]:
+        """Download one tile into its store; None if the server has no such tile."""
+        response = self.session.get(request.url, timeout=self.timeout)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+        request.store.put(request.z, request.x, request.y, response.content)
+        return len(response.content)
+
+    def close(self) -> None:
+        self.session.close()
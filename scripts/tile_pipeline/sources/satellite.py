@@ -15,10 +15,11 @@ from typing import Optional
 
 import numpy as np
 from numpy.typing import NDArray
-import requests
 from PIL import Image
 
 from ..config import PipelineConfig
+from ..tile_store import TileBackend, TileStore, tile_store_for
+from .prefetch import TileRequest, make_session
 
 
 # Default SWISSIMAGE WMTS URL pattern
@@ -36,6 +37,7 @@ class SatelliteSource:
         url_template: str = DEFAULT_SWISSIMAGE_URL,
         cache_dir: Optional[Path] = None,
         timeout: int = 30,
+        cache_backend: TileBackend = "files",
     ):
         """Initialize satellite source.
 
@@ -43,38 +45,62 @@ class SatelliteSource:
             url_template: URL pattern with {z}, {x}, {y} placeholders
             cache_dir: Directory for tile cache (None = no caching)
             timeout: Request timeout in seconds
+            cache_backend: "files" (satellite/z/x/y.jpeg under cache_dir) or
+                "mbtiles" (a single satellite.mbtiles file)
         """
         self.url_template = url_template
         self.cache_dir = cache_dir
         self.timeout = timeout
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "ZurichTilePipeline/1.0 (https://github.com/example)"
-        })
+        self.session = make_session("ZurichTilePipeline/1.0 (https://github.com/example)")
 
+        self.store: Optional[TileStore] = None
         if cache_dir:
             cache_dir.mkdir(parents=True, exist_ok=True)
-
-    def _cache_path(self, z: int, x: int, y: int) -> Optional[Path]:
-        """Get cache file path for a tile."""
-        if not self.cache_dir:
-            return None
-        return self.cache_dir / "satellite" / f"{z}" / f"{x}" / f"{y}.jpeg"
+            self.store = tile_store_for(cache_dir, "satellite", "jpeg", cache_backend)
 
     def _load_from_cache(self, z: int, x: int, y: int) -> Optional[NDArray[np.uint8]]:
         """Load tile from cache if available."""
-        cache_path = self._cache_path(z, x, y)
-        if cache_path and cache_path.exists():
-            with Image.open(cache_path) as img:
-                return np.array(img.convert("RGB"))
-        return None
+        data = self.store.get(z, x, y) if self.store is not None else None
+        if data is None:
+            return None
+        with Image.open(io.BytesIO(data)) as img:
+            return np.array(img.convert("RGB"))
 
     def _save_to_cache(self, z: int, x: int, y: int, data: bytes) -> None:
         """Save tile data to cache."""
-        cache_path = self._cache_path(z, x, y)
-        if cache_path:
-            cache_path.parent.mkdir(parents=True, exist_ok=True)
-            cache_path.write_bytes(data)
+        if self.store is not None:
+            self.store.put(z, x, y, data)
+
+    def prefetch_requests(self, z: int, x: int, y: int) -> list[TileRequest]:
+        """Source tiles behind an output tile, for TilePrefetcher.
+
+        Mirrors the 2×2 grid at zoom z+1 used by fetch_and_resize. Empty
+        when caching is disabled (prefetched tiles would have nowhere to go).
+        """
+        if self.store is None:
+            return []
+        return [
+            TileRequest(
+                self.url_template.format(z=z + 1, x=x * 2 + dx, y=y * 2 + dy),
+                self.store, z + 1, x * 2 + dx, y * 2 + dy,
+            )
+            for dy in range(2)
+            for dx in range(2)
+        ]
+
+    def cache_mtimes(self, z: int, x: int, y: int) -> list[Optional[float]]:
+        """Get cache mtimes of the source tiles behind an output tile.
+
+        Mirrors the 2×2 grid at zoom z+1 used by fetch_and_resize.
+        Uncached tiles are reported as None.
+        """
+        if self.store is None:
+            return [None] * 4
+        return [
+            self.store.mtime(z + 1, x * 2 + dx, y * 2 + dy)
+            for dy in range(2)
+            for dx in range(2)
+        ]
 
     def fetch(self, z: int, x: int, y: int) -> NDArray[np.uint8]:
         """Fetch a satellite tile.
@@ -0,0 +1,344 @@
+"""
+Packed, NumPy-backed bounding box index for vector features.
+
+A static R-tree in the style of flatbush: feature bounding boxes are
+sorted along a Hilbert curve of their centers, then packed bottom-up into
+fixed-size nodes. The whole tree is three flat arrays, so it builds in
+bulk (one sort plus a few reductions), saves next to the feature store,
+and loads back with mmap in microseconds.
+
+Queries walk the tree level by level with vectorized intersection tests.
+``query_many`` runs the same walk for many boxes at once, carrying
+(query, node) pairs, so a render job can partition every feature to every
+tile in a single pass.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+DEFAULT_NODE_SIZE = 16
+
+# Hilbert curve resolution (bits per axis)
+HILBERT_BITS = 16
+
+INDEX_VERSION = 1
+
+_INDEX_FILES = ("index_order", "index_bounds", "index_level_offsets")
+_INDEX_META = "index_meta.json"
+
+
+def bounds_checksum(bounds: NDArray[np.float64]) -> str:
+    """Short content hash of an (N, 4) bounds array."""
+    data = np.ascontiguousarray(bounds, dtype=np.float64)
+    return hashlib.sha256(data.tobytes()).hexdigest()[:16]
+
+
+def hilbert_index(x: NDArray[np.uint32], y: NDArray[np.uint32], bits: int = HILBERT_BITS) -> NDArray[np.uint64]:
+    """Compute Hilbert curve distances for integer grid coordinates.
+
+    Args:
+        x: Grid X coordinates in [0, 2**bits)
+        y: Grid Y coordinates in [0, 2**bits)
+        bits: Curve order
+
+    Returns:
+        Distance along the curve for each point
+    """
+    x = x.astype(np.uint64)
+    y = y.astype(np.uint64)
+    d = np.zeros(x.shape, dtype=np.uint64)
+    n = np.uint64(1 << bits)
+
+    s = np.uint64(1 << (bits - 1))
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        d += s * s * ((3 * rx.astype(np.uint64)) ^ ry.astype(np.uint64))
+
+        # Rotate quadrant
+        flip = ~ry & rx
+        x = np.where(flip, n - 1 - x, x)
+        y = np.where(flip, n - 1 - y, y)
+        swap = ~ry
+        x, y = np.where(swap, y, x), np.where(swap, x, y)
+        s = s >> np.uint64(1)
+
+    return d
+
+
+def _intersects(
+    boxes: NDArray[np.float64],
+    queries: NDArray[np.float64],
+) -> NDArray[np.bool_]:
+    """Row-wise bbox intersection test (NaN boxes never intersect)."""
+    return (
+        (boxes[:, 2] >= queries[:, 0]) & (boxes[:, 0] <= queries[:, 2]) &
+        (boxes[:, 3] >= queries[:, 1]) & (boxes[:, 1] <= queries[:, 3])
+    )
+
+
+def _expand_children(
+    nodes: NDArray[np.int64],
+    node_size: int,
+    level_count: int,
+) -> tuple[NDArray[np.int64], NDArray[np.int64]]:
+    """Expand node positions to the positions of their children.
+
+    Returns:
+        (children, repeats) where repeats[i] is how many children nodes[i] has
+    """
+    starts = nodes * node_size
+    counts = np.minimum(node_size, level_count - starts)
+    total = int(counts.sum())
+    offsets = np.arange(total) - np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts, counts) + offsets, counts
+
+
+class PackedIndex:
+    """Static packed R-tree over feature bounding boxes."""
+
+    def __init__(
+        self,
+        order: NDArray[np.int64],
+        level_bounds: NDArray[np.float64],
+        level_offsets: NDArray[np.int64],
+        node_size: int = DEFAULT_NODE_SIZE,
+    ):
+        """Wrap prebuilt index arrays (use build() or load()).
+
+        Args:
+            order: Feature ids in Hilbert order (the leaf level)
+            level_bounds: Boxes of all levels, leaves first, root last
+            level_offsets: Start of each level in level_bounds, plus the end
+            node_size: Children per node
+        """
+        self.order = order
+        self.level_bounds = level_bounds
+        self.level_offsets = level_offsets
+        self.node_size = node_size
+
+    @classmethod
+    def build(
+        cls,
+        bounds: NDArray[np.float64],
+        node_size: int = DEFAULT_NODE_SIZE,
+    ) -> "PackedIndex":
+        """Bulk-build an index from an (N, 4) array of feature boxes.
+
+        Args:
+            bounds: (min_x, min_y, max_x, max_y) per feature; NaN rows are
+                kept but never match a query
+            node_size: Children per node
+
+        Returns:
+            PackedIndex
+        """
+        bounds = np.asarray(bounds, dtype=np.float64).reshape(-1, 4)
+        n = len(bounds)
+
+        if n == 0:
+            return cls(
+                np.zeros(0, dtype=np.int64),
+                np.zeros((0, 4), dtype=np.float64),
+                np.zeros(1, dtype=np.int64),
+                node_size,
+            )
+
+        # Sort by Hilbert distance of box centers on the data extent
+        valid = ~np.isnan(bounds).any(axis=1)
+        cx = (bounds[:, 0] + bounds[:, 2]) / 2
+        cy = (bounds[:, 1] + bounds[:, 3]) / 2
+        grid_max = (1 << HILBERT_BITS) - 1
+        keys = np.full(n, np.iinfo(np.uint64).max, dtype=np.uint64)
+        if valid.any():
+            min_x, max_x = cx[valid].min(), cx[valid].max()
+            min_y, max_y = cy[valid].min(), cy[valid].max()
+            gx = (cx[valid] - min_x) / max(max_x - min_x, 1e-12) * grid_max
+            gy = (cy[valid] - min_y) / max(max_y - min_y, 1e-12) * grid_max
+            keys[valid] = hilbert_index(gx.astype(np.uint32), gy.astype(np.uint32))
+        order = np.argsort(keys, kind="stable").astype(np.int64)
+
+        # Pack levels bottom-up; fmin/fmax ignore NaN boxes inside a node
+        levels = [bounds[order]]
+        while len(levels[-1]) > 1:
+            level = levels[-1]
+            starts = np.arange(0, len(level), node_size)
+            parent = np.empty((len(starts), 4), dtype=np.float64)
+            parent[:, 0] = np.fmin.reduceat(level[:, 0], starts)
+            parent[:, 1] = np.fmin.reduceat(level[:, 1], starts)
+            parent[:, 2] = np.fmax.reduceat(level[:, 2], starts)
+            parent[:, 3] = np.fmax.reduceat(level[:, 3], starts)
+            levels.append(parent)
+
+        level_offsets = np.cumsum([0] + [len(level) for level in levels]).astype(np.int64)
+        return cls(order, np.concatenate(levels), level_offsets, node_size)
+
+    def save(self, directory: Path, checksum: Optional[str] = None) -> None:
+        """Save index arrays as .npy files plus a meta file in a directory.
+
+        Every file is written under a temporary name and renamed into
+        place. The meta file is removed first and written last, so a crash
+        or a concurrent writer never leaves arrays that load() accepts but
+        that do not match their meta.
+
+        Args:
+            directory: Target directory (created if missing)
+            checksum: bounds_checksum() of the indexed bounds
+        """
+        directory.mkdir(parents=True, exist_ok=True)
+        meta_path = directory / _INDEX_META
+        try:
+            meta_path.unlink()
+        except FileNotFoundError:
+            pass
+
+        arrays = {
+            "index_order": self.order,
+            "index_bounds": self.level_bounds,
+            "index_level_offsets": self.level_offsets,
+        }
+        suffix = f".tmp-{os.getpid()}"
+        for name, array in arrays.items():
+            tmp_path = directory / f"{name}.npy{suffix}"
+            with open(tmp_path, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp_path, directory / f"{name}.npy")
+
+        meta = {
+            "version": INDEX_VERSION,
+            "node_size": self.node_size,
+            "count": len(self),
+            "checksum": checksum,
+        }
+        tmp_path = directory / f"{_INDEX_META}{suffix}"
+        tmp_path.write_text(json.dumps(meta))
+        os.replace(tmp_path, meta_path)
+
+    @classmethod
+    def load(cls, directory: Path) -> Optional["PackedIndex"]:
+        """Memory-map a saved index, or return None if it is missing or unreadable.
+
+        The node size comes from the saved meta file; use load_or_build()
+        to also check the index against the current bounds.
+        """
+        meta = cls._load_meta(directory)
+        if meta is None:
+            return None
+        try:
+            index = cls(
+                np.load(directory / "index_order.npy", mmap_mode="r"),
+                np.load(directory / "index_bounds.npy", mmap_mode="r"),
+                np.load(directory / "index_level_offsets.npy"),
+                int(meta["node_size"]),
+            )
+        except (OSError, ValueError, KeyError, TypeError):
+            # Missing, truncated or foreign files
+            return None
+
+        if (
+            len(index) != meta.get("count")
+            or len(index.level_offsets) == 0
+            or index.level_offsets[-1] != len(index.level_bounds)
+        ):
+            return None
+        return index
+
+    @staticmethod
+    def _load_meta(directory: Path) -> Optional[dict]:
+        """Read the index meta file (None if missing, corrupt or outdated)."""
+        try:
+            with open(directory / _INDEX_META) as f:
+                meta = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if not isinstance(meta, dict) or meta.get("version") != INDEX_VERSION:
+            return None
+        return meta
+
+    @classmethod
+    def load_or_build(
+        cls,
+        directory: Path,
+        bounds: NDArray[np.float64],
+        node_size: int = DEFAULT_NODE_SIZE,
+    ) -> "PackedIndex":
+        """Load a saved index built from these bounds, or build and save one.
+
+        A saved index is rebuilt when it fails to load, was built with
+        another node size, or its bounds checksum differs.
+        """
+        checksum = bounds_checksum(bounds)
+        meta = cls._load_meta(directory)
+        if meta is not None and meta.get("node_size") == node_size and meta.get("checksum") == checksum:
+            index = cls.load(directory)
+            if index is not None and len(index) == len(bounds):
+                return index
+
+        index = cls.build(bounds, node_size)
+        try:
+            index.save(directory, checksum)
+        except OSError as e:
+            print(f"Warning: could not save spatial index to {directory}: {e}")
+        return index
+
+    def _level(self, level: int) -> NDArray[np.float64]:
+        return self.level_bounds[self.level_offsets[level]:self.level_offsets[level + 1]]
+
+    def query(self, bounds: tuple[float, float, float, float]) -> NDArray[np.int64]:
+        """Find ids of features whose boxes intersect bounds.
+
+        Args:
+            bounds: (min_x, min_y, max_x, max_y)
+
+        Returns:
+            Feature ids in ascending order
+        """
+        return self.query_many(np.asarray([bounds], dtype=np.float64))[0]
+
+    def query_many(self, queries: NDArray[np.float64]) -> list[NDArray[np.int64]]:
+        """Find intersecting feature ids for many boxes in one tree walk.
+
+        Args:
+            queries: (Q, 4) array of (min_x, min_y, max_x, max_y)
+
+        Returns:
+            List of Q arrays of feature ids, each in ascending order
+        """
+        queries = np.asarray(queries, dtype=np.float64).reshape(-1, 4)
+        n_levels = len(self.level_offsets) - 1
+        if n_levels == 0 or len(queries) == 0:
+            return [np.zeros(0, dtype=np.int64) for _ in range(len(queries))]
+
+        # Start with every (query, root-level node) pair
+        top = self._level(n_levels - 1)
+        query_ids = np.repeat(np.arange(len(queries)), len(top))
+        nodes = np.tile(np.arange(len(top)), len(queries))
+
+        for level in range(n_levels - 1, -1, -1):
+            level_boxes = self._level(level)
+            hit = _intersects(level_boxes[nodes], queries[query_ids])
+            query_ids, nodes = query_ids[hit], nodes[hit]
+            if level == 0 or len(nodes) == 0:
+                break
+            nodes, counts = _expand_children(
+                nodes, self.node_size, self.level_offsets[level] - self.level_offsets[level - 1]
+            )
+            query_ids = np.repeat(query_ids, counts)
+
+        if len(nodes) == 0 or level != 0:
+            return [np.zeros(0, dtype=np.int64) for _ in range(len(queries))]
+
+        # Group feature ids per query (query_ids are non-decreasing)
+        feature_ids = np.asarray(self.order[nodes], dtype=np.int64)
+        splits = np.searchsorted(query_ids, np.arange(1, len(queries)))
+        return [np.sort(ids) for ids in np.split(feature_ids, splits)]
+
+    def __len__(self) -> int:
+        return len(self.order)
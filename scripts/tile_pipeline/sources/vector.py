@@ -2,18 +2,26 @@
 GeoJSON vector data loader with spatial indexing.
 
 Loads and indexes building footprints and tree positions for efficient
-tile-based queries. Uses a simple bounding box index when rtree is not
-available, or rtree for better performance with large datasets.
+tile-based queries. Bounding boxes are indexed with a packed, NumPy-backed
+R-tree (see spatial_index.py) that is saved alongside the feature store and
+supports batched queries for many tiles at once.
+
+By default features are served from a columnar, memory-mapped feature
+store (see feature_store.py) that is built from the GeoJSON on first use,
+so repeated loads and worker processes skip JSON parsing entirely.
 """
 
 import json
 from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Iterator, Optional
+from typing import Iterator, Optional, Sequence
 
 import numpy as np
 from numpy.typing import NDArray
 
+from .feature_store import DEFAULT_STORE_DIR, open_feature_store, parse_height
+from .spatial_index import PackedIndex
+
 
 @dataclass
 class Feature:
@@ -47,8 +55,8 @@ class Feature:
             xs = [c[0] for c in all_coords]
             ys = [c[1] for c in all_coords]
             return (min(xs), min(ys), max(xs), max(ys))
-        elif self.geometry_type == "LineString":
-            # LineString: coordinates is list of [x, y] points
+        elif self.geometry_type in ("LineString", "MultiPoint"):
+            # LineString/MultiPoint: coordinates is list of [x, y] points
             xs = [c[0] for c in self.coordinates]
             ys = [c[1] for c in self.coordinates]
             return (min(xs), min(ys), max(xs), max(ys))
@@ -67,68 +75,107 @@ class Feature:
 class VectorSource:
     """Manages loading and spatial queries for vector data."""
 
-    def __init__(self, geojson_path: Path, height_field: str = "height"):
+    def __init__(
+        self,
+        geojson_path: Path,
+        height_field: str = "height",
+        store_dir: Optional[Path] = DEFAULT_STORE_DIR,
+    ):
         """Initialize vector source from GeoJSON file.
 
         Args:
             geojson_path: Path to GeoJSON file
             height_field: Property name for feature height
+            store_dir: Directory for the memory-mapped feature store
+                (None = parse the GeoJSON into Feature objects directly)
         """
         self.path = geojson_path
         self.height_field = height_field
-        self.features: list[Feature] = []
-        self._index: Optional[object] = None  # rtree.Index or None
-        self._bounds_list: list[tuple[float, float, float, float]] = []
+        self.store_dir = store_dir
+        self.features: Sequence[Feature] = []
+        self._index: Optional[PackedIndex] = None
+        self._bounds: NDArray[np.float64] = np.zeros((0, 4))
+        self._heights: NDArray[np.float64] = np.zeros(0)
 
         self._load()
 
     def _load(self) -> None:
-        """Load and index features from GeoJSON."""
+        """Load and index features from the feature store or GeoJSON."""
+        if self.store_dir is not None:
+            try:
+                store = open_feature_store(self.path, self.height_field, self.store_dir)
+            except OSError as e:
+                print(f"Warning: feature store unavailable ({e}), parsing GeoJSON")
+            else:
+                self.features = store
+                self._bounds = store.bounds
+                self._heights = store.heights
+                self._index = PackedIndex.load_or_build(store.path, store.bounds)
+                return
+
+        self._load_geojson()
+        self._index = PackedIndex.build(self._bounds)
+
+    def _load_geojson(self) -> None:
+        """Parse GeoJSON into Feature objects."""
         with open(self.path) as f:
             data = json.load(f)
 
+        features = []
+        bounds_list = []
         for i, feature in enumerate(data.get("features", [])):
             geom = feature.get("geometry", {})
             props = feature.get("properties", {})
 
-            # Get height, with fallbacks
-            height = props.get(self.height_field)
-            if height is None:
-                # Try common alternative names
-                height = props.get("hoehe") or props.get("HOEHE") or 0
-            if height is None or height == "":
-                height = 0
-
-            try:
-                height = float(height)
-            except (ValueError, TypeError):
-                height = 0
-
             feat = Feature(
                 id=i,
                 geometry_type=geom.get("type", ""),
                 coordinates=geom.get("coordinates", []),
-                height=height,
+                height=parse_height(props, self.height_field),
                 properties=props,
             )
 
-            self.features.append(feat)
-            self._bounds_list.append(feat.bounds)
+            features.append(feat)
+            bounds_list.append(feat.bounds)
 
-        # Try to build rtree index
-        self._build_index()
+        self.features = features
+        self._bounds = np.asarray(bounds_list, dtype=np.float64).reshape(-1, 4)
+        self._heights = np.asarray([f.height for f in features], dtype=np.float64)
 
-    def _build_index(self) -> None:
-        """Build spatial index if rtree is available."""
-        try:
-            from rtree import index
+    def query_ids(
+        self,
+        bounds: tuple[float, float, float, float],
+        min_height: float = 0,
+    ) -> NDArray[np.int64]:
+        """Query ids of features within bounding box.
 
-            self._index = index.Index()
-            for i, bounds in enumerate(self._bounds_list):
-                self._index.insert(i, bounds)
-        except ImportError:
-            # Fall back to simple bounds checking
-            self._index = None
+        Args:
+            bounds: (min_x, min_y, max_x, max_y) in same CRS as data
+            min_height: Minimum height filter
+
+        Returns:
+            Feature ids in ascending order
+        """
+        return self.query_many([bounds], min_height)[0]
+
+    def query_many(
+        self,
+        bounds_list: Sequence[tuple[float, float, float, float]],
+        min_height: float = 0,
+    ) -> list[NDArray[np.int64]]:
+        """Query feature ids for many bounding boxes in one index pass.
+
+        Args:
+            bounds_list: Boxes as (min_x, min_y, max_x, max_y)
+            min_height: Minimum height filter
+
+        Returns:
+            One array of feature ids per box, in ascending order
+        """
+        results = self._index.query_many(np.asarray(bounds_list, dtype=np.float64))
+        if min_height > 0:
+            results = [ids[self._heights[ids] >= min_height] for ids in results]
+        return results
 
     def query(
         self,
@@ -144,25 +191,19 @@ class VectorSource:
         Yields:
             Features intersecting the bounds
         """
-        min_x, min_y, max_x, max_y = bounds
+        for idx in self.query_ids(bounds, min_height).tolist():
+            yield self.features[idx]
 
-        if self._index is not None:
-            # Use rtree
-            candidate_ids = list(self._index.intersection(bounds))
-        else:
-            # Brute force bbox check
-            candidate_ids = []
-            for i, fb in enumerate(self._bounds_list):
-                fb_min_x, fb_min_y, fb_max_x, fb_max_y = fb
-                # Check for intersection
-                if not (fb_max_x < min_x or fb_min_x > max_x or
-                        fb_max_y < min_y or fb_min_y > max_y):
-                    candidate_ids.append(i)
-
-        for idx in candidate_ids:
-            feat = self.features[idx]
-            if feat.height >= min_height:
-                yield feat
+    @property
+    def extent(self) -> tuple[float, float, float, float]:
+        """Bounding box of all features (NaN if there are none)."""
+        if not len(self._bounds):
+            return (np.nan, np.nan, np.nan, np.nan)
+        bounds = np.asarray(self._bounds)
+        return (
+            float(np.nanmin(bounds[:, 0])), float(np.nanmin(bounds[:, 1])),
+            float(np.nanmax(bounds[:, 2])), float(np.nanmax(bounds[:, 3])),
+        )
 
     def __len__(self) -> int:
         return len(self.features)
@@ -188,6 +229,47 @@ def query_features_in_tile(
     Returns:
         List of features
     """
+    buffered_bounds = buffer_tile_bounds(tile_bounds, buffer_meters)
+    return list(source.query(buffered_bounds, min_height))
+
+
+def partition_features_to_tiles(
+    source: VectorSource,
+    tile_bounds_list: Sequence[tuple[float, float, float, float]],
+    buffer_meters: float = 100,
+    min_height: float = 0,
+) -> list[NDArray[np.int64]]:
+    """Assign features to many tiles in a single batched index query.
+
+    Batch counterpart of query_features_in_tile that returns feature ids
+    (indices into source.features) instead of features.
+
+    Args:
+        source: VectorSource to query
+        tile_bounds_list: (west, south, east, north) per tile in WGS84 degrees
+        buffer_meters: Buffer around each tile in meters
+        min_height: Minimum feature height to include
+
+    Returns:
+        One array of feature ids per tile
+    """
+    buffered = [buffer_tile_bounds(b, buffer_meters) for b in tile_bounds_list]
+    return source.query_many(buffered, min_height)
+
+
+def buffer_tile_bounds(
+    tile_bounds: tuple[float, float, float, float],
+    buffer_meters: float,
+) -> tuple[float, float, float, float]:
+    """Expand WGS84 tile bounds by a buffer in meters.
+
+    Args:
+        tile_bounds: (west, south, east, north) in WGS84 degrees
+        buffer_meters: Buffer in meters
+
+    Returns:
+        Buffered (west, south, east, north)
+    """
     west, south, east, north = tile_bounds
 
     # Convert buffer from meters to degrees (approximate for Zurich)
@@ -195,35 +277,36 @@ def query_features_in_tile(
     lat_buffer = buffer_meters / 111000
     lon_buffer = buffer_meters / 76000
 
-    buffered_bounds = (
+    return (
         west - lon_buffer,
         south - lat_buffer,
         east + lon_buffer,
         north + lat_buffer,
     )
 
-    return list(source.query(buffered_bounds, min_height))
-
 
 def load_buildings(
     path: Path,
     height_field: str = "height",
+    store_dir: Optional[Path] = DEFAULT_STORE_DIR,
 ) -> VectorSource:
     """Load building footprints from GeoJSON.
 
     Args:
         path: Path to buildings GeoJSON
         height_field: Property containing building height in meters
+        store_dir: Directory for the memory-mapped feature store
 
     Returns:
         VectorSource ready for queries
     """
-    return VectorSource(path, height_field)
+    return VectorSource(path, height_field, store_dir)
 
 
 def load_trees(
     path: Path,
     height_field: str = "estimated_height",
+    store_dir: Optional[Path] = DEFAULT_STORE_DIR,
 ) -> VectorSource:
     """Load tree positions from GeoJSON.
 
@@ -233,11 +316,12 @@ def load_trees(
     Args:
         path: Path to trees GeoJSON
         height_field: Property containing tree height estimate
+        store_dir: Directory for the memory-mapped feature store
 
     Returns:
         VectorSource ready for queries
     """
-    return VectorSource(path, height_field)
+    return VectorSource(path, height_field, store_dir)
 
 
 def estimate_tree_height(crown_diameter: float) -> float:
@@ -259,6 +343,7 @@ def estimate_tree_height(crown_diameter: float) -> float:
 def load_streets(
     path: Path,
     width_field: str = "width",
+    store_dir: Optional[Path] = DEFAULT_STORE_DIR,
 ) -> VectorSource:
     """Load street centerlines from GeoJSON.
 
@@ -268,16 +353,18 @@ def load_streets(
     Args:
         path: Path to streets GeoJSON
         width_field: Property containing road width in meters
+        store_dir: Directory for the memory-mapped feature store
 
     Returns:
         VectorSource ready for queries
     """
-    return VectorSource(path, width_field)
+    return VectorSource(path, width_field, store_dir)
 
 
 def load_water_bodies(
     path: Path,
     width_field: str = "width",
+    store_dir: Optional[Path] = DEFAULT_STORE_DIR,
 ) -> VectorSource:
     """Load water bodies from GeoJSON.
 
@@ -290,11 +377,12 @@ def load_water_bodies(
     Args:
         path: Path to water bodies GeoJSON
         width_field: Property containing river width in meters
+        store_dir: Directory for the memory-mapped feature store
 
     Returns:
         VectorSource ready for queries
     """
-    return VectorSource(path, width_field)
+    return VectorSource(path, width_field, store_dir)
 
 
 def polygon_to_pixel_mask(
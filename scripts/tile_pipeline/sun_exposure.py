@@ -0,0 +1,428 @@
+"""
+Precomputed annual sun-exposure rasters.
+
+Ray tracing a point query (scene build plus a day of shadow rays) takes
+tens of milliseconds to seconds. This stage precomputes, per map tile and
+height band, how many hours of direct sun every raster cell receives on a
+set of representative days (one per month or per week). Point queries then
+become a bilinear lookup in a memory-mapped array.
+
+Layout of a product directory:
+
+    index.json              parameters (zoom, bands, days, quantization)
+                            and the list of built tiles
+    render_manifest.json    per-tile fingerprints, for resumable builds
+    {z}/{x}/{y}.npy         uint8 (bands, days, size, size) sun hours,
+                            quantized to HOURS_PER_UNIT steps
+
+Raster cells follow TileRaytracer: cell (row, col) is centered at
+((col + 0.5) / size, (row + 0.5) / size) of the tile, row 0 at the north
+edge. Sun positions are computed once at the area center; the difference
+across the city is far below the raster resolution.
+"""
+
+import json
+import math
+import os
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Literal, Optional, Sequence
+
+import numpy as np
+from numpy.typing import NDArray
+from tqdm import tqdm
+
+from .city_scene import DEFAULT_CITY_SCENE_DIR, open_city_scene
+from .raytracer import RayTracerConfig, SunPosition, TileRaytracer
+from .render_manifest import RenderManifest, file_digest, fingerprint
+from .scene_builder import SceneBuilder
+from .sources.satellite import wgs84_to_tile
+from .sources.feature_store import DEFAULT_STORE_DIR
+from .sources.vector import VectorSource, partition_features_to_tiles
+from .tile_renderer import (
+    BUILDING_BUFFER_METERS,
+    BUILDING_MIN_HEIGHT,
+    TREE_BUFFER_METERS,
+    TREE_MIN_HEIGHT,
+    TileCoord,
+)
+
+
+INDEX_FILENAME = "index.json"
+PRODUCT_VERSION = 1
+
+# Default product location (served next to the other tile sets)
+DEFAULT_SUN_EXPOSURE_DIR = Path("public/tiles/sun-exposure")
+
+# uint8 quantization: 0.1 h steps cover 0-25.5 h
+HOURS_PER_UNIT = 0.1
+
+# Heights above ground: floors 0, 1, 3, 6 and 10 at 3 m/floor + 1.5 m
+DEFAULT_HEIGHT_BANDS = (1.5, 4.5, 10.5, 19.5, 31.5)
+
+
+@dataclass
+class SunExposureConfig:
+    """Parameters of a sun-exposure product."""
+
+    zoom: int = 16
+    raster_size: int = 64                       # Cells per tile side (>= 2)
+    heights: tuple[float, ...] = DEFAULT_HEIGHT_BANDS
+    cadence: Literal["month", "week"] = "month"  # Representative days
+    year: int = 2025
+    interval_minutes: int = 30                  # Sun samples per day
+
+
+def representative_days(cadence: str, year: int) -> list[date]:
+    """Representative days of a year.
+
+    Args:
+        cadence: "month" (the 15th of every month) or "week" (every 7 days
+            starting January 4)
+        year: Calendar year
+
+    Returns:
+        Sorted list of dates
+    """
+    if cadence == "month":
+        return [date(year, month, 15) for month in range(1, 13)]
+    elif cadence == "week":
+        first = date(year, 1, 4)
+        return [first + timedelta(days=7 * i) for i in range(52)]
+    raise ValueError(f"Unknown cadence: {cadence} (expected 'month' or 'week')")
+
+
+def tiles_for_bounds(bounds: tuple[float, float, float, float], zoom: int) -> list[TileCoord]:
+    """All tiles at a zoom level intersecting WGS84 bounds."""
+    west, south, east, north = bounds
+    x_min, y_max = wgs84_to_tile(west, south, zoom)
+    x_max, y_min = wgs84_to_tile(east, north, zoom)
+    return [
+        TileCoord(zoom, x, y)
+        for x in range(x_min, x_max + 1)
+        for y in range(y_min, y_max + 1)
+    ]
+
+
+def _daily_sun_directions(
+    days: Sequence[date],
+    lat: float,
+    lng: float,
+    interval_minutes: int,
+) -> list[NDArray[np.float64]]:
+    """Sun positions above the horizon for each day, as (K, 2) azimuth/altitude."""
+    per_day = []
+    steps = 24 * 60 // interval_minutes
+    for day in days:
+        start = datetime(day.year, day.month, day.day, tzinfo=timezone.utc)
+        positions = []
+        for i in range(steps):
+            # Sample the middle of each interval
+            time = start + timedelta(minutes=interval_minutes * (i + 0.5))
+            sun = SunPosition.from_datetime(lat, lng, time)
+            if sun.altitude > 0:
+                positions.append((sun.azimuth, sun.altitude))
+        per_day.append(np.asarray(positions, dtype=np.float64).reshape(-1, 2))
+    return per_day
+
+
+def sun_hours_raster(
+    raytracer: TileRaytracer,
+    sun_positions: Sequence[NDArray[np.float64]],
+    heights: Sequence[float],
+    interval_minutes: int,
+) -> NDArray[np.uint8]:
+    """Ray trace quantized sun hours for one tile.
+
+    Args:
+        raytracer: Ray tracer for the tile scene (shadow_darkness=0)
+        sun_positions: Per day, (K, 2) azimuth/altitude of daytime samples
+        heights: Height bands above ground in meters
+        interval_minutes: Minutes represented by each sample
+
+    Returns:
+        uint8 array (bands, days, size, size) in HOURS_PER_UNIT steps
+    """
+    size = raytracer.config.image_size
+    hours_per_sample = interval_minutes / 60
+    result = np.zeros((len(heights), len(sun_positions), size, size), dtype=np.uint8)
+
+    for band, height in enumerate(heights):
+        origin_heights = np.full((size, size), height, dtype=np.float32)
+        for day, positions in enumerate(sun_positions):
+            lit = np.zeros((size, size), dtype=np.float32)
+            for azimuth, altitude in positions:
+                sun = SunPosition(azimuth=azimuth, altitude=altitude)
+                lit += raytracer.render(sun, elevation_grid=origin_heights)
+            hours = lit * hours_per_sample / HOURS_PER_UNIT
+            result[band, day] = np.clip(np.rint(hours), 0, 255).astype(np.uint8)
+
+    return result
+
+
+def _write_array(path: Path, array: NDArray) -> None:
+    """Atomically save an array (readers never see a partial file)."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.stem}.tmp-{os.getpid()}.npy")
+    np.save(tmp_path, array)
+    os.replace(tmp_path, path)
+
+
+def build_sun_exposure(
+    bounds: tuple[float, float, float, float],
+    buildings_path: Path,
+    trees_path: Optional[Path],
+    output_dir: Path = DEFAULT_SUN_EXPOSURE_DIR,
+    config: Optional[SunExposureConfig] = None,
+    force: bool = False,
+    progress: bool = True,
+    city_scene_dir: Optional[Path] = DEFAULT_CITY_SCENE_DIR,
+    store_dir: Optional[Path] = DEFAULT_STORE_DIR,
+) -> Path:
+    """Precompute sun-exposure rasters for every tile in an area.
+
+    Tiles whose fingerprint (product parameters plus vector data hashes)
+    matches the product's render manifest are skipped unless force is set,
+    so interrupted builds resume where they stopped.
+
+    When a current city scene covering the area exists, every tile casts
+    its rays against it instead of building its own scene.
+
+    Args:
+        bounds: (west, south, east, north) area in WGS84
+        buildings_path: Buildings GeoJSON
+        trees_path: Trees GeoJSON (None or missing to skip trees)
+        output_dir: Product directory
+        config: Product parameters
+        force: Rebuild tiles even if they are up to date
+        progress: Show progress bar
+        city_scene_dir: Prebuilt city scene to use when current
+            (None = always build per-tile scenes)
+        store_dir: Directory for the memory-mapped feature stores
+
+    Returns:
+        Path to the written index.json
+    """
+    config = config or SunExposureConfig()
+    days = representative_days(config.cadence, config.year)
+    tiles = tiles_for_bounds(bounds, config.zoom)
+
+    has_trees = trees_path is not None and trees_path.exists()
+    tile_fingerprint = fingerprint({
+        "version": PRODUCT_VERSION,
+        "config": asdict(config),
+        "buildings": file_digest(buildings_path),
+        "trees": file_digest(trees_path) if has_trees else None,
+    })
+
+    manifest = RenderManifest(output_dir)
+    if not force:
+        tiles = [
+            coord for coord in tiles
+            if not manifest.is_fresh(str(coord), tile_fingerprint, _tile_path(output_dir, coord))
+        ]
+
+    if tiles:
+        city_scene = open_city_scene(city_scene_dir, buildings_path, trees_path)
+        if city_scene is not None and not all(city_scene.covers(coord.bounds) for coord in tiles):
+            city_scene = None
+
+        if city_scene is None:
+            buildings = VectorSource(buildings_path, height_field="height", store_dir=store_dir)
+            trees = (
+                VectorSource(trees_path, height_field="estimated_height", store_dir=store_dir)
+                if has_trees else None
+            )
+            tile_bounds = [coord.bounds for coord in tiles]
+            building_ids = partition_features_to_tiles(
+                buildings, tile_bounds, BUILDING_BUFFER_METERS, BUILDING_MIN_HEIGHT
+            )
+            tree_ids = (
+                partition_features_to_tiles(trees, tile_bounds, TREE_BUFFER_METERS, TREE_MIN_HEIGHT)
+                if trees is not None else [[] for _ in tiles]
+            )
+        else:
+            building_ids = tree_ids = [[] for _ in tiles]
+
+        center_lat = (bounds[1] + bounds[3]) / 2
+        center_lng = (bounds[0] + bounds[2]) / 2
+        sun_positions = _daily_sun_directions(days, center_lat, center_lng, config.interval_minutes)
+        rt_config = RayTracerConfig(
+            image_size=config.raster_size,
+            shadow_darkness=0.0,
+            ray_offset=0.0,
+        )
+
+        try:
+            iterator = tqdm(
+                list(zip(tiles, building_ids, tree_ids)),
+                desc="Sun exposure tiles",
+                disable=not progress,
+            )
+            for coord, b_ids, t_ids in iterator:
+                if city_scene is not None:
+                    raytracer = TileRaytracer(city_scene, coord.bounds, rt_config)
+                else:
+                    builder = SceneBuilder(coord.bounds, image_size=config.raster_size)
+                    builder.add_ground_plane(z=0)
+                    if len(b_ids):
+                        builder.add_buildings([buildings.features[i] for i in b_ids])
+                    if len(t_ids):
+                        builder.add_trees([trees.features[i] for i in t_ids])
+                    raytracer = TileRaytracer(builder.build(), coord.bounds, rt_config)
+
+                raster = sun_hours_raster(
+                    raytracer, sun_positions, config.heights, config.interval_minutes
+                )
+                _write_array(_tile_path(output_dir, coord), raster)
+                manifest.record(str(coord), tile_fingerprint)
+        finally:
+            manifest.save()
+
+    built = sorted(
+        key for key, value in manifest.tiles.items()
+        if value == tile_fingerprint and (output_dir / f"{key}.npy").exists()
+    )
+    index = {
+        "version": PRODUCT_VERSION,
+        "zoom": config.zoom,
+        "raster_size": config.raster_size,
+        "heights": list(config.heights),
+        "days": [day.isoformat() for day in days],
+        "interval_minutes": config.interval_minutes,
+        "hours_per_unit": HOURS_PER_UNIT,
+        "tiles": built,
+    }
+    index_path = output_dir / INDEX_FILENAME
+    tmp_path = index_path.with_suffix(".json.tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+    return index_path
+
+
+def _tile_path(output_dir: Path, coord: TileCoord) -> Path:
+    return output_dir / str(coord.z) / str(coord.x) / f"{coord.y}.npy"
+
+
+def _interpolation_weights(
+    values: Sequence[float],
+    x: float,
+    period: Optional[float] = None,
+) -> list[tuple[int, float]]:
+    """Linear interpolation weights of x between sorted sample positions.
+
+    Clamps outside the samples, or wraps around when period is given.
+    """
+    values = list(values)
+    if len(values) == 1:
+        return [(0, 1.0)]
+
+    upper = int(np.searchsorted(values, x, side="right"))
+    if period is None:
+        if upper == 0:
+            return [(0, 1.0)]
+        if upper == len(values):
+            return [(len(values) - 1, 1.0)]
+        lo, hi = values[upper - 1], values[upper]
+        t = (x - lo) / (hi - lo)
+        return [(upper - 1, 1 - t), (upper, t)]
+
+    # Periodic: the segment from the last sample wraps to the first
+    lower_index = (upper - 1) % len(values)
+    upper_index = upper % len(values)
+    lo = values[lower_index]
+    span = (values[upper_index] - lo) % period or period
+    t = ((x - lo) % period) / span
+    return [(lower_index, 1 - t), (upper_index, t)]
+
+
+class SunExposureProduct:
+    """Read-only access to a built sun-exposure product.
+
+    Example:
+        product = SunExposureProduct(Path("public/tiles/sun-exposure"))
+        hours = product.sun_hours(47.376, 8.54, date(2025, 6, 21), height=10.5)
+    """
+
+    def __init__(self, product_dir: Path = DEFAULT_SUN_EXPOSURE_DIR):
+        """Open a product directory.
+
+        Raises:
+            FileNotFoundError: If the product has no index.json
+        """
+        self.path = product_dir
+        with open(product_dir / INDEX_FILENAME) as f:
+            self.index = json.load(f)
+
+        self.zoom: int = self.index["zoom"]
+        self.raster_size: int = self.index["raster_size"]
+        self.heights: list[float] = self.index["heights"]
+        self.days = [date.fromisoformat(day) for day in self.index["days"]]
+        self.hours_per_unit: float = self.index["hours_per_unit"]
+        self._tile_keys = set(self.index["tiles"])
+        self._tiles: dict[str, NDArray[np.uint8]] = {}
+
+    def _tile(self, key: str) -> Optional[NDArray[np.uint8]]:
+        if key not in self._tile_keys:
+            return None
+        tile = self._tiles.get(key)
+        if tile is None:
+            tile = np.load(self.path / f"{key}.npy", mmap_mode="r")
+            self._tiles[key] = tile
+        return tile
+
+    def sun_hours(
+        self,
+        lat: float,
+        lng: float,
+        day: date,
+        height: float = 1.7,
+    ) -> Optional[float]:
+        """Look up the hours of direct sun at a point on a day.
+
+        Bilinear in space, linear between height bands (clamped to the
+        lowest/highest band) and between representative days (wrapping
+        around the year).
+
+        Args:
+            lat: Latitude (WGS84)
+            lng: Longitude (WGS84)
+            day: Date (only the day of year is used)
+            height: Height above ground in meters
+
+        Returns:
+            Sun hours, or None if the point is outside the product
+        """
+        n = 2 ** self.zoom
+        tile_x = (lng + 180.0) / 360.0 * n
+        tile_y = (1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n
+        key = f"{self.zoom}/{int(tile_x)}/{int(tile_y)}"
+        tile = self._tile(key)
+        if tile is None:
+            return None
+
+        # Fractional cell position (cell centers at +0.5)
+        size = self.raster_size
+        fx = min(max((tile_x - int(tile_x)) * size - 0.5, 0.0), size - 1.0)
+        fy = min(max((tile_y - int(tile_y)) * size - 0.5, 0.0), size - 1.0)
+        col, row = min(int(fx), size - 2), min(int(fy), size - 2)
+        tx, ty = fx - col, fy - row
+
+        day_of_year = [d.timetuple().tm_yday for d in self.days]
+        day_weights = _interpolation_weights(day_of_year, day.timetuple().tm_yday, period=365)
+        band_weights = _interpolation_weights(self.heights, height)
+
+        value = 0.0
+        for band, band_weight in band_weights:
+            for day_index, day_weight in day_weights:
+                cells = tile[band, day_index, row:row + 2, col:col + 2].astype(np.float64)
+                bilinear = (
+                    cells[0, 0] * (1 - tx) * (1 - ty) + cells[0, 1] * tx * (1 - ty)
+                    + cells[1, 0] * (1 - tx) * ty + cells[1, 1] * tx * ty
+                )
+                value += band_weight * day_weight * bilinear
+
+        return float(value * self.hours_per_unit)
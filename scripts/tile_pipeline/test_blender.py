@@ -63,9 +63,9 @@ def test_scene_export():
     """Test exporting scene data for Blender."""
     print("\n=== Testing Scene Export ===\n")
 
-    import json
     import tempfile
 
+    from .blender_scene import load_scene
     from .blender_shadows import (
         BlenderShadowRenderer,
         BlenderConfig,
@@ -138,12 +138,11 @@ def test_scene_export():
         renderer._export_scene_data(tmpdir, buildings, trees, elevation, bounds, sun)
 
         # Verify exported files
-        assert (tmpdir / "scene.json").exists(), "scene.json should be created"
+        assert (tmpdir / "scene.bin").exists(), "scene.bin should be created"
         assert (tmpdir / "elevation.npy").exists(), "elevation.npy should be created"
 
-        # Load and verify scene.json
-        with open(tmpdir / "scene.json") as f:
-            scene_data = json.load(f)
+        # Load and verify scene.bin
+        scene_data = load_scene(tmpdir)
 
         print(f"  Buildings exported: {len(scene_data['buildings'])}")
         print(f"  Trees exported: {len(scene_data['trees'])}")
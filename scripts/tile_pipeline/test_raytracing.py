@@ -6,7 +6,8 @@ This script verifies the complete V2 pipeline:
 1. Shadow detection and removal
 2. 3D scene building
 3. Ray tracing
-4. Compositing
+4. Shadow backend benchmark (trimesh / Embree / heightfield)
+5. Compositing
 
 Run with: python -m scripts.tile_pipeline.test_raytracing
 """
@@ -222,6 +223,33 @@ def test_ray_tracing(mesh, builder):
     return shadows
 
 
+def test_shadow_backends(mesh, builder):
+    """Benchmark the heightfield backend against mesh ray tracing."""
+    print("\n=== Benchmarking Shadow Backends ===\n")
+
+    from .raytracer import SunPosition, benchmark_shadow_backends
+
+    bounds = (builder.bounds.west, builder.bounds.south,
+              builder.bounds.east, builder.bounds.north)
+    suns = [
+        SunPosition(azimuth=90, altitude=30),
+        SunPosition(azimuth=180, altitude=60),
+        SunPosition(azimuth=270, altitude=15),
+    ]
+
+    # Rays start on the scene's ground plane (z=400)
+    elevation = np.full((256, 256), 400.0, dtype=np.float32)
+    results = benchmark_shadow_backends(mesh, bounds, suns, image_size=256, elevation=elevation)
+    for name, r in results.items():
+        print(f"  {name:12s} setup {r['setup_seconds']:.3f}s  "
+              f"render {r['render_seconds']:.3f}s  "
+              f"agreement {r['agreement'] * 100:.2f}%")
+
+    assert results["heightfield"]["agreement"] > 0.95, "Heightfield should match ray tracing"
+    print("\n  ✓ Shadow backend benchmark passed")
+    return results
+
+
 def test_full_pipeline():
     """Test the complete V2 compositing pipeline."""
     print("\n=== Testing Full V2 Pipeline ===\n")
@@ -367,6 +395,7 @@ def main():
         test_shadow_removal()
         mesh, builder = test_scene_building()
         test_ray_tracing(mesh, builder)
+        test_shadow_backends(mesh, builder)
 
         if not args.skip_slow:
             result, previews = test_full_pipeline()
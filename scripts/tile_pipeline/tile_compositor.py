@@ -18,17 +18,21 @@ V2 Pipeline (with shadow removal + ray tracing):
 4. Time-of-day color grading
 """
 
+import threading
 from dataclasses import dataclass
-from typing import Optional
+from typing import TYPE_CHECKING, Optional, Sequence
 
 import numpy as np
 from numpy.typing import NDArray
 
-from .color_space import rgb_to_lab, lab_to_rgb
-from .blend_modes import blend_lab_lightness, blend_lab_color_shift
+from .color_space import lab_planar_to_rgb, rgb_to_lab_planar
+from .blend_modes import BlendMode, blend_lightness_inplace
 from .config import PipelineConfig
 from .time_presets import TimePreset, get_preset
 
+if TYPE_CHECKING:
+    from .city_scene import CityScene
+
 
 @dataclass
 class TileLayers:
@@ -43,6 +47,103 @@ class TileLayers:
     ambient_occlusion: Optional[NDArray[np.float32]] = None  # Grayscale (H, W)
 
 
+# Rows per compositing chunk: a 512px tile chunk keeps its ~600 KB of
+# work buffers cache-resident while every layer is applied
+COMPOSITE_CHUNK_ROWS = 32
+
+# (mask, mode, opacity) applied to lightness, bottom to top
+LightnessLayer = tuple[NDArray, BlendMode, float]
+
+
+class _CompositeBuffers(threading.local):
+    """Per-thread work buffers for composite_layers, reused across tiles."""
+
+    def __init__(self):
+        self.pixels = 0
+
+    def get(self, pixels: int) -> "_CompositeBuffers":
+        """Make sure the buffers hold at least this many pixels."""
+        if pixels > self.pixels:
+            self.lab = np.empty((3, pixels), dtype=np.float32)
+            self.linear = np.empty((pixels, 3), dtype=np.float32)
+            self.scratch = np.empty((3, pixels), dtype=np.float32)
+            self.pixels = pixels
+        return self
+
+
+_buffers = _CompositeBuffers()
+
+
+def composite_layers(
+    base: NDArray[np.uint8],
+    lightness: Sequence[LightnessLayer],
+    shift_a: Optional[NDArray] = None,
+    shift_b: Optional[NDArray] = None,
+    color_offset: tuple[float, float] = (0.0, 0.0),
+    out: Optional[NDArray[np.uint8]] = None,
+    chunk_rows: int = COMPOSITE_CHUNK_ROWS,
+) -> NDArray[np.uint8]:
+    """Evaluate a LAB layer stack in a single pass over the image.
+
+    Equivalent to rgb_to_lab, then blend_lab_lightness per lightness layer,
+    blend_lab_color_shift with the a/b shifts, a clamped constant a/b
+    offset, and lab_to_rgb. Lightness and color operations touch separate
+    channels, so each band of rows is converted, blended through the whole
+    stack and written to the output while it is still in cache, using
+    per-thread float32 buffers instead of full-size temporaries per layer.
+
+    Args:
+        base: RGB image (H, W, 3) uint8
+        lightness: (mask, mode, opacity) layers for the lightness channel,
+            masks of shape (H, W) with values 0-1, applied in order
+        shift_a: Additive 'a' channel shift (H, W), or None
+        shift_b: Additive 'b' channel shift (H, W), or None
+        color_offset: Constant (a, b) offset applied after the shifts
+        out: Destination (H, W, 3) uint8 array (allocated if None)
+        chunk_rows: Rows processed per pass
+
+    Returns:
+        Composited RGB image (H, W, 3)
+    """
+    height, width = base.shape[:2]
+    if out is None:
+        out = np.empty((height, width, 3), dtype=np.uint8)
+    buffers = _buffers.get(min(chunk_rows, height) * width)
+
+    for row in range(0, height, chunk_rows):
+        rows = slice(row, min(row + chunk_rows, height))
+        pixels = (rows.stop - rows.start) * width
+
+        lab = buffers.lab[:, :pixels]
+        scratch = buffers.scratch[:, :pixels]
+        rgb_to_lab_planar(
+            np.ascontiguousarray(base[rows]).reshape(-1, 3),
+            lab,
+            buffers.linear[:pixels],
+            scratch,
+        )
+
+        # Lightness stack on normalized L
+        L = lab[0]
+        L *= np.float32(0.01)
+        for mask, mode, opacity in lightness:
+            blend_lightness_inplace(L, mask[rows].reshape(-1), mode, opacity, scratch[0], scratch[1])
+        L *= np.float32(100)
+
+        # Color shifts, each clamped to the LAB range like blend_lab_color_shift
+        for channel, shift, offset in ((1, shift_a, color_offset[0]), (2, shift_b, color_offset[1])):
+            if shift is not None:
+                lab[channel] += shift[rows].reshape(-1)
+                np.clip(lab[channel], -128, 127, out=lab[channel])
+            if offset:
+                lab[channel] += np.float32(offset)
+                np.clip(lab[channel], -128, 127, out=lab[channel])
+
+        lab_planar_to_rgb(lab, out[rows].reshape(-1, 3), scratch)
+
+    return out
+
+
 class TileCompositor:
     """Composites multiple layers into final photorealistic tiles."""
 
@@ -69,54 +170,32 @@ class TileCompositor:
         Returns:
             Final composited RGB image (H, W, 3)
         """
-        # Convert satellite to LAB for perceptual blending
-        lab = rgb_to_lab(layers.satellite)
-
-        # 1. Apply hillshade (soft light on lightness)
-        lab = blend_lab_lightness(
-            lab,
-            layers.hillshade,
-            mode=self.config.blend.hillshade_mode,
-            opacity=self.config.blend.hillshade_opacity,
-        )
-
-        # 2. Apply Imhof color shifts (warm/cool tinting)
-        lab = blend_lab_color_shift(
-            lab,
-            shift_a=layers.imhof_shift_a,
-            shift_b=layers.imhof_shift_b,
-            mask=np.ones_like(layers.hillshade),  # Apply everywhere
-            strength=1.0,  # Shifts already have strength baked in
-        )
-
-        # 3. Apply building shadows (multiply on lightness)
-        lab = blend_lab_lightness(
-            lab,
-            layers.building_shadows,
-            mode=self.config.blend.building_shadow_mode,
-            opacity=self.config.blend.building_shadow_opacity,
-        )
-
-        # 4. Apply tree shadows if present
+        blend = self.config.blend
+        lightness = [
+            # 1. Hillshade (soft light on lightness)
+            (layers.hillshade, blend.hillshade_mode, blend.hillshade_opacity),
+            # 3. Building shadows (multiply on lightness)
+            (layers.building_shadows, blend.building_shadow_mode, blend.building_shadow_opacity),
+        ]
+        # 4. Tree shadows if present
         if layers.tree_shadows is not None:
-            lab = blend_lab_lightness(
-                lab,
-                layers.tree_shadows,
-                mode=self.config.blend.tree_shadow_mode,
-                opacity=self.config.blend.tree_shadow_opacity,
+            lightness.append(
+                (layers.tree_shadows, blend.tree_shadow_mode, blend.tree_shadow_opacity)
             )
-
-        # 5. Apply ambient occlusion if present
+        # 5. Ambient occlusion if present
         if layers.ambient_occlusion is not None:
-            lab = blend_lab_lightness(
-                lab,
-                layers.ambient_occlusion,
-                mode=self.config.blend.ambient_occlusion_mode,
-                opacity=self.config.blend.ambient_occlusion_opacity,
+            lightness.append(
+                (layers.ambient_occlusion, blend.ambient_occlusion_mode, blend.ambient_occlusion_opacity)
             )
 
-        # Convert back to RGB
-        return lab_to_rgb(lab)
+        # 2. Imhof color shifts (warm/cool tinting) act on a/b only, so the
+        # whole stack is evaluated in one pass in LAB space
+        return composite_layers(
+            layers.satellite,
+            lightness,
+            shift_a=layers.imhof_shift_a,
+            shift_b=layers.imhof_shift_b,
+        )
 
     def composite_simple(
         self,
@@ -136,26 +215,14 @@ class TileCompositor:
         Returns:
             Composited RGB image
         """
-        lab = rgb_to_lab(satellite)
-
-        # Apply hillshade
-        lab = blend_lab_lightness(
-            lab,
-            hillshade,
-            mode="soft_light",
-            opacity=0.5,
+        return composite_layers(
+            satellite,
+            [
+                (hillshade, "soft_light", 0.5),  # Hillshade
+                (shadows, "multiply", 0.6),  # Shadows
+            ],
         )
 
-        # Apply shadows
-        lab = blend_lab_lightness(
-            lab,
-            shadows,
-            mode="multiply",
-            opacity=0.6,
-        )
-
-        return lab_to_rgb(lab)
-
 
 def composite_tile(
     satellite: NDArray[np.uint8],
@@ -328,76 +395,49 @@ class TileCompositorV2:
         Returns:
             Final composited RGB image (H, W, 3)
         """
-        # Convert clean base to LAB
-        lab = rgb_to_lab(layers.clean_base)
-
-        # 1. Apply hillshade (soft light on lightness)
-        lab = blend_lab_lightness(
-            lab,
-            layers.hillshade,
-            mode=self.config.blend.hillshade_mode,
-            opacity=self.config.blend.hillshade_opacity,
-        )
+        blend = self.config.blend
+        lightness = [
+            # 1. Hillshade (soft light on lightness)
+            (layers.hillshade, blend.hillshade_mode, blend.hillshade_opacity),
+            # 3. Ray-traced shadows, slightly more prominent
+            (layers.ray_traced_shadows, "multiply", 0.85),
+        ]
+        # 4. Ambient occlusion if present
+        if layers.ambient_occlusion is not None:
+            lightness.append(
+                (layers.ambient_occlusion, "multiply", blend.ambient_occlusion_opacity)
+            )
 
-        # 2. Apply Imhof color shifts
-        lab = blend_lab_color_shift(
-            lab,
+        # 2. Imhof color shifts and 5. time-of-day color grading
+        return composite_layers(
+            layers.clean_base,
+            lightness,
             shift_a=layers.imhof_shift_a,
             shift_b=layers.imhof_shift_b,
-            mask=np.ones_like(layers.hillshade),
-            strength=1.0,
+            color_offset=self._color_grade(),
         )
 
-        # 3. Apply ray-traced shadows
-        lab = blend_lab_lightness(
-            lab,
-            layers.ray_traced_shadows,
-            mode="multiply",
-            opacity=0.85,  # Slightly more prominent for ray-traced
-        )
-
-        # 4. Apply ambient occlusion if present
-        if layers.ambient_occlusion is not None:
-            lab = blend_lab_lightness(
-                lab,
-                layers.ambient_occlusion,
-                mode="multiply",
-                opacity=self.config.blend.ambient_occlusion_opacity,
-            )
-
-        # 5. Apply time-of-day color grading
-        lab = self._apply_color_grade(lab)
-
-        return lab_to_rgb(lab)
-
-    def _apply_color_grade(self, lab: NDArray[np.float64]) -> NDArray[np.float64]:
-        """Apply time-of-day color grading.
+    def _color_grade(self) -> tuple[float, float]:
+        """Time-of-day color grading as an (a, b) offset.
 
         Golden hour: warmer (increased b)
         Blue hour: cooler (decreased b, slight a shift)
         Noon: neutral
         """
-        result = lab.copy()
-
         # Get color grade strength from preset
         # Lower sun = stronger color grade
         grade_strength = max(0, 1 - self.preset.altitude / 60) * 0.3
 
         if self.preset.altitude < 15:
             # Blue hour (very low sun) - cool blue tint
-            result[..., 2] -= grade_strength * 10  # Shift towards blue
-            result[..., 1] -= grade_strength * 3   # Slight towards green
-        elif self.preset.altitude < 30:
+            # Slight towards green, shift towards blue
+            return (-grade_strength * 3, -grade_strength * 10)
+        if self.preset.altitude < 30:
             # Golden hour - warm orange tint
-            result[..., 2] += grade_strength * 15  # Shift towards yellow
-            result[..., 1] += grade_strength * 5   # Slight towards red
+            # Slight towards red, shift towards yellow
+            return (grade_strength * 5, grade_strength * 15)
         # Above 30 degrees: neutral, no color grade
-
-        # Clamp to valid LAB range
-        result[..., 1] = np.clip(result[..., 1], -128, 127)
-        result[..., 2] = np.clip(result[..., 2], -128, 127)
-
-        return result
+        return (0.0, 0.0)
 
 
 def composite_tile_v2(
@@ -414,6 +454,7 @@ def composite_tile_v2(
     progress_callback: Optional[callable] = None,
     use_blender: bool = False,
     blender_samples: int = 16,
+    city_scene: Optional["CityScene"] = None,
 ) -> NDArray[np.uint8]:
     """High-level V2 function with shadow removal and ray tracing.
 
@@ -442,6 +483,12 @@ def composite_tile_v2(
         progress_callback: Optional callback(stage, progress) for updates
         use_blender: Use Blender Cycles for GPU-accelerated shadow rendering
         blender_samples: Render samples when using Blender (16-64 typical)
+        city_scene: Prebuilt city scene (see city_scene.open_city_scene). If
+            it covers the tile, the trimesh ray tracer casts against it and
+            no tile mesh is built; buildings and trees are then only used
+            by Blender. The city scene has no terrain: ray origins still
+            sit on the tile's elevation, but hills do not shadow slopes
+            behind them (hillshade still darkens slopes facing away).
 
     Returns:
         Final composited RGB image with ray-traced shadows
@@ -505,7 +552,12 @@ def composite_tile_v2(
 
     # Step 2: Build 3D scene (only needed for trimesh raytracer)
     scene_mesh = None
-    if not use_blender:
+    if not use_blender and city_scene is not None and city_scene.covers(bounds):
+        # Rays go to the city-wide BVH, nothing to assemble per tile
+        report_progress("scene_building", 0.0)
+        scene_mesh = city_scene
+        report_progress("scene_building", 1.0)
+    elif not use_blender:
         report_progress("scene_building", 0.0)
         builder = SceneBuilder(bounds, size)
 
@@ -625,6 +677,7 @@ def preview_v2_pipeline(
     trees: list,
     bounds: tuple[float, float, float, float],
     preset_name: str = "afternoon",
+    city_scene: Optional["CityScene"] = None,
 ) -> dict[str, NDArray[np.uint8]]:
     """Generate preview images of each V2 pipeline stage.
 
@@ -637,6 +690,8 @@ def preview_v2_pipeline(
         trees: Tree features
         bounds: Tile bounds
         preset_name: Time preset name
+        city_scene: Prebuilt city scene to ray trace against if it covers
+            the tile (see composite_tile_v2)
 
     Returns:
         Dictionary of stage names to RGB preview images
@@ -673,16 +728,19 @@ def preview_v2_pipeline(
         previews["03_shadow_removed"] = satellite
 
     # 4. Ray-traced shadows
-    builder = SceneBuilder(bounds, size)
-    if elevation is not None:
-        builder.add_terrain(elevation)
+    if city_scene is not None and city_scene.covers(bounds):
+        mesh = city_scene
     else:
-        builder.add_ground_plane()
-    if buildings:
-        builder.add_buildings(buildings)
-    if trees:
-        builder.add_trees(trees)
-    mesh = builder.build()
+        builder = SceneBuilder(bounds, size)
+        if elevation is not None:
+            builder.add_terrain(elevation)
+        else:
+            builder.add_ground_plane()
+        if buildings:
+            builder.add_buildings(buildings)
+        if trees:
+            builder.add_trees(trees)
+        mesh = builder.build()
 
     rt_config = RayTracerConfig(image_size=size, samples_per_pixel=1)
     raytracer = TileRaytracer(mesh, bounds, rt_config)
@@ -709,6 +767,7 @@ def preview_v2_pipeline(
             remove_shadows=True,
             shadow_removal_method="color_transfer",
             ray_trace_samples=1,
+            city_scene=city_scene,
         )
         previews["06_final_composite"] = final
     except Exception as e:
@@ -16,6 +16,12 @@ from typing import Optional
 import requests
 from PIL import Image
 
+try:
+    from .provider_cache import default_provider_cache, request_key
+except ImportError:
+    # Imported as a top-level module by the standalone scripts
+    from provider_cache import default_provider_cache, request_key
+
 # Provider model mapping
 PROVIDER_MODELS = {
     "gemini": "gemini-2.5-flash-image",
@@ -93,14 +99,28 @@ Transform this tile into something visually stunning while keeping the straight-
         mood_bytes: Optional[bytes] = None,
         temperature: float = 0.5,
     ) -> StyleResult:
-        """Style a tile using the configured provider."""
+        """Style a tile using the configured provider.
+
+        Responses are cached by request content (see provider_cache), so
+        styling the same tile with the same prompt again makes no API call.
+        """
         if self.provider == "gemini":
-            return self._style_with_gemini(tile_bytes, prompt, mood_bytes, temperature)
+            call = lambda: self._style_with_gemini(tile_bytes, prompt, mood_bytes, temperature)
         elif self.provider == "openai":
-            return self._style_with_openai(tile_bytes, prompt, mood_bytes)
+            # OpenAI image edits take no temperature
+            temperature = None
+            call = lambda: self._style_with_openai(tile_bytes, prompt, mood_bytes)
         else:
             raise ValueError(f"Unknown provider: {self.provider}")
 
+        model = PROVIDER_MODELS[self.provider]
+        key = request_key(
+            self.provider, model, f"{self.SYSTEM_PROMPT}\n\n{prompt}", temperature,
+            images=[tile_bytes], references=[mood_bytes] if mood_bytes else [],
+        )
+        image_bytes, _ = default_provider_cache().fetch(key, lambda: call().image_bytes)
+        return StyleResult(image_bytes=image_bytes, provider=self.provider, model=model)
+
     def _style_with_gemini(
         self,
         tile_bytes: bytes,
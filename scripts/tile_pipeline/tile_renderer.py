@@ -5,11 +5,13 @@ Handles tile coordinate calculations, iteration over tile grids,
 output file writing, and parallel processing coordination.
 """
 
+import io
 import math
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass
+import multiprocessing.util
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
 from pathlib import Path
-from typing import Iterator, Optional, Callable
+from typing import TYPE_CHECKING, Any, Iterator, Literal, Optional, Callable
 
 import numpy as np
 from numpy.typing import NDArray
@@ -17,12 +19,23 @@ from PIL import Image
 from tqdm import tqdm
 
 from .config import PipelineConfig
+from .render_manifest import RenderManifest, file_digest, fingerprint
 from .sources.satellite import SatelliteSource, tile_bounds_wgs84, wgs84_to_tile
 from .sources.elevation import ElevationSource
-from .sources.vector import VectorSource, query_features_in_tile
+from .sources.prefetch import TilePrefetcher, TileRequest
+from .sources.vector import (
+    Feature,
+    VectorSource,
+    partition_features_to_tiles,
+    query_features_in_tile,
+)
 from .tile_compositor import composite_tile, composite_tile_v2
+from .tile_store import DirectoryTileStore, MBTilesStore, TileStore
 from .time_presets import get_preset
 
+if TYPE_CHECKING:
+    from .city_scene import CityScene
+
 
 @dataclass
 class TileCoord:
@@ -37,10 +50,28 @@ class TileCoord:
         """Get WGS84 bounds (west, south, east, north)."""
         return tile_bounds_wgs84(self.z, self.x, self.y)
 
+    def children(self) -> list["TileCoord"]:
+        """Get the four child tiles at zoom z+1 (row-major order)."""
+        return [
+            TileCoord(self.z + 1, self.x * 2 + dx, self.y * 2 + dy)
+            for dy in range(2)
+            for dx in range(2)
+        ]
+
     def __str__(self) -> str:
         return f"{self.z}/{self.x}/{self.y}"
 
 
+# Query buffers around each tile (long shadows can extend far)
+BUILDING_BUFFER_METERS = 200
+TREE_BUFFER_METERS = 100
+BUILDING_MIN_HEIGHT = 1.0
+TREE_MIN_HEIGHT = 2.0
+
+# Output file for config.output.backend == "mbtiles"
+OUTPUT_MBTILES = "tiles.mbtiles"
+
+
 class TileRenderer:
     """Manages tile rendering for a region."""
 
@@ -69,15 +100,27 @@ class TileRenderer:
         self.satellite = SatelliteSource(
             url_template=self.config.sources.swissimage_url,
             cache_dir=self.config.cache_dir,
+            cache_backend=self.config.cache_backend,
         )
         self.elevation = ElevationSource(
             url_template=self.config.sources.elevation_url,
             cache_dir=self.config.cache_dir,
+            cache_backend=self.config.cache_backend,
+            max_zoom=self.config.sources.elevation_max_zoom,
         )
+        self._output_stores: dict[Path, TileStore] = {}
 
         # Vector sources loaded lazily
         self._buildings: Optional[VectorSource] = None
         self._trees: Optional[VectorSource] = None
+        self._render_inputs: Optional[dict[str, Any]] = None
+
+        # City-wide shadow scene, opened lazily
+        self._city_scene: Optional["CityScene"] = None
+        self._city_scene_checked = False
+
+        # Feature ids per tile, filled by partition_features()
+        self._tile_feature_ids: dict[str, tuple] = {}
 
     @property
     def buildings(self) -> Optional[VectorSource]:
@@ -85,7 +128,7 @@ class TileRenderer:
         if self._buildings is None:
             buildings_path = self.config.sources.buildings_path
             if buildings_path.exists():
-                self._buildings = VectorSource(buildings_path, "height")
+                self._buildings = VectorSource(buildings_path, "height", self.config.feature_store_dir)
         return self._buildings
 
     @property
@@ -94,9 +137,23 @@ class TileRenderer:
         if self._trees is None:
             trees_path = self.config.sources.trees_path
             if trees_path.exists():
-                self._trees = VectorSource(trees_path, "estimated_height")
+                self._trees = VectorSource(trees_path, "estimated_height", self.config.feature_store_dir)
         return self._trees
 
+    @property
+    def city_scene(self) -> Optional["CityScene"]:
+        """Prebuilt city scene matching the current sources, if any (opened once)."""
+        if not self._city_scene_checked:
+            from .city_scene import open_city_scene
+
+            self._city_scene = open_city_scene(
+                self.config.city_scene_dir,
+                self.config.sources.buildings_path,
+                self.config.sources.trees_path,
+            )
+            self._city_scene_checked = True
+        return self._city_scene
+
     def tiles_in_bounds(
         self,
         bounds: tuple[float, float, float, float],
@@ -135,42 +192,206 @@ class TileRenderer:
                 total += 1
         return total
 
-    def render_tile(self, coord: TileCoord) -> NDArray[np.uint8]:
-        """Render a single tile.
+    def collect_tiles(
+        self,
+        bounds: tuple[float, float, float, float],
+        min_zoom: int,
+        max_zoom: int,
+    ) -> list[TileCoord]:
+        """Collect all tiles for a zoom range, lowest zoom first."""
+        tiles = []
+        for z in range(min_zoom, max_zoom + 1):
+            tiles.extend(self.tiles_in_bounds(bounds, z))
+        return tiles
+
+    def worker_init_kwargs(self) -> dict[str, Any]:
+        """Constructor arguments used to rebuild this renderer in a worker process."""
+        return {
+            "config": self.config,
+            "preset_name": self.preset_name,
+            "use_blender": self.use_blender,
+            "blender_samples": self.blender_samples,
+        }
+
+    def close(self) -> None:
+        """Release output stores and any render servers held by the renderer."""
+        for store in self._output_stores.values():
+            store.close()
+        self._output_stores = {}
+
+    def __enter__(self) -> "TileRenderer":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def load_sources(self) -> None:
+        """Eagerly load vector sources (normally loaded lazily on first tile)."""
+        _ = self.buildings
+        _ = self.trees
+
+    def render_inputs(self) -> dict[str, Any]:
+        """Inputs shared by every tile of a render, for manifest fingerprints.
+
+        Covers the preset, blend/config values and a content hash of the
+        vector data. Computed once per renderer.
+        """
+        if self._render_inputs is None:
+            self._render_inputs = {
+                "preset": self.preset_name,
+                "preset_values": asdict(self.preset),
+                "blend": asdict(self.config.blend),
+                "imhof": asdict(self.config.imhof),
+                "sun": asdict(self.config.sun),
+                "tile_size": self.config.output.tile_size,
+                "format": self.config.output.format,
+                "quality": self.config.output.quality,
+                "use_blender": self.use_blender,
+                "blender_samples": self.blender_samples,
+                "buildings": file_digest(self.config.sources.buildings_path),
+                "trees": file_digest(self.config.sources.trees_path),
+            }
+            if self.config.sources.elevation_max_zoom is not None:
+                # Only recorded when set, so existing manifests stay valid
+                self._render_inputs["elevation_max_zoom"] = self.config.sources.elevation_max_zoom
+        return self._render_inputs
+
+    def tile_inputs(self, coord: TileCoord) -> dict[str, Any]:
+        """Per-tile inputs for manifest fingerprints (source cache mtimes)."""
+        return {
+            "satellite": self.satellite.cache_mtimes(coord.z, coord.x, coord.y),
+            "elevation": self.elevation.cache_mtime(coord.z, coord.x, coord.y),
+        }
+
+    def tile_fingerprint(self, coord: TileCoord) -> str:
+        """Fingerprint of everything that determines a tile's output."""
+        return fingerprint({**self.render_inputs(), **self.tile_inputs(coord)})
+
+    def stale_tiles(
+        self,
+        tiles: list[TileCoord],
+        manifest: RenderManifest,
+        output_dir: Optional[Path] = None,
+    ) -> list[TileCoord]:
+        """Filter out tiles whose recorded inputs are unchanged.
 
-        Args:
-            coord: Tile coordinates
+        Tiles with uncached source data never match (their mtime is None),
+        so they are always rendered.
+        """
+        return [
+            coord for coord in tiles
+            if not manifest.is_fresh(
+                str(coord),
+                self.tile_fingerprint(coord),
+                self.tile_exists(coord, output_dir),
+            )
+        ]
 
-        Returns:
-            Composited RGB image
+    def prefetch_requests(self, coord: TileCoord) -> list[TileRequest]:
+        """Raster source tiles render_tile() will read for a tile."""
+        return [
+            *self.satellite.prefetch_requests(coord.z, coord.x, coord.y),
+            *self.elevation.prefetch_requests(coord.z, coord.x, coord.y),
+        ]
+
+    def prefetch_sources(self, tiles: list[TileCoord], progress: bool = True) -> None:
+        """Download all uncached source tiles for a render up front.
+
+        Fetches run concurrently (config.fetch_concurrency in flight), so
+        rendering then reads every source tile from the cache instead of
+        paying one round trip per tile.
         """
-        size = self.config.output.tile_size
+        if not tiles:
+            return
+        prefetcher = TilePrefetcher(concurrency=self.config.fetch_concurrency)
+        try:
+            result = prefetcher.prefetch(
+                (request for coord in tiles for request in self.prefetch_requests(coord)),
+                progress=progress,
+            )
+        finally:
+            prefetcher.close()
+        if result.fetched or result.missing or result.failed:
+            print(result.summary())
 
-        # Fetch base layers
-        satellite = self.satellite.fetch_and_resize(coord.z, coord.x, coord.y, size)
-        elevation = self.elevation.fetch_and_resize(coord.z, coord.x, coord.y, size)
+    def partition_features(self, tiles: list[TileCoord]) -> None:
+        """Pre-assign buildings and trees to tiles in one batched index query.
+
+        Later tile_features() calls for these tiles look up the stored ids
+        instead of querying the index per tile.
+        """
+        bounds_list = [coord.bounds for coord in tiles]
+        building_ids = (
+            partition_features_to_tiles(
+                self.buildings, bounds_list, BUILDING_BUFFER_METERS, BUILDING_MIN_HEIGHT
+            )
+            if self.buildings else [None] * len(tiles)
+        )
+        tree_ids = (
+            partition_features_to_tiles(
+                self.trees, bounds_list, TREE_BUFFER_METERS, TREE_MIN_HEIGHT
+            )
+            if self.trees else [None] * len(tiles)
+        )
+        for coord, b_ids, t_ids in zip(tiles, building_ids, tree_ids):
+            self._tile_feature_ids[str(coord)] = (b_ids, t_ids)
+
+    def tile_features(self, coord: TileCoord) -> tuple[list[Feature], list[Feature]]:
+        """Get buildings and trees relevant to a tile (including shadow buffer).
+
+        Returns:
+            (building_features, tree_features)
+        """
+        partitioned = self._tile_feature_ids.pop(str(coord), None)
+        if partitioned is not None:
+            building_ids, tree_ids = partitioned
+            return (
+                [self.buildings.features[i] for i in building_ids.tolist()]
+                if building_ids is not None else [],
+                [self.trees.features[i] for i in tree_ids.tolist()]
+                if tree_ids is not None else [],
+            )
 
-        # Query vector features
-        bounds = coord.bounds
         building_features = []
         tree_features = []
 
         if self.buildings:
             building_features = query_features_in_tile(
                 self.buildings,
-                bounds,
-                buffer_meters=200,  # Long shadows can extend far
-                min_height=1.0,
+                coord.bounds,
+                buffer_meters=BUILDING_BUFFER_METERS,
+                min_height=BUILDING_MIN_HEIGHT,
             )
 
         if self.trees:
             tree_features = query_features_in_tile(
                 self.trees,
-                bounds,
-                buffer_meters=100,
-                min_height=2.0,
+                coord.bounds,
+                buffer_meters=TREE_BUFFER_METERS,
+                min_height=TREE_MIN_HEIGHT,
             )
 
+        return building_features, tree_features
+
+    def render_tile(self, coord: TileCoord) -> NDArray[np.uint8]:
+        """Render a single tile.
+
+        Args:
+            coord: Tile coordinates
+
+        Returns:
+            Composited RGB image
+        """
+        size = self.config.output.tile_size
+
+        # Fetch base layers
+        satellite = self.satellite.fetch_and_resize(coord.z, coord.x, coord.y, size)
+        elevation = self.elevation.fetch_and_resize(coord.z, coord.x, coord.y, size)
+
+        # Query vector features
+        bounds = coord.bounds
+        building_features, tree_features = self.tile_features(coord)
+
         # Branch: V2 pipeline (Blender) or V1 pipeline (trimesh)
         if self.use_blender:
             return composite_tile_v2(
@@ -184,6 +405,7 @@ class TileRenderer:
                 remove_shadows=True,
                 use_blender=True,
                 blender_samples=self.blender_samples,
+                city_scene=self.city_scene,
             )
         else:
             return composite_tile(
@@ -196,13 +418,49 @@ class TileRenderer:
                 self.preset_name,
             )
 
+    def output_store(self, output_dir: Optional[Path] = None) -> TileStore:
+        """Tile store for an output directory (per config.output.backend)."""
+        output_dir = output_dir or self.config.output.output_dir
+        store = self._output_stores.get(output_dir)
+        if store is None:
+            fmt = self.config.output.format
+            if self.config.output.backend == "mbtiles":
+                store = MBTilesStore(output_dir / OUTPUT_MBTILES, fmt, name=output_dir.name)
+            else:
+                store = DirectoryTileStore(output_dir, fmt)
+            store = self._output_stores.setdefault(output_dir, store)
+        return store
+
+    def tile_path(self, coord: TileCoord, output_dir: Optional[Path] = None) -> Path:
+        """Get the file holding a tile (the MBTiles file for that backend)."""
+        return self.output_store(output_dir).location(coord.z, coord.x, coord.y)
+
+    def tile_exists(self, coord: TileCoord, output_dir: Optional[Path] = None) -> bool:
+        """Check whether a tile has been saved."""
+        return self.output_store(output_dir).has(coord.z, coord.x, coord.y)
+
+    def encode_tile(self, image: NDArray[np.uint8]) -> bytes:
+        """Encode an RGB tile in the configured output format."""
+        fmt = self.config.output.format
+        buffer = io.BytesIO()
+        img = Image.fromarray(image)
+
+        if fmt == "webp":
+            img.save(buffer, "WEBP", quality=self.config.output.quality)
+        elif fmt == "jpeg":
+            img.save(buffer, "JPEG", quality=self.config.output.quality)
+        else:
+            img.save(buffer, "PNG")
+
+        return buffer.getvalue()
+
     def save_tile(
         self,
         image: NDArray[np.uint8],
         coord: TileCoord,
         output_dir: Optional[Path] = None,
     ) -> Path:
-        """Save a rendered tile to disk.
+        """Save a rendered tile to the output store.
 
         Args:
             image: RGB image array
@@ -210,26 +468,11 @@ class TileRenderer:
             output_dir: Output directory (uses config default if None)
 
         Returns:
-            Path to saved file
+            Path to the file holding the tile
         """
-        output_dir = output_dir or self.config.output.output_dir
-        fmt = self.config.output.format
-
-        # Create directory structure
-        tile_path = output_dir / str(coord.z) / str(coord.x) / f"{coord.y}.{fmt}"
-        tile_path.parent.mkdir(parents=True, exist_ok=True)
-
-        # Save image
-        img = Image.fromarray(image)
-
-        if fmt == "webp":
-            img.save(tile_path, "WEBP", quality=self.config.output.quality)
-        elif fmt == "jpeg":
-            img.save(tile_path, "JPEG", quality=self.config.output.quality)
-        else:
-            img.save(tile_path, "PNG")
-
-        return tile_path
+        store = self.output_store(output_dir)
+        store.put(coord.z, coord.x, coord.y, self.encode_tile(image))
+        return store.location(coord.z, coord.x, coord.y)
 
     def render_and_save(
         self,
@@ -255,41 +498,49 @@ class TileRenderer:
         max_zoom: Optional[int] = None,
         progress: bool = True,
         on_tile_complete: Optional[Callable[[TileCoord, Path], None]] = None,
+        force: bool = False,
     ) -> list[Path]:
         """Render all tiles in region.
 
+        Tiles whose inputs match the output directory's render manifest
+        are skipped unless force is set.
+
         Args:
             bounds: Region bounds (uses config default if None)
             min_zoom: Minimum zoom level (uses config default if None)
             max_zoom: Maximum zoom level (uses config default if None)
             progress: Show progress bar
             on_tile_complete: Callback after each tile
+            force: Re-render tiles even if they are up to date
 
         Returns:
-            List of paths to rendered tiles
+            List of paths to rendered tiles (skipped tiles excluded)
         """
         bounds = bounds or self.config.bounds
         min_zoom = min_zoom if min_zoom is not None else self.config.min_zoom
         max_zoom = max_zoom if max_zoom is not None else self.config.max_zoom
 
-        # Collect all tiles
-        tiles = []
-        for z in range(min_zoom, max_zoom + 1):
-            for coord in self.tiles_in_bounds(bounds, z):
-                tiles.append(coord)
+        tiles = self.collect_tiles(bounds, min_zoom, max_zoom)
+        manifest, tiles = self._prepare_manifest(tiles, force)
+        self.prefetch_sources(tiles, progress)
+        self.partition_features(tiles)
 
         # Render with progress
         paths = []
         iterator = tqdm(tiles, desc="Rendering tiles", disable=not progress)
 
-        for coord in iterator:
-            try:
-                path = self.render_and_save(coord)
-                paths.append(path)
-                if on_tile_complete:
-                    on_tile_complete(coord, path)
-            except Exception as e:
-                print(f"Error rendering {coord}: {e}")
+        try:
+            for coord in iterator:
+                try:
+                    path = self.render_and_save(coord)
+                    paths.append(path)
+                    manifest.record(str(coord), self.tile_fingerprint(coord))
+                    if on_tile_complete:
+                        on_tile_complete(coord, path)
+                except Exception as e:
+                    print(f"Error rendering {coord}: {e}")
+        finally:
+            manifest.save()
 
         return paths
 
@@ -300,36 +551,69 @@ class TileRenderer:
         max_zoom: Optional[int] = None,
         workers: Optional[int] = None,
         progress: bool = True,
+        executor: Literal["process", "thread"] = "process",
+        force: bool = False,
     ) -> list[Path]:
         """Render all tiles using parallel workers.
 
+        The default process executor sidesteps the GIL: compositing, shadow
+        rasterization and hillshading are pure NumPy/PIL work that does not
+        scale with threads. Each worker process rebuilds the renderer once,
+        loads buildings/trees at startup, and then only receives TileCoords
+        and returns output paths. The thread executor is kept for Blender
+        renders, where the heavy lifting already happens in a subprocess.
+
         Args:
             bounds: Region bounds
             min_zoom: Minimum zoom level
             max_zoom: Maximum zoom level
             workers: Number of parallel workers (uses config default if None)
             progress: Show progress bar
+            executor: "process" (one renderer per worker) or "thread" (shared renderer)
+            force: Re-render tiles even if the render manifest marks them up to date
 
         Returns:
-            List of paths to rendered tiles
+            List of paths to rendered tiles (skipped tiles excluded)
         """
         bounds = bounds or self.config.bounds
         min_zoom = min_zoom if min_zoom is not None else self.config.min_zoom
         max_zoom = max_zoom if max_zoom is not None else self.config.max_zoom
         workers = workers or self.config.workers
 
-        # Collect all tiles
-        tiles = []
-        for z in range(min_zoom, max_zoom + 1):
-            for coord in self.tiles_in_bounds(bounds, z):
-                tiles.append(coord)
+        tiles = self.collect_tiles(bounds, min_zoom, max_zoom)
+        manifest, tiles = self._prepare_manifest(tiles, force)
+        return self._render_in_pool(tiles, manifest, workers, progress, executor)
+
+    def _render_in_pool(
+        self,
+        tiles: list[TileCoord],
+        manifest: RenderManifest,
+        workers: int,
+        progress: bool,
+        executor: Literal["process", "thread"],
+    ) -> list[Path]:
+        """Render tiles through a worker pool, recording each in the manifest."""
+        if not tiles:
+            return []
+
+        self.prefetch_sources(tiles, progress)
+
+        if executor == "process":
+            # Build any missing feature stores once, before workers map them
+            self.load_sources()
+            pool = ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_render_worker,
+                initargs=(type(self), self.worker_init_kwargs()),
+            )
+            render_fn = _render_tile_in_worker
+        else:
+            pool = ThreadPoolExecutor(max_workers=workers)
+            render_fn = self.render_and_save
 
         paths = []
-        with ThreadPoolExecutor(max_workers=workers) as executor:
-            futures = {
-                executor.submit(self.render_and_save, coord): coord
-                for coord in tiles
-            }
+        with pool:
+            futures = {pool.submit(render_fn, coord): coord for coord in tiles}
 
             iterator = tqdm(
                 as_completed(futures),
@@ -338,16 +622,188 @@ class TileRenderer:
                 disable=not progress,
             )
 
-            for future in iterator:
-                try:
-                    path = future.result()
-                    paths.append(path)
-                except Exception as e:
+            try:
+                for future in iterator:
                     coord = futures[future]
-                    print(f"Error rendering {coord}: {e}")
+                    try:
+                        path = future.result()
+                        paths.append(path)
+                        manifest.record(str(coord), self.tile_fingerprint(coord))
+                    except Exception as e:
+                        print(f"Error rendering {coord}: {e}")
+            finally:
+                manifest.save()
 
         return paths
 
+    def render_pyramid(
+        self,
+        bounds: Optional[tuple[float, float, float, float]] = None,
+        min_zoom: Optional[int] = None,
+        max_zoom: Optional[int] = None,
+        workers: Optional[int] = None,
+        progress: bool = True,
+        executor: Literal["process", "thread"] = "process",
+        force: bool = False,
+    ) -> list[Path]:
+        """Render max zoom fully and build lower zooms by downsampling.
+
+        Only tiles at max_zoom go through compositing and shadow casting.
+        Each lower-zoom tile is then built bottom-up as a 2×2 mosaic of its
+        children, filtered down to tile size, so a z14–z18 render costs about
+        1.33× the z18 work. Parent tiles at the edge of the bounds, whose
+        children were not all rendered, fall back to a full render.
+
+        Args:
+            bounds: Region bounds
+            min_zoom: Minimum zoom level
+            max_zoom: Maximum (fully rendered) zoom level
+            workers: Number of parallel workers
+            progress: Show progress bar
+            executor: Pool backend for full renders ("process" or "thread")
+            force: Rebuild tiles even if the render manifest marks them up to date
+
+        Returns:
+            List of paths to rendered or downsampled tiles (skipped tiles excluded)
+        """
+        bounds = bounds or self.config.bounds
+        min_zoom = min_zoom if min_zoom is not None else self.config.min_zoom
+        max_zoom = max_zoom if max_zoom is not None else self.config.max_zoom
+        workers = workers or self.config.workers
+
+        base_tiles = self.collect_tiles(bounds, max_zoom, max_zoom)
+        manifest, stale = self._prepare_manifest(base_tiles, force)
+        paths = self._render_in_pool(stale, manifest, workers, progress, executor)
+        available = {
+            str(coord) for coord in base_tiles
+            if str(coord) in manifest.tiles and self.tile_exists(coord)
+        }
+
+        for z in range(max_zoom - 1, min_zoom - 1, -1):
+            to_build = []
+            to_render = []
+            for coord in self.tiles_in_bounds(bounds, z):
+                children = [str(child) for child in coord.children()]
+                if all(child in available for child in children):
+                    tile_fingerprint = fingerprint(
+                        {"children": [manifest.tiles[child] for child in children]}
+                    )
+                    if force or not manifest.is_fresh(
+                        str(coord), tile_fingerprint, self.tile_exists(coord)
+                    ):
+                        to_build.append((coord, tile_fingerprint))
+                    available.add(str(coord))
+                elif force or not manifest.is_fresh(
+                    str(coord), self.tile_fingerprint(coord), self.tile_exists(coord)
+                ):
+                    to_render.append(coord)
+                else:
+                    available.add(str(coord))
+
+            # Edge tiles without a full set of children are rendered directly
+            rendered = self._render_in_pool(to_render, manifest, workers, progress, executor)
+            paths.extend(rendered)
+            available.update(
+                str(coord) for coord in to_render if str(coord) in manifest.tiles
+            )
+
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                futures = {
+                    pool.submit(self.build_parent_tile, coord): (coord, tile_fingerprint)
+                    for coord, tile_fingerprint in to_build
+                }
+                iterator = tqdm(
+                    as_completed(futures),
+                    total=len(futures),
+                    desc=f"Downsampling z{z}",
+                    disable=not progress,
+                )
+                try:
+                    for future in iterator:
+                        coord, tile_fingerprint = futures[future]
+                        try:
+                            paths.append(future.result())
+                            manifest.record(str(coord), tile_fingerprint)
+                        except Exception as e:
+                            available.discard(str(coord))
+                            print(f"Error building {coord}: {e}")
+                finally:
+                    manifest.save()
+
+        return paths
+
+    def build_parent_tile(
+        self,
+        coord: TileCoord,
+        output_dir: Optional[Path] = None,
+    ) -> Path:
+        """Build a tile from its four already-saved children.
+
+        The children are mosaicked into a 2× image and filtered down with
+        Lanczos resampling.
+
+        Args:
+            coord: Parent tile coordinates
+            output_dir: Output directory holding the children
+
+        Returns:
+            Path to saved parent tile
+        """
+        size = self.config.output.tile_size
+        mosaic = Image.new("RGB", (size * 2, size * 2))
+
+        store = self.output_store(output_dir)
+        for child in coord.children():
+            data = store.get(child.z, child.x, child.y)
+            if data is None:
+                raise FileNotFoundError(f"Child tile {child} not found in {store!r}")
+            with Image.open(io.BytesIO(data)) as img:
+                img = img.convert("RGB")
+                if img.size != (size, size):
+                    img = img.resize((size, size), Image.Resampling.LANCZOS)
+                offset_x = (child.x - coord.x * 2) * size
+                offset_y = (child.y - coord.y * 2) * size
+                mosaic.paste(img, (offset_x, offset_y))
+
+        image = np.asarray(mosaic.resize((size, size), Image.Resampling.LANCZOS))
+        return self.save_tile(image, coord, output_dir)
+
+    def _prepare_manifest(
+        self,
+        tiles: list[TileCoord],
+        force: bool,
+    ) -> tuple[RenderManifest, list[TileCoord]]:
+        """Load the output manifest and drop up-to-date tiles unless forced."""
+        manifest = RenderManifest(self.config.output.output_dir)
+        if force:
+            return manifest, tiles
+
+        stale = self.stale_tiles(tiles, manifest)
+        skipped = len(tiles) - len(stale)
+        if skipped:
+            print(f"Skipping {skipped} up-to-date tiles ({len(stale)} to render)")
+        return manifest, stale
+
+
+# Per-process renderer used by render_parallel(executor="process")
+_worker_renderer: Optional["TileRenderer"] = None
+
+
+def _init_render_worker(renderer_cls: type, init_kwargs: dict[str, Any]) -> None:
+    """Process pool initializer: build the renderer and load sources once."""
+    global _worker_renderer
+    _worker_renderer = renderer_cls(**init_kwargs)
+    _worker_renderer.load_sources()
+    # Pool workers skip atexit; multiprocessing finalizers run on worker exit
+    multiprocessing.util.Finalize(_worker_renderer, _worker_renderer.close, exitpriority=10)
+
+
+def _render_tile_in_worker(coord: TileCoord) -> Path:
+    """Render and save one tile with this process's renderer."""
+    if _worker_renderer is None:
+        raise RuntimeError("Render worker was not initialized")
+    return _worker_renderer.render_and_save(coord)
+
 
 class RenderedTileRenderer(TileRenderer):
     """Renders tiles using pure Blender 3D rendering (no satellite imagery).
@@ -369,6 +825,7 @@ class RenderedTileRenderer(TileRenderer):
         preset_name: str = "afternoon",
         style_name: str = "default",
         samples: int = 64,
+        blender_servers: int = 0,
     ):
         """Initialize rendered tile renderer.
 
@@ -377,15 +834,44 @@ class RenderedTileRenderer(TileRenderer):
             preset_name: Time preset for lighting/sun position
             style_name: Visual style name (see materials.py)
             samples: Blender Cycles render samples
+            blender_servers: Persistent Blender processes to render on
+                (0 starts a new Blender process per tile)
         """
         # Initialize base class (but we won't use satellite/blender shadow features)
         super().__init__(config, preset_name, use_blender=False, blender_samples=samples)
 
         self.style_name = style_name
         self.samples = samples
+        self.blender_servers = blender_servers
 
-        # Lazy-loaded Blender renderer
+        # Lazy-loaded Blender renderer and server pool
         self._blender_renderer = None
+        self._server_pool = None
+
+    def worker_init_kwargs(self) -> dict[str, Any]:
+        """Constructor arguments used to rebuild this renderer in a worker process."""
+        return {
+            "config": self.config,
+            "preset_name": self.preset_name,
+            "style_name": self.style_name,
+            "samples": self.samples,
+            # A worker process renders one tile at a time, so one server is enough
+            "blender_servers": min(self.blender_servers, 1),
+        }
+
+    def render_inputs(self) -> dict[str, Any]:
+        """Shared render inputs, including the visual style."""
+        inputs = super().render_inputs()
+        inputs.setdefault("style", self.style_name)
+        return inputs
+
+    def tile_inputs(self, coord: TileCoord) -> dict[str, Any]:
+        """Per-tile inputs (rendered mode does not use satellite imagery)."""
+        return {"elevation": self.elevation.cache_mtime(coord.z, coord.x, coord.y)}
+
+    def prefetch_requests(self, coord: TileCoord) -> list[TileRequest]:
+        """Elevation tiles only (rendered mode does not use satellite imagery)."""
+        return self.elevation.prefetch_requests(coord.z, coord.x, coord.y)
 
     @property
     def blender_renderer(self):
@@ -398,9 +884,23 @@ class RenderedTileRenderer(TileRenderer):
                 samples=self.samples,
                 use_gpu=True,
             )
-            self._blender_renderer = BlenderTileRenderer(config=render_config)
+            if self.blender_servers > 0:
+                from .blender_server import BlenderServerPool
+
+                self._server_pool = BlenderServerPool(size=self.blender_servers)
+            self._blender_renderer = BlenderTileRenderer(
+                config=render_config, server_pool=self._server_pool
+            )
         return self._blender_renderer
 
+    def close(self) -> None:
+        """Shut down the Blender server pool, if one was started."""
+        super().close()
+        if self._server_pool is not None:
+            self._server_pool.close()
+            self._server_pool = None
+            self._blender_renderer = None
+
     def render_tile(self, coord: TileCoord) -> NDArray[np.uint8]:
         """Render a single tile using Blender.
 
@@ -416,24 +916,7 @@ class RenderedTileRenderer(TileRenderer):
         bounds = coord.bounds
 
         # Query vector features
-        building_features = []
-        tree_features = []
-
-        if self.buildings:
-            building_features = query_features_in_tile(
-                self.buildings,
-                bounds,
-                buffer_meters=200,
-                min_height=1.0,
-            )
-
-        if self.trees:
-            tree_features = query_features_in_tile(
-                self.trees,
-                bounds,
-                buffer_meters=100,
-                min_height=2.0,
-            )
+        building_features, tree_features = self.tile_features(coord)
 
         # Fetch elevation for terrain
         size = self.config.output.tile_size
@@ -0,0 +1,260 @@
+"""
+Pluggable storage for raster tiles (source caches and render output).
+
+Two backends share one interface:
+
+- DirectoryTileStore: the classic {root}/{z}/{x}/{y}.{ext} layout, one
+  file per tile. What web servers and the frontend read directly.
+- MBTilesStore: every tile in a single SQLite file following the MBTiles
+  1.3 schema (TMS row order). Avoids hundreds of thousands of small files,
+  makes existence checks an index lookup, and copies/rsyncs as one file.
+  WAL mode lets worker processes write concurrently.
+
+An MBTiles store can be exported to the directory layout at any time
+(``store.export(directory)`` or ``tile_pipeline.cli export-tiles``).
+
+Example:
+    store = open_tile_store(Path("public/tiles/photorealistic/tiles.mbtiles"), "webp")
+    store.put(16, 34322, 22950, webp_bytes)
+    store.export(Path("public/tiles/photorealistic"))
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import Iterator, Literal, Optional
+
+
+TileBackend = Literal["files", "mbtiles"]
+
+MBTILES_SUFFIX = ".mbtiles"
+
+
+def write_atomic(path: Path, data: bytes) -> None:
+    """Write a file so concurrent readers never see a partial tile."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    tmp_path.write_bytes(data)
+    os.replace(tmp_path, path)
+
+
+class TileStore(ABC):
+    """Key-value store of encoded tiles addressed by (z, x, y)."""
+
+    ext: str
+
+    @abstractmethod
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        """Encoded tile bytes, or None if the tile is not stored."""
+
+    @abstractmethod
+    def put(self, z: int, x: int, y: int, data: bytes) -> None:
+        """Store (or replace) a tile."""
+
+    @abstractmethod
+    def mtime(self, z: int, x: int, y: int) -> Optional[float]:
+        """When a tile was last written (None if not stored)."""
+
+    @abstractmethod
+    def tiles(self) -> Iterator[tuple[int, int, int]]:
+        """Iterate over the (z, x, y) of every stored tile."""
+
+    @abstractmethod
+    def location(self, z: int, x: int, y: int) -> Path:
+        """File that holds a tile (the tile file itself, or the store file)."""
+
+    def has(self, z: int, x: int, y: int) -> bool:
+        return self.mtime(z, x, y) is not None
+
+    def close(self) -> None:
+        pass
+
+    def export(self, directory: Path, overwrite: bool = False) -> int:
+        """Write every tile to {directory}/{z}/{x}/{y}.{ext}.
+
+        Args:
+            directory: Target root directory
+            overwrite: Replace tiles that already exist in the target
+
+        Returns:
+            Number of tiles written
+        """
+        target = DirectoryTileStore(directory, self.ext)
+        written = 0
+        for z, x, y in self.tiles():
+            if not overwrite and target.has(z, x, y):
+                continue
+            data = self.get(z, x, y)
+            if data is not None:
+                target.put(z, x, y, data)
+                written += 1
+        return written
+
+
+class DirectoryTileStore(TileStore):
+    """One file per tile under {root}/{z}/{x}/{y}.{ext}."""
+
+    def __init__(self, root: Path, ext: str):
+        self.root = Path(root)
+        self.ext = ext
+
+    def location(self, z: int, x: int, y: int) -> Path:
+        return self.root / str(z) / str(x) / f"{y}.{self.ext}"
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        try:
+            return self.location(z, x, y).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, z: int, x: int, y: int, data: bytes) -> None:
+        write_atomic(self.location(z, x, y), data)
+
+    def mtime(self, z: int, x: int, y: int) -> Optional[float]:
+        try:
+            return self.location(z, x, y).stat().st_mtime
+        except FileNotFoundError:
+            return None
+
+    def tiles(self) -> Iterator[tuple[int, int, int]]:
+        if not self.root.exists():
+            return
+        for path in self.root.glob(f"*/*/*.{self.ext}"):
+            z, x, y = path.parent.parent.name, path.parent.name, path.name[: -len(self.ext) - 1]
+            if z.isdigit() and x.isdigit() and y.isdigit():
+                yield int(z), int(x), int(y)
+
+    def __repr__(self) -> str:
+        return f"DirectoryTileStore({str(self.root)!r}, {self.ext!r})"
+
+
+class MBTilesStore(TileStore):
+    """All tiles in one SQLite file (MBTiles schema).
+
+    Each thread (and each process) gets its own connection. The database
+    runs in WAL mode, so readers never block and concurrent writers from
+    render workers wait on a busy timeout instead of failing.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        ext: Optional[str] = None,
+        name: Optional[str] = None,
+        timeout: float = 60.0,
+    ):
+        """Open (or create) an MBTiles file.
+
+        Args:
+            path: .mbtiles file
+            ext: Tile format ('webp', 'png', 'jpeg'), used for metadata and
+                exports (None = the format recorded in an existing file)
+            name: Tileset name for the metadata table (defaults to the file stem)
+            timeout: Seconds a writer waits for a lock before raising
+        """
+        self.path = Path(path)
+        self.timeout = timeout
+        self._local = threading.local()
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        conn = self._connection()
+        with conn:
+            conn.execute("CREATE TABLE IF NOT EXISTS metadata (name TEXT PRIMARY KEY, value TEXT)")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS tiles ("
+                "zoom_level INTEGER NOT NULL, tile_column INTEGER NOT NULL, "
+                "tile_row INTEGER NOT NULL, tile_data BLOB NOT NULL, updated_at REAL NOT NULL, "
+                "PRIMARY KEY (zoom_level, tile_column, tile_row))"
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO metadata (name, value) VALUES (?, ?)",
+                [("name", name or self.path.stem), ("format", ext or "png"), ("scheme", "tms")],
+            )
+        self.ext = ext or self.metadata()["format"]
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection (reopened after a fork)."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    @staticmethod
+    def _row(z: int, y: int) -> int:
+        """XYZ row to TMS row (MBTiles counts rows from the south)."""
+        return (1 << z) - 1 - y
+
+    def metadata(self) -> dict[str, str]:
+        """Contents of the MBTiles metadata table."""
+        return dict(self._connection().execute("SELECT name, value FROM metadata").fetchall())
+
+    def location(self, z: int, x: int, y: int) -> Path:
+        return self.path
+
+    def get(self, z: int, x: int, y: int) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT tile_data FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, self._row(z, y)),
+        ).fetchone()
+        return bytes(row[0]) if row else None
+
+    def put(self, z: int, x: int, y: int, data: bytes) -> None:
+        self._connection().execute(
+            "INSERT OR REPLACE INTO tiles (zoom_level, tile_column, tile_row, tile_data, updated_at) "
+            "VALUES (?, ?, ?, ?, ?)",
+            (z, x, self._row(z, y), sqlite3.Binary(data), time.time()),
+        )
+
+    def mtime(self, z: int, x: int, y: int) -> Optional[float]:
+        row = self._connection().execute(
+            "SELECT updated_at FROM tiles WHERE zoom_level=? AND tile_column=? AND tile_row=?",
+            (z, x, self._row(z, y)),
+        ).fetchone()
+        return row[0] if row else None
+
+    def tiles(self) -> Iterator[tuple[int, int, int]]:
+        rows = self._connection().execute(
+            "SELECT zoom_level, tile_column, tile_row FROM tiles"
+        ).fetchall()
+        for z, x, row in rows:
+            yield z, x, self._row(z, row)
+
+    def close(self) -> None:
+        conn = getattr(self._local, "conn", None)
+        if conn is not None and self._local.pid == os.getpid():
+            conn.close()
+        self._local = threading.local()
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM tiles").fetchone()[0]
+
+    def __repr__(self) -> str:
+        return f"MBTilesStore({str(self.path)!r}, {self.ext!r})"
+
+
+def open_tile_store(location: Path, ext: str) -> TileStore:
+    """Open a store from a path: *.mbtiles files are MBTiles, anything else a directory."""
+    location = Path(location)
+    if location.suffix == MBTILES_SUFFIX:
+        return MBTilesStore(location, ext)
+    return DirectoryTileStore(location, ext)
+
+
+def tile_store_for(root: Path, name: str, ext: str, backend: TileBackend = "files") -> TileStore:
+    """Store called ``name`` under ``root`` for a backend.
+
+    "files" uses the directory {root}/{name}/, "mbtiles" the single file
+    {root}/{name}.mbtiles.
+    """
+    if backend == "mbtiles":
+        return MBTilesStore(Path(root) / f"{name}{MBTILES_SUFFIX}", ext)
+    if backend == "files":
+        return DirectoryTileStore(Path(root) / name, ext)
+    raise ValueError(f"Unknown tile store backend: {backend!r}")
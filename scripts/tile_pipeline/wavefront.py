@@ -0,0 +1,263 @@
+"""
+Dependency-aware scheduling for context-stitched AI tile styling.
+
+The L-shaped stitchers style each tile against its already-styled left
+and upper neighbors, so a tile only has to wait for those. Tiles on the
+same anti-diagonal (wavefront) are independent, and the scheduler keeps
+up to ``max_in_flight`` of them in flight at once instead of walking the
+grid row by row.
+
+When the provider answers with a rate limit (HTTP 429/503), the request
+is retried after a backoff. No new requests are issued during the backoff,
+and the in-flight limit is halved. It then grows back by one per success.
+"""
+
+import heapq
+import itertools
+import random
+import time
+from collections import defaultdict
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Hashable, Iterable, Optional
+
+
+Tile = tuple[int, int]
+
+# Rate-limit status codes worth retrying
+RATE_LIMIT_STATUS = (429, 503)
+
+
+class RateLimitError(RuntimeError):
+    """A provider call was rejected because the client is going too fast."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, or None if absent/unparseable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True)
+class TileContext:
+    """Styled neighbors a tile is generated against (None where absent)."""
+
+    left: Optional[Tile] = None
+    above: Optional[Tile] = None
+    above_left: Optional[Tile] = None
+
+    @property
+    def neighbors(self) -> list[Tile]:
+        return [t for t in (self.left, self.above, self.above_left) if t is not None]
+
+
+def plan_l_shaped(
+    grid: dict[int, dict[int, Path]],
+) -> tuple[dict[Tile, TileContext], Optional[tuple[Tile, Tile]]]:
+    """Work out the context of every tile for L-shaped stitching.
+
+    "Above" is the previous row present in the grid and "left" the previous
+    column present in the same row, exactly as in the sequential stitcher.
+    The first two tiles of the first row are styled together as a seed
+    pair; the second one has no entry of its own.
+
+    Args:
+        grid: {y: {x: path}} source tiles
+
+    Returns:
+        (contexts, seed) where contexts maps (x, y) to its TileContext and
+        seed is the ((x0, y0), (x1, y0)) pair, or None for a 1-wide first row
+    """
+    ys = sorted(grid)
+    first_row = sorted(grid[ys[0]]) if ys else []
+    seed = None
+    if len(first_row) >= 2:
+        seed = ((first_row[0], ys[0]), (first_row[1], ys[0]))
+
+    contexts: dict[Tile, TileContext] = {}
+    for row_idx, y in enumerate(ys):
+        y_above = ys[row_idx - 1] if row_idx > 0 else None
+        above_row = grid[y_above] if y_above is not None else {}
+        xs = sorted(grid[y])
+
+        for col_idx, x in enumerate(xs):
+            if seed is not None and (x, y) == seed[1]:
+                continue
+            x_left = xs[col_idx - 1] if col_idx > 0 else None
+            contexts[(x, y)] = TileContext(
+                left=(x_left, y) if x_left is not None else None,
+                above=(x, y_above) if x in above_row else None,
+                above_left=(x_left, y_above) if x_left in above_row else None,
+            )
+
+    return contexts, seed
+
+
+def l_shaped_dependencies(
+    contexts: dict[Tile, TileContext],
+    seed: Optional[tuple[Tile, Tile]],
+) -> dict[Tile, set[Tile]]:
+    """Map each tile to the tasks it waits on (the seed pair is one task)."""
+    owner = {seed[1]: seed[0]} if seed is not None else {}
+    return {
+        tile: {owner.get(n, n) for n in context.neighbors}
+        for tile, context in contexts.items()
+    }
+
+
+def wavefront_priority(tile: Tile) -> tuple[int, int]:
+    """Order tiles by anti-diagonal, then top to bottom."""
+    x, y = tile
+    return (x + y, y)
+
+
+class WavefrontScheduler:
+    """Runs dependent tasks on a thread pool with a bounded number in flight.
+
+    A task becomes ready once all of its dependencies have settled. Failed
+    dependencies count as settled too, so dependents run with whatever
+    context exists. Ready tasks are issued in priority order.
+
+    ``on_done`` is always called on the thread that called ``run``, so
+    callers can update shared state and manifests without locks. An
+    exception raised from ``on_done`` aborts the run: queued tasks are
+    cancelled and tasks already in flight are allowed to finish.
+    """
+
+    def __init__(
+        self,
+        max_in_flight: int = 4,
+        max_retries: int = 6,
+        backoff_base: float = 2.0,
+        backoff_max: float = 120.0,
+    ):
+        """Configure the scheduler.
+
+        Args:
+            max_in_flight: Maximum concurrent provider calls
+            max_retries: Rate-limit retries per task before it fails
+            backoff_base: First backoff in seconds (doubles per retry)
+            backoff_max: Upper bound for a single backoff
+        """
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retries = 0
+
+    def backoff(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)."""
+        if retry_after is not None:
+            return min(retry_after, self.backoff_max)
+        delay = min(self.backoff_max, self.backoff_base * 2 ** (attempt - 1))
+        return delay * random.uniform(0.5, 1.0)
+
+    def run(
+        self,
+        tasks: dict[Hashable, Callable[[], Any]],
+        dependencies: dict[Hashable, Iterable[Hashable]],
+        on_done: Callable[[Hashable, Any, Optional[BaseException]], None],
+        priority: Callable[[Hashable], Any] = lambda key: key,
+    ) -> int:
+        """Run all tasks, respecting dependencies.
+
+        Args:
+            tasks: Task key -> zero-argument callable
+            dependencies: Task key -> keys it waits on; keys that are not
+                in ``tasks`` (e.g. tiles resumed from disk) are ignored
+            on_done: Called as on_done(key, result, error) per settled task
+            priority: Sort key for ready tasks (lower runs first)
+
+        Returns:
+            Number of tasks that succeeded
+        """
+        waiting = {
+            key: {dep for dep in dependencies.get(key, ()) if dep in tasks and dep != key}
+            for key in tasks
+        }
+        dependents: dict[Hashable, list[Hashable]] = defaultdict(list)
+        for key, deps in waiting.items():
+            for dep in deps:
+                dependents[dep].append(key)
+
+        counter = itertools.count()
+        ready: list = []
+        retry_queue: list = []
+
+        def make_ready(key: Hashable) -> None:
+            heapq.heappush(ready, (priority(key), next(counter), key))
+
+        for key, deps in waiting.items():
+            if not deps:
+                make_ready(key)
+
+        attempts: dict[Hashable, int] = defaultdict(int)
+        in_flight: dict[Future, Hashable] = {}
+        limit = self.max_in_flight
+        resume_at = 0.0
+        settled = 0
+        succeeded = 0
+
+        pool = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        try:
+            while settled < len(tasks):
+                now = time.monotonic()
+                while retry_queue and retry_queue[0][0] <= now:
+                    make_ready(heapq.heappop(retry_queue)[2])
+
+                if now >= resume_at:
+                    while ready and len(in_flight) < limit:
+                        key = heapq.heappop(ready)[2]
+                        in_flight[pool.submit(tasks[key])] = key
+
+                wake_times = [retry_queue[0][0]] if retry_queue else []
+                if ready and now < resume_at:
+                    wake_times.append(resume_at)
+
+                if not in_flight:
+                    if not wake_times:
+                        raise ValueError("Task dependencies contain a cycle")
+                    time.sleep(max(0.0, min(wake_times) - now))
+                    continue
+
+                timeout = max(0.0, min(wake_times) - now) if wake_times else None
+                done, _ = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+
+                for future in done:
+                    key = in_flight.pop(future)
+                    error = future.exception()
+
+                    if isinstance(error, RateLimitError) and attempts[key] < self.max_retries:
+                        attempts[key] += 1
+                        self.retries += 1
+                        retry_at = time.monotonic() + self.backoff(attempts[key], error.retry_after)
+                        heapq.heappush(retry_queue, (retry_at, next(counter), key))
+                        resume_at = max(resume_at, retry_at)
+                        limit = max(1, limit // 2)
+                        continue
+
+                    settled += 1
+                    if error is None:
+                        succeeded += 1
+                        limit = min(self.max_in_flight, limit + 1)
+                    on_done(key, None if error else future.result(), error)
+
+                    for dependent in dependents.pop(key, ()):
+                        waiting[dependent].discard(key)
+                        if not waiting[dependent]:
+                            make_ready(dependent)
+        finally:
+            pool.shutdown(wait=True, cancel_futures=True)
+
+        return succeeded